@@ -0,0 +1,6 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pakiet testów wydajnościowych: generator danych syntetycznych i zestaw benchmarków.
+"""
@@ -0,0 +1,447 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Generator syntetycznych danych w skali produkcyjnej.
+Tworzy powtarzalny (ziarno losowania) zestaw klientów, pojazdów, depozytów, zamówień,
+wizyt, opon, części, stanów kasy i logów SMS/e-mail w skali 10k/100k/1M.
+
+Użycie:
+    python -m benchmarks.data_generator --scale 100k --output /tmp/bench.db
+"""
+
+import os
+import sys
+import random
+import sqlite3
+import logging
+import argparse
+from itertools import islice
+from datetime import datetime, timedelta
+
+# Dodaj katalog główny projektu do ścieżki, aby zaimportować moduły
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import (
+    initialize_database, check_and_upgrade_database,
+    check_and_add_missing_columns, initialize_finance_tables
+)
+from utils.schema import apply_migrations
+from utils.tire_size import refresh_tire_sizes
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Dostępne skale - liczba klientów, pozostałe tabele są do niej proporcjonalne
+SCALES = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+# Liczba wierszy wstawianych w jednym wywołaniu executemany
+BATCH_SIZE = 10_000
+
+FIRST_NAMES = [
+    "Jan", "Anna", "Piotr", "Katarzyna", "Tomasz", "Małgorzata", "Paweł", "Agnieszka",
+    "Michał", "Magdalena", "Krzysztof", "Joanna", "Marek", "Ewa", "Łukasz", "Zofia",
+]
+LAST_NAMES = [
+    "Kowalski", "Nowak", "Wiśniewski", "Wójcik", "Kowalczyk", "Kamiński", "Lewandowski",
+    "Zieliński", "Szymański", "Woźniak", "Dąbrowski", "Kozłowski", "Jankowski", "Mazur",
+]
+COMPANY_NAMES = ["Auto", "Trans", "Flota", "Serwis", "Logistyka", "Spedycja", "Car"]
+COMPANY_SUFFIXES = ["Sp. z o.o.", "S.A.", "Sp.J.", "Sp.K."]
+CAR_MODELS = [
+    ("Volkswagen", "Golf"), ("Volkswagen", "Passat"), ("Toyota", "Corolla"), ("Toyota", "RAV4"),
+    ("Skoda", "Octavia"), ("Skoda", "Fabia"), ("Ford", "Focus"), ("Opel", "Astra"),
+    ("BMW", "X5"), ("Audi", "A4"), ("Fiat", "500"), ("Mercedes", "Sprinter"), ("Kia", "Ceed"),
+]
+REGISTRATION_PREFIXES = ["WA", "WB", "WE", "KR", "PO", "GD", "WR", "LU", "SK", "DW"]
+TIRE_SIZES = [
+    "175/65 R14", "185/65 R15", "195/65 R15", "205/55 R16", "205/60 R16", "215/55 R17",
+    "225/45 R17", "225/40 R18", "235/65 R16C", "255/50 R19", "215/65 R16", "225/50 R17",
+]
+TIRE_BRANDS = [
+    ("Continental", "ContiWinterContact"), ("Michelin", "Pilot Sport"), ("Bridgestone", "Blizzak"),
+    ("Pirelli", "P Zero"), ("Goodyear", "UltraGrip"), ("Dębica", "Frigo"), ("Hankook", "Ventus"),
+    ("Nokian", "WR Snowproof"), ("Kleber", "Krisalp"), ("Dunlop", "Sport Maxx"),
+]
+SEASONS = ["Zimowe", "Letnie", "Całoroczne"]
+DEPOSIT_STATUSES = [("Aktywny", 45), ("Do odbioru", 10), ("Zaległy", 5), ("Rezerwacja", 2), ("Wydany", 38)]
+ORDER_STATUSES = [("Nowe", 10), ("W realizacji", 10), ("Zakończone", 70), ("Anulowane", 10)]
+APPOINTMENT_STATUSES = [("Zaplanowana", 30), ("Zakończona", 60), ("Anulowana", 10)]
+INVENTORY_STATUSES = [("Dostępna", 70), ("Rezerwacja", 10), ("Zamówiona", 5), ("Sprzedana", 15)]
+SERVICE_TYPES = ["Wymiana opon", "Przechowywanie opon", "Naprawa opony", "Wyważanie kół", "Wymiana oleju"]
+ORDER_SERVICES = [
+    ("usługa", "Wymiana opon", 120.0), ("usługa", "Wyważanie kół", 80.0),
+    ("usługa", "Przechowywanie opon", 150.0), ("usługa", "Naprawa opony", 50.0),
+    ("część", "Filtr oleju Bosch", 35.0), ("część", "Zawór TPMS", 60.0),
+]
+PART_CATEGORIES = ["Oleje", "Filtry", "Hamulce", "Płyny", "Akcesoria", "Zawory"]
+EXPENSE_CATEGORIES = ["Czynsz", "Media", "Materiały", "Usługi", "Wynagrodzenia", "Podatki", "Inne"]
+PAYMENT_METHODS = ["Gotówka", "Przelew", "Karta", "BLIK"]
+EMPLOYEES = ["Adam", "Bartek", "Celina", "Dawid"]
+
+
+def _weighted_choices(rng, weighted):
+    """
+    Przygotowuje funkcję losującą wartość z listy z wagami.
+
+    Args:
+        rng (random.Random): Generator liczb losowych
+        weighted (list): Lista krotek (wartość, waga)
+
+    Returns:
+        callable: Funkcja bez argumentów zwracająca wylosowaną wartość
+    """
+    values = [value for value, _weight in weighted]
+    weights = [weight for _value, weight in weighted]
+    return lambda: rng.choices(values, weights)[0]
+
+
+def _insert_many(cursor, query, rows):
+    """
+    Wstawia wiersze partiami, bez materializowania całego zbioru w pamięci.
+
+    Args:
+        cursor: Kursor bazy danych
+        query (str): Zapytanie INSERT z parametrami
+        rows (iterable): Generator krotek z danymi
+
+    Returns:
+        int: Liczba wstawionych wierszy
+    """
+    count = 0
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            return count
+        cursor.executemany(query, batch)
+        count += len(batch)
+
+
+def dataset_counts(scale):
+    """
+    Wylicza liczebności poszczególnych tabel dla podanej skali.
+
+    Args:
+        scale (int): Liczba klientów
+
+    Returns:
+        dict: Słownik {nazwa_tabeli: liczba_wierszy}
+    """
+    return {
+        "clients": scale,
+        "vehicles": int(scale * 1.4),
+        "deposits": int(scale * 1.5),
+        "orders": scale,
+        "appointments": scale,
+        "inventory": max(scale // 10, 50),
+        "parts": max(scale // 100, 20),
+        # Tabela cash_register ma unikalną datę - maksymalnie 10 lat historii
+        "cash_register": min(max(scale // 10, 30), 3650),
+        "expenses": max(scale // 5, 50),
+        "income": max(scale // 5, 50),
+        "sms_logs": scale * 2,
+        "email_logs": scale // 2,
+    }
+
+
+def generate_dataset(conn, scale, seed=42, reference_date=None):
+    """
+    Wypełnia bazę danych syntetycznymi danymi.
+
+    Args:
+        conn: Połączenie z bazą danych SQLite (najlepiej z pustą bazą)
+        scale (int): Liczba klientów - pozostałe tabele są proporcjonalne
+        seed (int): Ziarno generatora, zapewnia powtarzalność danych
+        reference_date (datetime, optional): Data odniesienia ("dzisiaj"). Domyślnie bieżąca data.
+
+    Returns:
+        dict: Słownik {nazwa_tabeli: liczba_wstawionych_wierszy}
+    """
+    rng = random.Random(seed)
+    today = reference_date or datetime.now()
+    counts = dataset_counts(scale)
+    inserted = {}
+
+    # Struktura bazy danych - te same funkcje, które wywołuje aplikacja przy starcie
+    initialize_database(conn)
+    check_and_upgrade_database(conn)
+    check_and_add_missing_columns(conn)
+    apply_migrations(conn)
+    initialize_finance_tables(conn)
+
+    cursor = conn.cursor()
+
+    # Przyspieszenie masowego wstawiania
+    cursor.execute("PRAGMA synchronous = OFF")
+    cursor.execute("PRAGMA journal_mode = MEMORY")
+
+    def random_date(days_back, days_forward=0):
+        return (today + timedelta(days=rng.randint(-days_back, days_forward))).strftime("%Y-%m-%d")
+
+    # Klienci
+    def clients():
+        for i in range(1, counts["clients"] + 1):
+            if rng.random() < 0.1:
+                name = f"{rng.choice(COMPANY_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(COMPANY_SUFFIXES)}"
+                client_type = "Firma"
+            else:
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                client_type = "Indywidualny"
+            phone = f"{rng.randint(500, 899)}{rng.randint(0, 999999):06d}"
+            email = f"klient{i}@example.com"
+            discount = rng.choice([0, 0, 0, 5, 10, 15])
+            yield (name, phone, email, "", discount, f"C-{i:07d}", client_type, random_date(2000) + " 10:00:00")
+
+    inserted["clients"] = _insert_many(cursor, """
+        INSERT INTO clients (name, phone_number, email, additional_info, discount, barcode, client_type, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, clients())
+
+    # Pojazdy - każdy klient ma co najmniej jeden pojazd (pierwsze N), reszta losowo
+    def vehicles():
+        for i in range(1, counts["vehicles"] + 1):
+            client_id = i if i <= counts["clients"] else rng.randint(1, counts["clients"])
+            make, model = rng.choice(CAR_MODELS)
+            registration = f"{rng.choice(REGISTRATION_PREFIXES)}{i:07d}"
+            vin = f"VIN{seed:04d}{i:010d}"
+            yield (client_id, make, model, rng.randint(2005, today.year), registration, vin,
+                   rng.choice(TIRE_SIZES), "Osobowy", "")
+
+    inserted["vehicles"] = _insert_many(cursor, """
+        INSERT INTO vehicles (client_id, make, model, year, registration_number, vin, tire_size, vehicle_type, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, vehicles())
+
+    # Depozyty - uwzględnij kolumnę vehicle_id, jeśli istnieje w tej wersji schematu
+    cursor.execute("PRAGMA table_info(deposits)")
+    has_vehicle_id = "vehicle_id" in {column[1] for column in cursor.fetchall()}
+    deposit_status = _weighted_choices(rng, DEPOSIT_STATUSES)
+
+    def deposits():
+        for _i in range(counts["deposits"]):
+            vehicle_id = rng.randint(1, counts["vehicles"])
+            client_id = vehicle_id if vehicle_id <= counts["clients"] else rng.randint(1, counts["clients"])
+            deposit_day = today - timedelta(days=rng.randint(0, 1800))
+            pickup_day = deposit_day + timedelta(days=rng.choice([150, 180, 210]))
+            row = [client_id, deposit_day.strftime("%Y-%m-%d"), pickup_day.strftime("%Y-%m-%d"),
+                   rng.choice(TIRE_SIZES), rng.choice(SEASONS), rng.choice([2, 4, 4, 4]),
+                   f"{rng.choice('ABCDEF')}-{rng.randint(1, 20):02d}-{rng.randint(1, 9):02d}",
+                   deposit_status(), ""]
+            if has_vehicle_id:
+                row.append(vehicle_id)
+            yield tuple(row)
+
+    deposit_columns = "client_id, deposit_date, pickup_date, tire_size, tire_type, quantity, location, status, notes"
+    deposit_params = "?, ?, ?, ?, ?, ?, ?, ?, ?"
+    if has_vehicle_id:
+        deposit_columns += ", vehicle_id"
+        deposit_params += ", ?"
+    inserted["deposits"] = _insert_many(
+        cursor, f"INSERT INTO deposits ({deposit_columns}) VALUES ({deposit_params})", deposits()
+    )
+
+    # Zamówienia i ich pozycje
+    order_status = _weighted_choices(rng, ORDER_STATUSES)
+    order_items = []
+
+    def orders():
+        for order_id in range(1, counts["orders"] + 1):
+            items = rng.sample(ORDER_SERVICES, rng.randint(1, 4))
+            total = 0.0
+            for item_type, name, price in items:
+                quantity = 4 if name == "Wymiana opon" else 1
+                total += quantity * price
+                order_items.append((order_id, item_type, None, name, quantity, price))
+            yield (rng.randint(1, counts["clients"]), random_date(1800), order_status(), round(total, 2), "")
+
+    inserted["orders"] = _insert_many(cursor, """
+        INSERT INTO orders (client_id, order_date, status, total_amount, notes)
+        VALUES (?, ?, ?, ?, ?)
+    """, orders())
+    inserted["order_items"] = _insert_many(cursor, """
+        INSERT INTO order_items (order_id, item_type, item_id, name, quantity, price)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, order_items)
+    order_items.clear()
+
+    # Wizyty
+    appointment_status = _weighted_choices(rng, APPOINTMENT_STATUSES)
+
+    def appointments():
+        for _i in range(counts["appointments"]):
+            vehicle_id = rng.randint(1, counts["vehicles"])
+            client_id = vehicle_id if vehicle_id <= counts["clients"] else rng.randint(1, counts["clients"])
+            yield (client_id, random_date(1800, 30), f"{rng.randint(8, 17):02d}:{rng.choice(['00', '30'])}",
+                   rng.choice(SERVICE_TYPES), appointment_status(), "", rng.choice([30, 60, 90]), vehicle_id)
+
+    inserted["appointments"] = _insert_many(cursor, """
+        INSERT INTO appointments (client_id, appointment_date, appointment_time, service_type,
+                                  status, notes, duration, vehicle_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, appointments())
+
+    # Magazyn opon
+    inventory_status = _weighted_choices(rng, INVENTORY_STATUSES)
+
+    def inventory():
+        for _i in range(counts["inventory"]):
+            manufacturer, model = rng.choice(TIRE_BRANDS)
+            condition = "Nowa" if rng.random() < 0.7 else "Używana"
+            price = round(rng.uniform(180, 1200), 2)
+            yield (f"{manufacturer} {model}", rng.choice(TIRE_SIZES), manufacturer, model,
+                   rng.randint(0, 16), price, f"{rng.randint(1, 52):02d}{rng.randint(18, 25)}",
+                   rng.choice(SEASONS), condition, inventory_status(), "", round(price * 0.7, 2),
+                   None if condition == "Nowa" else round(rng.uniform(3, 8), 1))
+
+    inserted["inventory"] = _insert_many(cursor, """
+        INSERT INTO inventory (brand_model, size, manufacturer, model, quantity, price, dot,
+                               season_type, condition, status, notes, purchase_price, bieznik)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, inventory())
+
+    # Części i akcesoria
+    def parts():
+        for i in range(1, counts["parts"] + 1):
+            category = rng.choice(PART_CATEGORIES)
+            yield (f"{category} #{i}", f"CAT-{i:06d}", category, rng.choice(TIRE_BRANDS)[0],
+                   rng.randint(0, 50), rng.randint(1, 5), round(rng.uniform(10, 400), 2),
+                   f"Regał {rng.choice('ABC')}-{rng.randint(1, 9)}", "", f"P-{i:07d}", "AutoParts",
+                   "23%", "szt.", "")
+
+    inserted["parts"] = _insert_many(cursor, """
+        INSERT INTO parts (name, catalog_number, category, manufacturer, quantity, minimum_quantity,
+                           price, location, description, barcode, supplier, vat_rate, unit, warranty)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, parts())
+
+    # Stan kasy (jeden wpis dziennie) i wypłaty
+    payroll_rows = []
+
+    def cash_register():
+        balance = 1000.0
+        for day in range(counts["cash_register"], 0, -1):
+            cash_id = counts["cash_register"] - day + 1
+            amount = round(rng.uniform(500, 6000), 2)
+            safe_transfer = round(amount * rng.choice([0, 0.5, 0.8]), 2)
+            previous = balance
+            balance = round(previous + amount - safe_transfer, 2)
+            if rng.random() < 0.3:
+                payroll_rows.append((cash_id, rng.choice(EMPLOYEES), round(rng.uniform(100, 400), 2), ""))
+            yield ((today - timedelta(days=day)).strftime("%Y-%m-%d"), amount, previous,
+                   safe_transfer, balance, "")
+
+    inserted["cash_register"] = _insert_many(cursor, """
+        INSERT INTO cash_register (date, amount, previous_amount, safe_transfer, current_balance, comment)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, cash_register())
+    inserted["payroll"] = _insert_many(cursor, """
+        INSERT INTO payroll (cash_register_id, employee_name, amount, notes) VALUES (?, ?, ?, ?)
+    """, payroll_rows)
+    payroll_rows.clear()
+
+    # Wydatki i przychody
+    inserted["expenses"] = _insert_many(cursor, """
+        INSERT INTO expenses (date, category, description, amount, payment_method, notes)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, ((random_date(1800), rng.choice(EXPENSE_CATEGORIES), "Wydatek", round(rng.uniform(20, 3000), 2),
+           rng.choice(PAYMENT_METHODS), "") for _i in range(counts["expenses"])))
+    inserted["income"] = _insert_many(cursor, """
+        INSERT INTO income (date, source, description, amount, payment_method, notes)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, ((random_date(1800), rng.choice(SERVICE_TYPES), "Przychód", round(rng.uniform(50, 2000), 2),
+           rng.choice(PAYMENT_METHODS), "") for _i in range(counts["income"])))
+
+    # Logi SMS i e-mail powiązane z depozytami
+    def sms_logs():
+        for _i in range(counts["sms_logs"]):
+            yield (rng.randint(1, counts["deposits"]), f"48{rng.randint(500, 899)}{rng.randint(0, 999999):06d}",
+                   "Przypominamy o odbiorze opon z depozytu.", random_date(1800) + " 12:00:00",
+                   rng.choice(["Wysłany", "Wysłany", "Wysłany", "Błąd"]))
+
+    inserted["sms_logs"] = _insert_many(cursor, """
+        INSERT INTO sms_logs (deposit_id, phone_number, content, sent_date, status) VALUES (?, ?, ?, ?, ?)
+    """, sms_logs())
+
+    def email_logs():
+        for _i in range(counts["email_logs"]):
+            deposit_id = rng.randint(1, counts["deposits"])
+            yield (deposit_id, f"klient{rng.randint(1, counts['clients'])}@example.com",
+                   f"Depozyt D{deposit_id:03d}", random_date(1800) + " 12:00:00", "Wysłany")
+
+    inserted["email_logs"] = _insert_many(cursor, """
+        INSERT INTO email_logs (deposit_id, email, subject, sent_date, status) VALUES (?, ?, ?, ?, ?)
+    """, email_logs())
+
+    # Kolumny rozmiaru opon wstawionych wierszy (wyzwalacze tylko je kolejkują)
+    refresh_tire_sizes(conn)
+    conn.commit()
+    cursor.execute("PRAGMA synchronous = FULL")
+
+    logger.info(f"Wygenerowano dane syntetyczne (skala {scale}, ziarno {seed}): {inserted}")
+    return inserted
+
+
+def create_dataset_file(path, scale, seed=42, reference_date=None):
+    """
+    Tworzy nowy plik bazy danych z syntetycznymi danymi.
+
+    Args:
+        path (str): Ścieżka do pliku bazy danych (istniejący plik zostanie nadpisany)
+        scale (int): Liczba klientów
+        seed (int): Ziarno generatora
+        reference_date (datetime, optional): Data odniesienia
+
+    Returns:
+        dict: Słownik {nazwa_tabeli: liczba_wstawionych_wierszy}
+    """
+    if os.path.exists(path):
+        os.remove(path)
+
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    try:
+        return generate_dataset(conn, scale, seed, reference_date)
+    finally:
+        conn.close()
+
+
+def parse_scale(value):
+    """
+    Zamienia nazwę skali (np. "100k") lub liczbę na liczbę klientów.
+
+    Args:
+        value (str): Nazwa skali z SCALES lub liczba całkowita
+
+    Returns:
+        int: Liczba klientów
+    """
+    value = str(value).lower()
+    if value in SCALES:
+        return SCALES[value]
+    return int(value)
+
+
+def main(argv=None):
+    """Punkt wejścia generatora uruchamianego z wiersza poleceń."""
+    parser = argparse.ArgumentParser(description="Generator syntetycznych danych Menadżera Serwisu Opon")
+    parser.add_argument("--scale", default="10k", help=f"Skala danych: {', '.join(SCALES)} lub liczba klientów")
+    parser.add_argument("--seed", type=int, default=42, help="Ziarno generatora liczb losowych")
+    parser.add_argument("--output", required=True, help="Ścieżka do tworzonego pliku bazy danych")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    counts = create_dataset_file(args.output, parse_scale(args.scale), args.seed)
+    for table, count in counts.items():
+        print(f"{table:<15} {count:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Zestaw benchmarków uruchamiający rzeczywiste funkcje ładujące aplikacji
+na syntetycznych danych, bez wyświetlania okien (platforma Qt "offscreen").
+Wyniki zapisywane są w formacie JSON, co pozwala porównywać kolejne wersje.
+
+Użycie:
+    python -m benchmarks.run_benchmarks --scale 100k --output wyniki.json
+    python -m benchmarks.run_benchmarks --dataset /tmp/bench.db --compare poprzednie.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import sqlite3
+import logging
+import importlib.util
+import platform
+import argparse
+import tempfile
+import statistics
+from datetime import datetime
+
+# Dodaj katalog główny projektu do ścieżki, aby zaimportować moduły
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.data_generator import SCALES, create_dataset_file, parse_scale
+from utils.archive import create_history_views
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Próg (względny), powyżej którego wzrost czasu jest raportowany jako regresja
+REGRESSION_THRESHOLD = 0.2
+
+
+class _ErrorCounter(logging.Handler):
+    """Zlicza błędy logowane przez aplikację - funkcje ładujące połykają wyjątki."""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def time_call(func, repeat=5, warmup=1):
+    """
+    Mierzy czas wykonania funkcji.
+
+    Args:
+        func (callable): Mierzona funkcja (bez argumentów)
+        repeat (int): Liczba pomiarów
+        warmup (int): Liczba wywołań rozgrzewkowych (niemierzonych)
+
+    Returns:
+        dict: Statystyki czasu w milisekundach i liczba błędów zalogowanych w trakcie
+    """
+    counter = _ErrorCounter()
+    logger.addHandler(counter)
+    try:
+        for _i in range(warmup):
+            func()
+        samples = []
+        for _i in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        logger.removeHandler(counter)
+
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "min_ms": round(min(samples), 3),
+        "max_ms": round(max(samples), 3),
+        "runs": repeat,
+        "errors": counter.count,
+    }
+
+
+def open_connection(db_path):
+    """
+    Otwiera połączenie skonfigurowane tak samo jak utils.database.create_connection.
+
+    Args:
+        db_path (str): Ścieżka do pliku bazy danych
+
+    Returns:
+        Connection: Połączenie z bazą danych
+    """
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    # Widoki historii (<tabela>_all) używane przez zakładki, tutaj bez archiwum
+    create_history_views(conn)
+    return conn
+
+
+def run_data_benchmarks(db_path, workdir, repeat):
+    """
+    Benchmarki importu i eksportu danych (nie wymagają Qt).
+
+    Args:
+        db_path (str): Ścieżka do bazy z danymi syntetycznymi
+        workdir (str): Katalog na pliki tymczasowe
+        repeat (int): Liczba pomiarów
+
+    Returns:
+        dict: Wyniki {nazwa_benchmarku: statystyki}
+    """
+    from utils.exporter import export_data_to_csv, export_data_to_excel
+    from utils.importer import import_data_from_csv
+
+    results = {}
+    conn = open_connection(db_path)
+    try:
+        for data_type in ("clients", "inventory"):
+            csv_path = os.path.join(workdir, f"export_{data_type}.csv")
+            results[f"exporter.csv.{data_type}"] = time_call(
+                lambda: export_data_to_csv(conn, csv_path, data_type), repeat
+            )
+
+        if importlib.util.find_spec("openpyxl") is not None:
+            xlsx_path = os.path.join(workdir, "export_clients.xlsx")
+            results["exporter.excel.clients"] = time_call(
+                lambda: export_data_to_excel(conn, xlsx_path, "clients"), max(1, repeat // 2)
+            )
+        else:
+            results["exporter.excel.clients"] = {"skipped": "brak biblioteki openpyxl"}
+    finally:
+        conn.close()
+
+    # Import na kopii bazy, aby nie zmieniać zestawu danych dla kolejnych pomiarów
+    csv_path = os.path.join(workdir, "export_clients.csv")
+    if os.path.exists(csv_path):
+        scratch_path = os.path.join(workdir, "import_scratch.db")
+        shutil.copy2(db_path, scratch_path)
+        scratch = open_connection(scratch_path)
+        try:
+            results["importer.csv.clients"] = time_call(
+                lambda: import_data_from_csv(scratch, csv_path, "clients"), 1, warmup=0
+            )
+        finally:
+            scratch.close()
+            os.remove(scratch_path)
+
+    return results
+
+
+def run_ui_benchmarks(db_path, repeat):
+    """
+    Benchmarki funkcji ładujących zakładek uruchamiane na platformie Qt "offscreen".
+
+    Args:
+        db_path (str): Ścieżka do bazy z danymi syntetycznymi
+        repeat (int): Liczba pomiarów
+
+    Returns:
+        dict: Wyniki {nazwa_benchmarku: statystyki}
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PySide6.QtWidgets import QApplication
+    except ImportError:
+        return {"ui": {"skipped": "brak biblioteki PySide6"}}
+
+    app = QApplication.instance() or QApplication([])
+
+    from ui.tabs.deposits_tab import DepositsTab
+    from ui.tabs.clients_tab import ClientsTab
+    from ui.tabs.orders_tab import OrdersTab
+    from ui.tabs.inventory_tab import InventoryTab
+    from ui.tabs.finances_tab import FinancesTab
+
+    results = {}
+    conn = open_connection(db_path)
+    try:
+        tabs = {}
+
+        def build(name, factory):
+            start = time.perf_counter()
+            tabs[name] = factory(conn)
+            results[f"{name}.init"] = {"median_ms": round((time.perf_counter() - start) * 1000, 3), "runs": 1}
+            app.processEvents()
+            return tabs[name]
+
+        deposits = build("deposits", DepositsTab)
+        clients = build("clients", ClientsTab)
+        orders = build("orders", OrdersTab)
+        inventory = build("inventory", InventoryTab)
+        finances = build("finances", FinancesTab)
+
+        def deposits_view(index, filter_text=""):
+            def load():
+                deposits.current_tab_index = index
+                deposits.current_page = 0
+                deposits.filter_text = filter_text
+                deposits.load_deposits()
+            return load
+
+        results["deposits.load_deposits.active"] = time_call(deposits_view(0), repeat)
+        results["deposits.load_deposits.history"] = time_call(deposits_view(1), repeat)
+        results["deposits.load_deposits.pending"] = time_call(deposits_view(2), repeat)
+        results["deposits.load_deposits.filter"] = time_call(deposits_view(0, "Kowal"), repeat)
+        results["deposits.load_statistics"] = time_call(deposits.load_statistics, repeat)
+        deposits_view(0)()
+
+        def clients_view(filter_text=""):
+            def load():
+                clients.current_page = 0
+                clients.filter_text = filter_text
+                clients.load_clients()
+            return load
+
+        results["clients.load_clients"] = time_call(clients_view(), repeat)
+        results["clients.load_clients.filter"] = time_call(clients_view("Kowal"), repeat)
+        clients_view()()
+
+        results["orders.load_orders"] = time_call(orders.load_orders, repeat)
+
+        results["inventory.load_inventory_data"] = time_call(
+            lambda: inventory.load_inventory_data("Nowa", inventory.new_tires_table, inventory.new_tires_page_label),
+            repeat
+        )
+        results["inventory.load_statistics"] = time_call(inventory.load_statistics, repeat)
+
+        results["finances.load_cash_register_data"] = time_call(finances.load_cash_register_data, repeat)
+        results["finances.update_financial_analysis"] = time_call(finances.update_financial_analysis, repeat)
+
+        for tab in tabs.values():
+            tab.deleteLater()
+        app.processEvents()
+    finally:
+        conn.close()
+
+    return results
+
+
+def compare_results(previous, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Porównuje dwa zestawy wyników i zwraca listę regresji.
+
+    Args:
+        previous (dict): Wcześniejszy wynik (zawartość pliku JSON)
+        current (dict): Bieżący wynik
+        threshold (float): Względny wzrost mediany uznawany za regresję
+
+    Returns:
+        list: Lista krotek (nazwa, poprzednia_mediana_ms, bieżąca_mediana_ms)
+    """
+    regressions = []
+    old_results = previous.get("results", {})
+    for name, stats in current.get("results", {}).items():
+        old = old_results.get(name, {})
+        if "median_ms" not in stats or "median_ms" not in old or old["median_ms"] <= 0:
+            continue
+        if stats["median_ms"] > old["median_ms"] * (1 + threshold):
+            regressions.append((name, old["median_ms"], stats["median_ms"]))
+    return regressions
+
+
+def run_benchmarks(scale, seed=42, repeat=5, dataset=None, label="", include_ui=True):
+    """
+    Uruchamia pełny zestaw benchmarków.
+
+    Args:
+        scale (int): Liczba klientów w generowanym zestawie danych
+        seed (int): Ziarno generatora
+        repeat (int): Liczba pomiarów każdego benchmarku
+        dataset (str, optional): Istniejący plik bazy z danymi (pomija generowanie)
+        label (str): Etykieta wersji zapisywana w wynikach
+        include_ui (bool): Uruchom także benchmarki zakładek (wymagają Qt)
+
+    Returns:
+        dict: Wyniki gotowe do zapisu w formacie JSON
+    """
+    workdir = tempfile.mkdtemp(prefix="tdm_bench_")
+    try:
+        db_path = os.path.join(workdir, "bench.db")
+        generation_ms = None
+        if dataset:
+            shutil.copy2(dataset, db_path)
+            counts = None
+        else:
+            start = time.perf_counter()
+            counts = create_dataset_file(db_path, scale, seed)
+            generation_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        results = {}
+        if include_ui:
+            results.update(run_ui_benchmarks(db_path, repeat))
+        results.update(run_data_benchmarks(db_path, workdir, repeat))
+
+        return {
+            "meta": {
+                "label": label,
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "scale": scale,
+                "seed": seed,
+                "repeat": repeat,
+                "dataset": dataset,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+                "generation_ms": generation_ms,
+            },
+            "dataset": counts,
+            "results": results,
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main(argv=None):
+    """Punkt wejścia benchmarków uruchamianych z wiersza poleceń."""
+    parser = argparse.ArgumentParser(description="Benchmarki Menadżera Serwisu Opon")
+    parser.add_argument("--scale", default="10k", help=f"Skala danych: {', '.join(SCALES)} lub liczba klientów")
+    parser.add_argument("--seed", type=int, default=42, help="Ziarno generatora liczb losowych")
+    parser.add_argument("--repeat", type=int, default=5, help="Liczba pomiarów każdego benchmarku")
+    parser.add_argument("--dataset", help="Istniejący plik bazy z danymi (zamiast generowania)")
+    parser.add_argument("--label", default="", help="Etykieta wersji zapisywana w wynikach")
+    parser.add_argument("--output", help="Plik JSON na wyniki (domyślnie standardowe wyjście)")
+    parser.add_argument("--compare", help="Plik JSON z poprzednimi wynikami do porównania")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    report = run_benchmarks(parse_scale(args.scale), args.seed, args.repeat, args.dataset, args.label)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        regressions = compare_results(previous, report)
+        for name, old, new in regressions:
+            print(f"REGRESJA {name}: {old:.1f} ms -> {new:.1f} ms", file=sys.stderr)
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Menadżer Serwisu Opon - wiersz poleceń do zadań wsadowych (bez interfejsu graficznego).
+Moduł nie importuje widżetów Qt, dzięki czemu nocne zadania (kopie zapasowe, eksport,
+konserwacja, przypomnienia) mogą być uruchamiane z harmonogramu systemowego (cron,
+Harmonogram zadań Windows) bez uruchamiania aplikacji.
+
+Użycie:
+    python -m tire_deposit_manager.cli backup --output /kopie/baza.db
+    python -m tire_deposit_manager.cli export clients klienci.csv
+    python -m tire_deposit_manager.cli import deposits depozyty.xlsx
+    python -m tire_deposit_manager.cli maintenance --task optimize
+    python -m tire_deposit_manager.cli reminders --send
+    python -m tire_deposit_manager.cli benchmark --scale 10k --output wyniki.json
+    python -m tire_deposit_manager.cli serve --host 0.0.0.0 --token sekret
+    python -m tire_deposit_manager.cli sync --folder /mnt/wspolny/replikacja
+    python -m tire_deposit_manager.cli kiosk --host 0.0.0.0
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+
+# Dodaj katalog aplikacji do ścieżki, aby zaimportować moduły (również przy python -m)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.paths import ensure_directories_exist
+from utils.log_config import LOGGER_NAME, setup_logging
+
+# Logger
+logger = logging.getLogger(LOGGER_NAME)
+
+# Typy danych obsługiwane przez importer i eksporter
+DATA_TYPES = ("clients", "deposits", "inventory", "parts", "appointments")
+
+# Kody wyjścia
+EXIT_OK = 0
+EXIT_ERROR = 1
+
+
+def open_database():
+    """
+    Otwiera bazę danych aplikacji i wykonuje brakujące migracje schematu
+    (tak jak przy starcie aplikacji, bez interfejsu).
+
+    Returns:
+        Connection: Połączenie z bazą danych lub None w przypadku błędu
+    """
+    from utils.database import create_connection, initialize_database
+    from utils.schema import apply_migrations
+    from utils.archive import attach_archive, create_history_views
+
+    conn = create_connection()
+    if conn is None:
+        return None
+    initialize_database(conn)
+    attach_archive(conn, create_views=False)
+    apply_migrations(conn)
+    create_history_views(conn)
+    return conn
+
+
+def load_settings(conn):
+    """
+    Wczytuje ustawienia aplikacji (QSettings i tabela settings w bazie danych).
+    Wymaga modułu PySide6.QtCore - importowany jest dopiero tutaj.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        Settings: Ustawienia aplikacji
+    """
+    from utils.settings import Settings
+
+    settings = Settings.get_instance()
+    settings.load_database(conn)
+    return settings
+
+
+def cmd_backup(args):
+    """Tworzy kopię zapasową bazy danych."""
+    from utils.database import backup_database
+
+    conn = open_database()
+    if conn is None:
+        return EXIT_ERROR
+    try:
+        if not backup_database(conn, args.output):
+            return EXIT_ERROR
+    finally:
+        conn.close()
+    print(f"Utworzono kopię zapasową{f': {args.output}' if args.output else ''}")
+    return EXIT_OK
+
+
+def cmd_restore(args):
+    """Przywraca bazę danych z kopii zapasowej."""
+    from utils.database import restore_database
+
+    if not restore_database(args.backup):
+        return EXIT_ERROR
+    print(f"Przywrócono bazę danych z kopii: {args.backup}")
+    return EXIT_OK
+
+
+def cmd_export(args):
+    """Eksportuje dane do pliku CSV, Excel lub PDF (według rozszerzenia)."""
+    from utils.exporter import export_data_to_csv, export_data_to_excel, export_data_to_pdf
+
+    exporters = {
+        ".csv": export_data_to_csv,
+        ".xlsx": export_data_to_excel,
+        ".pdf": export_data_to_pdf,
+    }
+    exporter = exporters.get(os.path.splitext(args.file)[1].lower())
+    if exporter is None:
+        logger.error(f"Nieobsługiwany format pliku eksportu: {args.file} (dozwolone: {', '.join(exporters)})")
+        return EXIT_ERROR
+
+    conn = open_database()
+    if conn is None:
+        return EXIT_ERROR
+    try:
+        count = exporter(conn, args.file, args.data_type)
+    except Exception as e:
+        logger.error(f"Błąd podczas eksportu danych: {e}")
+        return EXIT_ERROR
+    finally:
+        conn.close()
+    print(f"Wyeksportowano {count} rekordów ({args.data_type}) do pliku {args.file}")
+    return EXIT_OK
+
+
+def cmd_import(args):
+    """Importuje dane z pliku CSV lub Excel (według rozszerzenia)."""
+    from utils.importer import import_data_from_csv, import_data_from_excel
+
+    extension = os.path.splitext(args.file)[1].lower()
+    if extension == ".csv":
+        importer = import_data_from_csv
+    elif extension in (".xlsx", ".xlsm"):
+        importer = import_data_from_excel
+    else:
+        logger.error(f"Nieobsługiwany format pliku importu: {args.file} (dozwolone: .csv, .xlsx)")
+        return EXIT_ERROR
+
+    conn = open_database()
+    if conn is None:
+        return EXIT_ERROR
+    try:
+        count = importer(conn, args.file, args.data_type)
+    except Exception as e:
+        logger.error(f"Błąd podczas importu danych: {e}")
+        return EXIT_ERROR
+    finally:
+        conn.close()
+    print(f"Zaimportowano {count} rekordów ({args.data_type}) z pliku {args.file}")
+    return EXIT_OK
+
+
+def cmd_maintenance(args):
+    """Wykonuje zadania konserwacji bazy danych (domyślnie zadania wymagające wykonania)."""
+    from utils.maintenance import run_maintenance, TASK_FUNCTIONS
+
+    unknown = [task for task in args.task or [] if task not in TASK_FUNCTIONS]
+    if unknown:
+        logger.error(f"Nieznane zadania konserwacji: {', '.join(unknown)} (dostępne: {', '.join(TASK_FUNCTIONS)})")
+        return EXIT_ERROR
+
+    conn = open_database()
+    if conn is None:
+        return EXIT_ERROR
+    conn.close()
+
+    results = run_maintenance(tasks=args.task)
+    for task, result in results.items():
+        print(f"{task}: {result}")
+    if not results:
+        print("Brak zadań konserwacji do wykonania")
+    return EXIT_OK if all(result == "ok" for result in results.values()) else EXIT_ERROR
+
+
+def cmd_reminders(args):
+    """Zmienia statusy depozytów, planuje przypomnienia i opcjonalnie wysyła kolejkę."""
+    from utils.deposit_lifecycle import run_lifecycle_if_due
+    from utils.reminders import get_delivery_config, schedule_reminders, deliver_pending_notifications
+
+    conn = open_database()
+    if conn is None:
+        return EXIT_ERROR
+    try:
+        settings = load_settings(conn)
+        changes = run_lifecycle_if_due(conn, settings)
+        for status, deposit_ids in changes.items():
+            print(f"Zmiana statusu na '{status}': {len(deposit_ids)} depozytów")
+
+        config = get_delivery_config(settings)
+        scheduled = schedule_reminders(
+            conn, channels=config["channels"], company_data=config["company_data"],
+            pickup_days=config["pickup_days"], overdue_days=config["overdue_days"],
+            appointment_days=config["appointment_days"]
+        )
+        print(f"Zaplanowano przypomnień: {scheduled}")
+
+        if args.send:
+            sent, failed = deliver_pending_notifications(conn, config, args.limit)
+            print(f"Wysłano powiadomień: {sent}, błędy: {failed}")
+            if failed:
+                return EXIT_ERROR
+    finally:
+        conn.close()
+    return EXIT_OK
+
+
+def cmd_benchmark(args):
+    """Uruchamia benchmarki importu i eksportu na danych syntetycznych (bez zakładek Qt)."""
+    from benchmarks.data_generator import parse_scale
+    from benchmarks.run_benchmarks import run_benchmarks, compare_results
+
+    report = run_benchmarks(
+        parse_scale(args.scale), args.seed, args.repeat, args.dataset, args.label, include_ui=False
+    )
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        regressions = compare_results(previous, report)
+        for name, old, new in regressions:
+            print(f"REGRESJA {name}: {old:.1f} ms -> {new:.1f} ms", file=sys.stderr)
+        return EXIT_ERROR if regressions else EXIT_OK
+    return EXIT_OK
+
+
+def cmd_serve(args):
+    """Uruchamia serwer API dla pracy wielostanowiskowej."""
+    from utils.paths import DATABASE_PATH
+    from utils.server import serve
+
+    token = args.token or os.environ.get("TDM_SERVER_TOKEN")
+    if args.host not in ("127.0.0.1", "localhost") and not token:
+        logger.error("Serwer dostępny w sieci wymaga tokenu (--token lub TDM_SERVER_TOKEN)")
+        return EXIT_ERROR
+
+    conn = open_database()
+    if conn is None:
+        return EXIT_ERROR
+    conn.close()
+
+    print(f"Serwer API: http://{args.host}:{args.port}/api/ (Ctrl+C kończy pracę)")
+    serve(DATABASE_PATH, args.host, args.port, args.pool_size, token)
+    return EXIT_OK
+
+
+def cmd_sync(args):
+    """Wymienia zmiany z innymi stanowiskami przez wspólny katalog."""
+    from utils.replication import sync_folder, set_station_code
+
+    conn = open_database()
+    if conn is None:
+        return EXIT_ERROR
+    try:
+        if args.station_code is not None:
+            try:
+                set_station_code(conn, args.station_code)
+            except ValueError as e:
+                logger.error(str(e))
+                return EXIT_ERROR
+            print(f"Kod stanowiska: {args.station_code.strip().upper() or '(brak)'}")
+        folder = args.folder or load_settings(conn).value("sync_folder", "")
+        if not folder:
+            if args.station_code is not None:
+                return EXIT_OK
+            logger.error("Nie podano wspólnego katalogu replikacji (--folder lub ustawienie sync_folder)")
+            return EXIT_ERROR
+        exported, applied = sync_folder(conn, folder)
+        print(f"Wyeksportowano zmian: {exported}, zastosowano zmian innych stanowisk: {applied}")
+        return EXIT_OK
+    finally:
+        conn.close()
+
+
+def cmd_kiosk(args):
+    """Uruchamia wyszukiwarkę statusu depozytów dla klientów (API i strona kiosku)."""
+    from utils.paths import DATABASE_PATH
+    from utils.status_lookup import serve_status
+
+    conn = open_database()
+    if conn is None:
+        return EXIT_ERROR
+    conn.close()
+
+    print(f"Status depozytów: http://{args.host}:{args.port}/ (Ctrl+C kończy pracę)")
+    serve_status(DATABASE_PATH, args.host, args.port)
+    return EXIT_OK
+
+
+def build_parser():
+    """Tworzy parser argumentów wiersza poleceń."""
+    parser = argparse.ArgumentParser(
+        prog="python -m tire_deposit_manager.cli",
+        description="Menadżer Serwisu Opon - zadania wsadowe bez interfejsu graficznego"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Wypisuj komunikaty informacyjne")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backup = commands.add_parser("backup", help="Utwórz kopię zapasową bazy danych")
+    backup.add_argument("--output", help="Plik kopii (domyślnie katalog kopii zapasowych aplikacji)")
+    backup.set_defaults(func=cmd_backup)
+
+    restore = commands.add_parser("restore", help="Przywróć bazę danych z kopii zapasowej")
+    restore.add_argument("backup", help="Plik kopii zapasowej")
+    restore.set_defaults(func=cmd_restore)
+
+    export = commands.add_parser("export", help="Eksportuj dane do pliku .csv, .xlsx lub .pdf")
+    export.add_argument("data_type", choices=DATA_TYPES, help="Typ danych")
+    export.add_argument("file", help="Plik docelowy")
+    export.set_defaults(func=cmd_export)
+
+    import_ = commands.add_parser("import", help="Importuj dane z pliku .csv lub .xlsx")
+    import_.add_argument("data_type", choices=DATA_TYPES, help="Typ danych")
+    import_.add_argument("file", help="Plik źródłowy")
+    import_.set_defaults(func=cmd_import)
+
+    maintenance = commands.add_parser("maintenance", help="Wykonaj konserwację bazy danych")
+    maintenance.add_argument(
+        "--task", action="append",
+        help="Zadanie do wykonania (można podać wiele razy); domyślnie zadania wymagające wykonania"
+    )
+    maintenance.set_defaults(func=cmd_maintenance)
+
+    reminders = commands.add_parser("reminders", help="Zmień statusy depozytów i zaplanuj przypomnienia")
+    reminders.add_argument("--send", action="store_true", help="Wyślij oczekujące powiadomienia z kolejki")
+    reminders.add_argument("--limit", type=int, default=500, help="Maksymalna liczba wysłanych powiadomień")
+    reminders.set_defaults(func=cmd_reminders)
+
+    benchmark = commands.add_parser("benchmark", help="Benchmarki importu i eksportu danych")
+    benchmark.add_argument("--scale", default="10k", help="Skala danych (np. 10k, 100k) lub liczba klientów")
+    benchmark.add_argument("--seed", type=int, default=42, help="Ziarno generatora liczb losowych")
+    benchmark.add_argument("--repeat", type=int, default=5, help="Liczba pomiarów każdego benchmarku")
+    benchmark.add_argument("--dataset", help="Istniejący plik bazy z danymi (zamiast generowania)")
+    benchmark.add_argument("--label", default="", help="Etykieta wersji zapisywana w wynikach")
+    benchmark.add_argument("--output", help="Plik JSON na wyniki (domyślnie standardowe wyjście)")
+    benchmark.add_argument("--compare", help="Plik JSON z poprzednimi wynikami do porównania")
+    benchmark.set_defaults(func=cmd_benchmark)
+
+    server = commands.add_parser("serve", help="Uruchom serwer API dla pracy wielostanowiskowej")
+    server.add_argument("--host", default="127.0.0.1", help="Adres nasłuchiwania (0.0.0.0 - wszystkie interfejsy)")
+    server.add_argument("--port", type=int, default=8765, help="Port serwera")
+    server.add_argument("--pool-size", type=int, default=4, help="Liczba połączeń z bazą danych w puli")
+    server.add_argument("--token", help="Token wymagany w nagłówku X-Api-Token")
+    server.set_defaults(func=cmd_serve)
+
+    sync = commands.add_parser("sync", help="Wymień zmiany z innymi stanowiskami przez wspólny katalog")
+    sync.add_argument("--folder", help="Wspólny katalog wymiany (domyślnie ustawienie sync_folder)")
+    sync.add_argument("--station-code", help="Ustaw kod stanowiska w kodach nowych depozytów (np. B - DB001)")
+    sync.set_defaults(func=cmd_sync)
+
+    kiosk = commands.add_parser("kiosk", help="Uruchom wyszukiwarkę statusu depozytów dla klientów")
+    kiosk.add_argument("--host", default="127.0.0.1", help="Adres nasłuchiwania (0.0.0.0 - wszystkie interfejsy)")
+    kiosk.add_argument("--port", type=int, default=8766, help="Port usługi")
+    kiosk.set_defaults(func=cmd_kiosk)
+
+    return parser
+
+
+def main(argv=None):
+    """Punkt wejścia wiersza poleceń."""
+    args = build_parser().parse_args(argv)
+
+    ensure_directories_exist()
+    level = os.environ.get("TDM_LOG_LEVEL") or ("INFO" if args.verbose else "WARNING")
+    setup_logging(level, os.environ.get("TDM_LOG_MODULES"))
+
+    try:
+        return args.func(args)
+    except Exception as e:
+        logger.critical(f"Błąd podczas wykonywania polecenia {args.command}: {e}", exc_info=True)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
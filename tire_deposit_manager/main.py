@@ -9,57 +9,58 @@ Zmodernizowana wersja z ciemnym motywem jako domyślnym.
 
 
 
+import time
+
+# Czas startu procesu - punkt odniesienia dla profilowania uruchamiania
+_PROCESS_START = time.perf_counter()
+
 import os
 import sys
 import logging
-import time
+import threading
 import traceback
-from datetime import datetime
 from pathlib import Path
 
 from PySide6.QtWidgets import QApplication, QSplashScreen, QMessageBox
 from PySide6.QtGui import QPixmap, QIcon
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtCore import Qt, QTimer, QSettings
 
-from ui.main_window import MainWindow
 from utils.database import create_connection, initialize_database, check_and_upgrade_database, check_and_add_missing_columns
 from utils.paths import APP_DATA_DIR, LOGS_DIR, ICONS_DIR, ensure_directories_exist
 from utils.styles import get_style_sheet  # Nowa funkcja do pobierania stylów
+from utils.startup_profiler import StartupProfiler, PROFILE_STARTUP_FLAG, install_first_paint_probe
+from utils.sql_trace import SQLTracer
+from utils.settings import Settings
+from utils.schema import apply_migrations
+from utils.tire_size import refresh_tire_sizes
+from utils.summaries import repair_client_summary
+from utils.deposit_lifecycle import run_lifecycle_if_due
+from utils.reminders import schedule_reminders_if_due
+from utils.archive import (
+    attach_archive, create_history_views, run_scheduled_archiving,
+    DEFAULT_DEPOSIT_AGE_DAYS, DEFAULT_ORDER_AGE_DAYS, DEFAULT_LOG_AGE_DAYS
+)
+from utils.maintenance import MaintenanceScheduler, DEFAULT_IDLE_SECONDS
+from utils.log_config import LOGGER_NAME, setup_logging as configure_logging
 
 # Konfiguracja logowania
 def setup_logging():
-    """Konfiguruje system logowania aplikacji."""
-    # Upewnij się, że katalog na logi istnieje
-    os.makedirs(LOGS_DIR, exist_ok=True)
-    
-    # Nazwa pliku logu z datą
-    log_file = os.path.join(LOGS_DIR, f"app_{datetime.now().strftime('%Y%m%d')}.log")
-    
-    # Konfiguracja loggera
-    logger = logging.getLogger("TireServiceManager")
-    logger.setLevel(logging.DEBUG)
+    """
+    Konfiguruje system logowania aplikacji.
     
-    # Obsługa logowania do pliku
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setLevel(logging.DEBUG)
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_handler.setFormatter(file_formatter)
+    Zapis do plików odbywa się w wątku w tle (utils.log_config). Poziomy logowania
+    pochodzą z ustawień (Ustawienia > Diagnostyka) lub zmiennych środowiskowych
+    TDM_LOG_LEVEL i TDM_LOG_MODULES (np. "sms_sender=DEBUG,deposits_tab=DEBUG").
+    """
+    settings = QSettings("TireDepositManager", "Settings")
+    level = os.environ.get("TDM_LOG_LEVEL") or settings.value("log_level", "INFO")
+    module_levels = os.environ.get("TDM_LOG_MODULES") or settings.value("log_module_levels", "")
     
-    # Obsługa logowania do konsoli
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_formatter = logging.Formatter('%(levelname)s: %(message)s')
-    console_handler.setFormatter(console_formatter)
-    
-    # Dodanie handlerów do loggera
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
-    return logger
+    return configure_logging(level, module_levels)
 
 def exception_hook(exctype, value, traceback_obj):
     """Przechwytuje nieobsłużone wyjątki i loguje je."""
-    logger = logging.getLogger("TireServiceManager")
+    logger = logging.getLogger(LOGGER_NAME)
     
     # Formatowanie informacji o wyjątku
     tb_lines = traceback.format_exception(exctype, value, traceback_obj)
@@ -84,7 +85,19 @@ def exception_hook(exctype, value, traceback_obj):
     sys.__excepthook__(exctype, value, traceback_obj)
 
 def main():
-    """Funkcja główna aplikacji."""
+    """
+    Funkcja główna aplikacji.
+    
+    Opcja --profile-startup mierzy czasy faz uruchamiania (importy, inicjalizacja bazy,
+    migracje, budowa okna, pierwsze odmalowanie), wypisuje raport i kończy działanie.
+    W tym trybie nie są uruchamiane zadania zmieniające dane (cykl życia depozytów,
+    przypomnienia, archiwizacja, konserwacja, replikacja, alerty magazynowe).
+    """
+    # Profilowanie startu (tylko z flagą --profile-startup)
+    profiler = StartupProfiler.from_argv(sys.argv, _PROCESS_START)
+    profiler.record("imports", time.perf_counter() - _PROCESS_START)
+    qt_argv = [arg for arg in sys.argv if arg != PROFILE_STARTUP_FLAG]
+    
     try:
         # Ustawienie obsługi nieobsłużonych wyjątków
         sys.excepthook = exception_hook
@@ -97,7 +110,7 @@ def main():
         ensure_directories_exist()
         
         # Inicjalizacja aplikacji Qt
-        app = QApplication(sys.argv)
+        app = QApplication(qt_argv)
         app.setApplicationName("Menadżer Serwisu Opon")
         app.setWindowIcon(QIcon(os.path.join(ICONS_DIR, "app-icon.png")))
         
@@ -118,31 +131,76 @@ def main():
         if splash:
             splash.showMessage("Inicjalizacja bazy danych...", Qt.AlignBottom | Qt.AlignHCenter, Qt.white)
         
-        # Nawiązanie połączenia z bazą danych
-        conn = create_connection()
-        if not conn:
-            if splash:
-                splash.close()
-            QMessageBox.critical(None, "Błąd", "Nie można połączyć się z bazą danych!")
-            logger.critical("Nie można połączyć się z bazą danych!")
-            return 1
+        # Wspólne ustawienia aplikacji - oczekujące zmiany zapisywane przy zamykaniu
+        settings = Settings.get_instance()
+        app.aboutToQuit.connect(settings.flush)
+        
+        # Śledzenie zapytań SQL (Ustawienia > Diagnostyka lub zmienna środowiskowa TDM_SQL_TRACE=1)
+        SQLTracer.get_instance().configure(
+            settings.value("sql_trace_enabled", False, type=bool) or os.environ.get("TDM_SQL_TRACE") == "1",
+            settings.value("sql_trace_threshold_ms", SQLTracer.get_instance().slow_threshold_ms, type=float)
+        )
         
-        # Inicjalizacja struktury bazy danych
-        initialize_database(conn)
+        # Nawiązanie połączenia z bazą danych
+        with profiler.phase("db_init"):
+            conn = create_connection()
+            if not conn:
+                if splash:
+                    splash.close()
+                QMessageBox.critical(None, "Błąd", "Nie można połączyć się z bazą danych!")
+                logger.critical("Nie można połączyć się z bazą danych!")
+                return 1
+            
+            # Inicjalizacja struktury bazy danych
+            initialize_database(conn)
+            
+            # Ustawienia z tabeli settings trafiają do wspólnej pamięci podręcznej ustawień
+            settings.load_database(conn)
         
-        # Aktualizacja struktury bazy danych, jeśli potrzebna
-        check_and_upgrade_database(conn)
+        with profiler.phase("migrations"):
+            # Aktualizacja struktury bazy danych, jeśli potrzebna
+            check_and_upgrade_database(conn)
 
-        # Sprawdź i dodaj brakujące kolumny
-        check_and_add_missing_columns(conn)
+            # Sprawdź i dodaj brakujące kolumny
+            check_and_add_missing_columns(conn)
+            
+            # Archiwum danych historycznych - dołączane przed migracjami, aby wypełniane
+            # przez nie podsumowania uwzględniały także rekordy archiwalne
+            attach_archive(conn, create_views=False)
+            
+            # Wersjonowane migracje schematu (PRAGMA user_version)
+            apply_migrations(conn)
+            
+            # Kolumny rozmiaru opon zmienionych poza aplikacją (np. w sqlite3 lub DB Browser)
+            refresh_tire_sizes(conn)
+            
+            # Widoki historii (<tabela>_all) łączące bieżącą bazę i archiwum
+            create_history_views(conn)
+            
+            # Podsumowania klientów dodanych z pominięciem wyzwalaczy
+            repair_client_summary(conn)
+            
+            # Zadania zmieniające dane pomijane przy profilowaniu - pomiar nie może modyfikować bazy
+            if not profiler.enabled:
+                # Zmiany statusu depozytów ("Do odbioru", "Zaległy") - raz dziennie
+                run_lifecycle_if_due(conn, settings)
+                
+                # Przypomnienia należne dzisiaj (wysyłka z głównego okna, w tle)
+                schedule_reminders_if_due(conn, settings)
                 
         # Aktualizacja ekranu powitalnego
         if splash:
             splash.showMessage("Ładowanie interfejsu użytkownika...", Qt.AlignBottom | Qt.AlignHCenter, Qt.white)
         
+        # Import głównego okna dopiero po wyświetleniu ekranu powitalnego
+        # (zakładki ciągną za sobą ciężkie moduły Qt)
+        with profiler.phase("imports_ui"):
+            from ui.main_window import MainWindow
+        
         # Utworzenie głównego okna aplikacji
         try:
-            mainWindow = MainWindow(conn)
+            with profiler.phase("window_build"):
+                mainWindow = MainWindow(conn, background_jobs=not profiler.enabled)
         except Exception as e:
             if splash:
                 splash.close()
@@ -154,8 +212,36 @@ def main():
         if splash:
             splash.finish(mainWindow)
         
+        # Pomiar czasu do pierwszego odmalowania okna
+        def finish_profiling():
+            profiler.print_report()
+            app.quit()
+        
+        # Filtr pomiaru musi żyć do pierwszego odmalowania - referencja zapisana w oknie
+        mainWindow.first_paint_probe = install_first_paint_probe(mainWindow, profiler, finish_profiling)
+        
         mainWindow.show()
         
+        # Przy profilowaniu startu aplikacja kończy działanie po pierwszym odmalowaniu okna
+        if profiler.enabled:
+            return app.exec()
+        
+        # Okresowa archiwizacja starych danych w tle (osobne połączenie z bazą danych)
+        if settings.value("archive_enabled", True, type=bool):
+            archive_kwargs = {
+                "deposit_age_days": settings.value("archive_deposit_age_days", DEFAULT_DEPOSIT_AGE_DAYS, type=int),
+                "order_age_days": settings.value("archive_order_age_days", DEFAULT_ORDER_AGE_DAYS, type=int),
+                "log_age_days": settings.value("archive_log_age_days", DEFAULT_LOG_AGE_DAYS, type=int),
+            }
+            threading.Thread(target=run_scheduled_archiving, kwargs=archive_kwargs, daemon=True).start()
+        
+        # Konserwacja bazy danych w czasie bezczynności użytkownika
+        if settings.value("maintenance_enabled", True, type=bool):
+            maintenance_scheduler = MaintenanceScheduler(
+                app, idle_seconds=settings.value("maintenance_idle_seconds", DEFAULT_IDLE_SECONDS, type=int)
+            )
+            maintenance_scheduler.start()
+        
         # Uruchomienie pętli zdarzeń aplikacji
         return app.exec()
     
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł wspólnego rysowania delegatów tabel.
+Plakietki statusu i przyciski akcji są rysowane raz do QPixmap i przechowywane
+w QPixmapCache (klucz: zawartość, rozmiar komórki, skala ekranu), więc odświeżanie
+tabeli podczas przewijania sprowadza się do kopiowania gotowych obrazów.
+Pędzle, pióra i czcionki są przygotowywane raz (aplikacja używa ciemnego motywu).
+"""
+
+import logging
+
+from PySide6.QtWidgets import QStyledItemDelegate
+from PySide6.QtCore import Qt, QEvent, QRect
+from PySide6.QtGui import QBrush, QColor, QFont, QPainter, QPen, QPixmap, QPixmapCache
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Kolory plakietek statusu
+PILL_GREEN = "green"
+PILL_ORANGE = "orange"
+PILL_RED = "red"
+PILL_BLUE = "blue"
+PILL_GREY = "grey"
+PILL_DEFAULT = "default"
+
+# Kolory używane przez delegaty (ciemny motyw)
+DELEGATE_COLORS = {
+    PILL_GREEN: "#51cf66",
+    PILL_ORANGE: "#ffa94d",
+    PILL_RED: "#fa5252",
+    PILL_BLUE: "#4dabf7",
+    PILL_GREY: "#adb5bd",
+    PILL_DEFAULT: "#2c3034",
+    "pill_text": "#ffffff",
+    "action_text": "#ffffff",
+}
+
+# Wymiary plakietki statusu
+PILL_MARGIN = 4
+PILL_RADIUS = 10
+
+# Wymiary przycisków akcji
+ACTION_BUTTON_WIDTH = 30
+ACTION_BUTTON_HEIGHT = 24
+ACTION_FONT_FAMILY = "Segoe UI"
+ACTION_FONT_SIZE = 12
+
+_style = None
+
+
+class DelegateStyle:
+    """Pędzle, pióra i czcionki delegatów przygotowane raz dla całej aplikacji."""
+
+    def __init__(self, colors=DELEGATE_COLORS):
+        """
+        Args:
+            colors (dict): Kolory delegatów (jak DELEGATE_COLORS)
+        """
+        self.pill_brushes = {
+            name: QBrush(QColor(colors[name]))
+            for name in (PILL_GREEN, PILL_ORANGE, PILL_RED, PILL_BLUE, PILL_GREY, PILL_DEFAULT)
+        }
+        self.pill_text_pen = QPen(QColor(colors["pill_text"]))
+        self.action_pen = QPen(QColor(colors["action_text"]))
+        self.action_font = QFont(ACTION_FONT_FAMILY, ACTION_FONT_SIZE)
+
+    def pill_brush(self, color):
+        """Zwraca pędzel tła plakietki (nieznany kolor - tło domyślne)."""
+        return self.pill_brushes.get(color, self.pill_brushes[PILL_DEFAULT])
+
+
+def get_style():
+    """
+    Zwraca przygotowany styl delegatów (tworzony przy pierwszym rysowaniu, po utworzeniu QApplication).
+
+    Returns:
+        DelegateStyle: Styl delegatów
+    """
+    global _style
+    if _style is None:
+        _style = DelegateStyle()
+    return _style
+
+
+def _cached_pixmap(key, size, painter, render):
+    """
+    Zwraca obraz z QPixmapCache albo rysuje go funkcją render i zapamiętuje.
+
+    Args:
+        key (str): Klucz obrazu bez skali ekranu
+        size (QSize): Rozmiar obrazu w pikselach logicznych
+        painter (QPainter): Malarz komórki (skala ekranu urządzenia)
+        render (callable): Funkcja render(painter, rect) rysująca obraz
+
+    Returns:
+        QPixmap: Obraz komórki
+    """
+    ratio = painter.device().devicePixelRatioF()
+    key = f"{key}|{ratio}"
+    pixmap = QPixmapCache.find(key)
+    if pixmap is not None and not pixmap.isNull():
+        return pixmap
+
+    pixmap = QPixmap(int(size.width() * ratio), int(size.height() * ratio))
+    pixmap.setDevicePixelRatio(ratio)
+    pixmap.fill(Qt.transparent)
+    pixmap_painter = QPainter(pixmap)
+    try:
+        pixmap_painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        render(pixmap_painter, QRect(0, 0, size.width(), size.height()))
+    finally:
+        pixmap_painter.end()
+    QPixmapCache.insert(key, pixmap)
+    return pixmap
+
+
+def action_button_rects(rect, count):
+    """
+    Wyznacza obszary przycisków akcji rozmieszczonych równomiernie w komórce.
+
+    Args:
+        rect (QRect): Obszar komórki
+        count (int): Liczba przycisków
+
+    Returns:
+        list: Obszary (QRect) kolejnych przycisków
+    """
+    total_width = rect.width()
+    if count > 1:
+        # Mniejsza szerokość z większymi marginesami
+        button_width = min(total_width / (count + 1), ACTION_BUTTON_WIDTH)
+    else:
+        button_width = ACTION_BUTTON_WIDTH
+    spacing = (total_width - button_width * count) / (count + 1)
+    top = int(rect.top() + rect.height() / 2 - ACTION_BUTTON_HEIGHT / 2)
+
+    rects = []
+    x = rect.left() + spacing
+    for _ in range(count):
+        rects.append(QRect(int(x), top, int(button_width), ACTION_BUTTON_HEIGHT))
+        x += button_width + spacing
+    return rects
+
+
+class StatusPillDelegate(QStyledItemDelegate):
+    """Delegat rysujący status jako kolorową plakietkę z obrazów w pamięci podręcznej."""
+
+    def __init__(self, status_colors, parent=None):
+        """
+        Args:
+            status_colors (dict): Kolor plakietki (PILL_*) dla tekstu statusu
+            parent (QObject): Obiekt rodzica
+        """
+        super().__init__(parent)
+        self.status_colors = status_colors
+
+    def paint(self, painter, option, index):
+        if not index.isValid():
+            return super().paint(painter, option, index)
+
+        status = index.data() or ""
+        color = self.status_colors.get(status, PILL_DEFAULT)
+        style = get_style()
+
+        def render(pixmap_painter, rect):
+            pixmap_painter.setBrush(style.pill_brush(color))
+            pixmap_painter.setPen(Qt.NoPen)
+            pixmap_painter.drawRoundedRect(
+                rect.adjusted(PILL_MARGIN, PILL_MARGIN, -PILL_MARGIN, -PILL_MARGIN), PILL_RADIUS, PILL_RADIUS
+            )
+            pixmap_painter.setFont(option.font)
+            pixmap_painter.setPen(style.pill_text_pen)
+            pixmap_painter.drawText(rect, Qt.AlignCenter, status)
+
+        try:
+            size = option.rect.size()
+            key = f"pill|{status}|{color}|{size.width()}x{size.height()}|{option.font.key()}"
+            painter.drawPixmap(option.rect.topLeft(), _cached_pixmap(key, size, painter, render))
+        except Exception as e:
+            logger.error(f"Błąd podczas rysowania statusu: {e}")
+
+
+class ActionButtonsDelegate(QStyledItemDelegate):
+    """
+    Delegat wyświetlający przyciski akcji z emotikonami. Kliknięcie przycisku emituje
+    sygnał tabeli (rodzica) z numerem wiersza.
+    """
+
+    def __init__(self, actions, parent=None):
+        """
+        Args:
+            actions (list): Przyciski jako krotki (emotikona, nazwa sygnału rodzica)
+            parent (QObject): Tabela z sygnałami akcji
+        """
+        super().__init__(parent)
+        self.actions = actions
+        self._glyphs = "".join(glyph for glyph, _signal in actions)
+
+    def paint(self, painter, option, index):
+        if not index.isValid():
+            return super().paint(painter, option, index)
+
+        style = get_style()
+
+        def render(pixmap_painter, rect):
+            pixmap_painter.setFont(style.action_font)
+            pixmap_painter.setPen(style.action_pen)
+            for (glyph, _signal), button_rect in zip(self.actions, action_button_rects(rect, len(self.actions))):
+                pixmap_painter.drawText(button_rect, Qt.AlignCenter, glyph)
+
+        try:
+            size = option.rect.size()
+            key = f"actions|{self._glyphs}|{size.width()}x{size.height()}"
+            painter.drawPixmap(option.rect.topLeft(), _cached_pixmap(key, size, painter, render))
+        except Exception as e:
+            logger.error(f"Błąd podczas rysowania przycisków akcji: {e}")
+
+    def editorEvent(self, event, model, option, index):
+        try:
+            if event.type() == QEvent.Type.MouseButtonRelease:
+                for (_glyph, signal), button_rect in zip(self.actions, action_button_rects(option.rect, len(self.actions))):
+                    if button_rect.contains(event.pos()):
+                        getattr(self.parent(), signal).emit(index.row())
+                        return True
+        except Exception as e:
+            logger.error(f"Błąd podczas obsługi zdarzenia edytora: {e}")
+
+        return super().editorEvent(event, model, option, index)
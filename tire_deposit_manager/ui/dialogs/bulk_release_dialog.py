@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dialog danych odbioru przy zbiorczym wydawaniu depozytów.
+"""
+
+import datetime
+import logging
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit,
+    QPushButton, QDateEdit, QTextEdit, QCheckBox, QMessageBox
+)
+from PySide6.QtCore import QDate
+from PySide6.QtGui import QFont
+
+from utils.i18n import _  # Funkcja do obsługi lokalizacji
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+
+class BulkReleaseDialog(QDialog):
+    """
+    Dialog pobierający jednokrotnie datę wydania, osobę odbierającą i uwagi
+    dla wszystkich zaznaczonych depozytów.
+    """
+
+    def __init__(self, deposit_count, receiver="", parent=None):
+        """
+        Inicjalizacja dialogu zbiorczego wydania.
+
+        Args:
+            deposit_count (int): Liczba wydawanych depozytów
+            receiver (str, optional): Proponowana osoba odbierająca (np. wspólny klient)
+            parent (QWidget, optional): Widget rodzica. Domyślnie None.
+        """
+        super().__init__(parent)
+
+        self.deposit_count = deposit_count
+
+        self.setWindowTitle(_("Wydanie depozytów"))
+        self.resize(500, 320)
+
+        # Inicjalizacja UI
+        self.init_ui()
+        self.receiver_edit.setText(receiver)
+
+    def init_ui(self):
+        """Inicjalizacja interfejsu użytkownika."""
+        main_layout = QVBoxLayout(self)
+
+        # Nagłówek
+        header_label = QLabel(_("Wydanie {} depozytów").format(self.deposit_count))
+        header_label.setObjectName("headerLabel")
+        header_label.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        main_layout.addWidget(header_label)
+
+        # Data wydania i osoba odbierająca
+        release_grid = QGridLayout()
+        release_grid.setSpacing(10)
+
+        release_grid.addWidget(QLabel(_("Data wydania:")), 0, 0)
+        self.release_date_edit = QDateEdit()
+        self.release_date_edit.setCalendarPopup(True)
+        self.release_date_edit.setDate(QDate.currentDate())
+        release_grid.addWidget(self.release_date_edit, 0, 1)
+
+        release_grid.addWidget(QLabel(_("Osoba odbierająca:")), 1, 0)
+        self.receiver_edit = QLineEdit()
+        self.receiver_edit.setPlaceholderText(_("Imię i nazwisko osoby odbierającej"))
+        release_grid.addWidget(self.receiver_edit, 1, 1)
+
+        main_layout.addLayout(release_grid)
+
+        # Uwagi wspólne dla wszystkich depozytów
+        main_layout.addWidget(QLabel(_("Uwagi do wydania:")))
+        self.release_notes_edit = QTextEdit()
+        self.release_notes_edit.setPlaceholderText(_("Dodatkowe informacje o wydaniu depozytów..."))
+        self.release_notes_edit.setMaximumHeight(100)
+        main_layout.addWidget(self.release_notes_edit)
+
+        self.confirm_checkbox = QCheckBox(_("Potwierdzam wydanie kompletów opon klientowi"))
+        self.confirm_checkbox.setStyleSheet("font-weight: bold;")
+        main_layout.addWidget(self.confirm_checkbox)
+
+        # Przyciski
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addStretch()
+
+        cancel_button = QPushButton(_("Anuluj"))
+        cancel_button.clicked.connect(self.reject)
+        buttons_layout.addWidget(cancel_button)
+
+        self.release_button = QPushButton(_("Wydaj depozyty"))
+        self.release_button.setEnabled(False)
+        self.release_button.clicked.connect(self.on_release)
+        self.confirm_checkbox.toggled.connect(self.release_button.setEnabled)
+        buttons_layout.addWidget(self.release_button)
+
+        main_layout.addLayout(buttons_layout)
+
+    def validate_form(self):
+        """Sprawdza poprawność danych formularza (jak w dialogu wydania depozytu)."""
+        if not self.receiver_edit.text().strip():
+            QMessageBox.warning(self, _("Błąd walidacji"), _("Podaj imię i nazwisko osoby odbierającej."))
+            return False
+
+        if self.release_date_edit.date().toPython() > datetime.date.today():
+            response = QMessageBox.question(
+                self,
+                _("Uwaga"),
+                _("Data wydania jest przyszła. Czy na pewno chcesz kontynuować?"),
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if response == QMessageBox.No:
+                return False
+
+        return True
+
+    def on_release(self):
+        """Zamyka dialog z akceptacją po poprawnej walidacji."""
+        if self.validate_form():
+            self.accept()
+
+    def release_data(self):
+        """
+        Zwraca dane odbioru wpisane w formularzu.
+
+        Returns:
+            tuple: (data wydania YYYY-MM-DD, osoba odbierająca, uwagi)
+        """
+        return (
+            self.release_date_edit.date().toString("yyyy-MM-dd"),
+            self.receiver_edit.text().strip(),
+            self.release_notes_edit.toPlainText(),
+        )
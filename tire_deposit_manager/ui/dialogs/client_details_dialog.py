@@ -21,6 +21,7 @@ from ui.notifications import NotificationManager, NotificationTypes
 from ui.dialogs.client_dialog import ClientDialog
 from ui.tabs.vehicles_tab import VehiclesTab
 from utils.paths import ICONS_DIR
+from utils.tire_matching import get_tire_suggestions
 
 # Logger
 logger = logging.getLogger("TireDepositManager")
@@ -206,6 +207,20 @@ class ClientDetailsDialog(QDialog):
         orders_layout.addWidget(self.orders_table)
         self.tabs.addTab(orders_tab, "📋 Zamówienia")
         
+        # Zakładka opon z magazynu pasujących do pojazdów klienta
+        matches_tab = QWidget()
+        matches_layout = QVBoxLayout(matches_tab)
+        
+        self.matches_table = QTableWidget()
+        self.matches_table.setColumnCount(7)
+        self.matches_table.setHorizontalHeaderLabels([
+            "Pojazd", "Opona", "Rozmiar", "Sezon", "Ilość", "Cena", "DOT"
+        ])
+        self.matches_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        
+        matches_layout.addWidget(self.matches_table)
+        self.tabs.addTab(matches_tab, "🛞 Pasujące opony")
+        
         content_layout.addWidget(self.tabs)
         
         main_layout.addLayout(content_layout)
@@ -280,6 +295,9 @@ class ClientDetailsDialog(QDialog):
             # Ładowanie historii zamówień
             self.load_orders()
             
+            # Ładowanie opon pasujących do pojazdów
+            self.load_tire_matches()
+            
         except Exception as e:
             logger.error(f"Błąd podczas ładowania danych klienta: {e}")
             QMessageBox.critical(self, "Błąd", f"Wystąpił błąd podczas ładowania danych klienta:\n{str(e)}")
@@ -340,14 +358,14 @@ class ClientDetailsDialog(QDialog):
             logger.error(f"Błąd podczas ładowania wizyt klienta: {e}")
     
     def load_deposits(self):
-        """Ładuje historię depozytów klienta."""
+        """Ładuje historię depozytów klienta (łącznie z depozytami z archiwum)."""
         try:
             cursor = self.conn.cursor()
             cursor.execute("""
                 SELECT 
                     deposit_date, tire_brand, tire_size, 
                     status, season, location
-                FROM deposits
+                FROM deposits_all
                 WHERE client_id = ?
                 ORDER BY deposit_date DESC
             """, (self.client_id,))
@@ -396,14 +414,14 @@ class ClientDetailsDialog(QDialog):
             logger.error(f"Błąd podczas ładowania depozytów klienta: {e}")
     
     def load_orders(self):
-        """Ładuje historię zamówień klienta."""
+        """Ładuje historię zamówień klienta (łącznie z zamówieniami z archiwum)."""
         try:
             cursor = self.conn.cursor()
             cursor.execute("""
                 SELECT 
                     order_date, total_amount, 
                     status, notes
-                FROM orders
+                FROM orders_all
                 WHERE client_id = ?
                 ORDER BY order_date DESC
             """, (self.client_id,))
@@ -452,6 +470,37 @@ class ClientDetailsDialog(QDialog):
         except Exception as e:
             logger.error(f"Błąd podczas ładowania zamówień klienta: {e}")
     
+    def load_tire_matches(self):
+        """Ładuje dostępne opony z magazynu pasujące rozmiarem do pojazdów klienta."""
+        try:
+            suggestions = get_tire_suggestions(self.conn, client_id=self.client_id, limit=200)
+            
+            # Czyszczenie tabeli
+            self.matches_table.setRowCount(0)
+            
+            for row, suggestion in enumerate(suggestions):
+                self.matches_table.insertRow(row)
+                
+                dot = suggestion["dot"] or "-"
+                if suggestion["dot_age"] is not None:
+                    dot += f" ({suggestion['dot_age']:.1f} lat)"
+                
+                data_items = [
+                    f"{suggestion['make']} {suggestion['model']} ({suggestion['registration_number'] or '-'})",
+                    suggestion["brand_model"] or "-",
+                    suggestion["size"] or "-",
+                    suggestion["season_type"] or "-",
+                    suggestion["quantity"],
+                    f"{suggestion['price'] or 0:.2f} zł",
+                    dot
+                ]
+                
+                for col, value in enumerate(data_items):
+                    self.matches_table.setItem(row, col, QTableWidgetItem(str(value)))
+            
+        except Exception as e:
+            logger.error(f"Błąd podczas ładowania pasujących opon: {e}")
+    
     def edit_client(self):
         """Otwiera okno edycji klienta."""
         dialog = ClientDialog(self.conn, client_id=self.client_id, parent=self)
@@ -479,8 +528,9 @@ class ClientDetailsDialog(QDialog):
                 # Przełącz na zakładkę pojazdów
                 self.tabs.setCurrentIndex(0)
                 
-                # Odśwież listę pojazdów
+                # Odśwież listę pojazdów i pasujących opon
                 self.vehicles_tab.load_vehicles()
+                self.load_tire_matches()
                 
                 # Powiadomienie
                 NotificationManager.get_instance().show_notification(
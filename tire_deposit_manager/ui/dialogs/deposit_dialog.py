@@ -25,6 +25,7 @@ from ui.notifications import NotificationManager, NotificationTypes
 from utils.i18n import _  # Funkcja do obsługi lokalizacji
 from ui.dialogs.client_dialog import ClientDialog
 from ui.dialogs.vehicle_dialog import VehicleDialog
+from utils.tire_matching import get_tire_suggestions, format_suggestion
 
 # Logger
 logger = logging.getLogger("TireDepositManager")
@@ -420,6 +421,14 @@ class DepositDialog(QDialog):
         # Dodanie grid layout do głównego layout'u sekcji
         tire_layout.addLayout(tire_grid)
         
+        # Podpowiedzi: opony z magazynu pasujące do pojazdów klienta
+        tire_layout.addWidget(QLabel(_("Pasujące opony w magazynie:")))
+        
+        self.suggestions_list = QListWidget()
+        self.suggestions_list.setMaximumHeight(110)
+        self.suggestions_list.setSelectionMode(QAbstractItemView.NoSelection)
+        tire_layout.addWidget(self.suggestions_list)
+        
         main_layout.addWidget(tire_frame)
         
         # Sekcja dat
@@ -660,6 +669,7 @@ class DepositDialog(QDialog):
             self.vehicle_combo.clear()
             self.vehicle_combo.setEnabled(False)
             self.add_vehicle_btn.setEnabled(False)
+            self.load_tire_suggestions()
     
     def load_vehicles_for_client(self, client_id):
         """Ładuje pojazdy dla wybranego klienta."""
@@ -692,6 +702,8 @@ class DepositDialog(QDialog):
             self.vehicle_combo.setEnabled(True)
             self.add_vehicle_btn.setEnabled(True)
             
+            self.load_tire_suggestions()
+            
         except Exception as e:
             NotificationManager.get_instance().show_notification(
                 f"Błąd podczas ładowania pojazdów klienta: {e}",
@@ -702,6 +714,7 @@ class DepositDialog(QDialog):
         """Obsługuje wybór pojazdu z comboboxa."""
         if index <= 0:  # Pierwszy element to placeholder
             self.vehicle_id = None
+            self.load_tire_suggestions()
             return
         
         self.vehicle_id = self.vehicle_combo.itemData(index)
@@ -712,6 +725,27 @@ class DepositDialog(QDialog):
                 # Ustaw rozmiar opon z pojazdu
                 self.tire_size_combo.setCurrentText(tire_size)
                 break
+        
+        self.load_tire_suggestions()
+    
+    def load_tire_suggestions(self):
+        """Wyświetla opony z magazynu pasujące do wybranego pojazdu lub do wszystkich pojazdów klienta."""
+        self.suggestions_list.clear()
+        if not self.client_id:
+            return
+        
+        try:
+            suggestions = get_tire_suggestions(
+                self.conn, vehicle_id=self.vehicle_id, client_id=self.client_id, limit=20
+            )
+        except Exception as e:
+            logger.error(f"Błąd podczas wyszukiwania pasujących opon: {e}")
+            return
+        
+        for suggestion in suggestions:
+            self.suggestions_list.addItem(format_suggestion(suggestion))
+        if not suggestions:
+            self.suggestions_list.addItem(_("Brak pasujących opon w magazynie"))
     
     def add_new_client(self):
         """Otwiera dialog dodawania nowego klienta."""
@@ -32,6 +32,7 @@ from PySide6.QtCore import Qt, QDate, Signal
 from PySide6.QtGui import QIcon, QPixmap, QFont
 
 from utils.paths import ICONS_DIR
+from utils.status_lookup import format_deposit_code
 from ui.notifications import NotificationManager, NotificationTypes
 from utils.i18n import _  # Funkcja do obsługi lokalizacji
 
@@ -85,7 +86,7 @@ class DepositReleaseDialog(QDialog):
             SELECT 
                 d.client_id,
                 c.name AS client_name,
-                d.id,
+                d.id, d.code,
                 d.deposit_date,
                 d.pickup_date,
                 d.tire_size,
@@ -536,7 +537,7 @@ class DepositReleaseDialog(QDialog):
             
             query = """
             SELECT 
-                d.id,
+                d.id, d.code,
                 c.name AS client_name,
                 d.tire_size,
                 d.tire_type,
@@ -565,7 +566,7 @@ class DepositReleaseDialog(QDialog):
                 self.deposits_table.insertRow(row_position)
                 
                 # Formatowanie ID (D001, D002, itp.)
-                deposit_id_str = f"D{str(deposit['id']).zfill(3)}"
+                deposit_id_str = format_deposit_code(deposit['id'], deposit['code'])
                 
                 # Formatowanie daty
                 deposit_date = datetime.datetime.strptime(deposit['deposit_date'], "%Y-%m-%d").strftime("%d-%m-%Y")
@@ -630,7 +631,7 @@ class DepositReleaseDialog(QDialog):
             return
         
         # Formatowanie ID
-        deposit_id = f"D{str(self.deposit_details['id']).zfill(3)}"
+        deposit_id = format_deposit_code(self.deposit_details['id'], self.deposit_details['code'])
         
         # Formatowanie dat
         deposit_date = datetime.datetime.strptime(self.deposit_details['deposit_date'], "%Y-%m-%d").strftime("%d-%m-%Y")
@@ -24,6 +24,7 @@ from PySide6.QtCore import Qt, QDate, QSize
 
 from ui.notifications import NotificationManager, NotificationTypes
 from utils.paths import ICONS_DIR
+from utils.settings import Settings
 from ui.dialogs.client_dialog import ClientDialog
 
 
@@ -1589,8 +1590,7 @@ class OrderDialog(QDialog):
             current_date = datetime.now().strftime("%d-%m-%Y")
             
             # Pobierz dane firmy z ustawień
-            from PySide6.QtCore import QSettings
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_name = settings.value("company_name", "Serwis Opon")
             company_address = settings.value("company_address", "")
             company_phone = settings.value("company_phone", "")
@@ -1895,14 +1895,13 @@ class OrderDialog(QDialog):
             import json
             import os
             import logging
-            from PySide6.QtCore import QSettings
             from utils.sms_sender import SMSSender
 
             # Logger dla dokładniejszego raportowania błędów
             logger = logging.getLogger("TireDepositManager")
 
-            # Pobierz ustawienia z QSettings
-            settings = QSettings("TireDepositManager", "Settings")
+            # Pobierz ustawienia
+            settings = Settings.get_instance()
             
             # Sprawdź, czy SMS-y są włączone
             enable_sms = settings.value("enable_sms", False, type=bool)
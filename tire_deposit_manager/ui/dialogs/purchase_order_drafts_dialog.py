@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dialog szkiców zamówień u dostawców tworzonych dla pozycji o niskim stanie magazynowym.
+"""
+
+import logging
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView, QMessageBox
+)
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QFont
+
+from ui.notifications import NotificationManager, NotificationTypes
+from utils.stock_alerts import (
+    get_draft_purchase_orders, set_draft_status, delete_draft_purchase_orders,
+    DRAFT_STATUS, DRAFT_ORDERED
+)
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Nazwy rodzajów pozycji w tabeli
+ITEM_KIND_NAMES = {
+    "part": "Część",
+    "tire": "Opona",
+}
+
+# Filtr statusu: {etykieta: status przekazywany do zapytania}
+STATUS_FILTERS = {
+    "Szkice": DRAFT_STATUS,
+    "Zamówione": DRAFT_ORDERED,
+    "Wszystkie": None,
+}
+
+
+class PurchaseOrderDraftsDialog(QDialog):
+    """
+    Dialog przeglądania szkiców zamówień.
+    Szkice można oznaczyć jako zamówione u dostawcy lub usunąć.
+    """
+
+    def __init__(self, db_connection, parent=None):
+        """
+        Inicjalizacja dialogu szkiców zamówień.
+
+        Args:
+            db_connection: Połączenie z bazą danych SQLite
+            parent (QWidget, optional): Widget rodzica. Domyślnie None.
+        """
+        super().__init__(parent)
+
+        self.conn = db_connection
+
+        self.setWindowTitle("Szkice zamówień")
+        self.resize(850, 450)
+
+        # Inicjalizacja UI
+        self.init_ui()
+        self.load_drafts()
+
+    def init_ui(self):
+        """Inicjalizacja interfejsu użytkownika."""
+        main_layout = QVBoxLayout(self)
+
+        # Nagłówek
+        header_label = QLabel("Szkice zamówień dla pozycji o niskim stanie")
+        header_label.setObjectName("headerLabel")
+        header_label.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        main_layout.addWidget(header_label)
+
+        # Filtr statusu
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Pokaż:"))
+        self.status_combo = QComboBox()
+        self.status_combo.addItems(list(STATUS_FILTERS))
+        self.status_combo.currentIndexChanged.connect(self.load_drafts)
+        filter_layout.addWidget(self.status_combo)
+        filter_layout.addStretch()
+        main_layout.addLayout(filter_layout)
+
+        # Tabela szkiców
+        self.drafts_table = QTableWidget(0, 7)
+        self.drafts_table.setHorizontalHeaderLabels(
+            ["Data", "Rodzaj", "Pozycja", "Stan", "Dostawca", "Do zamówienia", "Status"]
+        )
+        self.drafts_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.drafts_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.drafts_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.drafts_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.drafts_table.setAlternatingRowColors(True)
+        self.drafts_table.verticalHeader().setVisible(False)
+        main_layout.addWidget(self.drafts_table)
+
+        # Przyciski
+        buttons_layout = QHBoxLayout()
+
+        self.ordered_button = QPushButton("Oznacz jako zamówione")
+        self.ordered_button.clicked.connect(self.mark_ordered)
+        buttons_layout.addWidget(self.ordered_button)
+
+        self.delete_button = QPushButton("Usuń szkic")
+        self.delete_button.clicked.connect(self.delete_drafts)
+        buttons_layout.addWidget(self.delete_button)
+
+        buttons_layout.addStretch()
+
+        close_button = QPushButton("Zamknij")
+        close_button.clicked.connect(self.accept)
+        buttons_layout.addWidget(close_button)
+
+        main_layout.addLayout(buttons_layout)
+
+    def load_drafts(self):
+        """Ładuje szkice zamówień o wybranym statusie."""
+        try:
+            drafts = get_draft_purchase_orders(self.conn, STATUS_FILTERS[self.status_combo.currentText()])
+
+            self.drafts_table.setRowCount(0)
+            for row, draft in enumerate(drafts):
+                draft_id, created_at, item_kind, _item_id, name, stock_quantity, supplier, quantity, status = draft
+                self.drafts_table.insertRow(row)
+                values = [
+                    created_at,
+                    ITEM_KIND_NAMES.get(item_kind, item_kind),
+                    name or "(pozycja usunięta)",
+                    "" if stock_quantity is None else str(stock_quantity),
+                    supplier or "",
+                    str(quantity),
+                    status or "",
+                ]
+                for column, value in enumerate(values):
+                    item = QTableWidgetItem(value)
+                    if column in (3, 5):
+                        item.setTextAlignment(Qt.AlignCenter)
+                    self.drafts_table.setItem(row, column, item)
+                self.drafts_table.item(row, 0).setData(Qt.UserRole, draft_id)
+
+            self.ordered_button.setEnabled(self.status_combo.currentText() != "Zamówione")
+        except Exception as e:
+            logger.error(f"Błąd podczas ładowania szkiców zamówień: {e}")
+            QMessageBox.critical(self, "Błąd", f"Nie udało się załadować szkiców zamówień:\n{str(e)}")
+
+    def selected_draft_ids(self):
+        """
+        Zwraca identyfikatory zaznaczonych szkiców.
+
+        Returns:
+            list: Lista identyfikatorów
+        """
+        rows = sorted({index.row() for index in self.drafts_table.selectionModel().selectedRows()})
+        return [self.drafts_table.item(row, 0).data(Qt.UserRole) for row in rows]
+
+    def mark_ordered(self):
+        """Oznacza zaznaczone szkice jako zamówione u dostawcy."""
+        draft_ids = self.selected_draft_ids()
+        if not draft_ids:
+            QMessageBox.information(self, "Szkice zamówień", "Zaznacz szkice do oznaczenia.")
+            return
+
+        try:
+            changed = set_draft_status(self.conn, draft_ids, DRAFT_ORDERED)
+            NotificationManager.get_instance().show_notification(
+                f"Oznaczono jako zamówione: {changed} pozycji", NotificationTypes.SUCCESS
+            )
+            self.load_drafts()
+        except Exception as e:
+            logger.error(f"Błąd podczas zmiany statusu szkiców zamówień: {e}")
+            QMessageBox.critical(self, "Błąd", f"Nie udało się zmienić statusu szkiców:\n{str(e)}")
+
+    def delete_drafts(self):
+        """Usuwa zaznaczone szkice po potwierdzeniu."""
+        draft_ids = self.selected_draft_ids()
+        if not draft_ids:
+            QMessageBox.information(self, "Szkice zamówień", "Zaznacz szkice do usunięcia.")
+            return
+
+        reply = QMessageBox.question(
+            self, "Usuń szkice", f"Czy na pewno usunąć zaznaczone szkice ({len(draft_ids)})?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return
+
+        try:
+            deleted = delete_draft_purchase_orders(self.conn, draft_ids)
+            NotificationManager.get_instance().show_notification(
+                f"Usunięto szkice zamówień: {deleted}", NotificationTypes.INFO
+            )
+            self.load_drafts()
+        except Exception as e:
+            logger.error(f"Błąd podczas usuwania szkiców zamówień: {e}")
+            QMessageBox.critical(self, "Błąd", f"Nie udało się usunąć szkiców:\n{str(e)}")
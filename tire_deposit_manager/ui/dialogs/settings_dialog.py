@@ -17,11 +17,11 @@ from PySide6.QtWidgets import (
     QDialogButtonBox, QMessageBox, QFontComboBox, QTextEdit, QGroupBox,
     QFileDialog, QFrame, QScrollArea, QSizePolicy, QInputDialog
 )
-from PySide6.QtCore import Qt, QSettings, QDir, QFile
+from PySide6.QtCore import Qt, QDir, QFile
 from PySide6.QtGui import QIcon, QFont, QTextDocument, QTextCursor
-from PySide6.QtWebEngineWidgets import QWebEngineView
 
 from utils.paths import ICONS_DIR, CONFIG_DIR, ensure_dir_exists
+from utils.settings import Settings
 from ui.notifications import NotificationManager, NotificationTypes
 from utils.i18n import _  # Funkcja do obsługi lokalizacji
 
@@ -631,7 +631,7 @@ class SettingsDialog(QDialog):
         self.resize(800, 600)
         
         # Inicjalizacja ustawień
-        self.settings = QSettings("TireDepositManager", "Settings")
+        self.settings = Settings.get_instance()
         
         # Ścieżka do pliku z szablonami
         self.templates_file = os.path.join(CONFIG_DIR, "templates.json")
@@ -1051,6 +1051,7 @@ class SettingsDialog(QDialog):
         preview_group = QGroupBox("Podgląd")
         preview_layout = QVBoxLayout(preview_group)
         
+        from PySide6.QtWebEngineWidgets import QWebEngineView
         self.email_preview = QWebEngineView()
         self.email_preview.setMinimumWidth(300)
         self.email_preview.setMinimumHeight(300)
@@ -1178,6 +1179,7 @@ class SettingsDialog(QDialog):
         preview_group = QGroupBox("Podgląd etykiety")
         preview_layout = QVBoxLayout(preview_group)
         
+        from PySide6.QtWebEngineWidgets import QWebEngineView
         self.label_preview = QWebEngineView()
         self.label_preview.setMinimumHeight(300)
         preview_layout.addWidget(self.label_preview)
@@ -1319,6 +1321,7 @@ class SettingsDialog(QDialog):
         preview_group = QGroupBox("Podgląd potwierdzenia")
         preview_layout = QVBoxLayout(preview_group)
         
+        from PySide6.QtWebEngineWidgets import QWebEngineView
         self.receipt_preview = QWebEngineView()
         self.receipt_preview.setMinimumHeight(300)
         preview_layout.addWidget(self.receipt_preview)
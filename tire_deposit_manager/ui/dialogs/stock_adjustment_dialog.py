@@ -19,10 +19,18 @@ from PySide6.QtGui import QIcon, QFont
 
 from ui.notifications import NotificationManager, NotificationTypes
 from utils.paths import ICONS_DIR
+from utils.stock_ledger import stock_movement, MOVEMENT_RECEIPT, MOVEMENT_SALE, MOVEMENT_ADJUSTMENT
 
 # Logger
 logger = logging.getLogger("TireDepositManager")
 
+# Typy ruchów w rejestrze magazynowym dla powodów korekty
+MOVEMENT_TYPES_BY_REASON = {
+    "Dostawa towaru": MOVEMENT_RECEIPT,
+    "Sprzedaż": MOVEMENT_SALE,
+}
+
+
 class StockAdjustmentDialog(QDialog):
     """
     Dialog do korekty stanu magazynowego części/akcesoriów.
@@ -228,11 +236,13 @@ class StockAdjustmentDialog(QDialog):
                 self.current_quantity, new_quantity, reason, document, notes, user
             ))
             
-            # Aktualizacja stanu w tabeli parts
-            cursor.execute(
-                "UPDATE parts SET quantity = ? WHERE id = ?",
-                (new_quantity, self.part_id)
-            )
+            # Aktualizacja stanu w tabeli parts (ruch trafia do rejestru z powodem i dokumentem)
+            movement_type = MOVEMENT_TYPES_BY_REASON.get(reason, MOVEMENT_ADJUSTMENT)
+            with stock_movement(self.conn, movement_type, reference=document or None, notes=reason):
+                cursor.execute(
+                    "UPDATE parts SET quantity = ? WHERE id = ?",
+                    (new_quantity, self.part_id)
+                )
             
             # Zatwierdzenie zmian
             self.conn.commit()
@@ -9,6 +9,7 @@ Zmodernizowana wersja interfejsu z nowoczesnym wyglądem.
 import os
 import sys
 import logging
+import threading
 from datetime import datetime
 
 from PySide6.QtWidgets import (
@@ -18,7 +19,7 @@ from PySide6.QtWidgets import (
     QComboBox, QStackedWidget, QSizePolicy, QSpacerItem
 )
 from PySide6.QtGui import QIcon, QPixmap, QFont, QColor, QAction
-from PySide6.QtCore import Qt, QSize, QTimer, QSettings, Signal, Slot
+from PySide6.QtCore import Qt, QSize, QTimer, Signal, Slot
 
 # Import własnych modułów aplikacji
 from ui.tabs.dashboard_tab import DashboardTab
@@ -26,6 +27,12 @@ from ui.tabs.settings_tab import SettingsTab
 from ui.notifications import NotificationManager, NotificationTypes
 from ui.tabs.orders_tab import OrdersTab
 from utils.paths import ICONS_DIR, APP_DATA_DIR, DATABASE_PATH, BACKUP_DIR, resource_path
+from utils.settings import Settings
+from utils.stock_alerts import take_pending_alerts, create_draft_purchase_orders
+from utils.deposit_lifecycle import run_lifecycle_if_due, STATUS_PICKUP, STATUS_OVERDUE
+from utils.reminders import schedule_reminders_if_due, get_delivery_config, run_reminder_delivery
+from utils.replication import run_folder_sync
+from utils.status_lookup import start_status_server
 from ui.tabs.deposits_tab import DepositsTab
 from ui.tabs.inventory_tab import InventoryTab
 from ui.tabs.finances_tab import FinancesTab
@@ -46,13 +53,17 @@ class MainWindow(QMainWindow):
     
     # Sygnały
     database_updated = Signal()  # Emitowany po aktualizacji bazy danych
+    replication_finished = Signal(int)  # Emitowany z wątku replikacji (liczba zastosowanych zmian)
     
-    def __init__(self, db_connection):
+    def __init__(self, db_connection, background_jobs=True):
         """
         Inicjalizacja głównego okna aplikacji.
         
         Args:
             db_connection: Połączenie z bazą danych SQLite
+            background_jobs (bool): Czy uruchamiać zadania okresowe zmieniające dane
+                (alerty magazynowe, cykl życia depozytów, przypomnienia, replikacja).
+                Wyłączane przy profilowaniu startu.
         """
         super().__init__()
         
@@ -66,7 +77,7 @@ class MainWindow(QMainWindow):
         self.init_ui()
         
         # Inicjalizacja ustawień
-        self.settings = QSettings("TireDepositManager", "Settings")
+        self.settings = Settings.get_instance()
         self.load_settings()
         
         # Inicjalizacja notyfikacji
@@ -81,9 +92,48 @@ class MainWindow(QMainWindow):
         self.timer.timeout.connect(self.update_time)
         self.timer.start(1000)  # Aktualizacja co sekundę
         
+        self.reminder_delivery_thread = None
+        self.replication_thread = None
+        self.replication_finished.connect(self.on_replication_finished)
+        if background_jobs:
+            self.start_background_jobs()
+        
+        # Wyszukiwarka statusu depozytów dla klientów (własne połączenie tylko do odczytu)
+        self.status_server = None
+        if self.settings.value("status_lookup_enabled", False, type=bool):
+            try:
+                self.status_server = start_status_server(
+                    DATABASE_PATH,
+                    self.settings.value("status_lookup_host", "127.0.0.1"),
+                    self.settings.value("status_lookup_port", 8766, type=int)
+                )
+            except Exception as e:
+                logger.error(f"Błąd podczas uruchamiania wyszukiwarki statusu depozytów: {e}")
+        
         # Pokaż okno
         self.setup_window()
     
+    def start_background_jobs(self):
+        """Uruchamia timery zadań okresowych zmieniających dane."""
+        # Kolejka alertów niskiego stanu magazynowego sprawdzana co minutę
+        self.stock_alert_timer = QTimer(self)
+        self.stock_alert_timer.timeout.connect(self.check_stock_alerts)
+        self.stock_alert_timer.start(60000)
+        QTimer.singleShot(3000, self.check_stock_alerts)
+        
+        # Zmiany statusu depozytów po zmianie daty (przy starcie wykonywane w main.py)
+        self.deposit_lifecycle_timer = QTimer(self)
+        self.deposit_lifecycle_timer.timeout.connect(self.check_deposit_lifecycle)
+        self.deposit_lifecycle_timer.timeout.connect(self.check_reminders)
+        self.deposit_lifecycle_timer.start(3600000)
+        QTimer.singleShot(10000, self.check_reminders)
+        
+        # Wymiana zmian z innymi stanowiskami przez wspólny katalog co 5 minut (w tle)
+        self.replication_timer = QTimer(self)
+        self.replication_timer.timeout.connect(self.check_replication)
+        self.replication_timer.start(300000)
+        QTimer.singleShot(15000, self.check_replication)
+    
     def init_ui(self):
         """Inicjalizacja interfejsu użytkownika."""
         # Ustawienia głównego okna
@@ -295,6 +345,11 @@ class MainWindow(QMainWindow):
         # Moduł Depozytów
         self.deposits_tab = DepositsTab(self.conn)  # Użyj self.conn zamiast self.db_connection
         self.content_stack.addWidget(self.deposits_tab)
+        
+        # Wydanie i zmiany zbiorcze depozytów odświeżają pulpit
+        self.deposits_tab.deposit_released.connect(self.on_deposits_changed)
+        self.deposits_tab.deposits_bulk_updated.connect(self.on_deposits_changed)
+        self.deposits_tab.deposits_bulk_deleted.connect(self.on_deposits_changed)
 
         # Moduł Magazynu
         self.inventory_tab = InventoryTab(self.conn)  # Użyj self.conn zamiast self.db_connection
@@ -492,6 +547,17 @@ class MainWindow(QMainWindow):
         
         parent_layout.addWidget(header_frame)
 
+    def on_deposits_changed(self, deposit_ids=None):
+        """
+        Odświeża licznik depozytów i ostatnie działania na pulpicie po zmianie depozytów.
+        
+        Args:
+            deposit_ids (int lub list, optional): Identyfikator lub identyfikatory zmienionych depozytów
+        """
+        self.dashboard_tab.load_deposits_count()
+        self.dashboard_tab.load_recent_activities()
+        self.database_updated.emit()
+
     def on_settings_saved(self):
         """Obsługuje zdarzenie zapisania ustawień."""
         # Zastosuj nowe ustawienia
@@ -618,6 +684,114 @@ class MainWindow(QMainWindow):
         except Exception as e:
             logger.error(f"Błąd podczas aktualizacji liczby rekordów: {e}")
     
+    def check_stock_alerts(self):
+        """Powiadamia o nowych alertach niskiego stanu i opcjonalnie tworzy szkice zamówień."""
+        try:
+            alerts = take_pending_alerts(self.conn)
+            if not alerts:
+                return
+            
+            drafts = 0
+            if self.settings.value("low_stock_draft_orders", False, type=bool):
+                drafts = create_draft_purchase_orders(self.conn, alerts)
+            
+            names = ", ".join(f"{alert[5]} ({alert[6]})" for alert in alerts[:3])
+            if len(alerts) > 3:
+                names += f" i {len(alerts) - 3} innych"
+            if drafts:
+                names += f". Utworzono szkice zamówień: {drafts} (Pulpit > Szkice zamówień)"
+            NotificationManager.get_instance().show_notification(
+                f"Niski stan magazynowy: {names}",
+                NotificationTypes.WARNING,
+                duration=8000
+            )
+            self.dashboard_tab.load_parts_count()
+        except Exception as e:
+            logger.error(f"Błąd podczas sprawdzania alertów niskiego stanu: {e}")
+    
+    def check_deposit_lifecycle(self):
+        """Wykonuje reguły zmian statusu depozytów, jeśli nie były wykonane dzisiaj."""
+        try:
+            changes = run_lifecycle_if_due(self.conn, self.settings)
+            if not changes:
+                return
+            
+            counts = []
+            if changes.get(STATUS_PICKUP):
+                counts.append(f"do odbioru: {len(changes[STATUS_PICKUP])}")
+            if changes.get(STATUS_OVERDUE):
+                counts.append(f"zaległe: {len(changes[STATUS_OVERDUE])}")
+            NotificationManager.get_instance().show_notification(
+                f"Zmiana statusu depozytów - {', '.join(counts)}",
+                NotificationTypes.INFO,
+                duration=8000
+            )
+            self.deposits_tab.refresh_data()
+            self.database_updated.emit()
+        except Exception as e:
+            logger.error(f"Błąd podczas zmiany statusu depozytów: {e}")
+    
+    def check_reminders(self):
+        """Planuje przypomnienia należne dzisiaj i wysyła kolejkę w tle (przy włączonej wysyłce automatycznej)."""
+        try:
+            scheduled = schedule_reminders_if_due(self.conn, self.settings)
+            if scheduled:
+                NotificationManager.get_instance().show_notification(
+                    f"Zaplanowano przypomnienia dla klientów: {scheduled}",
+                    NotificationTypes.INFO,
+                    duration=6000
+                )
+            
+            if not self.settings.value("reminders_enabled", False, type=bool) or \
+                    not self.settings.value("reminders_auto_send", False, type=bool):
+                return
+            # Jedna wysyłka naraz - równoległe partie mogłyby wysłać to samo powiadomienie
+            if self.reminder_delivery_thread is not None and self.reminder_delivery_thread.is_alive():
+                return
+            self.reminder_delivery_thread = threading.Thread(
+                target=run_reminder_delivery, args=(get_delivery_config(self.settings),), daemon=True
+            )
+            self.reminder_delivery_thread.start()
+        except Exception as e:
+            logger.error(f"Błąd podczas planowania przypomnień: {e}")
+    
+    def check_replication(self):
+        """Uruchamia w tle wymianę zmian z innymi stanowiskami, jeśli skonfigurowano wspólny katalog."""
+        try:
+            folder = self.settings.value("sync_folder", "")
+            if not folder:
+                return
+            # Jedna wymiana naraz - udział sieciowy może odpowiadać wolniej niż odstęp timera
+            if self.replication_thread is not None and self.replication_thread.is_alive():
+                return
+            self.replication_thread = threading.Thread(target=self.run_replication, args=(folder,), daemon=True)
+            self.replication_thread.start()
+        except Exception as e:
+            logger.error(f"Błąd podczas uruchamiania replikacji zmian: {e}")
+    
+    def run_replication(self, folder):
+        """Wymienia zmiany na osobnym połączeniu (wątek w tle) i zgłasza wynik sygnałem."""
+        _exported, applied = run_folder_sync(folder)
+        self.replication_finished.emit(applied)
+    
+    def on_replication_finished(self, applied):
+        """Odświeża widok po zastosowaniu zmian z innych stanowisk (wątek interfejsu)."""
+        try:
+            if not applied:
+                return
+            NotificationManager.get_instance().show_notification(
+                f"Zastosowano zmiany z innych stanowisk: {applied}",
+                NotificationTypes.INFO,
+                duration=6000
+            )
+            current_widget = self.content_stack.currentWidget()
+            if hasattr(current_widget, 'refresh_data') and callable(current_widget.refresh_data):
+                current_widget.refresh_data()
+            self.update_record_counts()
+            self.database_updated.emit()
+        except Exception as e:
+            logger.error(f"Błąd podczas odświeżania po replikacji zmian: {e}")
+    
     def switch_module(self):
         """Przełącza aktywny moduł."""
         sender = self.sender()
@@ -964,6 +1138,11 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.Yes:
+            # Zatrzymanie wyszukiwarki statusu depozytów
+            if self.status_server is not None:
+                self.status_server.shutdown()
+                self.status_server.index.close()
+            
             # Zamknięcie połączenia z bazą danych
             if self.conn:
                 try:
@@ -10,6 +10,7 @@ Dodatkowo umożliwia przypisywanie pojazdów do klientom.
 import os
 import logging
 import csv
+import sqlite3
 import smtplib
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
@@ -18,10 +19,10 @@ from PySide6.QtWidgets import (
     QWidget, QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QTableWidget, QTableWidgetItem,
     QPushButton, QLineEdit, QLabel, QHeaderView, QMessageBox, QMenu,
     QComboBox, QFrame, QTabWidget, QSplitter, QToolButton, QScrollArea,
-    QSpacerItem, QSizePolicy, QStyledItemDelegate, QFileDialog
+    QSpacerItem, QSizePolicy, QFileDialog
 )
-from PySide6.QtCore import Qt, QEvent, Signal, QRect
-from PySide6.QtGui import QIcon, QPixmap, QColor, QFont, QPainter, QPen, QBrush
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QIcon, QPixmap, QPen, QBrush
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
@@ -31,7 +32,12 @@ from ui.dialogs.client_dialog import ClientDialog
 from ui.dialogs.client_details_dialog import ClientDetailsDialog
 from ui.dialogs.vehicle_dialog import VehicleDialog
 from ui.notifications import NotificationManager, NotificationTypes
+from ui.delegates import (
+    StatusPillDelegate, ActionButtonsDelegate, PILL_GREEN, PILL_ORANGE, PILL_BLUE
+)
 from utils.paths import ICONS_DIR
+from utils.change_log import get_change_version
+from utils.filter_cache import FilterResultCache
 from utils.i18n import _  # Dodana funkcja do obsługi lokalizacji
 
 # Logger
@@ -265,151 +271,28 @@ STYLES = {
 }
 
 
-class StatusDelegate(QStyledItemDelegate):
+class StatusDelegate(StatusPillDelegate):
     """
     Delegat do stylizowania komórek statusu w tabeli klientów.
     """
-    def paint(self, painter, option, index):
-        status = index.data()
-        
-        if status == _("Stały"):
-            background_color = QColor("#51cf66")
-            text_color = QColor(255, 255, 255)
-        elif status == _("Nowy"):
-            background_color = QColor("#ffa94d")
-            text_color = QColor(255, 255, 255)
-        elif status == _("Firma"):
-            background_color = QColor("#4dabf7")
-            text_color = QColor(255, 255, 255)
-        else:
-            # Domyślne kolory
-            background_color = QColor("#2c3034")
-            text_color = QColor(255, 255, 255)
-        
-        # Rysowanie zaokrąglonego prostokąta
-        painter.save()
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setBrush(background_color)
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(option.rect.adjusted(4, 4, -4, -4), 10, 10)
-        
-        # Rysowanie tekstu
-        painter.setPen(text_color)
-        painter.drawText(
-            option.rect, 
-            Qt.AlignCenter, 
-            status
-        )
-        painter.restore()
+    def __init__(self, parent=None):
+        super().__init__({
+            _("Stały"): PILL_GREEN,
+            _("Nowy"): PILL_ORANGE,
+            _("Firma"): PILL_BLUE,
+        }, parent)
 
 
-class ActionButtonDelegate(QStyledItemDelegate):
+class ActionButtonDelegate(ActionButtonsDelegate):
     """
     Delegat do wyświetlania przycisków akcji z emotikonami w tabeli.
     """
     def __init__(self, parent=None):
-        super().__init__(parent)
-
-    def paint(self, painter, option, index):
-        painter.save()
-
-        # Obliczenie szerokości każdego przycisku i odstępów
-        total_width = option.rect.width()
-        button_width = min(total_width / 4, 30)  # Mniejsza szerokość z większymi marginesami
-        spacing = (total_width - (button_width * 3)) / 4  # Równe odstępy
-
-        # Pozycje x dla każdego przycisku
-        x1 = option.rect.left() + spacing
-        x2 = x1 + button_width + spacing
-        x3 = x2 + button_width + spacing
-
-        # Pozycja y (centr pionowy)
-        y_center = option.rect.top() + option.rect.height() / 2
-        button_height = 24
-
-        # Obszary dla każdego przycisku
-        view_rect = QRect(
-            int(x1), 
-            int(y_center - button_height/2),
-            int(button_width), 
-            int(button_height)
-        )
-
-        edit_rect = QRect(
-            int(x2), 
-            int(y_center - button_height/2),
-            int(button_width), 
-            int(button_height)
-        )
-
-        delete_rect = QRect(
-            int(x3), 
-            int(y_center - button_height/2),
-            int(button_width), 
-            int(button_height)
-        )
-
-        # Rysowanie emotikon zamiast ikon
-        painter.setFont(QFont("Segoe UI", 12))
-        painter.setPen(Qt.white)
-
-        painter.drawText(view_rect, Qt.AlignCenter, "👁️")
-        painter.drawText(edit_rect, Qt.AlignCenter, "✏️")
-        painter.drawText(delete_rect, Qt.AlignCenter, "🗑️")
-
-        painter.restore()
-
-    def editorEvent(self, event, model, option, index):
-        if event.type() == QEvent.Type.MouseButtonRelease:
-            # Obliczenie szerokości każdego przycisku i odstępów
-            total_width = option.rect.width()
-            button_width = min(total_width / 4, 30)  # Mniejsza szerokość z większymi marginesami
-            spacing = (total_width - (button_width * 3)) / 4  # Równe odstępy
-
-            # Pozycje x dla każdego przycisku
-            x1 = option.rect.left() + spacing
-            x2 = x1 + button_width + spacing
-            x3 = x2 + button_width + spacing
-
-            # Pozycja y (centr pionowy)
-            y_center = option.rect.top() + option.rect.height() / 2
-            button_height = 24
-
-            # Obszary dla każdego przycisku
-            view_rect = QRect(
-                int(x1), 
-                int(y_center - button_height/2),
-                int(button_width), 
-                int(button_height)
-            )
-
-            edit_rect = QRect(
-                int(x2), 
-                int(y_center - button_height/2),
-                int(button_width), 
-                int(button_height)
-            )
-
-            delete_rect = QRect(
-                int(x3), 
-                int(y_center - button_height/2),
-                int(button_width), 
-                int(button_height)
-            )
-
-            if view_rect.contains(event.pos()):
-                self.parent().view_client_requested.emit(index.row())
-                return True
-            elif edit_rect.contains(event.pos()):
-                self.parent().edit_client_requested.emit(index.row())
-                return True
-            elif delete_rect.contains(event.pos()):
-                self.parent().delete_client_requested.emit(index.row())
-                return True
-
-        return super().editorEvent(event, model, option, index)
-    
-
+        super().__init__([
+            ("👁️", "view_client_requested"),
+            ("✏️", "edit_client_requested"),
+            ("🗑️", "delete_client_requested"),
+        ], parent)
 
 
 class ClientsTable(QTableWidget):
@@ -490,6 +373,9 @@ class ClientsTab(QWidget):
         self.filter_text = ""  # Tekst wyszukiwania
         self.total_pages = 0  # Całkowita liczba stron
         
+        # Wyniki wyszukiwania tekstowego (nazwa, telefon, rejestracja) zawężane w pamięci
+        self.filter_cache = FilterResultCache(lambda client: (client[1], client[2], client[6]))
+        
         # Inicjalizacja interfejsu użytkownika
         self.init_ui()
         
@@ -1134,7 +1020,8 @@ class ClientsTab(QWidget):
             # Przygotowanie parametrów zapytania
             params = []
             
-            # Bazowe zapytanie zoptymalizowane - używa jednego JOIN i podzapytań
+            # Liczba pojazdów i pierwszy pojazd pochodzą z podsumowania klienta
+            # (tabela client_summary utrzymywana przez wyzwalacze)
             base_query = """
             SELECT 
                 c.id, 
@@ -1143,15 +1030,12 @@ class ClientsTab(QWidget):
                 c.email, 
                 c.client_type, 
                 c.discount,
-                v.registration_number as reg_number,
-                (SELECT COUNT(*) FROM vehicles WHERE client_id = c.id) as vehicle_count
+                s.primary_registration as reg_number,
+                s.vehicle_count
             FROM 
                 clients c
-            LEFT JOIN 
-                (SELECT client_id, MIN(id) as first_vehicle_id FROM vehicles GROUP BY client_id) fv
-                ON c.id = fv.client_id
-            LEFT JOIN
-                vehicles v ON fv.first_vehicle_id = v.id
+            JOIN 
+                client_summary s ON s.client_id = c.id
             """
             
             # Warunki filtrowania
@@ -1163,7 +1047,7 @@ class ClientsTab(QWidget):
                 where_clauses.append("""(
                     c.name LIKE ? OR 
                     c.phone_number LIKE ? OR 
-                    v.registration_number LIKE ?
+                    s.primary_registration LIKE ?
                 )""")
                 params.extend([filter_text, filter_text, filter_text])
             
@@ -1189,17 +1073,13 @@ class ClientsTab(QWidget):
             elif sort_field == _("Data dodania"):
                 base_query += " ORDER BY c.id DESC"
             elif sort_field == _("Liczba pojazdów"):
-                base_query += " ORDER BY vehicle_count DESC, c.name"
+                base_query += " ORDER BY s.vehicle_count DESC, c.name"
             
             # Zapytanie do pobrania całkowitej liczby rekordów (bez paginacji)
             count_query = """
             SELECT COUNT(*) 
             FROM clients c
-            LEFT JOIN 
-                (SELECT client_id, MIN(id) as first_vehicle_id FROM vehicles GROUP BY client_id) fv
-                ON c.id = fv.client_id
-            LEFT JOIN
-                vehicles v ON fv.first_vehicle_id = v.id
+            JOIN client_summary s ON s.client_id = c.id
             """
             
             if where_clauses:
@@ -1346,7 +1226,8 @@ class ClientsTab(QWidget):
             # Przygotowanie parametrów zapytania
             params = []
             
-            # Bazowe zapytanie zoptymalizowane - używa jednego JOIN i podzapytań
+            # Liczba pojazdów i pierwszy pojazd pochodzą z podsumowania klienta
+            # (tabela client_summary utrzymywana przez wyzwalacze)
             base_query = """
             SELECT 
                 c.id, 
@@ -1355,15 +1236,12 @@ class ClientsTab(QWidget):
                 c.email, 
                 c.client_type, 
                 c.discount,
-                v.registration_number as reg_number,
-                (SELECT COUNT(*) FROM vehicles WHERE client_id = c.id) as vehicle_count
+                s.primary_registration as reg_number,
+                s.vehicle_count
             FROM 
                 clients c
-            LEFT JOIN 
-                (SELECT client_id, MIN(id) as first_vehicle_id FROM vehicles GROUP BY client_id) fv
-                ON c.id = fv.client_id
-            LEFT JOIN
-                vehicles v ON fv.first_vehicle_id = v.id
+            JOIN 
+                client_summary s ON s.client_id = c.id
             """
             
             # Warunki filtrowania
@@ -1375,7 +1253,7 @@ class ClientsTab(QWidget):
                 where_clauses.append("""(
                     c.name LIKE ? OR 
                     c.phone_number LIKE ? OR 
-                    v.registration_number LIKE ?
+                    s.primary_registration LIKE ?
                 )""")
                 params.extend([filter_text, filter_text, filter_text])
             
@@ -1401,37 +1279,54 @@ class ClientsTab(QWidget):
             elif sort_field == _("Data dodania"):
                 base_query += " ORDER BY c.id DESC"
             elif sort_field == _("Liczba pojazdów"):
-                base_query += " ORDER BY vehicle_count DESC, c.name"
+                base_query += " ORDER BY s.vehicle_count DESC, c.name"
             
-            # Zapytanie do pobrania całkowitej liczby rekordów (bez paginacji)
-            count_query = """
-            SELECT COUNT(*) 
-            FROM clients c
-            LEFT JOIN 
-                (SELECT client_id, MIN(id) as first_vehicle_id FROM vehicles GROUP BY client_id) fv
-                ON c.id = fv.client_id
-            LEFT JOIN
-                vehicles v ON fv.first_vehicle_id = v.id
-            """
+            offset = self.current_page * self.records_per_page
             
-            if where_clauses:
-                count_query += " WHERE " + " AND ".join(where_clauses)
+            # Wyszukiwanie: wynik zawężany w pamięci przy dopisywaniu znaków, jeśli zapamiętano
+            # pełny wynik szerszego filtra; zapytanie przy rozszerzeniu filtra lub zmianie danych
+            matching_clients = None
+            if self.filter_text:
+                signature = (self.filtered_type, sort_field)
+                version = get_change_version(self.conn)
+                matching_clients = self.filter_cache.lookup(signature, self.filter_text, version)
+            
+            if matching_clients is None:
+                # Zapytanie do pobrania całkowitej liczby rekordów (bez paginacji)
+                count_query = """
+                SELECT COUNT(*) 
+                FROM clients c
+                JOIN client_summary s ON s.client_id = c.id
+                """
+                
+                if where_clauses:
+                    count_query += " WHERE " + " AND ".join(where_clauses)
+                
+                # Pobierz całkowitą liczbę klientów z filtrami
+                cursor.execute(count_query, params)
+                total_clients = cursor.fetchone()[0]
+                
+                if self.filter_text and total_clients <= self.filter_cache.max_rows:
+                    # Niewielki wynik wyszukiwania zapamiętywany w całości do zawężania w pamięci
+                    cursor.execute(base_query, params)
+                    matching_clients = self.filter_cache.store(
+                        signature, self.filter_text, version, cursor.fetchall()
+                    )
+                else:
+                    # Paginacja - dodaj LIMIT i OFFSET
+                    base_query += f" LIMIT {self.records_per_page} OFFSET {offset}"
+                    
+                    # Wykonaj główne zapytanie
+                    cursor.execute(base_query, params)
+                    clients = cursor.fetchall()
             
-            # Pobierz całkowitą liczbę klientów z filtrami
-            cursor.execute(count_query, params)
-            total_clients = cursor.fetchone()[0]
+            if matching_clients is not None:
+                total_clients = len(matching_clients)
+                clients = matching_clients[offset:offset + self.records_per_page]
             
             # Oblicz całkowitą liczbę stron
             self.total_pages = (total_clients + self.records_per_page - 1) // self.records_per_page
             
-            # Paginacja - dodaj LIMIT i OFFSET
-            offset = self.current_page * self.records_per_page
-            base_query += f" LIMIT {self.records_per_page} OFFSET {offset}"
-            
-            # Wykonaj główne zapytanie
-            cursor.execute(base_query, params)
-            clients = cursor.fetchall()
-            
             # Pobierz liczby klientów dla poszczególnych zakładek - optymalizacja: 
             # jedno zapytanie zamiast czterech oddzielnych
             cursor.execute("""
@@ -1947,10 +1842,7 @@ class ClientsTab(QWidget):
                     # Rozpocznij transakcję
                     self.conn.execute("BEGIN")
                     
-                    # Usuń powiązane pojazdy
-                    cursor.execute("DELETE FROM vehicles WHERE client_id = ?", (client_id,))
-                    
-                    # Usuń klienta
+                    # Pojazdy i wizyty klienta usuwa SQLite (ON DELETE CASCADE)
                     cursor.execute("DELETE FROM clients WHERE id = ?", (client_id,))
                     
                     # Zatwierdź zmiany
@@ -1971,6 +1863,14 @@ class ClientsTab(QWidget):
                     # W przypadku błędu, cofnij transakcję
                     self.conn.rollback()
                     raise e
+        except sqlite3.IntegrityError:
+            # Depozyty i zamówienia klienta celowo nie są usuwane kaskadowo
+            QMessageBox.warning(
+                self,
+                _("Nie można usunąć klienta"),
+                _("Klient {} ma zarejestrowane depozyty lub zamówienia.\n\n"
+                "Usuń je lub przypisz do innego klienta przed usunięciem klienta.").format(client_name)
+            )
         except Exception as e:
             logger.error(f"Błąd podczas usuwania klienta: {e}")
             QMessageBox.critical(
@@ -2018,14 +1918,13 @@ class ClientsTab(QWidget):
                 base_query = """
                 SELECT 
                     c.id, c.name, c.phone_number, c.email, c.client_type, c.discount, c.notes,
-                    v.make as vehicle_make, v.model as vehicle_model, v.registration_number
+                    s.primary_make as vehicle_make, s.primary_model as vehicle_model,
+                    s.primary_registration as registration_number,
+                    s.vehicle_count, s.active_deposit_count, s.last_visit, s.lifetime_order_value
                 FROM 
                     clients c
-                LEFT JOIN 
-                    (SELECT client_id, MIN(id) as first_vehicle_id FROM vehicles GROUP BY client_id) fv
-                    ON c.id = fv.client_id
-                LEFT JOIN
-                    vehicles v ON fv.first_vehicle_id = v.id
+                JOIN 
+                    client_summary s ON s.client_id = c.id
                 """
                 
                 # Dodaj warunki filtrowania
@@ -2037,7 +1936,7 @@ class ClientsTab(QWidget):
                     where_clauses.append("""(
                         c.name LIKE ? OR 
                         c.phone_number LIKE ? OR 
-                        v.registration_number LIKE ?
+                        s.primary_registration LIKE ?
                     )""")
                     params.extend([filter_text, filter_text, filter_text])
                 
@@ -2058,14 +1957,13 @@ class ClientsTab(QWidget):
                 base_query = """
                 SELECT 
                     c.id, c.name, c.phone_number, c.email, c.client_type, c.discount, c.notes,
-                    v.make as vehicle_make, v.model as vehicle_model, v.registration_number
+                    s.primary_make as vehicle_make, s.primary_model as vehicle_model,
+                    s.primary_registration as registration_number,
+                    s.vehicle_count, s.active_deposit_count, s.last_visit, s.lifetime_order_value
                 FROM 
                     clients c
-                LEFT JOIN 
-                    (SELECT client_id, MIN(id) as first_vehicle_id FROM vehicles GROUP BY client_id) fv
-                    ON c.id = fv.client_id
-                LEFT JOIN
-                    vehicles v ON fv.first_vehicle_id = v.id
+                JOIN 
+                    client_summary s ON s.client_id = c.id
                 """
                 params = []
             
@@ -2076,7 +1974,7 @@ class ClientsTab(QWidget):
             elif sort_field == _("Data dodania"):
                 base_query += " ORDER BY c.id DESC"
             elif sort_field == _("Liczba pojazdów"):
-                base_query += " ORDER BY (SELECT COUNT(*) FROM vehicles WHERE client_id = c.id) DESC, c.name"
+                base_query += " ORDER BY s.vehicle_count DESC, c.name"
             
             # Pobierz dane
             cursor.execute(base_query, params)
@@ -2086,7 +1984,8 @@ class ClientsTab(QWidget):
             with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
                 fieldnames = [
                     'id', 'name', 'phone_number', 'email', 'client_type', 'discount', 'notes',
-                    'vehicle_make', 'vehicle_model', 'registration_number'
+                    'vehicle_make', 'vehicle_model', 'registration_number',
+                    'vehicle_count', 'active_deposits', 'last_visit', 'lifetime_order_value'
                 ]
                 writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
                 writer.writeheader()
@@ -2102,7 +2001,11 @@ class ClientsTab(QWidget):
                         'notes': client[6] or '',
                         'vehicle_make': client[7] or '',
                         'vehicle_model': client[8] or '',
-                        'registration_number': client[9] or ''
+                        'registration_number': client[9] or '',
+                        'vehicle_count': client[10],
+                        'active_deposits': client[11],
+                        'last_visit': client[12] or '',
+                        'lifetime_order_value': f"{client[13]:.2f}"
                     })
                 
             # Powiadomienie
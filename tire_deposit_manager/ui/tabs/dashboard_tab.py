@@ -19,6 +19,7 @@ from PySide6.QtGui import QIcon, QColor, QFont
 from PySide6.QtCore import Qt, QSize, QTimer
 
 from utils.paths import ICONS_DIR
+from utils.stock_alerts import count_open_alerts, get_draft_purchase_orders
 
 # Logger
 logger = logging.getLogger("TireDepositManager")
@@ -171,13 +172,19 @@ class DashboardTab(QWidget):
         stats_layout.addWidget(self.visits_frame)
         
         # Sekcja 2: Dodatkowe kafelki (części i akcesoria)
-        parts_frame = CustomFrame(
+        self.parts_frame = CustomFrame(
             "Części i akcesoria", 
             "0", 
-            "Aż 24% stali magazynowej to części nowe", 
+            "Niski stan: 0 pozycji", 
             "#9b59b6"
         )
-        parts_frame.setMinimumHeight(100)  # Nieco niższy kafelek
+        self.parts_frame.setMinimumHeight(100)  # Nieco niższy kafelek
+        
+        # Szkice zamówień tworzone dla pozycji o niskim stanie
+        self.drafts_button = QPushButton("Szkice zamówień")
+        self.drafts_button.setObjectName("seeAllButton")
+        self.drafts_button.setMinimumHeight(35)
+        self.drafts_button.clicked.connect(self.show_purchase_order_drafts)
         
         # Sekcja 3: Tabele z danymi
         tables_layout = QHBoxLayout()
@@ -280,7 +287,8 @@ class DashboardTab(QWidget):
         
         # Dodanie sekcji do głównego układu
         scroll_layout.addLayout(stats_layout)
-        scroll_layout.addWidget(parts_frame)
+        scroll_layout.addWidget(self.parts_frame)
+        scroll_layout.addWidget(self.drafts_button, 0, Qt.AlignRight)
         scroll_layout.addLayout(tables_layout)
         scroll_layout.addWidget(shortcuts_title)
         scroll_layout.addLayout(shortcuts_grid)
@@ -302,6 +310,9 @@ class DashboardTab(QWidget):
             # Pobranie i wyświetlenie liczby opon na stanie
             self.load_tires_count()
             
+            # Pobranie i wyświetlenie liczby części oraz pozycji o niskim stanie
+            self.load_parts_count()
+            
             # Pobranie i wyświetlenie liczby zaplanowanych wizyt
             self.load_visits_count()
             
@@ -368,6 +379,28 @@ class DashboardTab(QWidget):
         except Exception as e:
             logger.error(f"Błąd podczas ładowania liczby opon: {e}")
     
+    def load_parts_count(self):
+        """Pobiera i wyświetla liczbę części oraz części o niskim stanie (z kolejki alertów)."""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM parts")
+            parts_count = cursor.fetchone()[0]
+            
+            low_stock_count = count_open_alerts(self.conn, 'part')
+            self.parts_frame.update_values(parts_count, f"Niski stan: {low_stock_count} pozycji")
+            
+            drafts_count = len(get_draft_purchase_orders(self.conn))
+            self.drafts_button.setText(f"Szkice zamówień ({drafts_count})" if drafts_count else "Szkice zamówień")
+        except Exception as e:
+            logger.error(f"Błąd podczas ładowania liczby części: {e}")
+    
+    def show_purchase_order_drafts(self):
+        """Otwiera listę szkiców zamówień dla pozycji o niskim stanie."""
+        from ui.dialogs.purchase_order_drafts_dialog import PurchaseOrderDraftsDialog
+        dialog = PurchaseOrderDraftsDialog(self.conn, parent=self)
+        dialog.exec()
+        self.load_parts_count()
+    
     def load_visits_count(self):
         """Pobiera i wyświetla liczbę zaplanowanych wizyt."""
         try:
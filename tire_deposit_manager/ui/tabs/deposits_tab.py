@@ -9,7 +9,7 @@ Obsługuje wyświetlanie, filtrowanie i zarządzanie depozytami opon klientów.
 import os
 import logging
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
 
 from PySide6.QtWidgets import (
@@ -17,18 +17,29 @@ from PySide6.QtWidgets import (
     QLineEdit, QComboBox, QTableWidget, QTableWidgetItem, 
     QHeaderView, QMenu, QAbstractItemView, QDialog, QFileDialog,
     QFrame, QSplitter, QToolButton, QScrollArea, QMessageBox,
-    QStyledItemDelegate, QSpacerItem, QSizePolicy, QTabWidget
+    QSpacerItem, QSizePolicy, QTabWidget
 )
-from PySide6.QtGui import QIcon, QAction, QColor, QFont, QPainter, QPixmap
-from PySide6.QtCore import Qt, QEvent, Signal, QDate, QRect, QSettings
-from PySide6.QtPrintSupport import QPrinter, QPrintDialog, QPrintPreviewDialog
-from PySide6.QtWebEngineWidgets import QWebEngineView
+from PySide6.QtGui import QIcon, QAction, QPixmap
+from PySide6.QtCore import Qt, Signal, QDate
 
 from ui.dialogs.deposit_dialog import DepositDialog
 from ui.dialogs.deposit_release_dialog import DepositReleaseDialog
+from ui.dialogs.bulk_release_dialog import BulkReleaseDialog
 from utils.exporter import export_data_to_excel, export_data_to_pdf
 from utils.paths import ICONS_DIR
+from utils.settings import Settings
+from utils.bulk_operations import (
+    bulk_set_status, bulk_release_deposits, bulk_move_deposits, bulk_extend_pickup, bulk_delete
+)
+from utils.schema import get_referencing_tables
+from utils.reminders import DEFAULT_SMS_TEMPLATES
+from utils.change_log import get_change_version
+from utils.filter_cache import FilterResultCache
+from utils.status_lookup import format_deposit_code
 from ui.notifications import NotificationManager, NotificationTypes
+from ui.delegates import (
+    StatusPillDelegate, ActionButtonsDelegate, PILL_GREEN, PILL_ORANGE, PILL_RED, PILL_BLUE, PILL_GREY
+)
 from utils.i18n import _  # Funkcja do obsługi lokalizacji
 
 # Logger
@@ -276,140 +287,28 @@ STYLES = {
 }
 
 
-class StatusDelegate(QStyledItemDelegate):
+class StatusDelegate(StatusPillDelegate):
     """
     Delegat do stylizowania komórek statusu w tabeli depozytów.
     """
-    def paint(self, painter, option, index):
-        if not index.isValid():
-            return super().paint(painter, option, index)
-            
-        status = index.data()
-        
-        # Zapisz stan paintera przed rozpoczęciem własnego rysowania
-        painter.save()
-        
-        try:
-            # Określenie kolorów w zależności od statusu
-            if status == _("Aktywny"):
-                background_color = QColor("#51cf66")  # Zielony
-                text_color = QColor(255, 255, 255)
-            elif status == _("Do odbioru"):
-                background_color = QColor("#ffa94d")  # Pomarańczowy
-                text_color = QColor(255, 255, 255)
-            elif status == _("Zaległy"):
-                background_color = QColor("#fa5252")  # Czerwony
-                text_color = QColor(255, 255, 255)
-            elif status == _("Rezerwacja"):
-                background_color = QColor("#4dabf7")  # Niebieski
-                text_color = QColor(255, 255, 255)
-            elif status == _("Wydany"):
-                background_color = QColor("#adb5bd")  # Szary
-                text_color = QColor(255, 255, 255)
-            else:
-                # Domyślne kolory
-                background_color = QColor("#2c3034")
-                text_color = QColor(255, 255, 255)
-            
-            # Włącz antyaliasing dla gładszych krawędzi
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            
-            # Wyczyść tło
-            painter.setBrush(background_color)
-            painter.setPen(Qt.NoPen)
-            
-            # Rysowanie zaokrąglonego prostokąta
-            painter.drawRoundedRect(option.rect.adjusted(4, 4, -4, -4), 10, 10)
-            
-            # Rysowanie tekstu
-            painter.setPen(text_color)
-            painter.drawText(
-                option.rect, 
-                Qt.AlignCenter, 
-                status
-            )
-        except Exception as e:
-            logger.error(f"Błąd podczas rysowania statusu: {e}")
-        finally:
-            # Zawsze przywracaj stan paintera, nawet jeśli wystąpi błąd
-            painter.restore()
+    def __init__(self, parent=None):
+        super().__init__({
+            _("Aktywny"): PILL_GREEN,
+            _("Do odbioru"): PILL_ORANGE,
+            _("Zaległy"): PILL_RED,
+            _("Rezerwacja"): PILL_BLUE,
+            _("Wydany"): PILL_GREY,
+        }, parent)
 
 
-class ActionButtonDelegate(QStyledItemDelegate):
+class ActionButtonDelegate(ActionButtonsDelegate):
     """
     Delegat do wyświetlania przycisków akcji z emotikonami w tabeli.
     """
     def __init__(self, parent=None):
-        super().__init__(parent)
-
-    def paint(self, painter, option, index):
-        if not index.isValid():
-            return super().paint(painter, option, index)
-            
-        # Zapisz stan paintera
-        painter.save()
-        
-        try:
-            # Obliczenie szerokości przycisku i odstępów
-            total_width = option.rect.width()
-            button_width = 30
-            spacing = (total_width - button_width) / 2  # Odstęp do wycentrowania
-
-            # Pozycja x dla przycisku
-            x_center = option.rect.left() + spacing
-
-            # Pozycja y (centr pionowy)
-            y_center = option.rect.top() + option.rect.height() / 2
-            button_height = 24
-
-            # Obszar przycisku
-            button_rect = QRect(
-                int(x_center), 
-                int(y_center - button_height/2),
-                int(button_width), 
-                int(button_height)
-            )
-
-            # Rysowanie emotikony
-            painter.setFont(QFont("Segoe UI", 12))
-            painter.setPen(Qt.white)
-            painter.drawText(button_rect, Qt.AlignCenter, "⋮")
-        except Exception as e:
-            logger.error(f"Błąd podczas rysowania przycisku akcji: {e}")
-        finally:
-            # Zawsze przywracaj stan paintera
-            painter.restore()
-
-    def editorEvent(self, event, model, option, index):
-        try:
-            if event.type() == QEvent.Type.MouseButtonRelease:
-                # Obliczenie szerokości przycisku i odstępów
-                total_width = option.rect.width()
-                button_width = 30
-                spacing = (total_width - button_width) / 2
-
-                # Pozycja x dla przycisku
-                x_center = option.rect.left() + spacing
-
-                # Pozycja y (centr pionowy)
-                y_center = option.rect.top() + option.rect.height() / 2
-                button_height = 24
-
-                # Obszar przycisku
-                button_rect = QRect(
-                    int(x_center), 
-                    int(y_center - button_height/2),
-                    int(button_width), 
-                    int(button_height)
-                )
-
-                if button_rect.contains(event.pos()):
-                    self.parent().action_requested.emit(index.row())
-                    return True
-        except Exception as e:
-            logger.error(f"Błąd podczas obsługi zdarzenia edytora: {e}")
-
-        return super().editorEvent(event, model, option, index)
+        super().__init__([
+            ("⋮", "action_requested"),
+        ], parent)
 
 
 class DepositsTable(QTableWidget):
@@ -424,6 +323,7 @@ class DepositsTable(QTableWidget):
         # Ustawienia tabeli
         self.setAlternatingRowColors(True)
         self.setSelectionBehavior(QTableWidget.SelectRows)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.setEditTriggers(QTableWidget.NoEditTriggers)
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.setShowGrid(False)
@@ -470,6 +370,8 @@ class DepositsTab(QWidget):
     deposit_released = Signal(int)  # Emitowany po wydaniu depozytu
     deposit_updated = Signal(int)  # Emitowany po aktualizacji depozytu
     deposit_deleted = Signal(int)  # Emitowany po usunięciu depozytu
+    deposits_bulk_updated = Signal(list)  # Emitowany po zbiorczej zmianie depozytów
+    deposits_bulk_deleted = Signal(list)  # Emitowany po zbiorczym usunięciu depozytów
     
     def __init__(self, db_connection):
         """
@@ -486,6 +388,11 @@ class DepositsTab(QWidget):
         self.current_season_filter = _("Wszystkie")  # Filtr sezonu
         self.filter_text = ""  # Tekst wyszukiwania
         self.current_page = 0  # Aktywna strona paginacji
+        
+        # Wyniki wyszukiwania tekstowego (klient, numer, telefon) zawężane w pamięci
+        self.filter_cache = FilterResultCache(
+            lambda deposit: (deposit['client_name'], deposit['id'], deposit['phone_number'])
+        )
         self.records_per_page = 20  # Liczba rekordów na stronę
         self.total_pages = 0  # Całkowita liczba stron
         
@@ -725,28 +632,21 @@ class DepositsTab(QWidget):
         try:
             cursor = self.conn.cursor()
             
-            # Pobierz całkowitą liczbę depozytów
-            cursor.execute("SELECT COUNT(*) FROM deposits")
+            # Pobierz całkowitą liczbę depozytów (łącznie z archiwum)
+            cursor.execute("SELECT COUNT(*) FROM deposits_all")
             self.total_deposits = cursor.fetchone()[0]
             
             # Pobierz liczbę aktywnych depozytów
             cursor.execute("SELECT COUNT(*) FROM deposits WHERE status = 'Aktywny'")
             self.active_deposits = cursor.fetchone()[0]
             
-            # Pobierz liczbę depozytów do odbioru w tym tygodniu
-            today = datetime.now()
-            week_later = today + timedelta(days=7)
-            cursor.execute(
-                "SELECT COUNT(*) FROM deposits WHERE status = 'Do odbioru' AND pickup_date BETWEEN ? AND ?",
-                (today.strftime("%Y-%m-%d"), week_later.strftime("%Y-%m-%d"))
-            )
+            # Statusy "Do odbioru" i "Zaległy" nadaje codziennie utils.deposit_lifecycle,
+            # więc liczniki to proste wyszukiwania w indeksie (status, pickup_date)
+            cursor.execute("SELECT COUNT(*) FROM deposits WHERE status = 'Do odbioru'")
             self.pending_deposits = cursor.fetchone()[0]
             
             # Pobierz liczbę zaległych depozytów
-            cursor.execute(
-                "SELECT COUNT(*) FROM deposits WHERE status = 'Zaległy' OR (status = 'Do odbioru' AND pickup_date < ?)",
-                (today.strftime("%Y-%m-%d"),)
-            )
+            cursor.execute("SELECT COUNT(*) FROM deposits WHERE status = 'Zaległy'")
             self.overdue_deposits = cursor.fetchone()[0]
             
             # Aktualizuj etykiety w interfejsie
@@ -1127,14 +1027,16 @@ class DepositsTab(QWidget):
             if self.current_tab_index == 0:  # Aktywne
                 base_query = """
                 SELECT 
-                    d.id, 
+                    d.id, d.code, 
                     c.name AS client_name, 
                     c.phone_number || '\n' || c.email AS contact_info,
+                    c.phone_number,
                     d.deposit_date,
                     d.pickup_date,
                     d.tire_size || ' ' || d.tire_type AS tire_info,
                     d.location,
-                    d.status
+                    d.status,
+                    0 AS is_archived
                 FROM 
                     deposits d
                 JOIN 
@@ -1142,19 +1044,21 @@ class DepositsTab(QWidget):
                 WHERE 
                     d.status IN ('Aktywny', 'Do odbioru', 'Zaległy', 'Rezerwacja')
                 """
-            elif self.current_tab_index == 1:  # Historia
+            elif self.current_tab_index == 1:  # Historia (bieżąca baza i archiwum)
                 base_query = """
                 SELECT 
-                    d.id, 
+                    d.id, d.code, 
                     c.name AS client_name, 
                     c.phone_number || '\n' || c.email AS contact_info,
+                    c.phone_number,
                     d.deposit_date,
                     d.pickup_date,
                     d.tire_size || ' ' || d.tire_type AS tire_info,
                     d.location,
-                    d.status
+                    d.status,
+                    d.is_archived
                 FROM 
-                    deposits d
+                    deposits_all d
                 JOIN 
                     clients c ON d.client_id = c.id
                 WHERE 
@@ -1163,14 +1067,16 @@ class DepositsTab(QWidget):
             elif self.current_tab_index == 2:  # Do odbioru
                 base_query = """
                 SELECT 
-                    d.id, 
+                    d.id, d.code, 
                     c.name AS client_name, 
                     c.phone_number || '\n' || c.email AS contact_info,
+                    c.phone_number,
                     d.deposit_date,
                     d.pickup_date,
                     d.tire_size || ' ' || d.tire_type AS tire_info,
                     d.location,
-                    d.status
+                    d.status,
+                    0 AS is_archived
                 FROM 
                     deposits d
                 JOIN 
@@ -1191,9 +1097,10 @@ class DepositsTab(QWidget):
                     where_clauses.append("""(
                         c.name LIKE ? OR 
                         d.id LIKE ? OR 
+                        d.code LIKE ? OR 
                         c.phone_number LIKE ?
                     )""")
-                    params.extend([filter_text, filter_text, filter_text])
+                    params.extend([filter_text, filter_text, filter_text, filter_text])
                 
                 # Filtrowanie po statusie
                 if self.current_status_filter != _("Wszystkie"):
@@ -1215,21 +1122,43 @@ class DepositsTab(QWidget):
             # Sortowanie - domyślnie po ID
             base_query += " ORDER BY d.id DESC"
             
-            # Obliczenie całkowitej liczby rekordów (do paginacji)
-            count_query = f"SELECT COUNT(*) FROM ({base_query})"
-            cursor.execute(count_query, params)
-            total_deposits = cursor.fetchone()[0]
+            offset = self.current_page * self.records_per_page
             
-            # Obliczenie liczby stron
-            self.total_pages = (total_deposits + self.records_per_page - 1) // self.records_per_page
+            # Wyszukiwanie: wynik zawężany w pamięci przy dopisywaniu znaków, jeśli zapamiętano
+            # pełny wynik szerszego filtra; zapytanie przy rozszerzeniu filtra lub zmianie danych
+            searching = self.current_tab_index == 0 and bool(self.filter_text)
+            matching_deposits = None
+            if searching:
+                signature = (self.current_tab_index, self.current_status_filter, self.current_season_filter)
+                version = get_change_version(self.conn)
+                matching_deposits = self.filter_cache.lookup(signature, self.filter_text, version)
+            
+            if matching_deposits is None:
+                # Obliczenie całkowitej liczby rekordów (do paginacji)
+                count_query = f"SELECT COUNT(*) FROM ({base_query})"
+                cursor.execute(count_query, params)
+                total_deposits = cursor.fetchone()[0]
+                
+                if searching and total_deposits <= self.filter_cache.max_rows:
+                    # Niewielki wynik wyszukiwania zapamiętywany w całości do zawężania w pamięci
+                    cursor.execute(base_query, params)
+                    matching_deposits = self.filter_cache.store(
+                        signature, self.filter_text, version, cursor.fetchall()
+                    )
+                else:
+                    # Dodanie paginacji
+                    base_query += f" LIMIT {self.records_per_page} OFFSET {offset}"
+                    
+                    # Wykonanie zapytania
+                    cursor.execute(base_query, params)
+                    deposits = cursor.fetchall()
             
-            # Dodanie paginacji
-            offset = self.current_page * self.records_per_page
-            base_query += f" LIMIT {self.records_per_page} OFFSET {offset}"
+            if matching_deposits is not None:
+                total_deposits = len(matching_deposits)
+                deposits = matching_deposits[offset:offset + self.records_per_page]
             
-            # Wykonanie zapytania
-            cursor.execute(base_query, params)
-            deposits = cursor.fetchall()
+            # Obliczenie liczby stron
+            self.total_pages = (total_deposits + self.records_per_page - 1) // self.records_per_page
             
             # Czyszczenie i wypełnianie odpowiedniej tabeli w zależności od aktywnej zakładki
             if self.current_tab_index == 0:
@@ -1249,14 +1178,18 @@ class DepositsTab(QWidget):
                 table.insertRow(row_position)
                 
                 # Formatowanie ID (zwykle w formacie Dxxx)
-                deposit_id = f"D{str(deposit['id']).zfill(3)}"
+                deposit_id = format_deposit_code(deposit['id'], deposit['code'])
                 
                 # Formatowanie dat
                 deposit_date = datetime.strptime(deposit['deposit_date'], "%Y-%m-%d").strftime("%d-%m-%Y")
                 pickup_date = datetime.strptime(deposit['pickup_date'], "%Y-%m-%d").strftime("%d-%m-%Y")
                 
-                # Dodanie danych do komórek
-                table.setItem(row_position, 0, QTableWidgetItem(deposit_id))
+                # Dodanie danych do komórek (depozyty z archiwum oznaczone w kolumnie ID)
+                id_item = QTableWidgetItem(deposit_id)
+                if deposit['is_archived']:
+                    id_item.setData(Qt.UserRole, True)
+                    id_item.setToolTip(_("Depozyt archiwalny - tylko podgląd"))
+                table.setItem(row_position, 0, id_item)
                 table.setItem(row_position, 1, QTableWidgetItem(deposit['client_name']))
                 table.setItem(row_position, 2, QTableWidgetItem(deposit['contact_info']))
                 table.setItem(row_position, 3, QTableWidgetItem(deposit_date))
@@ -1483,6 +1416,13 @@ class DepositsTab(QWidget):
                 return
             
             row = index.row()
+            
+            # Kilka zaznaczonych wierszy - menu operacji zbiorczych
+            selected_ids = self.get_selected_deposit_ids(table)
+            if len(selected_ids) > 1 and table.selectionModel().isRowSelected(row, index.parent()):
+                self.show_bulk_context_menu(table, pos, selected_ids)
+                return
+            
             deposit_id_str = table.item(row, 0).text()
             deposit_id = int(deposit_id_str.replace('D', ''))
             client_name = table.item(row, 1).text()
@@ -1526,6 +1466,13 @@ class DepositsTab(QWidget):
             else:
                 delete_action = None
             
+            # Depozyt z archiwum - akcje działają na bieżącej bazie, więc tylko podgląd
+            if self.is_archived_row(table, row):
+                self.disable_archived_actions(menu, [
+                    edit_action, print_label_action, print_receipt_action, send_email_action,
+                    send_sms_action, release_action, delete_action, status_menu.menuAction()
+                ])
+            
             # Wyświetlenie menu i obsługa wybranej akcji
             action = menu.exec(table.mapToGlobal(pos))
             
@@ -1592,6 +1539,12 @@ class DepositsTab(QWidget):
             else:
                 delete_action = None
             
+            # Depozyt z archiwum - akcje działają na bieżącej bazie, więc tylko podgląd
+            if self.is_archived_row(table, row):
+                self.disable_archived_actions(menu, [
+                    edit_action, email_action, sms_action, release_action, delete_action
+                ])
+            
             # Wyświetlenie menu w lokalizacji przycisku
             button_pos = table.visualItemRect(table.item(row, 8)).center()
             action = menu.exec(table.viewport().mapToGlobal(button_pos))
@@ -1734,30 +1687,301 @@ class DepositsTab(QWidget):
                 NotificationTypes.ERROR
             )
     
-    def identify_foreign_key_tables(self):
-        """Identyfikuje tabele powiązane kluczem obcym z tabelą deposits."""
+    def get_selected_deposit_ids(self, table):
+        """
+        Zwraca identyfikatory zaznaczonych depozytów z bieżącej bazy (bez archiwalnych,
+        których nie obejmują operacje zbiorcze).
+        
+        Args:
+            table (QTableWidget): Tabela depozytów
+            
+        Returns:
+            list: Lista identyfikatorów (int)
+        """
+        deposit_ids = []
+        for index in table.selectionModel().selectedRows():
+            item = table.item(index.row(), 0)
+            if item is not None and not item.data(Qt.UserRole):
+                deposit_ids.append(int(item.text().replace('D', '')))
+        return deposit_ids
+    
+    def is_archived_row(self, table, row):
+        """
+        Sprawdza, czy wiersz tabeli pokazuje depozyt przeniesiony do archiwum.
+        
+        Args:
+            table (QTableWidget): Tabela depozytów
+            row (int): Numer wiersza
+            
+        Returns:
+            bool: True dla depozytu archiwalnego
+        """
+        item = table.item(row, 0)
+        return bool(item is not None and item.data(Qt.UserRole))
+    
+    def disable_archived_actions(self, menu, actions):
+        """
+        Wyłącza akcje menu niedostępne dla depozytu archiwalnego i dodaje informację.
+        
+        Args:
+            menu (QMenu): Menu akcji depozytu
+            actions (list): Akcje do wyłączenia (None jest pomijane)
+        """
+        for action in actions:
+            if action is not None:
+                action.setEnabled(False)
+        menu.addSeparator()
+        note_action = menu.addAction(f"🗄️ {_('Depozyt archiwalny - tylko podgląd')}")
+        note_action.setEnabled(False)
+
+    def show_bulk_context_menu(self, table, pos, deposit_ids):
+        """
+        Wyświetla menu operacji zbiorczych dla zaznaczonych depozytów.
+        
+        Args:
+            table (QTableWidget): Tabela depozytów
+            pos (QPoint): Pozycja kursora
+            deposit_ids (list): Identyfikatory zaznaczonych depozytów
+        """
+        menu = QMenu(self)
+        menu.setStyleSheet(STYLES["MENU"])
+        
+        title_action = menu.addAction(f"{_('Zaznaczone depozyty')}: {len(deposit_ids)}")
+        title_action.setEnabled(False)
+        menu.addSeparator()
+        
+        status_menu = menu.addMenu(f"🔄 {_('Zmień status')}")
+        status_menu.setStyleSheet(STYLES["MENU"])
+        for status_option in [_("Aktywny"), _("Do odbioru"), _("Zaległy"), _("Rezerwacja"), _("Wydany")]:
+            action = status_menu.addAction(status_option)
+            action.triggered.connect(lambda checked=False, st=status_option:
+                                     self.change_deposits_status(deposit_ids, st))
+        
+        move_action = menu.addAction(f"📦 {_('Przenieś do lokalizacji...')}")
+        extend_action = menu.addAction(f"📅 {_('Przedłuż termin odbioru...')}")
+        menu.addSeparator()
+        delete_action = menu.addAction(f"🗑️ {_('Usuń zaznaczone depozyty')}")
+        
+        action = menu.exec(table.mapToGlobal(pos))
+        
+        if action == move_action:
+            self.move_deposits(deposit_ids)
+        elif action == extend_action:
+            self.extend_deposits_pickup(deposit_ids)
+        elif action == delete_action:
+            self.delete_deposits(deposit_ids)
+
+    def refresh_after_bulk_change(self, deposit_ids, message):
+        """
+        Odświeża widok jednokrotnie po operacji zbiorczej.
+        
+        Args:
+            deposit_ids (list): Identyfikatory zmienionych depozytów
+            message (str): Treść powiadomienia
+        """
+        self.load_statistics()
+        self.load_deposits()
+        
+        NotificationManager.get_instance().show_notification(message, NotificationTypes.SUCCESS)
+        self.deposits_bulk_updated.emit(list(deposit_ids))
+
+    def change_deposits_status(self, deposit_ids, new_status):
+        """
+        Zmienia status wielu depozytów w jednej transakcji.
+        
+        Args:
+            deposit_ids (list): Identyfikatory depozytów
+            new_status (str): Nowy status
+        """
+        # Wydanie wymaga danych odbioru - pobieranych raz dla wszystkich depozytów
+        if new_status == _("Wydany"):
+            self.release_deposits(deposit_ids)
+            return
+        
         try:
+            reply = QMessageBox.question(
+                self,
+                _("Potwierdź zmianę statusu"),
+                _("Czy na pewno chcesz zmienić status {} depozytów na '{}'?").format(len(deposit_ids), new_status),
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+            
+            changed = bulk_set_status(self.conn, "deposits", deposit_ids, new_status)
+            self.refresh_after_bulk_change(
+                deposit_ids,
+                f"🔄 {_('Zmieniono status')} {changed} {_('depozytów na')} '{new_status}'"
+            )
+        except Exception as e:
+            logger.error(f"Błąd podczas zbiorczej zmiany statusu depozytów: {e}")
+            NotificationManager.get_instance().show_notification(
+                f"Błąd podczas zmiany statusu depozytów: {e}",
+                NotificationTypes.ERROR
+            )
+
+    def release_deposits(self, deposit_ids):
+        """
+        Wydaje zaznaczone depozyty. Data wydania, osoba odbierająca i uwagi pobierane
+        są raz dla wszystkich depozytów i zapisywane jednym zapytaniem w jednej transakcji.
+        
+        Args:
+            deposit_ids (list): Identyfikatory depozytów
+        """
+        try:
+            placeholders = ", ".join("?" * len(deposit_ids))
             cursor = self.conn.cursor()
-            # Znajdź wszystkie tabele w bazie danych
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            tables = [table[0] for table in cursor.fetchall()]
-            
-            related_tables = []
-            for table in tables:
-                # Sprawdź każdą tabelę czy ma powiązanie z deposits
-                cursor.execute(f"PRAGMA foreign_key_list({table})")
-                for fk in cursor.fetchall():
-                    if fk[2] == 'deposits':  # jeśli tabela ma klucz obcy do deposits
-                        related_tables.append({
-                            'table': table,
-                            'from': fk[3],  # kolumna w tej tabeli
-                            'to': fk[4]     # kolumna w tabeli deposits
-                        })
-            
-            print("Tabele powiązane z deposits:", related_tables)
-            return related_tables
+            cursor.execute(
+                f"""
+                SELECT d.id, c.name
+                FROM deposits d
+                LEFT JOIN clients c ON d.client_id = c.id
+                WHERE d.id IN ({placeholders}) AND d.status != 'Wydany'
+                ORDER BY d.id
+                """,
+                list(deposit_ids)
+            )
+            pending = cursor.fetchall()
+            if not pending:
+                NotificationManager.get_instance().show_notification(
+                    _("Zaznaczone depozyty są już wydane"),
+                    NotificationTypes.INFO
+                )
+                return
+            
+            pending_ids = [row[0] for row in pending]
+            
+            # Jeśli wszystkie depozyty należą do jednego klienta, zaproponuj go jako odbierającego
+            client_names = {row[1] for row in pending}
+            receiver = client_names.pop() if len(client_names) == 1 else ""
+            
+            dialog = BulkReleaseDialog(len(pending_ids), receiver or "", parent=self)
+            if dialog.exec() != QDialog.Accepted:
+                return
+            
+            release_date, receiver, notes = dialog.release_data()
+            released = bulk_release_deposits(self.conn, pending_ids, release_date, receiver, notes)
+            self.refresh_after_bulk_change(
+                pending_ids,
+                f"📤 {_('Wydano')} {released} {_('z')} {len(pending_ids)} {_('depozytów')}"
+            )
+        except Exception as e:
+            logger.error(f"Błąd podczas zbiorczego wydawania depozytów: {e}")
+            NotificationManager.get_instance().show_notification(
+                f"Błąd podczas wydawania depozytów: {e}",
+                NotificationTypes.ERROR
+            )
+
+    def move_deposits(self, deposit_ids):
+        """
+        Przenosi zaznaczone depozyty do nowej lokalizacji.
+        
+        Args:
+            deposit_ids (list): Identyfikatory depozytów
+        """
+        try:
+            from PySide6.QtWidgets import QInputDialog
+            
+            location, ok = QInputDialog.getText(
+                self,
+                _("Przenieś depozyty"),
+                _("Nowa lokalizacja dla {} depozytów:").format(len(deposit_ids))
+            )
+            location = location.strip()
+            if not ok or not location:
+                return
+            
+            changed = bulk_move_deposits(self.conn, deposit_ids, location)
+            self.refresh_after_bulk_change(
+                deposit_ids,
+                f"📦 {_('Przeniesiono')} {changed} {_('depozytów do lokalizacji')} {location}"
+            )
+        except Exception as e:
+            logger.error(f"Błąd podczas przenoszenia depozytów: {e}")
+            NotificationManager.get_instance().show_notification(
+                f"Błąd podczas przenoszenia depozytów: {e}",
+                NotificationTypes.ERROR
+            )
+
+    def extend_deposits_pickup(self, deposit_ids):
+        """
+        Przedłuża termin odbioru zaznaczonych depozytów.
+        
+        Args:
+            deposit_ids (list): Identyfikatory depozytów
+        """
+        try:
+            from PySide6.QtWidgets import QInputDialog
+            
+            days, ok = QInputDialog.getInt(
+                self,
+                _("Przedłuż termin odbioru"),
+                _("Liczba dni przedłużenia dla {} depozytów:").format(len(deposit_ids)),
+                30, 1, 365
+            )
+            if not ok:
+                return
+            
+            changed = bulk_extend_pickup(self.conn, deposit_ids, days)
+            self.refresh_after_bulk_change(
+                deposit_ids,
+                f"📅 {_('Przedłużono termin odbioru')} {changed} {_('depozytów o')} {days} {_('dni')}"
+            )
+        except Exception as e:
+            logger.error(f"Błąd podczas przedłużania terminu odbioru: {e}")
+            NotificationManager.get_instance().show_notification(
+                f"Błąd podczas przedłużania terminu odbioru: {e}",
+                NotificationTypes.ERROR
+            )
+
+    def delete_deposits(self, deposit_ids):
+        """
+        Usuwa zaznaczone depozyty wraz z powiązanymi rekordami.
+        
+        Args:
+            deposit_ids (list): Identyfikatory depozytów
+        """
+        try:
+            reply = QMessageBox.question(
+                self,
+                _("Potwierdź usunięcie"),
+                _("Czy na pewno chcesz usunąć {} depozytów?\n\n"
+                "Ta operacja jest nieodwracalna.").format(len(deposit_ids)),
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+            
+            deleted = bulk_delete(self.conn, "deposits", deposit_ids, self.identify_foreign_key_tables())
+            
+            self.load_statistics()
+            self.load_deposits()
+            NotificationManager.get_instance().show_notification(
+                f"🗑️ {_('Usunięto')} {deleted} {_('depozytów')}",
+                NotificationTypes.SUCCESS
+            )
+            self.deposits_bulk_deleted.emit(list(deposit_ids))
         except Exception as e:
-            print(f"Błąd podczas identyfikacji tabel: {e}")
+            logger.error(f"Błąd podczas usuwania depozytów: {e}")
+            NotificationManager.get_instance().show_notification(
+                f"Błąd podczas usuwania depozytów: {e}",
+                NotificationTypes.ERROR
+            )
+
+    def identify_foreign_key_tables(self):
+        """
+        Identyfikuje tabele powiązane kluczem obcym z tabelą deposits, których rekordy
+        trzeba usunąć ręcznie (bez ON DELETE CASCADE). Korzysta z zapamiętanego grafu kluczy obcych.
+        
+        Returns:
+            list: Lista słowników {'table', 'from', 'to', 'on_delete'}
+        """
+        try:
+            return get_referencing_tables(self.conn, 'deposits', manual_only=True)
+        except Exception as e:
+            logger.error(f"Błąd podczas identyfikacji tabel powiązanych z depozytami: {e}")
             return []
 
     def delete_deposit(self, deposit_id):
@@ -1780,16 +2004,10 @@ class DepositsTab(QWidget):
                     # Rozpocznij transakcję
                     self.conn.execute("BEGIN")
                     
-                    # Znajdź powiązane tabele
-                    related_tables = self.identify_foreign_key_tables()
-                    
-                    # Usuń powiązane rekordy ze wszystkich powiązanych tabel
-                    for related in related_tables:
+                    # Logi SMS/email usuwa SQLite (ON DELETE CASCADE) - ręcznie tylko
+                    # tabele bez akcji kaskadowej
+                    for related in self.identify_foreign_key_tables():
                         cursor.execute(f"DELETE FROM {related['table']} WHERE {related['from']} = ?", (deposit_id,))
-                        print(f"Usunięto powiązane rekordy z tabeli {related['table']}")
-                    
-                    # Sprawdź czy są rekordy w email_logs
-                    cursor.execute("DELETE FROM email_logs WHERE deposit_id = ?", (deposit_id,))
                     
                     # Na końcu usuń depozyt
                     cursor.execute("DELETE FROM deposits WHERE id = ?", (deposit_id,))
@@ -1917,7 +2135,7 @@ class DepositsTab(QWidget):
                 if self.current_tab_index == 0:  # Aktywne
                     base_query = """
                     SELECT 
-                        d.id, 
+                        d.id, d.code, 
                         c.name AS client_name, 
                         c.phone_number,
                         c.email,
@@ -1946,9 +2164,10 @@ class DepositsTab(QWidget):
                         where_clauses.append("""(
                             c.name LIKE ? OR 
                             d.id LIKE ? OR 
+                            d.code LIKE ? OR 
                             c.phone_number LIKE ?
                         )""")
-                        params.extend([filter_text, filter_text, filter_text])
+                        params.extend([filter_text, filter_text, filter_text, filter_text])
                     
                     if self.current_status_filter != _("Wszystkie"):
                         where_clauses.append("d.status = ?")
@@ -1965,7 +2184,7 @@ class DepositsTab(QWidget):
                 elif self.current_tab_index == 1:  # Historia
                     base_query = """
                     SELECT 
-                        d.id, 
+                        d.id, d.code, 
                         c.name AS client_name, 
                         c.phone_number,
                         c.email,
@@ -1989,7 +2208,7 @@ class DepositsTab(QWidget):
                 elif self.current_tab_index == 2:  # Do odbioru
                     base_query = """
                     SELECT 
-                        d.id, 
+                        d.id, d.code, 
                         c.name AS client_name, 
                         c.phone_number,
                         c.email,
@@ -2020,7 +2239,7 @@ class DepositsTab(QWidget):
                 # Eksportuj wszystkie depozyty
                 base_query = """
                 SELECT 
-                    d.id, 
+                    d.id, d.code, 
                     c.name AS client_name, 
                     c.phone_number,
                     c.email,
@@ -2056,7 +2275,7 @@ class DepositsTab(QWidget):
             data = []
             for deposit in deposits:
                 data.append([
-                    f"D{str(deposit['id']).zfill(3)}",
+                    format_deposit_code(deposit['id'], deposit['code']),
                     deposit['client_name'],
                     deposit['phone_number'],
                     deposit['email'],
@@ -2136,7 +2355,7 @@ class DepositsTab(QWidget):
             # Pobierz dane depozytu
             query = """
             SELECT 
-                d.id,
+                d.id, d.code,
                 c.name AS client_name,
                 d.tire_size,
                 d.tire_type,
@@ -2164,7 +2383,7 @@ class DepositsTab(QWidget):
                 return
             
             # Formatowanie ID depozytu
-            deposit_id_str = f"D{str(deposit['id']).zfill(3)}"
+            deposit_id_str = format_deposit_code(deposit['id'], deposit['code'])
             
             # Formatowanie dat
             deposit_date = datetime.strptime(deposit['deposit_date'], "%Y-%m-%d").strftime("%d-%m-%Y")
@@ -2172,7 +2391,7 @@ class DepositsTab(QWidget):
             current_date = datetime.now().strftime("%d-%m-%Y")
             
             # Pobierz dane firmy z ustawień
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_name = settings.value("company_name", "Serwis Opon")
             company_address = settings.value("company_address", "")
             company_phone = settings.value("company_phone", "")
@@ -2232,7 +2451,7 @@ class DepositsTab(QWidget):
             # Pobierz dane depozytu
             query = """
             SELECT 
-                d.id,
+                d.id, d.code,
                 c.name AS client_name,
                 c.email,
                 c.phone_number,
@@ -2263,7 +2482,7 @@ class DepositsTab(QWidget):
                 return
             
             # Formatowanie ID depozytu
-            deposit_id_str = f"D{str(deposit['id']).zfill(3)}"
+            deposit_id_str = format_deposit_code(deposit['id'], deposit['code'])
             
             # Sprawdź, czy klient ma adres email
             if not deposit['email']:
@@ -2279,7 +2498,7 @@ class DepositsTab(QWidget):
             current_date = datetime.now().strftime("%d-%m-%Y")
             
             # Pobierz dane firmy z ustawień
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_name = settings.value("company_name", "Serwis Opon")
             company_address = settings.value("company_address", "")
             company_phone = settings.value("company_phone", "")
@@ -2358,6 +2577,7 @@ class DepositsTab(QWidget):
             content_label = QLabel("Treść:")
             preview_layout.addWidget(content_label)
             
+            from PySide6.QtWebEngineWidgets import QWebEngineView
             email_view = QWebEngineView()
             email_view.setHtml(email_body)
             email_view.setMinimumHeight(400)
@@ -2402,7 +2622,7 @@ class DepositsTab(QWidget):
         """Potwierdza wysłanie emaila."""
         try:
             # Pobierz ustawienia SMTP
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             smtp_server = settings.value("smtp_server", "")
             smtp_port = settings.value("smtp_port", 587, type=int)
             use_ssl = settings.value("use_ssl", True, type=bool)
@@ -2482,7 +2702,7 @@ class DepositsTab(QWidget):
                         subject TEXT,
                         sent_date TEXT,
                         status TEXT,
-                        FOREIGN KEY (deposit_id) REFERENCES deposits (id)
+                        FOREIGN KEY (deposit_id) REFERENCES deposits (id) ON DELETE CASCADE
                     )
                 """)
                 
@@ -2557,6 +2777,7 @@ class DepositsTab(QWidget):
         try:
             # Przygotowanie dokumentu HTML do drukowania
             from PySide6.QtWebEngineWidgets import QWebEngineView
+            from PySide6.QtPrintSupport import QPrinter, QPrintPreviewDialog
             from PySide6.QtCore import QUrl, QTemporaryFile, QIODevice, QFile
             
             # Zapisz treść HTML do tymczasowego pliku
@@ -2611,7 +2832,7 @@ class DepositsTab(QWidget):
             from ui.dialogs.settings_dialog import DEFAULT_EMAIL_TEMPLATES
             
             # Pobierz dane firmy
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_data = {
                 "company_name": settings.value("company_name", "Serwis Opon"),
                 "company_address": settings.value("company_address", ""),
@@ -2679,7 +2900,7 @@ class DepositsTab(QWidget):
             from ui.dialogs.settings_dialog import DEFAULT_LABEL_TEMPLATE
             
             # Pobierz dane firmy
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_data = {
                 "company_name": settings.value("company_name", "Serwis Opon"),
                 "company_address": settings.value("company_address", ""),
@@ -2745,7 +2966,7 @@ class DepositsTab(QWidget):
             from ui.dialogs.settings_dialog import DEFAULT_RECEIPT_TEMPLATE
             
             # Pobierz dane firmy
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_data = {
                 "company_name": settings.value("company_name", "Serwis Opon"),
                 "company_address": settings.value("company_address", ""),
@@ -2804,7 +3025,7 @@ class DepositsTab(QWidget):
             # Pobierz dane depozytu
             query = """
             SELECT 
-                d.id,
+                d.id, d.code,
                 c.name AS client_name,
                 c.phone_number,
                 d.tire_size,
@@ -2834,7 +3055,7 @@ class DepositsTab(QWidget):
                 return
             
             # Formatowanie ID depozytu
-            deposit_id_str = f"D{str(deposit['id']).zfill(3)}"
+            deposit_id_str = format_deposit_code(deposit['id'], deposit['code'])
             
             # Sprawdź, czy klient ma numer telefonu
             if not deposit['phone_number']:
@@ -2850,7 +3071,7 @@ class DepositsTab(QWidget):
             current_date = datetime.now().strftime("%d-%m-%Y")
             
             # Pobierz dane firmy z ustawień
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_name = settings.value("company_name", "Serwis Opon")
             company_address = settings.value("company_address", "")
             company_phone = settings.value("company_phone", "")
@@ -2980,7 +3201,7 @@ class DepositsTab(QWidget):
         """Potwierdza wysłanie SMS-a."""
         try:
             # Pobierz ustawienia SMS
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             sms_api_key = settings.value("sms_api_key", "")
             sms_sender = settings.value("sms_sender", "")
             enable_sms = settings.value("enable_sms", False, type=bool)
@@ -3033,7 +3254,7 @@ class DepositsTab(QWidget):
                             content TEXT,
                             sent_date TEXT,
                             status TEXT,
-                            FOREIGN KEY (deposit_id) REFERENCES deposits (id)
+                            FOREIGN KEY (deposit_id) REFERENCES deposits (id) ON DELETE CASCADE
                         )
                     """)
                     
@@ -3089,7 +3310,7 @@ class DepositsTab(QWidget):
             from utils.paths import CONFIG_DIR
             
             # Pobierz dane firmy
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_data = {
                 "company_name": settings.value("company_name", "Serwis Opon"),
                 "company_address": settings.value("company_address", ""),
@@ -3101,14 +3322,8 @@ class DepositsTab(QWidget):
             # Ścieżka do pliku szablonów
             templates_file = os.path.join(CONFIG_DIR, "templates.json")
             
-            # Domyślne szablony dla różnych typów
-            default_templates = {
-                "deposit": {
-                    "Przyjęcie depozytu": "Dziekujemy za skorzystanie z naszych uslug. Przyjeto depozyt {deposit_id}. Ilosc opon: {quantity}. Odbior: {pickup_date}. {company_name}",
-                    "Przypomnienie o odbiorze": "Przypominamy o odbiorze depozytu {deposit_id}. Opony czekaja na odbior. W razie pytan prosimy o kontakt: {company_phone}. {company_name}",
-                    "Zaległy depozyt": "Depozyt {deposit_id} zalega w naszym magazynie. Prosimy o pilny kontakt: {company_phone}. {company_name}"
-                }
-            }
+            # Domyślne szablony dla różnych typów (wspólne z automatycznymi przypomnieniami)
+            default_templates = DEFAULT_SMS_TEMPLATES
             
             # Wczytaj szablony
             template_dict_key = f"sms_{template_type}"
@@ -3145,7 +3360,7 @@ class DepositsTab(QWidget):
         """Wysyła powiadomienia SMS do klientów."""
         try:
             # Sprawdź czy funkcja SMS jest skonfigurowana
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             sms_api_key = settings.value("sms_api_key", "")
             sms_sender = settings.value("sms_sender", "")
             enable_sms = settings.value("enable_sms", False, type=bool)
@@ -3184,7 +3399,7 @@ class DepositsTab(QWidget):
             # Buduj zapytanie w zależności od aktualnej zakładki i filtrów
             query = """
             SELECT 
-                d.id,
+                d.id, d.code,
                 c.name AS client_name,
                 c.phone_number,
                 d.tire_size,
@@ -3305,7 +3520,7 @@ class DepositsTab(QWidget):
             
             # Wypełnij listę depozytów
             for deposit in deposits:
-                deposit_id = f"D{str(deposit['id']).zfill(3)}"
+                deposit_id = format_deposit_code(deposit['id'], deposit['code'])
                 status = deposit['status']
                 pickup_date = datetime.strptime(deposit['pickup_date'], "%Y-%m-%d").strftime("%d-%m-%Y")
                 
@@ -3434,7 +3649,7 @@ class DepositsTab(QWidget):
                             break  # Anulowano
                         
                         # Formatowanie ID depozytu
-                        deposit_id_str = f"D{str(deposit['id']).zfill(3)}"
+                        deposit_id_str = format_deposit_code(deposit['id'], deposit['code'])
                         
                         # Formatowanie dat
                         deposit_date = datetime.strptime(deposit['deposit_date'], "%Y-%m-%d").strftime("%d-%m-%Y")
@@ -3476,7 +3691,7 @@ class DepositsTab(QWidget):
                                 content TEXT,
                                 sent_date TEXT,
                                 status TEXT,
-                                FOREIGN KEY (deposit_id) REFERENCES deposits (id)
+                                FOREIGN KEY (deposit_id) REFERENCES deposits (id) ON DELETE CASCADE
                             )
                         """)
                         
@@ -3548,14 +3763,14 @@ class DepositsTab(QWidget):
             deposit = deposits[0]
             
             # Formatowanie ID depozytu
-            deposit_id_str = f"D{str(deposit['id']).zfill(3)}"
+            deposit_id_str = format_deposit_code(deposit['id'], deposit['code'])
             
             # Formatowanie dat
             deposit_date = datetime.strptime(deposit['deposit_date'], "%Y-%m-%d").strftime("%d-%m-%Y")
             pickup_date = datetime.strptime(deposit['pickup_date'], "%Y-%m-%d").strftime("%d-%m-%Y")
             
             # Pobierz dane firmy z ustawień
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_name = settings.value("company_name", "Serwis Opon")
             company_address = settings.value("company_address", "")
             company_phone = settings.value("company_phone", "")
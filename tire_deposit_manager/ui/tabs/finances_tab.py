@@ -26,13 +26,9 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, QDate, QDateTime, Signal, Slot, QObject, QTimer
 from PySide6.QtGui import QIcon, QPixmap, QColor, QPainter, QPen, QBrush, QPalette, QFont
 
-try:
-    from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis, QDateTimeAxis, QBarSeries, QBarSet, QBarCategoryAxis
-except ImportError:
-    logging.getLogger("TireDepositManager").warning("QtCharts not available. Chart functionality will be disabled.")
-
 from utils.paths import ICONS_DIR
 from utils.settings import Settings
+from utils.database import initialize_finance_tables
 from ui.notifications import NotificationManager, NotificationTypes
 from utils.i18n import _  # Funkcja do obsługi lokalizacji
 
@@ -1170,85 +1166,7 @@ class FinancesTab(QWidget):
         
     def initialize_database(self):
         """Inicjalizuje tabele bazy danych potrzebne do pracy z finansami."""
-        try:
-            cursor = self.conn.cursor()
-            
-            # Tabela stanów kasy z nowymi kolumnami
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS cash_register (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL UNIQUE,
-                    amount REAL NOT NULL,
-                    previous_amount REAL DEFAULT 0.0,
-                    safe_transfer REAL DEFAULT 0.0,
-                    current_balance REAL DEFAULT 0.0,
-                    comment TEXT,
-                    created_at TEXT DEFAULT (datetime('now', 'localtime'))
-                )
-            ''')
-            
-            # Sprawdź, czy kolumny już istnieją - jeśli nie, dodaj je
-            cursor.execute("PRAGMA table_info(cash_register)")
-            columns = [info[1] for info in cursor.fetchall()]
-            
-            if "previous_amount" not in columns:
-                cursor.execute("ALTER TABLE cash_register ADD COLUMN previous_amount REAL DEFAULT 0.0")
-            
-            if "safe_transfer" not in columns:
-                cursor.execute("ALTER TABLE cash_register ADD COLUMN safe_transfer REAL DEFAULT 0.0")
-            
-            if "current_balance" not in columns:
-                cursor.execute("ALTER TABLE cash_register ADD COLUMN current_balance REAL DEFAULT 0.0")
-            
-            # Tabela wypłat dla pracowników
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS payroll (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cash_register_id INTEGER NOT NULL,
-                    employee_name TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    notes TEXT,
-                    created_at TEXT DEFAULT (datetime('now', 'localtime')),
-                    FOREIGN KEY (cash_register_id) REFERENCES cash_register(id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Tabela wydatków - pozostaje bez zmian
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS expenses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    payment_method TEXT,
-                    notes TEXT,
-                    created_at TEXT DEFAULT (datetime('now', 'localtime'))
-                )
-            ''')
-            
-            # Tabela przychodów - pozostaje bez zmian
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS income (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date TEXT NOT NULL,
-                    source TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    amount REAL NOT NULL,
-                    payment_method TEXT,
-                    notes TEXT,
-                    created_at TEXT DEFAULT (datetime('now', 'localtime'))
-                )
-            ''')
-            
-            # Włącz obsługę kluczy obcych
-            cursor.execute("PRAGMA foreign_keys = ON")
-            
-            self.conn.commit()
-            logger.info("Zainicjalizowano tabele finansowe w bazie danych")
-        except Exception as e:
-            self.conn.rollback()
-            logger.error(f"Błąd podczas inicjalizacji tabel finansowych: {e}")
+        initialize_finance_tables(self.conn)
     
     def init_ui(self):
         """Inicjalizacja interfejsu użytkownika zakładki."""
@@ -1774,6 +1692,9 @@ class FinancesTab(QWidget):
             chart_layout.setContentsMargins(0, 0, 0, 0)
             
             try:
+                # QtCharts ładowane dopiero przy pierwszym użyciu (przyspiesza start aplikacji)
+                from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
+
                 # Utworzenie wykresu
                 chart = QChart()
                 chart.setTitle(_("Trend stanu kasy"))
@@ -2017,6 +1938,9 @@ class FinancesTab(QWidget):
             chart_layout.setContentsMargins(0, 0, 0, 0)
             
             try:
+                # QtCharts ładowane dopiero przy pierwszym użyciu (przyspiesza start aplikacji)
+                from PySide6.QtCharts import QChart, QChartView, QBarSeries, QBarSet, QBarCategoryAxis, QValueAxis
+
                 # Utworzenie wykresu
                 chart = QChart()
                 chart.setTitle(_("Wydatki według kategorii"))
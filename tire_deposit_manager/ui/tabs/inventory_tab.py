@@ -20,15 +20,20 @@ from PySide6.QtWidgets import (
     QStyledItemDelegate, QSpacerItem, QSizePolicy, QTabWidget,
     QSpinBox, QDoubleSpinBox, QDateEdit, QCheckBox, QGridLayout
 )
-from PySide6.QtGui import QIcon, QAction, QColor, QFont, QPainter, QPixmap
-from PySide6.QtCore import Qt, QEvent, Signal, QDate, QDateTime, QRect, QSettings
-from PySide6.QtPrintSupport import QPrinter, QPrintDialog, QPrintPreviewDialog
-from PySide6.QtWebEngineWidgets import QWebEngineView
+from PySide6.QtGui import QIcon, QAction, QColor, QPixmap
+from PySide6.QtCore import Qt, Signal, QDate, QDateTime
 
 from ui.dialogs.inventory_dialog import InventoryDialog
 from utils.exporter import export_data_to_excel, export_data_to_pdf
 from utils.paths import ICONS_DIR, CONFIG_DIR
+from utils.settings import Settings
+from utils.bulk_operations import bulk_set_status, bulk_delete
+from utils.stock_alerts import count_open_alerts
+from utils.tire_size import get_size_options, size_equals_clause, refresh_tire_sizes
 from ui.notifications import NotificationManager, NotificationTypes
+from ui.delegates import (
+    StatusPillDelegate, ActionButtonsDelegate, PILL_GREEN, PILL_ORANGE, PILL_RED, PILL_BLUE, PILL_GREY
+)
 from utils.i18n import _  # Funkcja do obsługi lokalizacji
 
 # Logger
@@ -302,48 +307,18 @@ STYLES = {
 }
 
 
-class StatusColorDelegate(QStyledItemDelegate):
+class StatusColorDelegate(StatusPillDelegate):
     """
     Delegat do stylizowania komórek statusu w tabeli magazynu.
     """
-    def paint(self, painter, option, index):
-        status = index.data()
-        
-        if status == _("Dostępna"):
-            background_color = QColor("#51cf66")  # Zielony
-            text_color = QColor(255, 255, 255)
-        elif status == _("Rezerwacja"):
-            background_color = QColor("#4dabf7")  # Niebieski
-            text_color = QColor(255, 255, 255)
-        elif status == _("Sprzedana"):
-            background_color = QColor("#fa5252")  # Czerwony
-            text_color = QColor(255, 255, 255)
-        elif status == _("Zamówiona"):
-            background_color = QColor("#ffa94d")  # Pomarańczowy
-            text_color = QColor(255, 255, 255)
-        elif status == _("Wycofana"):
-            background_color = QColor("#adb5bd")  # Szary
-            text_color = QColor(255, 255, 255)
-        else:
-            # Domyślne kolory
-            background_color = QColor("#2c3034")
-            text_color = QColor(255, 255, 255)
-        
-        # Rysowanie zaokrąglonego prostokąta
-        painter.save()
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setBrush(background_color)
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(option.rect.adjusted(4, 4, -4, -4), 10, 10)
-        
-        # Rysowanie tekstu
-        painter.setPen(text_color)
-        painter.drawText(
-            option.rect, 
-            Qt.AlignCenter, 
-            status
-        )
-        painter.restore()
+    def __init__(self, parent=None):
+        super().__init__({
+            _("Dostępna"): PILL_GREEN,
+            _("Rezerwacja"): PILL_BLUE,
+            _("Sprzedana"): PILL_RED,
+            _("Zamówiona"): PILL_ORANGE,
+            _("Wycofana"): PILL_GREY,
+        }, parent)
 
 
 class StockLevelDelegate(QStyledItemDelegate):
@@ -399,70 +374,14 @@ class PriceDelegate(QStyledItemDelegate):
             return super().displayText(value, locale)
 
 
-class ActionButtonDelegate(QStyledItemDelegate):
+class ActionButtonDelegate(ActionButtonsDelegate):
     """
     Delegat do wyświetlania przycisków akcji z emotikonami w tabeli.
     """
     def __init__(self, parent=None):
-        super().__init__(parent)
-
-    def paint(self, painter, option, index):
-        painter.save()
-
-        # Obliczenie szerokości przycisku i odstępów
-        total_width = option.rect.width()
-        button_width = 30
-        spacing = (total_width - button_width) / 2  # Odstęp do wycentrowania
-
-        # Pozycja x dla przycisku
-        x_center = option.rect.left() + spacing
-
-        # Pozycja y (centr pionowy)
-        y_center = option.rect.top() + option.rect.height() / 2
-        button_height = 24
-
-        # Obszar przycisku
-        button_rect = QRect(
-            int(x_center), 
-            int(y_center - button_height/2),
-            int(button_width), 
-            int(button_height)
-        )
-
-        # Rysowanie emotikony
-        painter.setFont(QFont("Segoe UI", 12))
-        painter.setPen(Qt.white)
-        painter.drawText(button_rect, Qt.AlignCenter, "⋮")
-
-        painter.restore()
-
-    def editorEvent(self, event, model, option, index):
-        if event.type() == QEvent.Type.MouseButtonRelease:
-            # Obliczenie szerokości przycisku i odstępów
-            total_width = option.rect.width()
-            button_width = 30
-            spacing = (total_width - button_width) / 2
-
-            # Pozycja x dla przycisku
-            x_center = option.rect.left() + spacing
-
-            # Pozycja y (centr pionowy)
-            y_center = option.rect.top() + option.rect.height() / 2
-            button_height = 24
-
-            # Obszar przycisku
-            button_rect = QRect(
-                int(x_center), 
-                int(y_center - button_height/2),
-                int(button_width), 
-                int(button_height)
-            )
-
-            if button_rect.contains(event.pos()):
-                self.parent().action_requested.emit(index.row())
-                return True
-
-        return super().editorEvent(event, model, option, index)
+        super().__init__([
+            ("⋮", "action_requested"),
+        ], parent)
 
 
 class InventoryTable(QTableWidget):
@@ -477,6 +396,7 @@ class InventoryTable(QTableWidget):
         # Ustawienia tabeli
         self.setAlternatingRowColors(True)
         self.setSelectionBehavior(QTableWidget.SelectRows)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.setEditTriggers(QTableWidget.NoEditTriggers)
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.setShowGrid(False)
@@ -525,6 +445,8 @@ class InventoryTab(QWidget):
     tire_added = Signal(int)  # Emitowany po dodaniu opony
     tire_updated = Signal(int)  # Emitowany po aktualizacji opony
     tire_deleted = Signal(int)  # Emitowany po usunięciu opony
+    tires_bulk_updated = Signal(list)  # Emitowany po zbiorczej zmianie opon
+    tires_bulk_deleted = Signal(list)  # Emitowany po zbiorczym usunięciu opon
     
     def __init__(self, db_connection):
         """
@@ -896,7 +818,7 @@ class InventoryTab(QWidget):
             tire_id_str = f"T{str(tire['id']).zfill(3)}"
             
             # Pobierz dane firmy z ustawień
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_name = settings.value("company_name", "Serwis Opon")
             company_address = settings.value("company_address", "")
             company_phone = settings.value("company_phone", "")
@@ -956,7 +878,7 @@ class InventoryTab(QWidget):
             cursor = self.conn.cursor()
             
             # Pobierz dane firmy z ustawień
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_name = settings.value("company_name", "Serwis Opon")
             company_address = settings.value("company_address", "")
             company_phone = settings.value("company_phone", "")
@@ -1075,6 +997,7 @@ class InventoryTab(QWidget):
         try:
             # Przygotowanie dokumentu HTML do drukowania
             from PySide6.QtWebEngineWidgets import QWebEngineView
+            from PySide6.QtPrintSupport import QPrinter, QPrintPreviewDialog
             from PySide6.QtCore import QUrl, QTemporaryFile, QIODevice, QFile
             
             # Zapisz treść HTML do tymczasowego pliku
@@ -1169,7 +1092,7 @@ class InventoryTab(QWidget):
         """
         try:
             # Pobierz dane firmy
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_data = {
                 "company_name": settings.value("company_name", "Serwis Opon"),
                 "company_address": settings.value("company_address", ""),
@@ -1479,7 +1402,7 @@ class InventoryTab(QWidget):
             format_funcs = {}
             
         # Pobierz dane firmy
-        settings = QSettings("TireDepositManager", "Settings")
+        settings = Settings.get_instance()
         company_name = settings.value("company_name", "Serwis Opon")
         company_address = settings.value("company_address", "")
         company_phone = settings.value("company_phone", "")
@@ -1907,8 +1830,11 @@ class InventoryTab(QWidget):
                 params.append(self.current_season_filter)
                 
             if self.current_size_filter != _("Wszystkie"):
-                query += " AND size = ?"
-                params.append(self.current_size_filter)
+                # Ten sam rozmiar niezależnie od zapisu (znormalizowane kolumny z indeksem)
+                refresh_tire_sizes(self.conn)
+                size_clause, size_params = size_equals_clause(self.current_size_filter, "inventory")
+                query += f" AND {size_clause}"
+                params.extend(size_params)
                 
             if self.filter_text:
                 query += """
@@ -2030,14 +1956,8 @@ class InventoryTab(QWidget):
             # Aktualizuj kartę statystyki - używamy bezpośrednio atrybutu value_label
             self.stock_value_card.value_label.setText(f"{self.total_stock_value:.2f} zł")
             
-            # Liczba pozycji o niskim stanie (ilość <= 2)
-            cursor.execute("""
-                SELECT COUNT(*) as count
-                FROM inventory 
-                WHERE quantity > 0 AND quantity <= 2 AND status = 'Dostępna'
-            """)
-            result = cursor.fetchone()
-            self.low_stock_count = result['count'] or 0
+            # Liczba pozycji o niskim stanie (otwarte alerty utrzymywane przez wyzwalacze)
+            self.low_stock_count = count_open_alerts(self.conn, 'tire')
             
             # Aktualizuj kartę statystyki - używamy bezpośrednio atrybutu value_label
             self.low_stock_card.value_label.setText(str(self.low_stock_count))
@@ -2175,18 +2095,8 @@ class InventoryTab(QWidget):
             condition (str): Stan opon ('Nowa' lub 'Używana')
         """
         try:
-            cursor = self.conn.cursor()
-            
-            # Pobierz unikalne rozmiary opon
-            query = """
-                SELECT DISTINCT size
-                FROM inventory
-                WHERE condition = ?
-                ORDER BY size
-            """
-            
-            cursor.execute(query, (condition,))
-            sizes = cursor.fetchall()
+            # Pobierz unikalne rozmiary opon (różne zapisy tego samego rozmiaru jako jedna opcja)
+            sizes = get_size_options(self.conn, "inventory", "condition = ?", (condition,))
             
             # Wybierz odpowiedni kombo box w zależności od stanu opon
             combo_box = self.new_tires_size_combo if condition == "Nowa" else self.used_tires_size_combo
@@ -2202,7 +2112,7 @@ class InventoryTab(QWidget):
             
             # Dodaj rozmiary
             for size in sizes:
-                combo_box.addItem(size['size'])
+                combo_box.addItem(size)
                 
             # Przywróć poprzednie wybrane
             index = combo_box.findText(current_text)
@@ -2233,6 +2143,12 @@ class InventoryTab(QWidget):
             
         tire_id = id_item.data(Qt.UserRole)
         
+        # Kilka zaznaczonych wierszy - menu operacji zbiorczych
+        selected_ids = self.get_selected_tire_ids(table)
+        if len(selected_ids) > 1 and tire_id in selected_ids:
+            self.show_bulk_tire_actions(table, row, selected_ids)
+            return
+        
         # Pobierz status opony
         status_item = table.item(row, 8)
         if status_item is None:
@@ -2380,6 +2296,124 @@ class InventoryTab(QWidget):
                 NotificationTypes.ERROR
             )
 
+    def get_selected_tire_ids(self, table):
+        """
+        Zwraca identyfikatory zaznaczonych opon.
+        
+        Args:
+            table (QTableWidget): Tabela opon
+            
+        Returns:
+            list: Lista identyfikatorów (int)
+        """
+        tire_ids = []
+        for index in table.selectionModel().selectedRows():
+            item = table.item(index.row(), 0)
+            if item is not None and item.data(Qt.UserRole) is not None:
+                tire_ids.append(int(item.data(Qt.UserRole)))
+        return tire_ids
+
+    def show_bulk_tire_actions(self, table, row, tire_ids):
+        """
+        Wyświetla menu operacji zbiorczych dla zaznaczonych opon.
+        
+        Args:
+            table (QTableWidget): Tabela opon
+            row (int): Wiersz, w którym kliknięto przycisk akcji
+            tire_ids (list): Identyfikatory zaznaczonych opon
+        """
+        menu = QMenu(self)
+        menu.setStyleSheet(STYLES["MENU"])
+        
+        title_action = QAction(f"{_('Zaznaczone opony')}: {len(tire_ids)}", self)
+        title_action.setEnabled(False)
+        menu.addAction(title_action)
+        menu.addSeparator()
+        
+        for label, status in [
+            (_("Oznacz jako dostępne"), _("Dostępna")),
+            (_("Oznacz jako zarezerwowane"), _("Rezerwacja")),
+            (_("Oznacz jako zamówione"), _("Zamówiona")),
+            (_("Oznacz jako sprzedane"), _("Sprzedana")),
+        ]:
+            action = QAction(label, self)
+            action.triggered.connect(lambda checked=False, st=status: self.change_tires_status(tire_ids, st))
+            menu.addAction(action)
+        
+        menu.addSeparator()
+        
+        delete_action = QAction(_("Usuń zaznaczone opony"), self)
+        delete_action.triggered.connect(lambda: self.delete_tires(tire_ids))
+        menu.addAction(delete_action)
+        
+        global_pos = table.mapToGlobal(table.visualItemRect(table.item(row, 9)).center())
+        menu.exec(global_pos)
+
+    def change_tires_status(self, tire_ids, new_status):
+        """
+        Zmienia status wielu opon w jednej transakcji.
+        
+        Args:
+            tire_ids (list): Identyfikatory opon
+            new_status (str): Nowy status opon
+        """
+        try:
+            changed = bulk_set_status(self.conn, "inventory", tire_ids, new_status)
+            
+            # Jedno odświeżenie po całej operacji
+            self.load_statistics()
+            self.load_inventory()
+            
+            NotificationManager.get_instance().show_notification(
+                f"{_('Zmieniono status')} {changed} {_('opon na')} {new_status}",
+                NotificationTypes.SUCCESS
+            )
+            self.tires_bulk_updated.emit(list(tire_ids))
+        except Exception as e:
+            logger.error(f"Błąd podczas zbiorczej zmiany statusu opon: {e}")
+            NotificationManager.get_instance().show_notification(
+                f"Błąd podczas zmiany statusu opon: {e}",
+                NotificationTypes.ERROR
+            )
+
+    def delete_tires(self, tire_ids):
+        """
+        Usuwa zaznaczone opony z magazynu.
+        
+        Args:
+            tire_ids (list): Identyfikatory opon
+        """
+        try:
+            reply = QMessageBox.question(
+                self,
+                _("Potwierdź usunięcie"),
+                _("Czy na pewno chcesz usunąć {} opon z magazynu?\n\n"
+                "Ta operacja jest nieodwracalna.").format(len(tire_ids)),
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+            
+            deleted = bulk_delete(self.conn, "inventory", tire_ids)
+            
+            self.load_statistics()
+            self.load_inventory()
+            self.load_tire_sizes("Nowa")
+            self.load_tire_sizes("Używana")
+            
+            NotificationManager.get_instance().show_notification(
+                f"🗑️ {_('Usunięto')} {deleted} {_('opon z magazynu')}",
+                NotificationTypes.SUCCESS
+            )
+            self.tires_bulk_deleted.emit(list(tire_ids))
+        except Exception as e:
+            logger.error(f"Błąd podczas usuwania opon: {e}")
+            NotificationManager.get_instance().show_notification(
+                f"Błąd podczas usuwania opon: {e}",
+                NotificationTypes.ERROR
+            )
+
     def change_tire_status(self, tire_id, new_status):
         """
         Zmienia status opony.
@@ -2728,8 +2762,10 @@ class InventoryTab(QWidget):
                     params.append(self.current_season_filter)
                     
                 if self.current_size_filter != _("Wszystkie"):
-                    query += " AND size = ?"
-                    params.append(self.current_size_filter)
+                    refresh_tire_sizes(self.conn)
+                    size_clause, size_params = size_equals_clause(self.current_size_filter, "inventory")
+                    query += f" AND {size_clause}"
+                    params.extend(size_params)
                     
                 if self.filter_text:
                     query += """
@@ -16,15 +16,22 @@ from PySide6.QtWidgets import (
     QLineEdit, QComboBox, QTableWidget, QTableWidgetItem, 
     QHeaderView, QMenu, QAbstractItemView, QDialog, QFileDialog,
     QFrame, QSplitter, QToolButton, QScrollArea, QMessageBox,
-    QStyledItemDelegate, QSpacerItem, QSizePolicy, QDialogButtonBox
+    QSpacerItem, QSizePolicy, QDialogButtonBox
 )
-from PySide6.QtGui import QIcon, QAction, QColor, QFont, QPainter, QPixmap
-from PySide6.QtCore import Qt, QEvent, Signal, QDate, QRect, QSettings
+from PySide6.QtGui import QIcon, QAction, QPixmap
+from PySide6.QtCore import Qt, Signal, QDate
 
 from ui.dialogs.order_dialog import OrderDialog
 from utils.exporter import export_data_to_excel, export_data_to_pdf
 from utils.paths import ICONS_DIR
+from utils.settings import Settings
+from utils.bulk_operations import bulk_set_status, bulk_delete
+from utils.schema import get_referencing_tables
+from utils.summaries import get_order_status_counts
 from ui.notifications import NotificationManager, NotificationTypes
+from ui.delegates import (
+    StatusPillDelegate, ActionButtonsDelegate, PILL_GREEN, PILL_ORANGE, PILL_RED, PILL_BLUE
+)
 from utils.i18n import _  # Dodana funkcja do obsługi lokalizacji
 
 # Logger
@@ -198,152 +205,29 @@ STYLES = {
 }
 
 
-class StatusDelegate(QStyledItemDelegate):
+class StatusDelegate(StatusPillDelegate):
     """
     Delegat do stylizowania komórek statusu w tabeli zamówień.
     """
-    def paint(self, painter, option, index):
-        status = index.data()
-        
-        if status == _("Zakończone"):
-            background_color = QColor("#51cf66")  # Zielony
-            text_color = QColor(255, 255, 255)
-        elif status == _("W realizacji"):
-            background_color = QColor("#4dabf7")  # Niebieski
-            text_color = QColor(255, 255, 255)
-        elif status == _("Nowe"):
-            background_color = QColor("#ffa94d")  # Pomarańczowy
-            text_color = QColor(255, 255, 255)
-        elif status == _("Anulowane"):
-            background_color = QColor("#fa5252")  # Czerwony
-            text_color = QColor(255, 255, 255)
-        else:
-            # Domyślne kolory
-            background_color = QColor("#2c3034")
-            text_color = QColor(255, 255, 255)
-        
-        # Rysowanie zaokrąglonego prostokąta
-        painter.save()
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        painter.setBrush(background_color)
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(option.rect.adjusted(4, 4, -4, -4), 10, 10)
-        
-        # Rysowanie tekstu
-        painter.setPen(text_color)
-        painter.drawText(
-            option.rect, 
-            Qt.AlignCenter, 
-            status
-        )
-        painter.restore()
+    def __init__(self, parent=None):
+        super().__init__({
+            _("Zakończone"): PILL_GREEN,
+            _("W realizacji"): PILL_BLUE,
+            _("Nowe"): PILL_ORANGE,
+            _("Anulowane"): PILL_RED,
+        }, parent)
 
 
-class ActionButtonDelegate(QStyledItemDelegate):
+class ActionButtonDelegate(ActionButtonsDelegate):
     """
     Delegat do wyświetlania przycisków akcji z emotikonami w tabeli.
     """
     def __init__(self, parent=None):
-        super().__init__(parent)
-
-    def paint(self, painter, option, index):
-        painter.save()
-
-        # Obliczenie szerokości każdego przycisku i odstępów
-        total_width = option.rect.width()
-        button_width = min(total_width / 4, 30)  # Mniejsza szerokość z większymi marginesami
-        spacing = (total_width - (button_width * 3)) / 4  # Równe odstępy
-
-        # Pozycje x dla każdego przycisku
-        x1 = option.rect.left() + spacing
-        x2 = x1 + button_width + spacing
-        x3 = x2 + button_width + spacing
-
-        # Pozycja y (centr pionowy)
-        y_center = option.rect.top() + option.rect.height() / 2
-        button_height = 24
-
-        # Obszary dla każdego przycisku
-        view_rect = QRect(
-            int(x1), 
-            int(y_center - button_height/2),
-            int(button_width), 
-            int(button_height)
-        )
-
-        edit_rect = QRect(
-            int(x2), 
-            int(y_center - button_height/2),
-            int(button_width), 
-            int(button_height)
-        )
-
-        more_rect = QRect(
-            int(x3), 
-            int(y_center - button_height/2),
-            int(button_width), 
-            int(button_height)
-        )
-
-        # Rysowanie emotikon zamiast ikon
-        painter.setFont(QFont("Segoe UI", 12))
-        painter.setPen(Qt.white)
-
-        painter.drawText(view_rect, Qt.AlignCenter, "👁️")
-        painter.drawText(edit_rect, Qt.AlignCenter, "✏️")
-        painter.drawText(more_rect, Qt.AlignCenter, "⋮")
-
-        painter.restore()
-
-    def editorEvent(self, event, model, option, index):
-        if event.type() == QEvent.Type.MouseButtonRelease:
-            # Obliczenie szerokości każdego przycisku i odstępów
-            total_width = option.rect.width()
-            button_width = min(total_width / 4, 30)  # Mniejsza szerokość z większymi marginesami
-            spacing = (total_width - (button_width * 3)) / 4  # Równe odstępy
-
-            # Pozycje x dla każdego przycisku
-            x1 = option.rect.left() + spacing
-            x2 = x1 + button_width + spacing
-            x3 = x2 + button_width + spacing
-
-            # Pozycja y (centr pionowy)
-            y_center = option.rect.top() + option.rect.height() / 2
-            button_height = 24
-
-            # Obszary dla każdego przycisku
-            view_rect = QRect(
-                int(x1), 
-                int(y_center - button_height/2),
-                int(button_width), 
-                int(button_height)
-            )
-
-            edit_rect = QRect(
-                int(x2), 
-                int(y_center - button_height/2),
-                int(button_width), 
-                int(button_height)
-            )
-
-            more_rect = QRect(
-                int(x3), 
-                int(y_center - button_height/2),
-                int(button_width), 
-                int(button_height)
-            )
-
-            if view_rect.contains(event.pos()):
-                self.parent().view_order_requested.emit(index.row())
-                return True
-            elif edit_rect.contains(event.pos()):
-                self.parent().edit_order_requested.emit(index.row())
-                return True
-            elif more_rect.contains(event.pos()):
-                self.parent().more_actions_requested.emit(index.row())
-                return True
-
-        return super().editorEvent(event, model, option, index)
+        super().__init__([
+            ("👁️", "view_order_requested"),
+            ("✏️", "edit_order_requested"),
+            ("⋮", "more_actions_requested"),
+        ], parent)
 
 
 class OrdersTable(QTableWidget):
@@ -360,6 +244,7 @@ class OrdersTable(QTableWidget):
         # Ustawienia tabeli
         self.setAlternatingRowColors(True)
         self.setSelectionBehavior(QTableWidget.SelectRows)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
         self.setEditTriggers(QTableWidget.NoEditTriggers)
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.setShowGrid(False)
@@ -402,6 +287,8 @@ class OrdersTab(QWidget):
     order_added = Signal(int)  # Emitowany po dodaniu zamówienia
     order_updated = Signal(int)  # Emitowany po aktualizacji zamówienia
     order_deleted = Signal(int)  # Emitowany po usunięciu zamówienia
+    orders_bulk_updated = Signal(list)  # Emitowany po zbiorczej zmianie zamówień
+    orders_bulk_deleted = Signal(list)  # Emitowany po zbiorczym usunięciu zamówień
     
     def __init__(self, db_connection):
         """
@@ -717,26 +604,22 @@ class OrdersTab(QWidget):
             # Przygotowanie parametrów zapytania
             params = []
             
-            # Bazowe zapytanie zoptymalizowane
+            # Pozycje zamówienia w postaci tekstu pochodzą z podsumowania zamówienia
+            # (tabela order_summary utrzymywana przez wyzwalacze)
             base_query = """
             SELECT 
                 o.id, 
                 o.order_date, 
                 c.name AS client_name, 
-                GROUP_CONCAT(oi.name, ', ') AS services, 
+                s.items_text AS services, 
                 o.status, 
-                o.total_amount,
-                (SELECT COUNT(*) FROM orders) AS total_count,
-                (SELECT COUNT(*) FROM orders WHERE status = 'Nowe') AS new_count,
-                (SELECT COUNT(*) FROM orders WHERE status = 'W realizacji') AS in_progress_count,
-                (SELECT COUNT(*) FROM orders WHERE status = 'Zakończone') AS completed_count,
-                (SELECT COUNT(*) FROM orders WHERE status = 'Anulowane') AS cancelled_count
+                COALESCE(o.total_amount, s.items_total, 0) AS total_amount
             FROM 
                 orders o
             JOIN 
                 clients c ON o.client_id = c.id
             LEFT JOIN 
-                order_items oi ON o.id = oi.order_id
+                order_summary s ON s.order_id = o.id
             """
             
             # Warunki filtrowania
@@ -748,7 +631,7 @@ class OrdersTab(QWidget):
                 where_clauses.append("""(
                     c.name LIKE ? OR 
                     o.id LIKE ? OR 
-                    oi.name LIKE ?
+                    s.items_text LIKE ?
                 )""")
                 params.extend([filter_text, filter_text, filter_text])
             
@@ -770,9 +653,6 @@ class OrdersTab(QWidget):
             if where_clauses:
                 base_query += " WHERE " + " AND ".join(where_clauses)
             
-            # Grupowanie wyników
-            base_query += " GROUP BY o.id"
-            
             # Sortowanie
             sort_field = self.sort_combo.currentText()
             if sort_field == _("Data (najnowsze)"):
@@ -789,7 +669,7 @@ class OrdersTab(QWidget):
             SELECT COUNT(*) 
             FROM orders o
             JOIN clients c ON o.client_id = c.id
-            LEFT JOIN order_items oi ON o.id = oi.order_id
+            LEFT JOIN order_summary s ON s.order_id = o.id
             """
             
             if where_clauses:
@@ -810,46 +690,16 @@ class OrdersTab(QWidget):
             cursor.execute(base_query, params)
             orders = cursor.fetchall()
             
-            # Odczyt i aktualizacja liczników dla zakładek statusów
-            if orders:
-                total_count = orders[0]['total_count']
-                new_count = orders[0]['new_count']
-                in_progress_count = orders[0]['in_progress_count']
-                completed_count = orders[0]['completed_count']
-                cancelled_count = orders[0]['cancelled_count']
-                
-                # Aktualizacja etykiet przycisków statusów
-                self.status_tab_buttons["all"].setText(f"{_('Wszystkie')} ({total_count})")
-                self.status_tab_buttons["new"].setText(f"{_('Nowe')} ({new_count})")
-                self.status_tab_buttons["in_progress"].setText(f"{_('W realizacji')} ({in_progress_count})")
-                self.status_tab_buttons["completed"].setText(f"{_('Zakończone')} ({completed_count})")
-                self.status_tab_buttons["cancelled"].setText(f"{_('Anulowane')} ({cancelled_count})")
-            else:
-                # Jeśli nie ma zamówień, pobierz liczniki osobnym zapytaniem
-                cursor.execute("""
-                    SELECT 
-                        COUNT(*) AS total_count,
-                        SUM(CASE WHEN status = 'Nowe' THEN 1 ELSE 0 END) AS new_count,
-                        SUM(CASE WHEN status = 'W realizacji' THEN 1 ELSE 0 END) AS in_progress_count,
-                        SUM(CASE WHEN status = 'Zakończone' THEN 1 ELSE 0 END) AS completed_count,
-                        SUM(CASE WHEN status = 'Anulowane' THEN 1 ELSE 0 END) AS cancelled_count
-                    FROM orders
-                """)
-                counts = cursor.fetchone()
-                
-                if counts:
-                    total_count = counts['total_count'] or 0
-                    new_count = counts['new_count'] or 0
-                    in_progress_count = counts['in_progress_count'] or 0
-                    completed_count = counts['completed_count'] or 0
-                    cancelled_count = counts['cancelled_count'] or 0
-                    
-                    # Aktualizacja etykiet przycisków statusów
-                    self.status_tab_buttons["all"].setText(f"{_('Wszystkie')} ({total_count})")
-                    self.status_tab_buttons["new"].setText(f"{_('Nowe')} ({new_count})")
-                    self.status_tab_buttons["in_progress"].setText(f"{_('W realizacji')} ({in_progress_count})")
-                    self.status_tab_buttons["completed"].setText(f"{_('Zakończone')} ({completed_count})")
-                    self.status_tab_buttons["cancelled"].setText(f"{_('Anulowane')} ({cancelled_count})")
+            # Liczniki zamówień według statusu (tabela order_status_counts)
+            status_counts = get_order_status_counts(self.conn)
+            total_count = sum(status_counts.values())
+            
+            # Aktualizacja etykiet przycisków statusów
+            self.status_tab_buttons["all"].setText(f"{_('Wszystkie')} ({total_count})")
+            self.status_tab_buttons["new"].setText(f"{_('Nowe')} ({status_counts.get('Nowe', 0)})")
+            self.status_tab_buttons["in_progress"].setText(f"{_('W realizacji')} ({status_counts.get('W realizacji', 0)})")
+            self.status_tab_buttons["completed"].setText(f"{_('Zakończone')} ({status_counts.get('Zakończone', 0)})")
+            self.status_tab_buttons["cancelled"].setText(f"{_('Anulowane')} ({status_counts.get('Anulowane', 0)})")
             
             # Wyczyść tabelę
             self.orders_table.setRowCount(0)
@@ -1204,6 +1054,13 @@ class OrdersTab(QWidget):
             return
         
         row = index.row()
+        
+        # Kilka zaznaczonych wierszy - menu operacji zbiorczych
+        selected_ids = self.get_selected_order_ids()
+        if len(selected_ids) > 1 and self.orders_table.selectionModel().isRowSelected(row, index.parent()):
+            self.show_bulk_context_menu(pos, selected_ids)
+            return
+        
         order_id = int(self.orders_table.item(row, 0).text())
         
         # Pobierz więcej informacji o zamówieniu dla wyświetlenia w menu
@@ -1332,6 +1189,122 @@ class OrdersTab(QWidget):
                 NotificationTypes.ERROR
             )
     
+    def get_selected_order_ids(self):
+        """
+        Zwraca identyfikatory zaznaczonych zamówień.
+        
+        Returns:
+            list: Lista identyfikatorów (int)
+        """
+        order_ids = []
+        for index in self.orders_table.selectionModel().selectedRows():
+            item = self.orders_table.item(index.row(), 0)
+            if item is not None:
+                order_ids.append(int(item.text()))
+        return order_ids
+
+    def show_bulk_context_menu(self, pos, order_ids):
+        """
+        Wyświetla menu operacji zbiorczych dla zaznaczonych zamówień.
+        
+        Args:
+            pos (QPoint): Pozycja kursora
+            order_ids (list): Identyfikatory zaznaczonych zamówień
+        """
+        menu = QMenu(self)
+        menu.setStyleSheet(STYLES["MENU"])
+        
+        title_action = menu.addAction(f"{_('Zaznaczone zamówienia')}: {len(order_ids)}")
+        title_action.setEnabled(False)
+        menu.addSeparator()
+        
+        status_menu = menu.addMenu(f"🔄 {_('Zmień status')}")
+        status_menu.setStyleSheet(STYLES["MENU"])
+        for status_option in [_("Nowe"), _("W realizacji"), _("Zakończone"), _("Anulowane")]:
+            action = status_menu.addAction(status_option)
+            action.triggered.connect(lambda checked=False, st=status_option:
+                                     self.change_orders_status(order_ids, st))
+        
+        menu.addSeparator()
+        delete_action = menu.addAction(f"🗑️ {_('Usuń zaznaczone zamówienia')}")
+        
+        action = menu.exec(self.orders_table.mapToGlobal(pos))
+        
+        if action == delete_action:
+            self.delete_orders(order_ids)
+
+    def change_orders_status(self, order_ids, new_status):
+        """
+        Zmienia status wielu zamówień w jednej transakcji.
+        
+        Args:
+            order_ids (list): Identyfikatory zamówień
+            new_status (str): Nowy status zamówień
+        """
+        try:
+            reply = QMessageBox.question(
+                self,
+                _("Potwierdź zmianę statusu"),
+                _("Czy na pewno chcesz zmienić status {} zamówień na '{}'?").format(len(order_ids), new_status),
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+            
+            changed = bulk_set_status(self.conn, "orders", order_ids, new_status)
+            
+            # Jedno odświeżenie listy po całej operacji
+            self.load_orders()
+            
+            NotificationManager.get_instance().show_notification(
+                f"🔄 {_('Zmieniono status')} {changed} {_('zamówień na')} '{new_status}'",
+                NotificationTypes.SUCCESS
+            )
+            self.orders_bulk_updated.emit(list(order_ids))
+        except Exception as e:
+            logger.error(f"Błąd podczas zbiorczej zmiany statusu zamówień: {e}")
+            NotificationManager.get_instance().show_notification(
+                f"Błąd podczas zmiany statusu zamówień: {e}",
+                NotificationTypes.ERROR
+            )
+
+    def delete_orders(self, order_ids):
+        """
+        Usuwa zaznaczone zamówienia wraz z pozycjami i logami powiadomień.
+        
+        Args:
+            order_ids (list): Identyfikatory zamówień
+        """
+        try:
+            reply = QMessageBox.question(
+                self,
+                _("Potwierdź usunięcie"),
+                _("Czy na pewno chcesz usunąć {} zamówień?\n\n"
+                "Ta operacja usunie również wszystkie powiązane pozycje zamówień.\n"
+                "Ta operacja jest nieodwracalna.").format(len(order_ids)),
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+            
+            deleted = bulk_delete(self.conn, "orders", order_ids)
+            
+            self.load_orders()
+            
+            NotificationManager.get_instance().show_notification(
+                f"🗑️ {_('Usunięto')} {deleted} {_('zamówień')}",
+                NotificationTypes.SUCCESS
+            )
+            self.orders_bulk_deleted.emit(list(order_ids))
+        except Exception as e:
+            logger.error(f"Błąd podczas usuwania zamówień: {e}")
+            NotificationManager.get_instance().show_notification(
+                f"Błąd podczas usuwania zamówień: {e}",
+                NotificationTypes.ERROR
+            )
+
     def delete_order(self, order_id):
         """
         Usuwa zamówienie wraz ze wszystkimi powiązanymi rekordami.
@@ -1358,36 +1331,10 @@ class OrdersTab(QWidget):
                     # Rozpocznij transakcję
                     self.conn.execute("BEGIN")
                     
-                    # Usuń logi emaili związane z zamówieniem
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS order_email_logs (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            order_id INTEGER,
-                            email TEXT,
-                            subject TEXT,
-                            sent_date TEXT,
-                            status TEXT,
-                            FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE
-                        )
-                    """)
-                    cursor.execute("DELETE FROM order_email_logs WHERE order_id = ?", (order_id,))
-                    
-                    # Usuń logi SMS związane z zamówieniem
-                    cursor.execute("""
-                        CREATE TABLE IF NOT EXISTS order_sms_logs (
-                            id INTEGER PRIMARY KEY AUTOINCREMENT,
-                            order_id INTEGER,
-                            phone_number TEXT,
-                            content TEXT,
-                            sent_date TEXT,
-                            status TEXT,
-                            FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE
-                        )
-                    """)
-                    cursor.execute("DELETE FROM order_sms_logs WHERE order_id = ?", (order_id,))
-                    
-                    # Usuń powiązane pozycje zamówienia
-                    cursor.execute("DELETE FROM order_items WHERE order_id = ?", (order_id,))
+                    # Pozycje i logi zamówienia usuwa SQLite (ON DELETE CASCADE) - ręcznie tylko
+                    # tabele bez akcji kaskadowej
+                    for related in get_referencing_tables(self.conn, 'orders', manual_only=True):
+                        cursor.execute(f"DELETE FROM {related['table']} WHERE {related['from']} = ?", (order_id,))
                     
                     # Usuń zamówienie
                     cursor.execute("DELETE FROM orders WHERE id = ?", (order_id,))
@@ -1547,7 +1494,7 @@ class OrdersTab(QWidget):
                 o.id, 
                 o.order_date, 
                 c.name AS client_name, 
-                GROUP_CONCAT(oi.name, ', ') AS services, 
+                s.items_text AS services, 
                 o.status, 
                 o.total_amount,
                 o.notes
@@ -1556,7 +1503,7 @@ class OrdersTab(QWidget):
             JOIN 
                 clients c ON o.client_id = c.id
             LEFT JOIN 
-                order_items oi ON o.id = oi.order_id
+                order_summary s ON s.order_id = o.id
             """
             
             params = []
@@ -1570,7 +1517,7 @@ class OrdersTab(QWidget):
                     where_clauses.append("""(
                         c.name LIKE ? OR 
                         o.id LIKE ? OR 
-                        oi.name LIKE ?
+                        s.items_text LIKE ?
                     )""")
                     params.extend([filter_text, filter_text, filter_text])
                 
@@ -1589,8 +1536,6 @@ class OrdersTab(QWidget):
                 if where_clauses:
                     base_query += " WHERE " + " AND ".join(where_clauses)
             
-            base_query += " GROUP BY o.id"
-            
             # Sortowanie
             sort_field = self.sort_combo.currentText()
             if sort_field == _("Data (najnowsze)"):
@@ -1673,7 +1618,7 @@ class OrdersTab(QWidget):
                 o.id, 
                 o.order_date, 
                 c.name AS client_name, 
-                GROUP_CONCAT(oi.name, ', ') AS services, 
+                s.items_text AS services, 
                 o.status, 
                 o.total_amount
             FROM 
@@ -1681,7 +1626,7 @@ class OrdersTab(QWidget):
             JOIN 
                 clients c ON o.client_id = c.id
             LEFT JOIN 
-                order_items oi ON o.id = oi.order_id
+                order_summary s ON s.order_id = o.id
             """
             
             # Filtrowanie podobne jak w export_to_excel
@@ -1693,7 +1638,7 @@ class OrdersTab(QWidget):
                 where_clauses.append("""(
                     c.name LIKE ? OR 
                     o.id LIKE ? OR 
-                    oi.name LIKE ?
+                    s.items_text LIKE ?
                 )""")
                 params.extend([filter_text, filter_text, filter_text])
             
@@ -1712,8 +1657,6 @@ class OrdersTab(QWidget):
             if where_clauses:
                 base_query += " WHERE " + " AND ".join(where_clauses)
             
-            base_query += " GROUP BY o.id"
-            
             # Sortowanie
             sort_field = self.sort_combo.currentText()
             if sort_field == _("Data (najnowsze)"):
@@ -1833,8 +1776,8 @@ class OrdersTab(QWidget):
                 )
                 return
             
-            # Pobierz ustawienia email z QSettings
-            settings = QSettings("TireDepositManager", "Settings")
+            # Pobierz ustawienia email
+            settings = Settings.get_instance()
             email_address = settings.value("email_address", "")
             email_password = settings.value("email_password", "")
             smtp_server = settings.value("smtp_server", "")
@@ -2048,7 +1991,7 @@ class OrdersTab(QWidget):
                                 subject TEXT,
                                 sent_date TEXT,
                                 status TEXT,
-                                FOREIGN KEY (order_id) REFERENCES orders (id)
+                                FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE
                             )
                         """)
                         
@@ -2127,8 +2070,8 @@ class OrdersTab(QWidget):
             from utils.sms_sender import format_phone_number
             formatted_phone = format_phone_number(order['phone_number'])
             
-            # Pobierz ustawienia SMS z QSettings
-            settings = QSettings("TireDepositManager", "Settings")
+            # Pobierz ustawienia SMS
+            settings = Settings.get_instance()
             api_key = settings.value("sms_api_key", "")
             sender = settings.value("sms_sender", "")
             enable_sms = settings.value("enable_sms", False, type=bool)
@@ -2289,7 +2232,7 @@ class OrdersTab(QWidget):
                                 content TEXT,
                                 sent_date TEXT,
                                 status TEXT,
-                                FOREIGN KEY (order_id) REFERENCES orders (id)
+                                FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE
                             )
                         """)
                         
@@ -2380,7 +2323,7 @@ class OrdersTab(QWidget):
         """Wysyła powiadomienia email do klientów z zamówieniami."""
         try:
             # Sprawdź czy funkcja email jest skonfigurowana
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             email_address = settings.value("email_address", "")
             email_password = settings.value("email_password", "")
             smtp_server = settings.value("smtp_server", "")
@@ -2848,7 +2791,7 @@ class OrdersTab(QWidget):
                                         subject TEXT,
                                         sent_date TEXT,
                                         status TEXT,
-                                        FOREIGN KEY (order_id) REFERENCES orders (id)
+                                        FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE
                                     )
                                 """)
                                 
@@ -2923,7 +2866,7 @@ class OrdersTab(QWidget):
         """Wysyła powiadomienia SMS do klientów z zamówieniami."""
         try:
             # Sprawdź czy funkcja SMS jest skonfigurowana
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             api_key = settings.value("sms_api_key", "")
             sender = settings.value("sms_sender", "")
             enable_sms = settings.value("enable_sms", False, type=bool)
@@ -3260,7 +3203,7 @@ class OrdersTab(QWidget):
                                 content TEXT,
                                 sent_date TEXT,
                                 status TEXT,
-                                FOREIGN KEY (order_id) REFERENCES orders (id)
+                                FOREIGN KEY (order_id) REFERENCES orders (id) ON DELETE CASCADE
                             )
                         """)
                         
@@ -3325,7 +3268,7 @@ class OrdersTab(QWidget):
                 return
             
             # Pobierz dane firmy z ustawień
-            settings = QSettings("TireDepositManager", "Settings")
+            settings = Settings.get_instance()
             company_name = settings.value("company_name", "")
             company_phone = settings.value("company_phone", "")
             
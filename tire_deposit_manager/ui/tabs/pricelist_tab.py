@@ -8,7 +8,6 @@ Umożliwia wyświetlanie, edycję cen usług oraz kalkulację kosztów.
 
 import os
 import logging
-import json
 from datetime import datetime
 from typing import Optional, List, Dict, Any, Tuple
 
@@ -18,18 +17,27 @@ from PySide6.QtWidgets import (
     QHeaderView, QMenu, QAbstractItemView, QDialog, QFileDialog,
     QFrame, QSplitter, QToolButton, QScrollArea, QMessageBox,
     QStyledItemDelegate, QSpacerItem, QSizePolicy, QTabWidget,
-    QCheckBox, QDoubleSpinBox, QGroupBox, QRadioButton, QSpinBox
+    QCheckBox, QDoubleSpinBox, QGroupBox, QRadioButton, QSpinBox, QListView
 )
 from PySide6.QtGui import QIcon, QAction, QColor, QFont, QPainter, QPixmap
-from PySide6.QtCore import Qt, QEvent, Signal, QRect, QSettings, QSize
+from PySide6.QtCore import (
+    Qt, QEvent, Signal, QRect, QSettings, QSize, QTimer, QAbstractListModel, QModelIndex
+)
 
 from utils.paths import ICONS_DIR
+from utils.price_list import (
+    load_price_catalog, save_price_category, save_price_data as save_price_items, find_duplicate_items
+)
+from utils.search_index import SearchIndex
 from ui.notifications import NotificationManager, NotificationTypes
 from utils.i18n import _  # Funkcja do obsługi lokalizacji
 
 # Logger
 logger = logging.getLogger("TireDepositManager")
 
+# Opóźnienie wyszukiwania usług po ostatnim naciśnięciu klawisza (ms)
+SERVICE_SEARCH_DELAY_MS = 150
+
 # Wspólne style CSS - scentralizowane do łatwego zarządzania
 STYLES = {
     "TABLE_WIDGET": """
@@ -272,6 +280,25 @@ STYLES = {
             padding: 10px;
             margin: 5px 0;
         }
+    """,
+    "SERVICE_LIST": """
+        QListView {
+            background-color: transparent;
+            color: white;
+            border: none;
+        }
+        QListView::item {
+            background-color: #2c3034;
+            border-radius: 5px;
+            padding: 8px;
+            margin: 2px 0;
+        }
+        QListView::item:disabled {
+            background-color: transparent;
+        }
+        QListView::item:hover {
+            background-color: #4dabf7;
+        }
     """
 }
 
@@ -572,6 +599,17 @@ class PriceListEditorDialog(QDialog):
             
             category_data["additional_services"] = services_data
         
+        # Każda pozycja może mieć tylko jedną cenę - powtórzenia trzeba usunąć lub przemianować
+        duplicates = find_duplicate_items(category_data)
+        if duplicates:
+            QMessageBox.warning(
+                self,
+                _("Powtórzone pozycje"),
+                _("Cennik zawiera powtórzone pozycje:") + "\n" + "\n".join(duplicates) + "\n\n" +
+                _("Usuń lub zmień nazwę powtórzonych pozycji przed zapisaniem.")
+            )
+            return
+        
         # Przygotuj wynik
         self.result_data = {
             "category": category,
@@ -704,6 +742,68 @@ class ServiceItem(QFrame):
             "total_price": self.price
         }
 
+class ServiceListModel(QAbstractListModel):
+    """
+    Model listy usług kalkulatora. Widok rysuje tylko widoczne wiersze, więc liczba
+    widżetów nie zależy od wielkości cennika.
+    """
+    
+    # Rodzaje wierszy
+    ROW_HEADER = "header"
+    ROW_MESSAGE = "message"
+    ROW_SERVICE = "service"
+    
+    # Rola z danymi usługi
+    ServiceRole = Qt.UserRole + 1
+    
+    def __init__(self, parent=None):
+        """
+        Inicjalizacja modelu.
+        
+        Args:
+            parent (QObject): Obiekt rodzica
+        """
+        super().__init__(parent)
+        self._rows = []
+        self._header_font = QFont()
+        self._header_font.setBold(True)
+        self._header_color = QColor("white")
+        self._message_color = QColor("#adb5bd")
+    
+    def set_rows(self, rows):
+        """
+        Ustawia wiersze listy.
+        
+        Args:
+            rows (list): Wiersze (rodzaj, wartość) - nagłówek i komunikat to tekst, usługa to słownik
+        """
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        kind, value = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return value["display_name"] if kind == self.ROW_SERVICE else value
+        if role == self.ServiceRole and kind == self.ROW_SERVICE:
+            return value
+        if role == Qt.FontRole and kind == self.ROW_HEADER:
+            return self._header_font
+        if role == Qt.ForegroundRole and kind != self.ROW_SERVICE:
+            return self._header_color if kind == self.ROW_HEADER else self._message_color
+        return None
+    
+    def flags(self, index):
+        if index.isValid() and self._rows[index.row()][0] == self.ROW_SERVICE:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.NoItemFlags
+
+
 class PriceListTab(QWidget):
     """Zakładka cennika w aplikacji."""
     
@@ -718,6 +818,7 @@ class PriceListTab(QWidget):
         
         self.conn = db_connection
         self.price_data = {}
+        self.price_catalog = None
         self.calculator_items = []
         # Inicjalizacja pustej listy od razu w konstruktorze
         self.all_services = []
@@ -821,32 +922,16 @@ class PriceListTab(QWidget):
         
         service_selection_layout.addLayout(search_service_layout)
         
-        # Lista wszystkich usług podzielonych na kategorie
-        all_services_layout = QVBoxLayout()
-        all_services_layout.setSpacing(5)
-        
-        # Przewijana lista usług
-        services_scroll = QScrollArea()
-        services_scroll.setWidgetResizable(True)
-        services_scroll.setFrameShape(QFrame.NoFrame)
-        services_scroll.setStyleSheet("background-color: transparent;")
-        
-        # Widget zawierający wszystkie usługi
-        services_content = QWidget()
-        services_content.setStyleSheet("background-color: transparent;")
-        self.services_content_layout = QVBoxLayout(services_content)
-        self.services_content_layout.setContentsMargins(0, 0, 0, 0)
-        self.services_content_layout.setSpacing(10)
-        
-        # Wypełnienie listy usług
-        self.populate_services_list()
-        
-        # Ustawienie widgetu w obszarze przewijania
-        services_scroll.setWidget(services_content)
-        services_scroll.setMaximumHeight(200)  # Ograniczenie wysokości
-        
-        all_services_layout.addWidget(services_scroll)
-        service_selection_layout.addLayout(all_services_layout)
+        # Lista usług (widok wirtualny z modelem) - pogrupowana według kategorii lub wyniki wyszukiwania
+        self.services_model = ServiceListModel(self)
+        self.services_view = QListView()
+        self.services_view.setModel(self.services_model)
+        self.services_view.setUniformItemSizes(True)
+        self.services_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.services_view.setStyleSheet(STYLES["SERVICE_LIST"])
+        self.services_view.setMaximumHeight(200)  # Ograniczenie wysokości
+        self.services_view.clicked.connect(self.on_service_clicked)
+        service_selection_layout.addWidget(self.services_view)
         
         calculator_layout.addWidget(service_selection_frame)
         
@@ -917,10 +1002,8 @@ class PriceListTab(QWidget):
         # Dodanie kalkulatora do głównego układu (proporcja 2 - szerszy)
         main_layout.addWidget(calculator_panel, 2)  # Proporcja 2 (szerszy)
 
-        # Inicjalizacja wyszukiwania usług
+        # Inicjalizacja wyszukiwania usług i wypełnienie listy usług
         self.setup_service_search()
-
-        # Wypełnienie listy usług (teraz self.all_services jest już zainicjalizowane)
         self.populate_services_list()
     
     def create_price_list_sections(self, parent_layout):
@@ -1146,47 +1229,18 @@ class PriceListTab(QWidget):
         parent_layout.addWidget(section_frame)
     
     def load_price_data(self):
-        """Ładuje dane cennika z bazy danych lub pliku."""
+        """Ładuje cennik z bazy danych (tabela price_items); pusty cennik wypełnia cenami domyślnymi."""
         try:
-            # Sprawdź czy istnieje tabela cennika w bazie danych
-            cursor = self.conn.cursor()
-            
-            # Sprawdź czy tabela istnieje
-            cursor.execute("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name='price_list'
-            """)
+            self.price_catalog = load_price_catalog(self.conn, _)
             
-            if cursor.fetchone():
-                # Pobierz dane z bazy
-                cursor.execute("SELECT data FROM price_list WHERE id = 1")
-                result = cursor.fetchone()
-                
-                if result and result[0]:
-                    try:
-                        self.price_data = json.loads(result[0])
-                        logger.info("Dane cennika załadowane z bazy danych")
-                    except json.JSONDecodeError:
-                        logger.error("Błąd dekodowania danych cennika z bazy danych")
-                        self.price_data = {}
-                else:
-                    # Brak danych w bazie
-                    logger.info("Brak danych cennika w bazie danych")
-                    self.init_default_prices()
-            else:
-                # Utwórz tabelę i dodaj domyślne dane
-                logger.info("Tworzenie tabeli cennika w bazie danych")
-                
-                cursor.execute("""
-                    CREATE TABLE price_list (
-                        id INTEGER PRIMARY KEY,
-                        data TEXT,
-                        last_updated TEXT
-                    )
-                """)
-                
+            if not self.price_catalog.items:
+                logger.info("Brak danych cennika w bazie danych - zapis cen domyślnych")
                 self.init_default_prices()
                 self.save_price_data()
+                return
+            
+            self.price_data = self.price_catalog.to_price_data()
+            logger.info("Dane cennika załadowane z bazy danych")
                 
         except Exception as e:
             logger.error(f"Błąd podczas ładowania danych cennika: {e}")
@@ -1254,31 +1308,10 @@ class PriceListTab(QWidget):
         }
     
     def save_price_data(self):
-        """Zapisuje dane cennika do bazy danych."""
+        """Zapisuje cennik do bazy danych (tylko zmienione pozycje) i odświeża cennik w pamięci."""
         try:
-            cursor = self.conn.cursor()
-            
-            # Konwersja danych do formatu JSON
-            data_json = json.dumps(self.price_data, ensure_ascii=False)
-            
-            # Sprawdź czy istnieje rekord
-            cursor.execute("SELECT id FROM price_list WHERE id = 1")
-            result = cursor.fetchone()
-            
-            if result:
-                # Aktualizuj istniejący rekord
-                cursor.execute(
-                    "UPDATE price_list SET data = ?, last_updated = ? WHERE id = 1",
-                    (data_json, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                )
-            else:
-                # Dodaj nowy rekord
-                cursor.execute(
-                    "INSERT INTO price_list (id, data, last_updated) VALUES (?, ?, ?)",
-                    (1, data_json, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                )
-            
-            self.conn.commit()
+            save_price_items(self.conn, self.price_data)
+            self.price_catalog = load_price_catalog(self.conn, _)
             logger.info("Dane cennika zapisane do bazy danych")
             
         except Exception as e:
@@ -1300,8 +1333,9 @@ class PriceListTab(QWidget):
                 
                 self.price_data[category] = category_data
                 
-                # Zapisanie danych
-                self.save_price_data()
+                # Zapisanie zmienionych pozycji kategorii
+                save_price_category(self.conn, category, category_data)
+                self.price_catalog = load_price_catalog(self.conn, _)
                 
                 # Odświeżenie widoku
                 self.refresh_price_list()
@@ -1343,6 +1377,8 @@ class PriceListTab(QWidget):
                 
                 # Aktualizuj listę usług w kalkulatorze
                 self.update_service_items()
+                self.update_service_index()
+                self.apply_service_filter()
             
         except Exception as e:
             logger.error(f"Błąd podczas odświeżania cennika: {e}")
@@ -1353,72 +1389,9 @@ class PriceListTab(QWidget):
             category = self.category_combo.currentText()
             self.service_combo.clear()
             
-            if category in self.price_data:
-                if _("Wymiana opon na felgach") in category:
-                    # Dla wymiany opon
-                    for size_data in self.price_data[category].get("sizes", []):
-                        self.service_combo.addItem(
-                            f"{_('Wymiana opon')} {size_data['size']} - {size_data['price_set']:.2f} zł",
-                            {
-                                "name": f"{_('Wymiana opon')} {size_data['size']}",
-                                "price": size_data['price_set'],
-                                "category": category
-                            }
-                        )
-                        
-                        self.service_combo.addItem(
-                            f"{_('Wymiana opony')} {size_data['size']} - {size_data['price_single']:.2f} zł",
-                            {
-                                "name": f"{_('Wymiana opony')} {size_data['size']}",
-                                "price": size_data['price_single'],
-                                "category": category
-                            }
-                        )
-                
-                elif _("Wyważanie kół") in category:
-                    # Dla wyważania kół
-                    for balancing_data in self.price_data[category].get("balancing", []):
-                        self.service_combo.addItem(
-                            f"{_('Wyważanie kół')} {balancing_data['rim_type']} {balancing_data['size']} - {balancing_data['price_set']:.2f} zł",
-                            {
-                                "name": f"{_('Wyważanie kół')} {balancing_data['rim_type']} {balancing_data['size']}",
-                                "price": balancing_data['price_set'],
-                                "category": category
-                            }
-                        )
-                        
-                        self.service_combo.addItem(
-                            f"{_('Wyważanie koła')} {balancing_data['rim_type']} {balancing_data['size']} - {balancing_data['price_single']:.2f} zł",
-                            {
-                                "name": f"{_('Wyważanie koła')} {balancing_data['rim_type']} {balancing_data['size']}",
-                                "price": balancing_data['price_single'],
-                                "category": category
-                            }
-                        )
-                
-                elif _("Naprawy") in category:
-                    # Dla napraw
-                    for repair_data in self.price_data[category].get("repairs", []):
-                        self.service_combo.addItem(
-                            f"{repair_data['name']} - {repair_data['price']:.2f} zł",
-                            {
-                                "name": repair_data['name'],
-                                "price": repair_data['price'],
-                                "category": category
-                            }
-                        )
-                
-                elif _("Usługi dodatkowe") in category:
-                    # Dla usług dodatkowych
-                    for service_data in self.price_data[category].get("additional_services", []):
-                        self.service_combo.addItem(
-                            f"{service_data['name']} - {service_data['price']:.2f} zł",
-                            {
-"name": service_data['name'],
-                                "price": service_data['price'],
-                                "category": category
-                            }
-                        )
+            # Usługi kategorii z gotowymi opisami z cennika w pamięci
+            for service in self.price_catalog.services_for(category):
+                self.service_combo.addItem(service["display_name"], service)
         
         except Exception as e:
             logger.error(f"Błąd podczas aktualizacji listy usług: {e}")
@@ -1600,135 +1573,66 @@ class PriceListTab(QWidget):
         )
 
     def setup_service_search(self):
-        """Konfiguruje funkcjonalność wyszukiwania usług z autouzupełnianiem."""
-        # Lista wszystkich usług do autouzupełniania
-        self.all_services = []
+        """Konfiguruje wyszukiwanie usług: indeks słów i opóźnione filtrowanie podczas pisania."""
+        self.update_service_index()
         
-        # Wypełnienie listy wszystkich usług
-        for category, data in self.price_data.items():
-            if _("Wymiana opon") in category and "sizes" in data:
-                for size_data in data["sizes"]:
-                    self.all_services.append({
-                        "name": f"{_('Wymiana opon')} {size_data['size']}",
-                        "display_name": f"{_('Wymiana opon')} {size_data['size']} - {size_data['price_set']:.2f} zł",
-                        "price": size_data['price_set'],
-                        "category": category
-                    })
-                    
-                    self.all_services.append({
-                        "name": f"{_('Wymiana opony')} {size_data['size']}",
-                        "display_name": f"{_('Wymiana opony')} {size_data['size']} - {size_data['price_single']:.2f} zł",
-                        "price": size_data['price_single'],
-                        "category": category
-                    })
-            
-            elif _("Wyważanie kół") in category and "balancing" in data:
-                for balancing_data in data["balancing"]:
-                    self.all_services.append({
-                        "name": f"{_('Wyważanie kół')} {balancing_data['rim_type']} {balancing_data['size']}",
-                        "display_name": f"{_('Wyważanie kół')} {balancing_data['rim_type']} {balancing_data['size']} - {balancing_data['price_set']:.2f} zł",
-                        "price": balancing_data['price_set'],
-                        "category": category
-                    })
-                    
-                    self.all_services.append({
-                        "name": f"{_('Wyważanie koła')} {balancing_data['rim_type']} {balancing_data['size']}",
-                        "display_name": f"{_('Wyważanie koła')} {balancing_data['rim_type']} {balancing_data['size']} - {balancing_data['price_single']:.2f} zł",
-                        "price": balancing_data['price_single'],
-                        "category": category
-                    })
-            
-            elif _("Naprawy") in category and "repairs" in data:
-                for repair_data in data["repairs"]:
-                    self.all_services.append({
-                        "name": repair_data['name'],
-                        "display_name": f"{repair_data['name']} - {repair_data['price']:.2f} zł",
-                        "price": repair_data['price'],
-                        "category": category
-                    })
-            
-            elif _("Usługi dodatkowe") in category and "additional_services" in data:
-                for service_data in data["additional_services"]:
-                    self.all_services.append({
-                        "name": service_data['name'],
-                        "display_name": f"{service_data['name']} - {service_data['price']:.2f} zł",
-                        "price": service_data['price'],
-                        "category": category
-                    })
+        # Wyszukiwanie po przerwie w pisaniu zamiast po każdym naciśnięciu klawisza
+        self.service_search_timer = QTimer(self)
+        self.service_search_timer.setSingleShot(True)
+        self.service_search_timer.setInterval(SERVICE_SEARCH_DELAY_MS)
+        self.service_search_timer.timeout.connect(self.apply_service_filter)
         
         # Połączenie z edycją pola wyszukiwania
         self.service_search.textChanged.connect(self.filter_services)
         self.service_search.returnPressed.connect(self.add_service_from_search)
     
+    def update_service_index(self):
+        """Wyznacza listę usług kalkulatora i indeks wyszukiwania z cennika w pamięci."""
+        # Lista wszystkich usług (wyznaczona przy wczytaniu cennika)
+        self.all_services = list(self.price_catalog.services) if self.price_catalog else []
+        self.service_index = SearchIndex(self.all_services, key=lambda service: service["name"])
+    
     def filter_services(self, text):
         """
-        Filtruje listę usług na podstawie wpisanego tekstu.
+        Planuje filtrowanie listy usług po przerwie w pisaniu.
         
         Args:
             text (str): Tekst wyszukiwania
         """
-        # Czyszczenie istniejących elementów z listy
-        self.clear_services_list()
+        self.service_search_timer.start()
+    
+    def apply_service_filter(self):
+        """Filtruje listę usług według tekstu wyszukiwania (wyniki uszeregowane według trafności)."""
+        self.service_search_timer.stop()
+        text = self.service_search.text()
         
         # Jeśli tekst jest pusty, pokazuj wszystkie usługi pogrupowane
-        if not text:
+        if not text.strip():
             self.populate_services_list()
             return
         
-        # Filtrowanie usług
-        filtered_services = [
-            service for service in self.all_services
-            if text.lower() in service["name"].lower()
-        ]
+        filtered_services = self.service_index.search(text)
         
-        # Wyświetlenie przefiltrowanych usług
         if filtered_services:
-            # Dodaj tytuł dla wyników wyszukiwania
-            results_label = QLabel(_("Wyniki wyszukiwania"))
-            results_label.setStyleSheet("color: white; font-weight: bold;")
-            self.services_content_layout.addWidget(results_label)
-            
-            # Dodaj przefiltrowane usługi
-            for service in filtered_services:
-                service_btn = QPushButton(service["display_name"])
-                service_btn.setStyleSheet("""
-                    QPushButton {
-                        background-color: #2c3034;
-                        color: white;
-                        text-align: left;
-                        border-radius: 5px;
-                        padding: 8px;
-                    }
-                    QPushButton:hover {
-                        background-color: #4dabf7;
-                    }
-                """)
-                service_btn.clicked.connect(lambda checked=False, s=service: self.add_service_to_calculator_data(s))
-                self.services_content_layout.addWidget(service_btn)
+            rows = [(ServiceListModel.ROW_HEADER, _("Wyniki wyszukiwania"))]
+            rows.extend((ServiceListModel.ROW_SERVICE, service) for service in filtered_services)
         else:
-            # Komunikat o braku wyników
-            no_results_label = QLabel(_("Brak wyników dla: ") + text)
-            no_results_label.setStyleSheet("color: #adb5bd; font-style: italic;")
-            self.services_content_layout.addWidget(no_results_label)
-        
-        # Dodaj elastyczny odstęp na końcu
-        self.services_content_layout.addStretch(1)
+            rows = [(ServiceListModel.ROW_MESSAGE, _("Brak wyników dla: ") + text)]
+        self.services_model.set_rows(rows)
     
     def add_service_from_search(self):
-        """Dodaje usługę na podstawie wyszukiwania po naciśnięciu Enter."""
+        """Dodaje najlepiej dopasowaną usługę po naciśnięciu Enter."""
         search_text = self.service_search.text()
         
-        if not search_text:
+        if not search_text.strip():
             return
         
-        # Wyszukaj usługę
-        matching_services = [
-            service for service in self.all_services
-            if search_text.lower() in service["name"].lower()
-        ]
+        # Wyniki muszą odpowiadać bieżącemu tekstowi, również przed upływem opóźnienia
+        self.apply_service_filter()
+        matching_services = self.service_index.search(search_text, limit=1)
         
         if matching_services:
-            # Dodaj pierwszą pasującą usługę
+            # Dodaj najlepiej dopasowaną usługę
             self.add_service_to_calculator_data(matching_services[0])
             
             # Wyczyść pole wyszukiwania
@@ -1741,28 +1645,19 @@ class PriceListTab(QWidget):
                 3000
             )
     
-    def clear_services_list(self):
-        """Czyści listę usług."""
-        for i in reversed(range(self.services_content_layout.count())):
-            item = self.services_content_layout.itemAt(i)
-            if item.widget():
-                item.widget().deleteLater()
-            elif item.spacerItem():
-                self.services_content_layout.removeItem(item)
+    def on_service_clicked(self, index):
+        """
+        Dodaje klikniętą usługę do kalkulatora.
+        
+        Args:
+            index (QModelIndex): Indeks klikniętego wiersza
+        """
+        service = index.data(ServiceListModel.ServiceRole)
+        if service:
+            self.add_service_to_calculator_data(service)
     
     def populate_services_list(self):
         """Wypełnia listę usług pogrupowanych według kategorii."""
-        # Upewnij się, że all_services istnieje
-        if not hasattr(self, 'all_services') or self.all_services is None:
-            self.all_services = []
-            # Możliwe, że setup_service_search nie został jeszcze wywołany
-            self.setup_service_search()
-            
-        # Bieżąca kategoria
-        current_category = None
-        category_label = None
-        
-        # Kategorie w kolejności
         categories_order = [
             _("Wymiana opon na felgach aluminiowych"),
             _("Wymiana opon na felgach stalowych"),
@@ -1771,40 +1666,13 @@ class PriceListTab(QWidget):
             _("Usługi dodatkowe")
         ]
         
-        # Sortowanie usług według kategorii
+        rows = []
         for category in categories_order:
-            # Filtrowanie usług dla tej kategorii
-            category_services = [
-                service for service in self.all_services
-                if service["category"] == category
-            ]
-            
+            category_services = self.price_catalog.services_for(category) if self.price_catalog else []
             if category_services:
-                # Dodaj etykietę kategorii
-                category_label = QLabel(category)
-                category_label.setStyleSheet("color: white; font-weight: bold;")
-                self.services_content_layout.addWidget(category_label)
-                
-                # Dodaj usługi tej kategorii
-                for service in category_services:
-                    service_btn = QPushButton(service["display_name"])
-                    service_btn.setStyleSheet("""
-                        QPushButton {
-                            background-color: #2c3034;
-                            color: white;
-                            text-align: left;
-                            border-radius: 5px;
-                            padding: 8px;
-                        }
-                        QPushButton:hover {
-                            background-color: #4dabf7;
-                        }
-                    """)
-                    service_btn.clicked.connect(lambda checked=False, s=service: self.add_service_to_calculator_data(s))
-                    self.services_content_layout.addWidget(service_btn)
-        
-        # Dodaj elastyczny odstęp na końcu
-        self.services_content_layout.addStretch(1)
+                rows.append((ServiceListModel.ROW_HEADER, category))
+                rows.extend((ServiceListModel.ROW_SERVICE, service) for service in category_services)
+        self.services_model.set_rows(rows)
     
     def add_service_to_calculator_data(self, service_data):
         """
@@ -12,7 +12,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 
 try:
-    from PySide6.QtCore import Qt, QSize, QSettings, QDir, QFile, Signal
+    from PySide6.QtCore import Qt, QSize, QDir, QFile, Signal
     from PySide6.QtGui import QIcon, QFont, QTextDocument, QTextCursor, QPixmap, QColor
     from PySide6.QtWidgets import (
         QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QFormLayout,
@@ -20,7 +20,8 @@ try:
         QMessageBox, QFontComboBox, QTextEdit, QGroupBox,
         QFileDialog, QFrame, QScrollArea, QSizePolicy, QInputDialog,
         QListWidget, QListWidgetItem, QStackedWidget, QSplitter, QTabWidget,
-        QDialogButtonBox
+        QDialogButtonBox, QTableWidget, QTableWidgetItem, QHeaderView,
+        QAbstractItemView
                 )
             
     def init_templates_page(self, layout):
@@ -252,7 +253,6 @@ try:
                 "Błąd",
                 f"Wystąpił błąd: {str(e)}"
             )
-    from PySide6.QtWebEngineWidgets import QWebEngineView
 except ImportError as e:
     logging.error(f"Błąd importu: {e}")
     raise
@@ -260,8 +260,11 @@ except ImportError as e:
 # Bezpieczny import modułów aplikacji
 try:
     from utils.paths import ICONS_DIR, CONFIG_DIR, ensure_dir_exists
+    from utils.settings import Settings
     from ui.notifications import NotificationManager, NotificationTypes
     from utils.i18n import _  # Funkcja do obsługi lokalizacji
+    from utils.sql_trace import SQLTracer, DEFAULT_SLOW_THRESHOLD_MS
+    from utils.log_config import set_log_levels
     from ui.dialogs.settings_dialog import (
         DEFAULT_EMAIL_TEMPLATES, DEFAULT_LABEL_TEMPLATE, DEFAULT_RECEIPT_TEMPLATE
     )
@@ -437,7 +440,7 @@ class SettingsTab(QWidget):
         super().__init__(parent)
         
         # Inicjalizacja ustawień
-        self.settings = QSettings("TireDepositManager", "Settings")
+        self.settings = Settings.get_instance()
         
         # Ścieżka do pliku z szablonami
         self.templates_file = os.path.join(CONFIG_DIR, "templates.json")
@@ -519,7 +522,8 @@ class SettingsTab(QWidget):
             {"name": "Dane firmy", "icon": "company.png"},
             {"name": "Kopie zapasowe", "icon": "backup.png"},
             {"name": "Komunikacja", "icon": "email.png"},
-            {"name": "Szablony", "icon": "template.png"}
+            {"name": "Szablony", "icon": "template.png"},
+            {"name": "Diagnostyka", "icon": "settings.png"}
         ]
         
         for category in categories:
@@ -544,6 +548,10 @@ class SettingsTab(QWidget):
         if 0 <= index < self.categories_list.count():
             category_name = self.categories_list.item(index).text()
             self.section_title.setText(f"Ustawienia - {category_name}")
+            
+            # Statystyki zapytań zmieniają się w tle - odśwież przy wejściu na stronę
+            if category_name == "Diagnostyka":
+                self.refresh_diagnostics()
 
 
     def create_settings_page(self, category_name):
@@ -577,6 +585,8 @@ class SettingsTab(QWidget):
             self.init_communication_page(layout)
         elif category_name == "Szablony":
             self.init_templates_page(layout)
+        elif category_name == "Diagnostyka":
+            self.init_diagnostics_page(layout)
         
         layout.addStretch()
         page.setWidget(content)
@@ -633,6 +643,20 @@ class SettingsTab(QWidget):
         general_layout.addRow("Domyślna stawka VAT:", self.default_vat_rate)
         
         layout.addWidget(general_group)
+        
+        # Magazyn - alerty niskiego stanu
+        stock_group = QGroupBox("Magazyn")
+        stock_layout = QFormLayout(stock_group)
+        stock_layout.setSpacing(10)
+        
+        self.low_stock_draft_orders_checkbox = QCheckBox("Twórz szkice zamówień dla pozycji o niskim stanie")
+        stock_layout.addRow("", self.low_stock_draft_orders_checkbox)
+        
+        stock_info = QLabel("Szkice zamówień są dostępne na pulpicie (przycisk \"Szkice zamówień\").")
+        stock_info.setWordWrap(True)
+        stock_layout.addRow("", stock_info)
+        
+        layout.addWidget(stock_group)
 
     def init_appearance_page(self, layout):
         """
@@ -830,6 +854,138 @@ class SettingsTab(QWidget):
                 f"Wystąpił błąd podczas przywracania z kopii zapasowej:\n{str(e)}"
             )
 
+    def init_diagnostics_page(self, layout):
+        """
+        Inicjalizacja strony diagnostyki (śledzenie zapytań SQL).
+        
+        Args:
+            layout (QVBoxLayout): Layout strony
+        """
+        # Konfiguracja śledzenia
+        trace_group = QGroupBox("Śledzenie zapytań SQL")
+        trace_layout = QFormLayout(trace_group)
+        trace_layout.setSpacing(10)
+        
+        self.sql_trace_checkbox = QCheckBox("Mierz czas wykonania zapytań")
+        trace_layout.addRow("", self.sql_trace_checkbox)
+        
+        self.sql_slow_threshold_spin = QSpinBox()
+        self.sql_slow_threshold_spin.setRange(1, 60000)
+        self.sql_slow_threshold_spin.setValue(int(DEFAULT_SLOW_THRESHOLD_MS))
+        self.sql_slow_threshold_spin.setSuffix(" ms")
+        trace_layout.addRow("Próg wolnego zapytania:", self.sql_slow_threshold_spin)
+        
+        layout.addWidget(trace_group)
+        
+        # Poziomy logowania
+        logging_group = QGroupBox("Logowanie")
+        logging_layout = QFormLayout(logging_group)
+        logging_layout.setSpacing(10)
+        
+        self.log_level_combo = QComboBox()
+        self.log_level_combo.addItems(["DEBUG", "INFO", "WARNING", "ERROR"])
+        self.log_level_combo.setCurrentText("INFO")
+        logging_layout.addRow("Poziom logowania:", self.log_level_combo)
+        
+        self.log_module_levels_input = QLineEdit()
+        self.log_module_levels_input.setPlaceholderText("np. sms_sender=DEBUG, deposits_tab=WARNING")
+        logging_layout.addRow("Poziomy modułów:", self.log_module_levels_input)
+        
+        layout.addWidget(logging_group)
+        
+        # Statystyki zapytań
+        stats_group = QGroupBox("Najkosztowniejsze zapytania")
+        stats_layout = QVBoxLayout(stats_group)
+        
+        self.sql_stats_table = QTableWidget(0, 7)
+        self.sql_stats_table.setHorizontalHeaderLabels(
+            ["Zapytanie", "Wywołania", "Średnio [ms]", "p95 [ms]", "Maks. [ms]", "Wiersze", "Miejsce wywołania"]
+        )
+        self.sql_stats_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.sql_stats_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.sql_stats_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.sql_stats_table.setMinimumHeight(220)
+        self.sql_stats_table.itemSelectionChanged.connect(self.show_query_histogram)
+        stats_layout.addWidget(self.sql_stats_table)
+        
+        self.sql_histogram_label = QLabel("")
+        self.sql_histogram_label.setWordWrap(True)
+        stats_layout.addWidget(self.sql_histogram_label)
+        
+        buttons_layout = QHBoxLayout()
+        refresh_button = QPushButton("Odśwież")
+        refresh_button.clicked.connect(self.refresh_diagnostics)
+        buttons_layout.addWidget(refresh_button)
+        
+        reset_button = QPushButton("Wyczyść statystyki")
+        reset_button.clicked.connect(self.reset_sql_stats)
+        buttons_layout.addWidget(reset_button)
+        buttons_layout.addStretch()
+        stats_layout.addLayout(buttons_layout)
+        
+        layout.addWidget(stats_group)
+        
+        # Log wolnych zapytań
+        slow_group = QGroupBox("Log wolnych zapytań")
+        slow_layout = QVBoxLayout(slow_group)
+        
+        self.slow_query_log_view = QTextEdit()
+        self.slow_query_log_view.setReadOnly(True)
+        self.slow_query_log_view.setMinimumHeight(180)
+        slow_layout.addWidget(self.slow_query_log_view)
+        
+        layout.addWidget(slow_group)
+        
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        """Odświeża statystyki zapytań i log wolnych zapytań."""
+        try:
+            tracer = SQLTracer.get_instance()
+            stats = tracer.get_stats()
+            
+            self.sql_stats_table.setRowCount(len(stats))
+            for row, item in enumerate(stats):
+                values = [
+                    item["query"], item["calls"], item["avg_ms"], item["p95_ms"],
+                    item["max_ms"], item["rows"], item["call_site"]
+                ]
+                for column, value in enumerate(values):
+                    cell = QTableWidgetItem(str(value))
+                    if column == 0:
+                        cell.setToolTip(item["query"])
+                    else:
+                        cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter if column < 6 else Qt.AlignLeft | Qt.AlignVCenter)
+                    self.sql_stats_table.setItem(row, column, cell)
+            
+            lines = []
+            for entry in tracer.read_slow_log(limit=50):
+                lines.append(f"[{entry.get('timestamp', '')}] {entry.get('elapsed_ms', 0)} ms, "
+                             f"{entry.get('rows', 0)} wierszy - {entry.get('call_site', '')}")
+                lines.append(f"    {entry.get('query', '')}")
+                for step in entry.get("plan", []):
+                    lines.append(f"    plan: {step}")
+            self.slow_query_log_view.setPlainText("\n".join(lines) if lines else "Brak wolnych zapytań.")
+        except Exception as e:
+            logger.error(f"Błąd podczas odświeżania diagnostyki: {e}")
+
+    def show_query_histogram(self):
+        """Wyświetla histogram czasów dla zaznaczonego zapytania."""
+        row = self.sql_stats_table.currentRow()
+        if row < 0 or self.sql_stats_table.item(row, 0) is None:
+            self.sql_histogram_label.setText("")
+            return
+        
+        query = self.sql_stats_table.item(row, 0).text()
+        histogram = SQLTracer.get_instance().get_histogram(query)
+        parts = [f"{label}: {count}" for label, count in histogram if count]
+        self.sql_histogram_label.setText("Rozkład czasów: " + ", ".join(parts) if parts else "")
+
+    def reset_sql_stats(self):
+        """Czyści zebrane statystyki zapytań."""
+        SQLTracer.get_instance().reset()
+        self.refresh_diagnostics()
+
     def init_communication_page(self, layout):
         """
         Inicjalizacja strony ustawień komunikacji.
@@ -1916,6 +2072,7 @@ class SettingsTab(QWidget):
             
             self.auto_login_checkbox.setChecked(self.settings.value("auto_login", False, type=bool))
             self.auto_update_checkbox.setChecked(self.settings.value("auto_update", False, type=bool))
+            self.low_stock_draft_orders_checkbox.setChecked(self.settings.value("low_stock_draft_orders", False, type=bool))
             
             self.default_visit_duration.setValue(self.settings.value("default_visit_duration", 60, type=int))
             
@@ -1972,6 +2129,14 @@ class SettingsTab(QWidget):
             self.sms_sender_input.setText(self.settings.value("sms_sender", ""))
             self.enable_sms_checkbox.setChecked(self.settings.value("enable_sms", False, type=bool))
 
+            # Ustawienia diagnostyki
+            self.sql_trace_checkbox.setChecked(self.settings.value("sql_trace_enabled", False, type=bool))
+            self.sql_slow_threshold_spin.setValue(
+                self.settings.value("sql_trace_threshold_ms", int(DEFAULT_SLOW_THRESHOLD_MS), type=int)
+            )
+            self.log_level_combo.setCurrentText(self.settings.value("log_level", "INFO"))
+            self.log_module_levels_input.setText(self.settings.value("log_module_levels", ""))
+
         except Exception as e:
             logger.error(f"Błąd podczas ładowania ustawień: {e}")
             QMessageBox.critical(
@@ -1988,6 +2153,7 @@ class SettingsTab(QWidget):
             self.settings.setValue("language", self.language_combo.currentText())
             self.settings.setValue("auto_login", self.auto_login_checkbox.isChecked())
             self.settings.setValue("auto_update", self.auto_update_checkbox.isChecked())
+            self.settings.setValue("low_stock_draft_orders", self.low_stock_draft_orders_checkbox.isChecked())
             self.settings.setValue("default_visit_duration", self.default_visit_duration.value())
             self.settings.setValue("default_vat_rate", self.default_vat_rate.currentText())
 
@@ -2025,6 +2191,16 @@ class SettingsTab(QWidget):
             self.settings.setValue("sms_sender", self.sms_sender_input.text())
             self.settings.setValue("enable_sms", self.enable_sms_checkbox.isChecked())
 
+            # Ustawienia diagnostyki (stosowane od razu, bez restartu)
+            self.settings.setValue("sql_trace_enabled", self.sql_trace_checkbox.isChecked())
+            self.settings.setValue("sql_trace_threshold_ms", self.sql_slow_threshold_spin.value())
+            SQLTracer.get_instance().configure(
+                self.sql_trace_checkbox.isChecked(), self.sql_slow_threshold_spin.value()
+            )
+            self.settings.setValue("log_level", self.log_level_combo.currentText())
+            self.settings.setValue("log_module_levels", self.log_module_levels_input.text())
+            set_log_levels(self.log_level_combo.currentText(), self.log_module_levels_input.text())
+
             # Zapisz szablony
             self.save_templates()
             
@@ -2088,6 +2264,7 @@ class SettingsTab(QWidget):
         preview_group = QGroupBox("Podgląd")
         preview_layout = QVBoxLayout(preview_group)
         
+        from PySide6.QtWebEngineWidgets import QWebEngineView
         self.receipt_preview = QWebEngineView()
         self.receipt_preview.setMinimumHeight(300)
         preview_layout.addWidget(self.receipt_preview)
@@ -2668,6 +2845,7 @@ class SettingsTab(QWidget):
         preview_group = QGroupBox("Podgląd")
         preview_layout = QVBoxLayout(preview_group)
         
+        from PySide6.QtWebEngineWidgets import QWebEngineView
         self.email_preview = QWebEngineView()
         self.email_preview.setMinimumHeight(300)
         preview_layout.addWidget(self.email_preview)
@@ -2787,6 +2965,7 @@ class SettingsTab(QWidget):
         preview_group = QGroupBox("Podgląd")
         preview_layout = QVBoxLayout(preview_group)
         
+        from PySide6.QtWebEngineWidgets import QWebEngineView
         self.label_preview = QWebEngineView()
         self.label_preview.setMinimumHeight(300)
         preview_layout.addWidget(self.label_preview)
@@ -2888,6 +3067,7 @@ class SettingsTab(QWidget):
         preview_group = QGroupBox("Podgląd")
         preview_layout = QVBoxLayout(preview_group)
         
+        from PySide6.QtWebEngineWidgets import QWebEngineView
         self.receipt_preview = QWebEngineView()
         self.receipt_preview.setMinimumHeight(300)
         preview_layout.addWidget(self.receipt_preview)
@@ -37,6 +37,8 @@ except ImportError:
 
 from ui.notifications import NotificationManager, NotificationTypes
 from utils.paths import ICONS_DIR
+from utils.settings import Settings
+from utils.data_access import create_data_source, MAX_LIMIT
 
 # Logger
 logger = logging.getLogger("TireDepositManager")
@@ -61,6 +63,9 @@ class VehiclesTab(QWidget):
         self.conn = db_connection
         self.client_id = client_id
         
+        # Źródło danych: lokalna baza lub serwer API (ustawienie server_url)
+        self.data_source = create_data_source(self.conn, Settings.get_instance())
+        
         # Inicjalizacja interfejsu użytkownika
         self.init_ui()
         
@@ -124,21 +129,18 @@ class VehiclesTab(QWidget):
         layout.addWidget(self.vehicles_table)
     
     def load_vehicles(self):
-        """Ładuje listę pojazdów klienta z bazy danych."""
+        """Ładuje listę pojazdów klienta ze źródła danych."""
         try:
-            cursor = self.conn.cursor()
-            
             # Pobierz wszystkie pojazdy klienta
-            cursor.execute("""
-                SELECT 
-                    id, make, model, year, registration_number, 
-                    tire_size, vehicle_type, notes
-                FROM vehicles 
-                WHERE client_id = ?
-                ORDER BY make, model
-            """, (self.client_id,))
-            
-            vehicles = cursor.fetchall()
+            rows = self.data_source.list(
+                "vehicles", {"client_id": self.client_id}, order="make", limit=MAX_LIMIT
+            )
+            rows.sort(key=lambda vehicle: (vehicle["make"] or "", vehicle["model"] or ""))
+            columns = (
+                "id", "make", "model", "year", "registration_number",
+                "tire_size", "vehicle_type", "notes"
+            )
+            vehicles = [tuple(vehicle.get(column) for column in columns) for vehicle in rows]
             
             # Czyszczenie tabeli
             self.vehicles_table.setRowCount(0)
@@ -312,13 +314,8 @@ class VehiclesTab(QWidget):
             )
             
             if reply == QMessageBox.Yes:
-                cursor = self.conn.cursor()
-                
-                # Usuń pojazd
-                cursor.execute("DELETE FROM vehicles WHERE id = ?", (vehicle_id,))
-                
-                # Zatwierdź zmiany
-                self.conn.commit()
+                # Usuń pojazd (źródło danych samo zatwierdza lub wycofuje zmianę)
+                self.data_source.delete("vehicles", vehicle_id)
                 
                 # Odśwież listę pojazdów
                 self.load_vehicles()
@@ -330,7 +327,6 @@ class VehiclesTab(QWidget):
                 )
         
         except Exception as e:
-            self.conn.rollback()
             logger.error(f"Błąd podczas usuwania pojazdu: {e}")
             QMessageBox.critical(
                 self, 
@@ -0,0 +1,412 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł archiwum danych historycznych.
+Wydane depozyty, zakończone zamówienia i stare logi wiadomości przenoszone są okresowo
+z głównej bazy danych do osobnej bazy archiwum (dołączanej przez ATTACH). Widoki
+tymczasowe <tabela>_all łączą dane bieżące i archiwalne dla zakładek historii.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+
+from utils.paths import DATA_DIR, BACKUP_DIR, DATABASE_PATH
+from utils.schema import get_referencing_tables
+from utils.replication import capture_changes, skip_local_changes
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Ścieżka do pliku bazy archiwum i nazwa schematu po dołączeniu
+ARCHIVE_PATH = os.path.join(DATA_DIR, "archive.db")
+ARCHIVE_SCHEMA = "archive"
+
+# Tabele, których rekordy mogą trafić do archiwum
+ARCHIVE_TABLES = (
+    "deposits", "sms_logs", "email_logs",
+    "orders", "order_items", "order_sms_logs", "order_email_logs",
+)
+
+# Tabele logów archiwizowane niezależnie od rekordu nadrzędnego (po dacie wysłania)
+LOG_TABLES = ("sms_logs", "email_logs", "order_sms_logs", "order_email_logs")
+
+# Statusy rekordów zamkniętych, które mogą trafić do archiwum
+ARCHIVED_DEPOSIT_STATUSES = ("Wydany",)
+ARCHIVED_ORDER_STATUSES = ("Zakończone", "Anulowane")
+
+# Domyślny wiek rekordów (w dniach), po którym trafiają do archiwum
+DEFAULT_DEPOSIT_AGE_DAYS = 365
+DEFAULT_ORDER_AGE_DAYS = 365
+DEFAULT_LOG_AGE_DAYS = 180
+
+# Minimalny odstęp między kolejnymi archiwizacjami (w dniach)
+DEFAULT_ARCHIVE_INTERVAL_DAYS = 7
+
+# Liczba przechowywanych kopii zapasowych archiwum
+ARCHIVE_BACKUP_COUNT = 3
+
+
+def _table_columns(conn, table, schema="main"):
+    """Zwraca listę kolumn tabeli (pustą, jeśli tabela nie istnieje)."""
+    return [(column[1], column[2]) for column in conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()]
+
+
+def is_archive_attached(conn):
+    """
+    Sprawdza, czy baza archiwum jest dołączona do połączenia.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        bool: True, jeśli archiwum jest dołączone
+    """
+    return any(row[1] == ARCHIVE_SCHEMA for row in conn.execute("PRAGMA database_list").fetchall())
+
+
+def sync_archive_schema(conn):
+    """
+    Tworzy w archiwum brakujące tabele i kolumny na wzór tabel głównej bazy danych.
+    Tabele archiwum nie mają kluczy obcych - rekordy nadrzędne (klienci) zostają w głównej bazie.
+
+    Args:
+        conn: Połączenie z dołączonym archiwum
+    """
+    for table in ARCHIVE_TABLES:
+        main_columns = _table_columns(conn, table)
+        if not main_columns:
+            continue
+
+        archive_columns = {name for name, _type in _table_columns(conn, table, ARCHIVE_SCHEMA)}
+        if not archive_columns:
+            columns_sql = ", ".join(
+                f"{name} {column_type}".strip() if name != "id" else "id INTEGER PRIMARY KEY"
+                for name, column_type in main_columns
+            )
+            conn.execute(f"CREATE TABLE {ARCHIVE_SCHEMA}.{table} ({columns_sql})")
+            logger.info(f"Utworzono tabelę archiwum {table}")
+        else:
+            for name, column_type in main_columns:
+                if name not in archive_columns:
+                    conn.execute(f"ALTER TABLE {ARCHIVE_SCHEMA}.{table} ADD COLUMN {name} {column_type}")
+
+        # Indeksy na kolumnach wyszukiwania historii
+        column_names = {name for name, _type in main_columns}
+        for column in ("client_id", "deposit_id", "order_id"):
+            if column in column_names:
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_{table}_{column} ON {table}({column})"
+                )
+
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.archive_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_date TEXT,
+            deposits INTEGER,
+            orders INTEGER,
+            logs INTEGER,
+            duration_ms REAL
+        )
+    """)
+
+
+def create_history_views(conn):
+    """
+    Tworzy widoki tymczasowe <tabela>_all łączące dane bieżące i archiwalne.
+    Kolumna is_archived wskazuje rekordy pochodzące z archiwum. Bez dołączonego
+    archiwum widoki obejmują tylko główną bazę danych.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    attached = is_archive_attached(conn)
+    for table in ARCHIVE_TABLES:
+        columns = [name for name, _type in _table_columns(conn, table)]
+        if not columns:
+            continue
+
+        column_list = ", ".join(columns)
+        query = f"SELECT {column_list}, 0 AS is_archived FROM main.{table}"
+        if attached and _table_columns(conn, table, ARCHIVE_SCHEMA):
+            query += f" UNION ALL SELECT {column_list}, 1 AS is_archived FROM {ARCHIVE_SCHEMA}.{table}"
+
+        conn.execute(f"DROP VIEW IF EXISTS temp.{table}_all")
+        conn.execute(f"CREATE TEMP VIEW {table}_all AS {query}")
+
+
+def attach_archive(conn, path=ARCHIVE_PATH, create_views=True):
+    """
+    Dołącza bazę archiwum do połączenia i przygotowuje widoki historii.
+
+    Args:
+        conn: Połączenie z bazą danych
+        path (str): Ścieżka do pliku archiwum
+        create_views (bool): Utwórz widoki historii; przed migracjami przebudowującymi
+                             tabele widoki należy utworzyć osobno (create_history_views)
+
+    Returns:
+        bool: True jeśli archiwum zostało dołączone, False w przeciwnym razie
+    """
+    try:
+        if not is_archive_attached(conn):
+            # ATTACH nie może być wykonany wewnątrz transakcji
+            conn.commit()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            conn.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        sync_archive_schema(conn)
+        conn.commit()
+        return True
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Błąd podczas dołączania archiwum bazy danych: {e}")
+        return False
+    finally:
+        # Widoki historii muszą istnieć także wtedy, gdy archiwum jest niedostępne
+        if create_views:
+            try:
+                create_history_views(conn)
+            except Exception as e:
+                logger.error(f"Błąd podczas tworzenia widoków historii: {e}")
+
+
+def _move_rows(conn, table, condition, params=()):
+    """
+    Przenosi rekordy spełniające warunek z głównej bazy do archiwum.
+
+    Returns:
+        int: Liczba przeniesionych rekordów
+    """
+    column_list = ", ".join(name for name, _type in _table_columns(conn, table))
+    conn.execute(
+        f"INSERT OR REPLACE INTO {ARCHIVE_SCHEMA}.{table} ({column_list}) "
+        f"SELECT {column_list} FROM main.{table} WHERE {condition}",
+        params
+    )
+    return conn.execute(f"DELETE FROM main.{table} WHERE {condition}", params).rowcount
+
+
+def _archive_parents(conn, table, condition, params):
+    """
+    Przenosi rekordy nadrzędne wraz z rekordami zależnymi (np. depozyt i jego logi).
+    Pomijane są rekordy, do których odwołują się tabele spoza archiwum.
+
+    Returns:
+        tuple: (liczba rekordów nadrzędnych, liczba rekordów zależnych)
+    """
+    references = get_referencing_tables(conn, table)
+    blocking = [ref for ref in references if ref["table"] not in ARCHIVE_TABLES]
+    for ref in blocking:
+        condition += (f" AND NOT EXISTS (SELECT 1 FROM main.{ref['table']} r "
+                      f"WHERE r.{ref['from']} = main.{table}.id)")
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS archive_ids (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.archive_ids")
+    conn.execute(f"INSERT INTO temp.archive_ids (id) SELECT id FROM main.{table} WHERE {condition}", params)
+
+    children = 0
+    for ref in references:
+        if ref["table"] in ARCHIVE_TABLES:
+            children += _move_rows(conn, ref["table"], f"{ref['from']} IN (SELECT id FROM temp.archive_ids)")
+    parents = _move_rows(conn, table, "id IN (SELECT id FROM temp.archive_ids)")
+    conn.execute("DELETE FROM temp.archive_ids")
+    return parents, children
+
+
+def archive_cold_data(conn, deposit_age_days=DEFAULT_DEPOSIT_AGE_DAYS,
+                      order_age_days=DEFAULT_ORDER_AGE_DAYS, log_age_days=DEFAULT_LOG_AGE_DAYS):
+    """
+    Przenosi do archiwum wydane depozyty, zakończone zamówienia i stare logi wiadomości.
+    Wszystkie zmiany wykonywane są w jednej transakcji obejmującej obie bazy danych.
+
+    Args:
+        conn: Połączenie z dołączonym archiwum
+        deposit_age_days (int): Minimalny wiek wydanego depozytu (dni od wydania)
+        order_age_days (int): Minimalny wiek zakończonego zamówienia (dni od daty zamówienia)
+        log_age_days (int): Minimalny wiek logu wiadomości (dni od wysłania)
+
+    Returns:
+        dict: Liczba przeniesionych rekordów {'deposits', 'orders', 'logs'}
+    """
+    started = time.perf_counter()
+    today = datetime.now()
+    result = {"deposits": 0, "orders": 0, "logs": 0}
+
+    if not is_archive_attached(conn):
+        raise RuntimeError("Archiwum bazy danych nie jest dołączone")
+
+    try:
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        sync_archive_schema(conn)
+
+        # Przeniesione zamówienia pozostają w łącznej wartości zamówień klienta (client_summary)
+        freeze_summaries = conn.execute(
+            "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'summary_freeze'"
+        ).fetchone() is not None
+        if freeze_summaries:
+            conn.execute("INSERT OR IGNORE INTO main.summary_freeze (reason) VALUES ('archive')")
+
+        # Przeniesienie do archiwum nie jest replikowane jako usunięcie - inne stanowiska
+        # zachowują historię. Wcześniejsze zmiany są oznaczane, a wpisy z przeniesienia pomijane.
+        replicated = conn.execute(
+            "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = 'sync_state'"
+        ).fetchone() is not None
+        if replicated:
+            capture_changes(conn, commit=False)
+
+        # Wydane depozyty - wiek liczony od daty wydania (lub terminu odbioru w starszych bazach)
+        deposit_columns = {name for name, _type in _table_columns(conn, "deposits")}
+        if deposit_columns:
+            date_candidates = [c for c in ("release_date", "pickup_date", "deposit_date") if c in deposit_columns]
+            date_expr = "COALESCE(" + ", ".join(f"NULLIF({c}, '')" for c in date_candidates) + ")"
+            cutoff = (today - timedelta(days=int(deposit_age_days))).strftime("%Y-%m-%d")
+            placeholders = ", ".join("?" for _status in ARCHIVED_DEPOSIT_STATUSES)
+            parents, children = _archive_parents(
+                conn, "deposits",
+                f"status IN ({placeholders}) AND {date_expr} < ?",
+                (*ARCHIVED_DEPOSIT_STATUSES, cutoff)
+            )
+            result["deposits"] += parents
+            result["logs"] += children
+
+        # Zakończone i anulowane zamówienia wraz z pozycjami i logami
+        order_columns = {name for name, _type in _table_columns(conn, "orders")}
+        if "order_date" in order_columns:
+            cutoff = (today - timedelta(days=int(order_age_days))).strftime("%Y-%m-%d")
+            placeholders = ", ".join("?" for _status in ARCHIVED_ORDER_STATUSES)
+            parents, _children = _archive_parents(
+                conn, "orders",
+                f"status IN ({placeholders}) AND order_date < ?",
+                (*ARCHIVED_ORDER_STATUSES, cutoff)
+            )
+            result["orders"] += parents
+
+        # Stare logi wiadomości (także dla rekordów, które pozostają w głównej bazie)
+        cutoff = (today - timedelta(days=int(log_age_days))).strftime("%Y-%m-%d")
+        for table in LOG_TABLES:
+            columns = {name for name, _type in _table_columns(conn, table)}
+            if "sent_date" in columns:
+                result["logs"] += _move_rows(conn, table, "sent_date < ?", (cutoff,))
+
+        if freeze_summaries:
+            conn.execute("DELETE FROM main.summary_freeze WHERE reason = 'archive'")
+        if replicated:
+            skip_local_changes(conn)
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        conn.execute(
+            f"INSERT INTO {ARCHIVE_SCHEMA}.archive_runs (run_date, deposits, orders, logs, duration_ms) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (today.strftime("%Y-%m-%d %H:%M:%S"), result["deposits"], result["orders"], result["logs"], duration_ms)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    logger.info(
+        f"Archiwizacja zakończona w {duration_ms:.0f} ms: depozyty {result['deposits']}, "
+        f"zamówienia {result['orders']}, logi {result['logs']}"
+    )
+    return result
+
+
+def get_last_archive_run(conn):
+    """
+    Zwraca datę ostatniej archiwizacji.
+
+    Args:
+        conn: Połączenie z dołączonym archiwum
+
+    Returns:
+        datetime: Data ostatniej archiwizacji lub None
+    """
+    try:
+        row = conn.execute(f"SELECT MAX(run_date) FROM {ARCHIVE_SCHEMA}.archive_runs").fetchone()
+        return datetime.strptime(row[0], "%Y-%m-%d %H:%M:%S") if row and row[0] else None
+    except (sqlite3.Error, ValueError):
+        return None
+
+
+def backup_archive(conn, backup_dir=BACKUP_DIR, keep=ARCHIVE_BACKUP_COUNT):
+    """
+    Tworzy kopię zapasową archiwum (archiwum zmienia się tylko podczas archiwizacji,
+    więc kopia wykonywana jest po każdej archiwizacji, a nie razem z główną bazą).
+
+    Args:
+        conn: Połączenie z dołączonym archiwum
+        backup_dir (str): Katalog kopii zapasowych
+        keep (int): Liczba przechowywanych kopii
+
+    Returns:
+        str: Ścieżka do kopii zapasowej lub None w przypadku błędu
+    """
+    try:
+        os.makedirs(backup_dir, exist_ok=True)
+        backup_path = os.path.join(backup_dir, f"archive_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db")
+        target = sqlite3.connect(backup_path)
+        try:
+            conn.backup(target, name=ARCHIVE_SCHEMA)
+        finally:
+            target.close()
+
+        backups = sorted(name for name in os.listdir(backup_dir)
+                         if name.startswith("archive_") and name.endswith(".db"))
+        for name in backups[:-keep] if keep > 0 else []:
+            os.remove(os.path.join(backup_dir, name))
+
+        logger.info(f"Utworzono kopię zapasową archiwum: {backup_path}")
+        return backup_path
+    except Exception as e:
+        logger.error(f"Błąd podczas tworzenia kopii zapasowej archiwum: {e}")
+        return None
+
+
+def run_scheduled_archiving(database_path=DATABASE_PATH, archive_path=ARCHIVE_PATH,
+                            interval_days=DEFAULT_ARCHIVE_INTERVAL_DAYS,
+                            deposit_age_days=DEFAULT_DEPOSIT_AGE_DAYS,
+                            order_age_days=DEFAULT_ORDER_AGE_DAYS,
+                            log_age_days=DEFAULT_LOG_AGE_DAYS):
+    """
+    Wykonuje archiwizację, jeśli od poprzedniej minęło co najmniej interval_days dni.
+    Korzysta z osobnego połączenia, więc może być uruchamiana w wątku w tle.
+
+    Args:
+        database_path (str): Ścieżka do głównej bazy danych
+        archive_path (str): Ścieżka do pliku archiwum
+        interval_days (int): Minimalny odstęp między archiwizacjami
+        deposit_age_days (int): Minimalny wiek wydanego depozytu
+        order_age_days (int): Minimalny wiek zakończonego zamówienia
+        log_age_days (int): Minimalny wiek logu wiadomości
+
+    Returns:
+        dict: Wynik archiwizacji lub None, jeśli nie była wykonywana
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(database_path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        if not attach_archive(conn, archive_path):
+            return None
+
+        last_run = get_last_archive_run(conn)
+        if last_run and datetime.now() - last_run < timedelta(days=interval_days):
+            return None
+
+        result = archive_cold_data(conn, deposit_age_days, order_age_days, log_age_days)
+        if any(result.values()):
+            backup_archive(conn)
+        return result
+    except Exception as e:
+        logger.error(f"Błąd podczas archiwizacji danych: {e}")
+        return None
+    finally:
+        if conn is not None:
+            conn.close()
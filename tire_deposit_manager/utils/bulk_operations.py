@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł operacji zbiorczych na depozytach, zamówieniach i oponach.
+Identyfikatory zaznaczonych rekordów trafiają do tabeli tymczasowej, a zmiany
+wykonywane są pojedynczymi zapytaniami UPDATE/DELETE w jednej transakcji.
+"""
+
+import logging
+from datetime import datetime
+
+from utils.schema import get_referencing_tables
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Tabele obsługiwane przez operacje zbiorcze
+BULK_TABLES = ("deposits", "orders", "inventory")
+
+# Status wydanego depozytu i kolumny danych odbioru
+RELEASED_STATUS = "Wydany"
+RELEASE_COLUMNS = ("release_date", "release_person", "release_notes")
+
+# Tabela tymczasowa z identyfikatorami (widoczna tylko dla bieżącego połączenia)
+IDS_TABLE = "temp.bulk_ids"
+IDS_SUBQUERY = f"SELECT id FROM {IDS_TABLE}"
+
+
+def _check_table(table):
+    if table not in BULK_TABLES:
+        raise ValueError(f"Nieobsługiwana tabela operacji zbiorczych: {table}")
+
+
+def _table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {column[1] for column in cursor.fetchall()}
+
+
+def _load_ids(cursor, ids):
+    """
+    Wypełnia tabelę tymczasową identyfikatorami rekordów.
+
+    Args:
+        cursor: Kursor bazy danych
+        ids (iterable): Identyfikatory rekordów
+    """
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS bulk_ids (id INTEGER PRIMARY KEY)")
+    cursor.execute(f"DELETE FROM {IDS_TABLE}")
+    cursor.executemany(f"INSERT OR IGNORE INTO {IDS_TABLE} (id) VALUES (?)", ((int(i),) for i in ids))
+
+
+def _run_in_transaction(conn, ids, work):
+    """
+    Wykonuje operację zbiorczą w jednej transakcji.
+
+    Args:
+        conn: Połączenie z bazą danych
+        ids (iterable): Identyfikatory rekordów
+        work (callable): Funkcja work(cursor) zwracająca liczbę zmienionych rekordów
+
+    Returns:
+        int: Liczba zmienionych rekordów
+    """
+    ids = list(ids)
+    if not ids:
+        return 0
+
+    cursor = conn.cursor()
+    try:
+        if not conn.in_transaction:
+            cursor.execute("BEGIN")
+        _load_ids(cursor, ids)
+        changed = work(cursor)
+        cursor.execute(f"DELETE FROM {IDS_TABLE}")
+        conn.commit()
+        return changed
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def bulk_set_status(conn, table, ids, status):
+    """
+    Zmienia status wielu rekordów jednym zapytaniem.
+
+    Dla opon aktualizowana jest też data modyfikacji. Depozytów nie wydaje się tą
+    funkcją (status 'Wydany') - wydanie wymaga danych odbioru, patrz bulk_release_deposits.
+
+    Args:
+        conn: Połączenie z bazą danych
+        table (str): Tabela ('deposits', 'orders' lub 'inventory')
+        ids (iterable): Identyfikatory rekordów
+        status (str): Nowy status
+
+    Returns:
+        int: Liczba zmienionych rekordów
+
+    Raises:
+        ValueError: Przy próbie wydania depozytów bez danych odbioru
+    """
+    _check_table(table)
+    if table == "deposits" and status == RELEASED_STATUS:
+        raise ValueError("Depozyty wydaje się z danymi odbioru (bulk_release_deposits)")
+
+    def work(cursor):
+        columns = _table_columns(cursor, table)
+        assignments = ["status = ?"]
+        params = [status]
+
+        if "last_updated" in columns:
+            assignments.append("last_updated = ?")
+            params.append(datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+        cursor.execute(
+            f"UPDATE {table} SET {', '.join(assignments)} "
+            f"WHERE id IN ({IDS_SUBQUERY}) AND status IS NOT ?",
+            params + [status]
+        )
+        return cursor.rowcount
+
+    return _run_in_transaction(conn, ids, work)
+
+
+def bulk_release_deposits(conn, ids, release_date, receiver, notes=""):
+    """
+    Wydaje wiele depozytów z tymi samymi danymi odbioru jednym zapytaniem.
+    Depozyty już wydane pozostają bez zmian.
+
+    Args:
+        conn: Połączenie z bazą danych
+        ids (iterable): Identyfikatory depozytów
+        release_date (str): Data wydania (YYYY-MM-DD)
+        receiver (str): Osoba odbierająca
+        notes (str): Uwagi do wydania
+
+    Returns:
+        int: Liczba wydanych depozytów
+    """
+    def work(cursor):
+        # Starsze bazy mogą nie mieć kolumn danych odbioru (jak w dialogu wydania)
+        columns = _table_columns(cursor, "deposits")
+        for column in RELEASE_COLUMNS:
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE deposits ADD COLUMN {column} TEXT")
+
+        cursor.execute(
+            f"""
+            UPDATE deposits
+            SET status = ?, release_date = ?, release_person = ?, release_notes = ?
+            WHERE id IN ({IDS_SUBQUERY}) AND status IS NOT ?
+            """,
+            (RELEASED_STATUS, release_date, receiver, notes, RELEASED_STATUS)
+        )
+        return cursor.rowcount
+
+    return _run_in_transaction(conn, ids, work)
+
+
+def bulk_move_deposits(conn, ids, location):
+    """
+    Przenosi wiele depozytów do nowej lokalizacji.
+
+    Args:
+        conn: Połączenie z bazą danych
+        ids (iterable): Identyfikatory depozytów
+        location (str): Nowa lokalizacja
+
+    Returns:
+        int: Liczba zmienionych depozytów
+    """
+    def work(cursor):
+        cursor.execute(
+            f"UPDATE deposits SET location = ? WHERE id IN ({IDS_SUBQUERY}) AND location IS NOT ?",
+            (location, location)
+        )
+        return cursor.rowcount
+
+    return _run_in_transaction(conn, ids, work)
+
+
+def bulk_extend_pickup(conn, ids, days):
+    """
+    Przesuwa termin odbioru wielu depozytów o podaną liczbę dni.
+    Depozyty bez terminu odbioru otrzymują termin liczony od dzisiaj.
+
+    Args:
+        conn: Połączenie z bazą danych
+        ids (iterable): Identyfikatory depozytów
+        days (int): Liczba dni
+
+    Returns:
+        int: Liczba zmienionych depozytów
+    """
+    def work(cursor):
+        cursor.execute(
+            f"""
+            UPDATE deposits
+            SET pickup_date = date(COALESCE(NULLIF(pickup_date, ''), date('now', 'localtime')), ?)
+            WHERE id IN ({IDS_SUBQUERY})
+            """,
+            (f"{int(days):+d} days",)
+        )
+        return cursor.rowcount
+
+    return _run_in_transaction(conn, ids, work)
+
+
+def bulk_delete(conn, table, ids, related_tables=None):
+    """
+    Usuwa wiele rekordów wraz z rekordami powiązanymi kluczem obcym.
+    Rekordy w tabelach z ON DELETE CASCADE usuwa sam SQLite.
+
+    Args:
+        conn: Połączenie z bazą danych
+        table (str): Tabela ('deposits', 'orders' lub 'inventory')
+        ids (iterable): Identyfikatory rekordów
+        related_tables (list, optional): Tabele powiązane do ręcznego usunięcia
+                                         (jak z get_referencing_tables); domyślnie
+                                         wyznaczane z grafu kluczy obcych
+
+    Returns:
+        int: Liczba usuniętych rekordów
+    """
+    _check_table(table)
+    if related_tables is None:
+        related_tables = get_referencing_tables(conn, table, manual_only=True)
+
+    def work(cursor):
+        for related in related_tables:
+            cursor.execute(
+                f"DELETE FROM {related['table']} WHERE {related['from']} IN ({IDS_SUBQUERY})"
+            )
+        cursor.execute(f"DELETE FROM {table} WHERE id IN ({IDS_SUBQUERY})")
+        return cursor.rowcount
+
+    return _run_in_transaction(conn, ids, work)
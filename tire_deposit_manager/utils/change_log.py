@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł dziennika zmian wierszy.
+Wyzwalacze na głównych tabelach danych zapisują w change_log każde dodanie, zmianę
+i usunięcie wiersza (tabela, identyfikator, operacja). Dziennik jest kanałem zmian dla
+serwera API (unieważnianie pamięci podręcznej, /api/changes) i replikacji między
+stanowiskami, a identyfikator ostatniej zmiany - wersją danych dla pamięci podręcznej
+wyników filtrowania w zakładkach.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Tabele, których zmiany są zapisywane w dzienniku
+TRACKED_TABLES = (
+    "clients", "vehicles", "deposits", "inventory", "parts",
+    "orders", "order_items", "appointments", "locations",
+    "sms_logs", "email_logs",
+)
+
+# Odbiorcy kanału zmian nieaktywni dłużej niż tyle dni nie wstrzymują skracania dziennika
+# (po powrocie muszą wczytać dane od nowa)
+CONSUMER_RETENTION_DAYS = 30
+
+# Operacje w dzienniku
+OP_INSERT = "I"
+OP_UPDATE = "U"
+OP_DELETE = "D"
+
+CHANGE_LOG_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS change_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        changed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        operation TEXT NOT NULL
+    )
+    """,
+]
+
+# Pozycje odbiorców kanału zmian (np. integracji korzystających z /api/changes) oraz
+# znacznik skracania dziennika - odbiorca, którego pozycja jest niższa, mógł nie zobaczyć
+# usuniętych zmian i musi wczytać dane od nowa
+CHANGE_LOG_CURSOR_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS change_log_cursors (
+        consumer TEXT PRIMARY KEY,
+        last_change_id INTEGER NOT NULL,
+        updated_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS change_log_prune_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        pruned_through INTEGER NOT NULL DEFAULT 0,
+        pruned_at TEXT
+    )
+    """,
+]
+
+CHANGE_LOG_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_change_log_table ON change_log(table_name, id)",
+]
+
+
+def _change_log_triggers(table):
+    """Zwraca wyzwalacze dziennika zmian tabeli: {nazwa: definicja}."""
+    log = "INSERT INTO change_log (table_name, row_id, operation) VALUES ('{table}', {row}.id, '{op}');"
+    return {
+        f"trg_change_log_{table}_insert": f"""
+            AFTER INSERT ON {table} BEGIN
+                {log.format(table=table, row="NEW", op=OP_INSERT)}
+            END
+        """,
+        f"trg_change_log_{table}_update": f"""
+            AFTER UPDATE ON {table} BEGIN
+                {log.format(table=table, row="NEW", op=OP_UPDATE)}
+            END
+        """,
+        f"trg_change_log_{table}_delete": f"""
+            AFTER DELETE ON {table} BEGIN
+                {log.format(table=table, row="OLD", op=OP_DELETE)}
+            END
+        """,
+    }
+
+
+def get_change_version(conn, table=None):
+    """
+    Zwraca identyfikator ostatniej zmiany (całej bazy lub jednej tabeli).
+    Wersja rośnie przy każdej zmianie, więc nadaje się do unieważniania pamięci podręcznej.
+
+    Args:
+        conn: Połączenie z bazą danych
+        table (str, optional): Nazwa tabeli
+
+    Returns:
+        int: Identyfikator ostatniej zmiany (0, jeśli brak zmian)
+    """
+    if table is None:
+        row = conn.execute("SELECT MAX(id) FROM change_log").fetchone()
+    else:
+        row = conn.execute("SELECT MAX(id) FROM change_log WHERE table_name = ?", (table,)).fetchone()
+    return row[0] or 0
+
+
+def get_changes(conn, after_id=0, limit=500, tables=None):
+    """
+    Zwraca zmiany nowsze niż podany identyfikator.
+
+    Args:
+        conn: Połączenie z bazą danych
+        after_id (int): Identyfikator ostatniej przetworzonej zmiany
+        limit (int): Maksymalna liczba zmian
+        tables (list, optional): Ogranicz do wskazanych tabel
+
+    Returns:
+        list: Lista krotek (id, changed_at, table_name, row_id, operation)
+    """
+    query = "SELECT id, changed_at, table_name, row_id, operation FROM change_log WHERE id > ?"
+    params = [after_id]
+    if tables:
+        query += f" AND table_name IN ({', '.join('?' * len(tables))})"
+        params.extend(tables)
+    query += " ORDER BY id LIMIT ?"
+    params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+
+def record_consumer_cursor(conn, consumer, change_id):
+    """
+    Zapisuje pozycję odbiorcy kanału zmian (zmiany do change_id zostały przez niego przetworzone).
+
+    Args:
+        conn: Połączenie z bazą danych
+        consumer (str): Identyfikator odbiorcy
+        change_id (int): Identyfikator ostatniej przetworzonej zmiany
+    """
+    conn.execute("""
+        INSERT INTO change_log_cursors (consumer, last_change_id, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT (consumer) DO UPDATE SET
+            last_change_id = excluded.last_change_id, updated_at = excluded.updated_at
+    """, (consumer, change_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    conn.commit()
+
+
+def get_prune_limit(conn, now=None):
+    """
+    Wyznacza najniższą pozycję odbiorców dziennika: replikacji (sync_state) i aktywnych
+    odbiorców kanału zmian. Wpisy do tej pozycji nie są już nikomu potrzebne.
+
+    Args:
+        conn: Połączenie z bazą danych
+        now (datetime, optional): Bieżący czas
+
+    Returns:
+        int: Identyfikator zmiany, do którego można skrócić dziennik
+    """
+    positions = [get_change_version(conn)]
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()}
+    if "sync_state" in tables:
+        row = conn.execute("SELECT last_change_id FROM sync_state WHERE id = 1").fetchone()
+        if row is not None:
+            positions.append(row[0])
+    if "change_log_cursors" in tables:
+        active_since = (now or datetime.now()) - timedelta(days=CONSUMER_RETENTION_DAYS)
+        row = conn.execute(
+            "SELECT MIN(last_change_id) FROM change_log_cursors WHERE updated_at >= ?",
+            (active_since.strftime("%Y-%m-%d %H:%M:%S"),)
+        ).fetchone()
+        if row[0] is not None:
+            positions.append(row[0])
+    return min(positions)
+
+
+def get_prune_watermark(conn):
+    """
+    Zwraca identyfikator, do którego dziennik mógł zostać skrócony. Odbiorca z niższą
+    pozycją nie może odtworzyć zmian przyrostowo.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        int: Identyfikator zmiany (0, jeśli dziennik nie był skracany)
+    """
+    if not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log_prune_state'"
+    ).fetchone():
+        return 0
+    row = conn.execute("SELECT pruned_through FROM change_log_prune_state WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def prune_change_log(conn, keep_after_id):
+    """
+    Usuwa z dziennika zmiany przetworzone przez wszystkich odbiorców. Ostatni wpis każdej
+    tabeli jest zachowywany, aby wersja danych (get_change_version) nie cofała się.
+    Znacznik skracania (get_prune_watermark) przesuwa się do keep_after_id.
+
+    Args:
+        conn: Połączenie z bazą danych
+        keep_after_id (int): Zmiany o identyfikatorze większym są zachowywane
+
+    Returns:
+        int: Liczba usuniętych wpisów
+    """
+    cursor = conn.execute("""
+        DELETE FROM change_log
+        WHERE id <= ? AND id NOT IN (SELECT MAX(id) FROM change_log GROUP BY table_name)
+    """, (keep_after_id,))
+    pruned = cursor.rowcount
+    if pruned:
+        conn.execute("""
+            INSERT INTO change_log_prune_state (id, pruned_through, pruned_at) VALUES (1, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                pruned_through = MAX(pruned_through, excluded.pruned_through), pruned_at = excluded.pruned_at
+        """, (keep_after_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+    conn.commit()
+    return pruned
+
+
+def install_change_log_cursors(conn):
+    """
+    Tworzy tabele pozycji odbiorców kanału zmian i znacznika skracania dziennika.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    for table_sql in CHANGE_LOG_CURSOR_TABLES:
+        conn.execute(table_sql)
+
+
+def install_change_log(conn):
+    """
+    Tworzy dziennik zmian z wyzwalaczami na śledzonych tabelach.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for table_sql in CHANGE_LOG_TABLES:
+        cursor.execute(table_sql)
+    for index_sql in CHANGE_LOG_INDEXES:
+        cursor.execute(index_sql)
+
+    existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table in TRACKED_TABLES:
+        if table not in existing:
+            continue
+        for name, body in _change_log_triggers(table).items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(f"CREATE TRIGGER {name} {body}")
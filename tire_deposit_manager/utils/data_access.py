@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł warstwy dostępu do danych.
+LocalDataSource wykonuje operacje na lokalnym pliku SQLite, a RemoteDataSource wysyła
+je do serwera API (utils.server) przez HTTP/JSON. Oba źródła mają ten sam interfejs
+(list, get, insert, update, delete, changes), więc zakładka korzystająca z
+create_data_source nie zależy od tego, czy stanowisko pracuje na własnej bazie,
+czy na bazie serwera (ustawienie server_url).
+"""
+
+import json
+import logging
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from utils.change_log import get_changes, get_change_version
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Zasoby (tabele) udostępniane przez warstwę dostępu do danych
+RESOURCES = (
+    "clients", "vehicles", "deposits", "inventory", "parts",
+    "orders", "order_items", "appointments", "locations",
+)
+
+# Domyślny i maksymalny rozmiar strony wyników
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Nagłówek z tokenem dostępu do serwera
+TOKEN_HEADER = "X-Api-Token"
+
+
+class DataAccessError(Exception):
+    """Błąd operacji na danych (nieznany zasób lub kolumna, błąd bazy lub serwera)."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class LocalDataSource:
+    """Źródło danych działające na połączeniu z lokalną bazą SQLite."""
+
+    def __init__(self, conn):
+        """
+        Args:
+            conn: Połączenie z bazą danych
+        """
+        self.conn = conn
+        self._columns = {}
+
+    def columns(self, resource):
+        """
+        Zwraca kolumny zasobu (nazwy kolumn tabeli).
+
+        Args:
+            resource (str): Nazwa zasobu z RESOURCES
+
+        Returns:
+            tuple: Nazwy kolumn
+        """
+        if resource not in RESOURCES:
+            raise DataAccessError(f"Nieznany zasób: {resource}", 404)
+        if resource not in self._columns:
+            self._columns[resource] = tuple(
+                row[1] for row in self.conn.execute(f"PRAGMA table_info({resource})").fetchall()
+            )
+        return self._columns[resource]
+
+    def _check_columns(self, resource, names):
+        """Sprawdza, czy podane kolumny należą do zasobu (chroni przed wstrzyknięciem SQL)."""
+        unknown = [name for name in names if name not in self.columns(resource)]
+        if unknown:
+            raise DataAccessError(f"Nieznane kolumny zasobu {resource}: {', '.join(unknown)}")
+
+    def _row_to_dict(self, resource, row):
+        """Zamienia wiersz na słownik {kolumna: wartość}."""
+        return dict(zip(self.columns(resource), tuple(row)))
+
+    def version(self, resource=None):
+        """
+        Zwraca wersję danych zasobu (identyfikator ostatniej zmiany w change_log).
+
+        Args:
+            resource (str, optional): Nazwa zasobu; domyślnie cała baza
+
+        Returns:
+            int: Wersja danych
+        """
+        return get_change_version(self.conn, resource)
+
+    def list(self, resource, filters=None, order=None, limit=DEFAULT_LIMIT, offset=0):
+        """
+        Zwraca wiersze zasobu spełniające filtry równościowe.
+
+        Args:
+            resource (str): Nazwa zasobu
+            filters (dict, optional): Filtry {kolumna: wartość}
+            order (str, optional): Kolumna sortowania; prefiks '-' oznacza kolejność malejącą
+            limit (int): Maksymalna liczba wierszy (najwyżej MAX_LIMIT)
+            offset (int): Liczba pominiętych wierszy
+
+        Returns:
+            list: Lista słowników
+        """
+        filters = filters or {}
+        self._check_columns(resource, filters)
+        columns = ", ".join(self.columns(resource))
+        query = f"SELECT {columns} FROM {resource}"
+        if filters:
+            query += " WHERE " + " AND ".join(f"{name} = ?" for name in filters)
+        if order:
+            descending = order.startswith("-")
+            column = order.lstrip("-")
+            self._check_columns(resource, [column])
+            query += f" ORDER BY {column}{' DESC' if descending else ''}"
+        else:
+            query += " ORDER BY id"
+        query += " LIMIT ? OFFSET ?"
+
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        rows = self.conn.execute(query, list(filters.values()) + [limit, max(0, int(offset))]).fetchall()
+        return [self._row_to_dict(resource, row) for row in rows]
+
+    def get(self, resource, row_id):
+        """
+        Zwraca wiersz zasobu o podanym identyfikatorze.
+
+        Args:
+            resource (str): Nazwa zasobu
+            row_id (int): Identyfikator wiersza
+
+        Returns:
+            dict: Wiersz lub None, jeśli nie istnieje
+        """
+        columns = ", ".join(self.columns(resource))
+        row = self.conn.execute(f"SELECT {columns} FROM {resource} WHERE id = ?", (row_id,)).fetchone()
+        return self._row_to_dict(resource, row) if row else None
+
+    def insert(self, resource, values):
+        """
+        Dodaje wiersz do zasobu.
+
+        Args:
+            resource (str): Nazwa zasobu
+            values (dict): Wartości kolumn
+
+        Returns:
+            int: Identyfikator nowego wiersza
+        """
+        values = {name: value for name, value in values.items() if name != "id"}
+        if not values:
+            raise DataAccessError("Brak wartości do zapisania")
+        self._check_columns(resource, values)
+        try:
+            cursor = self.conn.execute(
+                f"INSERT INTO {resource} ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                list(values.values())
+            )
+            self.conn.commit()
+            return cursor.lastrowid
+        except Exception as e:
+            self.conn.rollback()
+            raise DataAccessError(f"Błąd podczas dodawania do {resource}: {e}", 409)
+
+    def update(self, resource, row_id, values):
+        """
+        Zmienia wartości kolumn wiersza.
+
+        Args:
+            resource (str): Nazwa zasobu
+            row_id (int): Identyfikator wiersza
+            values (dict): Nowe wartości kolumn
+
+        Returns:
+            bool: True, jeśli wiersz istniał
+        """
+        values = {name: value for name, value in values.items() if name != "id"}
+        if not values:
+            raise DataAccessError("Brak wartości do zapisania")
+        self._check_columns(resource, values)
+        try:
+            cursor = self.conn.execute(
+                f"UPDATE {resource} SET {', '.join(f'{name} = ?' for name in values)} WHERE id = ?",
+                list(values.values()) + [row_id]
+            )
+            self.conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            self.conn.rollback()
+            raise DataAccessError(f"Błąd podczas zmiany {resource} {row_id}: {e}", 409)
+
+    def delete(self, resource, row_id):
+        """
+        Usuwa wiersz zasobu.
+
+        Args:
+            resource (str): Nazwa zasobu
+            row_id (int): Identyfikator wiersza
+
+        Returns:
+            bool: True, jeśli wiersz istniał
+        """
+        self.columns(resource)
+        try:
+            cursor = self.conn.execute(f"DELETE FROM {resource} WHERE id = ?", (row_id,))
+            self.conn.commit()
+            return cursor.rowcount > 0
+        except Exception as e:
+            self.conn.rollback()
+            raise DataAccessError(f"Błąd podczas usuwania {resource} {row_id}: {e}", 409)
+
+    def changes(self, after_id=0, limit=500):
+        """
+        Zwraca zmiany danych nowsze niż podany identyfikator (kanał zmian).
+
+        Args:
+            after_id (int): Identyfikator ostatniej przetworzonej zmiany
+            limit (int): Maksymalna liczba zmian
+
+        Returns:
+            list: Lista słowników (id, changed_at, table, row_id, operation)
+        """
+        return [
+            {"id": change_id, "changed_at": changed_at, "table": table, "row_id": row_id, "operation": operation}
+            for change_id, changed_at, table, row_id, operation
+            in get_changes(self.conn, after_id, min(int(limit), MAX_LIMIT), RESOURCES)
+        ]
+
+
+class RemoteDataSource:
+    """Źródło danych korzystające z serwera API (utils.server) przez HTTP/JSON."""
+
+    def __init__(self, base_url, token=None, timeout=10):
+        """
+        Args:
+            base_url (str): Adres serwera, np. "http://192.168.1.10:8765"
+            token (str, optional): Token dostępu do serwera
+            timeout (float): Limit czasu żądania w sekundach
+        """
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _request(self, method, path, params=None, body=None):
+        """Wysyła żądanie do serwera i zwraca zdekodowaną odpowiedź JSON."""
+        url = f"{self.base_url}/api/{path}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(url, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header(TOKEN_HEADER, self.token)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode("utf-8"))
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read().decode("utf-8")).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise DataAccessError(message, e.code)
+        except (urllib.error.URLError, OSError) as e:
+            raise DataAccessError(f"Brak połączenia z serwerem {self.base_url}: {e}", 503)
+
+    def version(self, resource=None):
+        """Zwraca wersję danych zasobu lub całej bazy."""
+        params = {"resource": resource} if resource else None
+        return self._request("GET", "version", params)["version"]
+
+    def list(self, resource, filters=None, order=None, limit=DEFAULT_LIMIT, offset=0):
+        """Zwraca wiersze zasobu spełniające filtry równościowe (jak LocalDataSource.list)."""
+        params = dict(filters or {})
+        params.update({"_limit": limit, "_offset": offset})
+        if order:
+            params["_order"] = order
+        return self._request("GET", resource, params)["rows"]
+
+    def get(self, resource, row_id):
+        """Zwraca wiersz zasobu lub None, jeśli nie istnieje."""
+        try:
+            return self._request("GET", f"{resource}/{int(row_id)}")
+        except DataAccessError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def insert(self, resource, values):
+        """Dodaje wiersz i zwraca jego identyfikator."""
+        return self._request("POST", resource, body=values)["id"]
+
+    def update(self, resource, row_id, values):
+        """Zmienia wartości kolumn wiersza; zwraca True, jeśli wiersz istniał."""
+        return self._request("PATCH", f"{resource}/{int(row_id)}", body=values)["updated"]
+
+    def delete(self, resource, row_id):
+        """Usuwa wiersz; zwraca True, jeśli wiersz istniał."""
+        return self._request("DELETE", f"{resource}/{int(row_id)}")["deleted"]
+
+    def changes(self, after_id=0, limit=500):
+        """Zwraca zmiany danych nowsze niż podany identyfikator."""
+        return self._request("GET", "changes", {"after": after_id, "limit": limit})["changes"]
+
+
+def create_data_source(conn, settings):
+    """
+    Zwraca źródło danych zgodne z ustawieniami: serwer API, jeśli skonfigurowano
+    adres server_url, w przeciwnym razie lokalną bazę.
+
+    Args:
+        conn: Połączenie z lokalną bazą danych
+        settings: Ustawienia aplikacji (obiekt z metodą value(klucz, domyślna, type=...))
+
+    Returns:
+        LocalDataSource lub RemoteDataSource
+    """
+    server_url = settings.value("server_url", "")
+    if server_url:
+        return RemoteDataSource(server_url, settings.value("server_token", "") or None)
+    return LocalDataSource(conn)
@@ -13,6 +13,20 @@ import shutil
 from datetime import datetime, timedelta
 
 from utils.paths import DATABASE_PATH, BACKUP_DIR
+from utils.sql_trace import TracedConnection
+from utils.schema import invalidate_foreign_key_graph
+
+# Ustawienia wstawiane do pustej tabeli settings (dane firmy są wartościami przykładowymi)
+DEFAULT_SETTINGS = [
+    ('company_name', 'Serwis Opon MATEO', 'Nazwa firmy'),
+    ('company_address', 'ul. Przykładowa 123, 00-000 Miasto', 'Adres firmy'),
+    ('company_phone', '+48 123 456 789', 'Telefon firmowy'),
+    ('company_email', 'kontakt@serwisopony.pl', 'Adres e-mail firmy'),
+    ('company_tax_id', '123-456-78-90', 'NIP firmy'),
+    ('default_vat_rate', '23%', 'Domyślna stawka VAT'),
+    ('app_theme', 'Dark', 'Motyw aplikacji (Light/Dark)'),
+    ('backup_interval', '7', 'Interwał automatycznych kopii zapasowych (dni)'),
+]
 
 # Logger
 logger = logging.getLogger("TireDepositManager")
@@ -28,8 +42,8 @@ def create_connection():
         # Upewnij się, że katalog na bazę danych istnieje
         os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
         
-        # Połączenie z bazą danych
-        conn = sqlite3.connect(DATABASE_PATH)
+        # Połączenie z bazą danych (z opcjonalnym śledzeniem zapytań, patrz utils.sql_trace)
+        conn = sqlite3.connect(DATABASE_PATH, factory=TracedConnection)
         
         # Ustawienie zwracania wierszy jako słowniki
         conn.row_factory = sqlite3.Row
@@ -54,6 +68,10 @@ def initialize_database(conn):
     try:
         cursor = conn.cursor()
         
+        # Nowe bazy od razu w trybie przyrostowego odzyskiwania wolnych stron
+        # (dla istniejących baz PRAGMA nie ma efektu - przełącza je konserwacja, utils.maintenance)
+        cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        
         # Tabela klientów
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS clients (
@@ -224,8 +242,8 @@ def initialize_database(conn):
                 duration INTEGER DEFAULT 60,
                 vehicle_id INTEGER,
                 created_at TEXT DEFAULT (datetime('now', 'localtime')),
-                FOREIGN KEY(client_id) REFERENCES clients(id),
-                FOREIGN KEY(vehicle_id) REFERENCES vehicles(id)
+                FOREIGN KEY(client_id) REFERENCES clients(id) ON DELETE CASCADE,
+                FOREIGN KEY(vehicle_id) REFERENCES vehicles(id) ON DELETE SET NULL
             )
         ''')
         
@@ -241,7 +259,7 @@ def initialize_database(conn):
                 vehicle_id INTEGER,
                 created_at TEXT DEFAULT (datetime('now', 'localtime')),
                 FOREIGN KEY(client_id) REFERENCES clients(id),
-                FOREIGN KEY(vehicle_id) REFERENCES vehicles(id)
+                FOREIGN KEY(vehicle_id) REFERENCES vehicles(id) ON DELETE SET NULL
             )
         ''')
         
@@ -256,7 +274,7 @@ def initialize_database(conn):
                 quantity INTEGER,
                 price REAL,
                 created_at TEXT DEFAULT (datetime('now', 'localtime')),
-                FOREIGN KEY(order_id) REFERENCES orders(id)
+                FOREIGN KEY(order_id) REFERENCES orders(id) ON DELETE CASCADE
             )
         ''')
         
@@ -282,6 +300,20 @@ def initialize_database(conn):
             )
         ''')
         
+        # Dziennik konserwacji bazy danych
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS maintenance_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_date TEXT,
+                task TEXT,
+                duration_ms REAL,
+                pages_before INTEGER,
+                pages_after INTEGER,
+                reclaimed_bytes INTEGER,
+                result TEXT
+            )
+        ''')
+        
         # Tabela szablonów
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS templates (
@@ -303,7 +335,7 @@ def initialize_database(conn):
                 content TEXT,
                 sent_date TEXT,
                 status TEXT,
-                FOREIGN KEY (deposit_id) REFERENCES deposits(id)
+                FOREIGN KEY (deposit_id) REFERENCES deposits(id) ON DELETE CASCADE
             )
         ''')
 
@@ -316,7 +348,7 @@ def initialize_database(conn):
                 subject TEXT,
                 sent_date TEXT,
                 status TEXT,
-                FOREIGN KEY (deposit_id) REFERENCES deposits(id)
+                FOREIGN KEY (deposit_id) REFERENCES deposits(id) ON DELETE CASCADE
             )
         ''')
         
@@ -353,20 +385,9 @@ def initialize_database(conn):
         cursor.execute("SELECT COUNT(*) FROM settings")
         if cursor.fetchone()[0] == 0:
             # Dodanie podstawowych ustawień
-            settings_data = [
-                ('company_name', 'Serwis Opon MATEO', 'Nazwa firmy'),
-                ('company_address', 'ul. Przykładowa 123, 00-000 Miasto', 'Adres firmy'),
-                ('company_phone', '+48 123 456 789', 'Telefon firmowy'),
-                ('company_email', 'kontakt@serwisopony.pl', 'Adres e-mail firmy'),
-                ('company_tax_id', '123-456-78-90', 'NIP firmy'),
-                ('default_vat_rate', '23%', 'Domyślna stawka VAT'),
-                ('app_theme', 'Dark', 'Motyw aplikacji (Light/Dark)'),
-                ('backup_interval', '7', 'Interwał automatycznych kopii zapasowych (dni)'),
-            ]
-            
             cursor.executemany(
                 "INSERT INTO settings (key, value, description) VALUES (?, ?, ?)",
-                settings_data
+                DEFAULT_SETTINGS
             )
             
             conn.commit()
@@ -432,6 +453,93 @@ def initialize_database(conn):
         conn.rollback()
         logger.error(f"Błąd podczas inicjalizacji bazy danych: {e}")
 
+def initialize_finance_tables(conn):
+    """
+    Inicjalizuje tabele potrzebne do pracy z finansami (stan kasy, wypłaty, wydatki, przychody).
+    
+    Args:
+        conn: Połączenie z bazą danych SQLite
+    """
+    try:
+        cursor = conn.cursor()
+        
+        # Tabela stanów kasy z nowymi kolumnami
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cash_register (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL UNIQUE,
+                amount REAL NOT NULL,
+                previous_amount REAL DEFAULT 0.0,
+                safe_transfer REAL DEFAULT 0.0,
+                current_balance REAL DEFAULT 0.0,
+                comment TEXT,
+                created_at TEXT DEFAULT (datetime('now', 'localtime'))
+            )
+        ''')
+        
+        # Sprawdź, czy kolumny już istnieją - jeśli nie, dodaj je
+        cursor.execute("PRAGMA table_info(cash_register)")
+        columns = [info[1] for info in cursor.fetchall()]
+        
+        if "previous_amount" not in columns:
+            cursor.execute("ALTER TABLE cash_register ADD COLUMN previous_amount REAL DEFAULT 0.0")
+        
+        if "safe_transfer" not in columns:
+            cursor.execute("ALTER TABLE cash_register ADD COLUMN safe_transfer REAL DEFAULT 0.0")
+        
+        if "current_balance" not in columns:
+            cursor.execute("ALTER TABLE cash_register ADD COLUMN current_balance REAL DEFAULT 0.0")
+        
+        # Tabela wypłat dla pracowników
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS payroll (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cash_register_id INTEGER NOT NULL,
+                employee_name TEXT NOT NULL,
+                amount REAL NOT NULL,
+                notes TEXT,
+                created_at TEXT DEFAULT (datetime('now', 'localtime')),
+                FOREIGN KEY (cash_register_id) REFERENCES cash_register(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Tabela wydatków - pozostaje bez zmian
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS expenses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                category TEXT NOT NULL,
+                description TEXT NOT NULL,
+                amount REAL NOT NULL,
+                payment_method TEXT,
+                notes TEXT,
+                created_at TEXT DEFAULT (datetime('now', 'localtime'))
+            )
+        ''')
+        
+        # Tabela przychodów - pozostaje bez zmian
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS income (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                source TEXT NOT NULL,
+                description TEXT NOT NULL,
+                amount REAL NOT NULL,
+                payment_method TEXT,
+                notes TEXT,
+                created_at TEXT DEFAULT (datetime('now', 'localtime'))
+            )
+        ''')
+        
+        # Włącz obsługę kluczy obcych
+        cursor.execute("PRAGMA foreign_keys = ON")
+        
+        conn.commit()
+        logger.info("Zainicjalizowano tabele finansowe w bazie danych")
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Błąd podczas inicjalizacji tabel finansowych: {e}")
+
 def backup_database(conn, backup_path=None):
     """
     Tworzy kopię zapasową bazy danych.
@@ -497,6 +605,9 @@ def restore_database(backup_path):
         # Przywrócenie bazy danych z kopii zapasowej
         shutil.copy2(backup_path, DATABASE_PATH)
         
+        # Kopia może mieć inny schemat - graf kluczy obcych trzeba wyznaczyć ponownie
+        invalidate_foreign_key_graph()
+        
         logger.info(f"Przywrócono bazę danych z kopii zapasowej: {backup_path}")
         return True
     
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł automatycznych zmian statusu depozytów.
+Reguły (zbliża się termin odbioru -> 'Do odbioru', termin minął -> 'Zaległy') wykonywane są
+jako zbiorcze UPDATE korzystające z indeksu (status, pickup_date), raz dziennie i przy starcie
+aplikacji. Depozyty, które zmieniły status, mogą opcjonalnie trafić do kolejki
+powiadomień notification_queue.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Statusy depozytów
+STATUS_ACTIVE = "Aktywny"
+STATUS_PICKUP = "Do odbioru"
+STATUS_OVERDUE = "Zaległy"
+
+# Domyślne parametry reguł: liczba dni przed terminem odbioru, od której depozyt jest
+# "Do odbioru", oraz liczba dni po terminie, po której staje się "Zaległy"
+DEFAULT_PICKUP_WINDOW_DAYS = 7
+DEFAULT_OVERDUE_DAYS = 0
+
+# Szablony powiadomień dla nowych statusów (klucze szablonów SMS/e-mail z ustawień)
+NOTIFICATION_TEMPLATES = {
+    STATUS_PICKUP: "Do odbioru",
+    STATUS_OVERDUE: "Zaległy depozyt",
+}
+
+# Statusy wpisów kolejki powiadomień
+QUEUE_PENDING = "Oczekuje"
+QUEUE_SENT = "Wysłane"
+QUEUE_FAILED = "Błąd"
+
+LIFECYCLE_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS notification_queue (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        channel TEXT NOT NULL DEFAULT 'sms',
+        client_id INTEGER,
+        deposit_id INTEGER,
+        template_key TEXT,
+        status TEXT NOT NULL DEFAULT 'Oczekuje',
+        sent_at TEXT,
+        error TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS deposit_lifecycle_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_date TEXT NOT NULL,
+        run_day TEXT NOT NULL,
+        transitions INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+LIFECYCLE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_deposits_status_pickup ON deposits(status, pickup_date)",
+    "CREATE INDEX IF NOT EXISTS idx_notification_queue_pending ON notification_queue(id) "
+    f"WHERE status = '{QUEUE_PENDING}'",
+]
+
+# Dziennik zdarzeń depozytów z wcześniejszej wersji - zmiany depozytów odczytuje się z change_log
+DEPOSIT_EVENT_TRIGGERS = ("trg_deposit_events_insert", "trg_deposit_events_status", "trg_deposit_events_delete")
+
+
+def get_transition_rules(today=None, pickup_window_days=DEFAULT_PICKUP_WINDOW_DAYS,
+                         overdue_days=DEFAULT_OVERDUE_DAYS):
+    """
+    Zwraca reguły przejść w kolejności wykonania. Depozyt po terminie przechodzi od razu
+    do statusu "Zaległy", dzięki czemu w jednym przebiegu zmienia status co najwyżej raz.
+
+    Args:
+        today (date, optional): Bieżąca data
+        pickup_window_days (int): Dni przed terminem odbioru, od których depozyt jest "Do odbioru"
+        overdue_days (int): Dni po terminie odbioru, po których depozyt jest "Zaległy"
+
+    Returns:
+        list: Lista krotek (statusy źródłowe, status docelowy, granica pickup_date - wyłącznie)
+    """
+    today = today or date.today()
+    # pickup_date może zawierać godzinę - porównanie z początkiem następnego dnia obejmuje cały dzień
+    pickup_before = (today + timedelta(days=pickup_window_days + 1)).strftime("%Y-%m-%d")
+    overdue_before = (today - timedelta(days=overdue_days)).strftime("%Y-%m-%d")
+    return [
+        ((STATUS_ACTIVE, STATUS_PICKUP), STATUS_OVERDUE, overdue_before),
+        ((STATUS_ACTIVE,), STATUS_PICKUP, pickup_before),
+    ]
+
+
+def get_last_lifecycle_day(conn):
+    """
+    Zwraca dzień ostatniego wykonania reguł (YYYY-MM-DD) lub None.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    return conn.execute("SELECT MAX(run_day) FROM deposit_lifecycle_runs").fetchone()[0]
+
+
+def is_lifecycle_due(conn, today=None):
+    """
+    Sprawdza, czy reguły nie były jeszcze wykonane danego dnia.
+
+    Args:
+        conn: Połączenie z bazą danych
+        today (date, optional): Bieżąca data
+
+    Returns:
+        bool: True, jeśli należy wykonać reguły
+    """
+    last_day = get_last_lifecycle_day(conn)
+    return last_day is None or last_day < (today or date.today()).strftime("%Y-%m-%d")
+
+
+def run_deposit_lifecycle(conn, today=None, pickup_window_days=DEFAULT_PICKUP_WINDOW_DAYS,
+                          overdue_days=DEFAULT_OVERDUE_DAYS, queue_notifications=False):
+    """
+    Wykonuje reguły zmian statusu depozytów w jednej transakcji.
+
+    Args:
+        conn: Połączenie z bazą danych
+        today (date, optional): Bieżąca data
+        pickup_window_days (int): Dni przed terminem odbioru, od których depozyt jest "Do odbioru"
+        overdue_days (int): Dni po terminie odbioru, po których depozyt jest "Zaległy"
+        queue_notifications (bool): Dodaj powiadomienia klientów do kolejki notification_queue
+
+    Returns:
+        dict: Słownik {nowy status: lista ID depozytów}
+    """
+    today = today or date.today()
+    changes = {}
+    try:
+        cursor = conn.cursor()
+        for from_statuses, to_status, pickup_before in get_transition_rules(today, pickup_window_days, overdue_days):
+            where = f"status IN ({', '.join('?' * len(from_statuses))}) AND pickup_date < ?"
+            params = from_statuses + (pickup_before,)
+
+            ids = [row[0] for row in cursor.execute(f"SELECT id FROM deposits WHERE {where}", params).fetchall()]
+            if not ids:
+                continue
+
+            if queue_notifications:
+                cursor.execute(f"""
+                    INSERT INTO notification_queue (client_id, deposit_id, template_key)
+                    SELECT client_id, id, ? FROM deposits WHERE {where}
+                """, (NOTIFICATION_TEMPLATES[to_status],) + params)
+            cursor.execute(f"UPDATE deposits SET status = ? WHERE {where}", (to_status,) + params)
+            changes[to_status] = ids
+
+        transitions = sum(len(ids) for ids in changes.values())
+        cursor.execute(
+            "INSERT INTO deposit_lifecycle_runs (run_date, run_day, transitions) VALUES (?, ?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), today.strftime("%Y-%m-%d"), transitions)
+        )
+        conn.commit()
+        if transitions:
+            logger.info(
+                "Zmiany statusu depozytów: " + ", ".join(f"{status}: {len(ids)}" for status, ids in changes.items())
+            )
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Błąd podczas automatycznej zmiany statusu depozytów: {e}")
+        return {}
+    return changes
+
+
+def run_lifecycle_if_due(conn, settings, today=None):
+    """
+    Wykonuje reguły zmian statusu z parametrami z ustawień, jeśli nie były wykonane danego dnia.
+
+    Args:
+        conn: Połączenie z bazą danych
+        settings: Ustawienia aplikacji (obiekt z metodą value(klucz, domyślna, type=...))
+        today (date, optional): Bieżąca data
+
+    Returns:
+        dict: Słownik {nowy status: lista ID depozytów}; pusty, gdy nic nie zmieniono
+    """
+    if not settings.value("deposit_lifecycle_enabled", True, type=bool):
+        return {}
+    try:
+        if not is_lifecycle_due(conn, today):
+            return {}
+    except Exception as e:
+        logger.error(f"Błąd podczas sprawdzania ostatniej zmiany statusu depozytów: {e}")
+        return {}
+
+    return run_deposit_lifecycle(
+        conn,
+        today=today,
+        pickup_window_days=settings.value("deposit_pickup_window_days", DEFAULT_PICKUP_WINDOW_DAYS, type=int),
+        overdue_days=settings.value("deposit_overdue_days", DEFAULT_OVERDUE_DAYS, type=int),
+        queue_notifications=settings.value("deposit_lifecycle_notify", False, type=bool),
+    )
+
+
+def install_deposit_lifecycle(conn):
+    """
+    Tworzy kolejkę powiadomień, rejestr uruchomień i indeks (status, pickup_date).
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for table_sql in LIFECYCLE_TABLES:
+        cursor.execute(table_sql)
+    for index_sql in LIFECYCLE_INDEXES:
+        cursor.execute(index_sql)
+
+
+def drop_deposit_events(conn):
+    """
+    Usuwa nieużywany dziennik zdarzeń depozytów (tabela deposit_events i jej wyzwalacze).
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for name in DEPOSIT_EVENT_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    cursor.execute("DROP TABLE IF EXISTS deposit_events")
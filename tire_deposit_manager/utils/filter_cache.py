@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł pamięci podręcznej wyników filtrowania list.
+Zakładki filtrują listy zapytaniem z warunkiem LIKE '%tekst%'. Dopisanie znaku do tekstu
+tylko zawęża wynik, więc nowy wynik można wyznaczyć w pamięci z wcześniejszego zamiast
+ponownie przeszukiwać tabele. Zapytanie SQL jest potrzebne dopiero, gdy filtr się
+rozszerza, zmienia się pozostała część filtra albo dane w bazie (wersja z change_log).
+W całości zapamiętywane są tylko niewielkie wyniki (do max_rows wierszy) - szerokie
+wyszukiwania są stronicowane zapytaniem z LIMIT/OFFSET.
+"""
+
+import string
+from collections import OrderedDict
+
+# Domyślna liczba zapamiętanych wyników na zakładkę
+DEFAULT_MAX_ENTRIES = 8
+
+# Domyślna największa liczba wierszy wyniku, który można zapamiętać w całości
+DEFAULT_MAX_ROWS = 500
+
+# LIKE w SQLite nie rozróżnia wielkości liter tylko dla znaków ASCII
+_LIKE_FOLD_TABLE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# Znaki wieloznaczne LIKE - tekstu z nimi nie da się porównać jako zwykłego podciągu
+_LIKE_WILDCARDS = ("%", "_")
+
+# Separator pól w kluczu wyszukiwania (nie występuje w tekście wpisanym przez użytkownika)
+_KEY_SEPARATOR = "\x00"
+
+
+def like_fold(text):
+    """
+    Sprowadza tekst do postaci porównywanej przez LIKE w SQLite (małe litery ASCII).
+
+    Args:
+        text (str): Tekst
+
+    Returns:
+        str: Tekst po normalizacji
+    """
+    return str(text).translate(_LIKE_FOLD_TABLE)
+
+
+def search_key(values):
+    """
+    Buduje klucz wyszukiwania wiersza z wartości przeszukiwanych kolumn.
+    Tekst pasuje do klucza, gdy jest podciągiem którejś z wartości (jak warunek
+    "kolumna1 LIKE ? OR kolumna2 LIKE ?"); wartości NULL są pomijane.
+
+    Args:
+        values (iterable): Wartości przeszukiwanych kolumn
+
+    Returns:
+        str: Klucz wyszukiwania
+    """
+    return _KEY_SEPARATOR.join(like_fold(value) for value in values if value is not None)
+
+
+class FilterResultCache:
+    """Pamięć podręczna pełnych wyników filtrowania z zawężaniem w pamięci."""
+
+    def __init__(self, key_values, max_entries=DEFAULT_MAX_ENTRIES, max_rows=DEFAULT_MAX_ROWS):
+        """
+        Args:
+            key_values (callable): Funkcja zwracająca wartości przeszukiwanych kolumn wiersza
+            max_entries (int): Maksymalna liczba zapamiętanych wyników
+            max_rows (int): Największa liczba wierszy wyniku, który można zapamiętać
+        """
+        self.key_values = key_values
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        # (sygnatura, tekst) -> (wiersze, klucze wyszukiwania)
+        self._entries = OrderedDict()
+        self._version = None
+
+    def lookup(self, signature, text, version):
+        """
+        Zwraca wynik filtra z pamięci: zapamiętany albo zawężony z wyniku szerszego filtra.
+
+        Args:
+            signature (tuple): Pozostała część filtra (zakładka, typ, sortowanie itp.)
+            text (str): Tekst wyszukiwania
+            version (int): Wersja danych (identyfikator ostatniej zmiany w bazie)
+
+        Returns:
+            list: Wiersze w kolejności zapytania lub None, jeśli potrzebne jest zapytanie SQL
+        """
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+            return None
+
+        needle = like_fold(text)
+        entry = self._entries.get((signature, needle))
+        if entry is not None:
+            self._entries.move_to_end((signature, needle))
+            return entry[0]
+
+        if any(wildcard in needle for wildcard in _LIKE_WILDCARDS):
+            return None
+
+        # Najwęższy zapamiętany wynik, który zawiera wynik nowego filtra
+        superset = None
+        for (cached_signature, cached_needle), cached_entry in self._entries.items():
+            if cached_signature == signature and cached_needle in needle:
+                if superset is None or len(cached_needle) > len(superset[0]):
+                    superset = (cached_needle, cached_entry)
+        if superset is None:
+            return None
+
+        rows, keys = superset[1]
+        matches = [position for position, key in enumerate(keys) if needle in key]
+        refined = ([rows[position] for position in matches], [keys[position] for position in matches])
+        self._remember((signature, needle), refined)
+        return refined[0]
+
+    def store(self, signature, text, version, rows):
+        """
+        Zapamiętuje pełny wynik zapytania SQL dla filtra.
+        Wyniki dłuższe niż max_rows nie są zapamiętywane.
+
+        Args:
+            signature (tuple): Pozostała część filtra
+            text (str): Tekst wyszukiwania
+            version (int): Wersja danych, dla której wykonano zapytanie
+            rows (list): Wiersze wyniku
+
+        Returns:
+            list: Zapamiętane wiersze
+        """
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+        rows = list(rows)
+        if len(rows) > self.max_rows:
+            return rows
+        keys = [search_key(self.key_values(row)) for row in rows]
+        self._remember((signature, like_fold(text)), (rows, keys))
+        return rows
+
+    def invalidate(self):
+        """Usuwa wszystkie zapamiętane wyniki."""
+        self._entries.clear()
+        self._version = None
+
+    def _remember(self, cache_key, entry):
+        """Zapisuje wynik i usuwa najdawniej używane, gdy przekroczono limit."""
+        self._entries[cache_key] = entry
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
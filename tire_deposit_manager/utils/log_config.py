@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł konfiguracji logowania aplikacji.
+Rekordy trafiają do kolejki w wątku wywołującym, a zapis do plików wykonuje wątek w tle
+(QueueHandler + QueueListener). Pliki logów są rotowane według rozmiaru i czasu,
+a starsze pliki kompresowane (gzip). Poziom logowania można ustawić osobno dla modułów.
+"""
+
+import os
+import gzip
+import queue
+import atexit
+import shutil
+import logging
+import logging.handlers
+
+from utils.paths import LOGS_DIR
+
+# Nazwa loggera używanego przez całą aplikację
+LOGGER_NAME = "TireDepositManager"
+
+# Plik bieżącego logu (starsze pliki: app.log.RRRR-MM-DD[.N].gz)
+LOG_FILE = os.path.join(LOGS_DIR, "app.log")
+
+# Domyślne parametry rotacji
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 14
+
+# Moduły, które w produkcji logują dużo na poziomie DEBUG - domyślnie INFO
+DEFAULT_MODULE_LEVELS = {
+    "sms_sender": "INFO",
+    "email_sender": "INFO",
+}
+
+FILE_FORMAT = "%(asctime)s - %(name)s - %(module)s - %(levelname)s - %(message)s"
+CONSOLE_FORMAT = "%(levelname)s: %(message)s"
+
+_listener = None
+
+
+class CompressingRotatingFileHandler(logging.handlers.TimedRotatingFileHandler):
+    """
+    Handler rotujący plik logu codziennie oraz po przekroczeniu rozmiaru.
+    Zrotowane pliki są kompresowane do formatu gzip.
+    """
+
+    def __init__(self, filename, max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT):
+        """
+        Inicjalizacja handlera.
+
+        Args:
+            filename (str): Ścieżka do pliku logu
+            max_bytes (int): Maksymalny rozmiar pliku przed rotacją (0 - bez limitu)
+            backup_count (int): Liczba przechowywanych plików archiwalnych
+        """
+        super().__init__(filename, when="midnight", backupCount=backup_count, encoding="utf-8", delay=True)
+        self.max_bytes = max_bytes
+        self.namer = self._gzip_name
+        self.rotator = self._gzip_rotate
+
+    def shouldRollover(self, record):
+        if super().shouldRollover(record):
+            return True
+        if self.max_bytes <= 0:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        return self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes
+
+    def rotation_filename(self, default_name):
+        # Kilka rotacji tego samego dnia (limit rozmiaru) - dodaj kolejny numer
+        name = super().rotation_filename(default_name)
+        if not os.path.exists(name):
+            return name
+        base = name[:-3] if name.endswith(".gz") else name
+        index = 1
+        while os.path.exists(f"{base}.{index}.gz"):
+            index += 1
+        return f"{base}.{index}.gz"
+
+    def getFilesToDelete(self):
+        # Pliki archiwalne mają dodatkowe sufiksy (.N, .gz), więc wybieramy je po prefiksie
+        directory, base_name = os.path.split(self.baseFilename)
+        prefix = base_name + "."
+        archives = sorted(
+            (os.path.join(directory, name) for name in os.listdir(directory)
+             if name.startswith(prefix) and name.endswith(".gz")),
+            key=os.path.getmtime
+        )
+        if len(archives) <= self.backupCount:
+            return []
+        return archives[:len(archives) - self.backupCount]
+
+    @staticmethod
+    def _gzip_name(name):
+        return name + ".gz"
+
+    @staticmethod
+    def _gzip_rotate(source, dest):
+        with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+
+class ModuleLevelFilter(logging.Filter):
+    """
+    Filtr przepuszczający rekordy zgodnie z poziomem ustawionym dla modułu (nazwa pliku bez .py).
+    Działa w wątku wywołującym, więc odrzucone rekordy nie trafiają do kolejki.
+    """
+
+    def __init__(self, default_level=logging.INFO, module_levels=None):
+        """
+        Inicjalizacja filtra.
+
+        Args:
+            default_level (int): Poziom dla modułów bez własnego ustawienia
+            module_levels (dict, optional): Słownik {moduł: poziom}
+        """
+        super().__init__()
+        self.default_level = default_level
+        self.module_levels = dict(module_levels or {})
+
+    def filter(self, record):
+        return record.levelno >= self.module_levels.get(record.module, self.default_level)
+
+
+def parse_level(level, default=logging.INFO):
+    """
+    Zamienia nazwę poziomu (np. 'DEBUG') na wartość liczbową.
+
+    Args:
+        level (str|int): Nazwa lub wartość poziomu
+        default (int): Wartość zwracana dla nieznanego poziomu
+
+    Returns:
+        int: Poziom logowania
+    """
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).strip().upper())
+    return value if isinstance(value, int) else default
+
+
+def parse_module_levels(text):
+    """
+    Parsuje ustawienia poziomów modułów w formacie 'moduł=POZIOM, moduł2=POZIOM'.
+
+    Args:
+        text (str): Tekst z ustawieniami
+
+    Returns:
+        dict: Słownik {moduł: poziom (int)}
+    """
+    levels = {}
+    for part in (text or "").replace(";", ",").split(","):
+        if "=" not in part:
+            continue
+        module, level = part.split("=", 1)
+        module = module.strip()
+        if module.endswith(".py"):
+            module = module[:-3]
+        if module:
+            levels[module] = parse_level(level)
+    return levels
+
+
+def format_module_levels(levels):
+    """
+    Zamienia słownik poziomów modułów na tekst (odwrotność parse_module_levels).
+
+    Args:
+        levels (dict): Słownik {moduł: poziom}
+
+    Returns:
+        str: Tekst w formacie 'moduł=POZIOM, ...'
+    """
+    return ", ".join(f"{module}={logging.getLevelName(parse_level(level))}" for module, level in sorted(levels.items()))
+
+
+def setup_logging(level="INFO", module_levels=None, log_file=LOG_FILE,
+                  max_bytes=DEFAULT_MAX_BYTES, backup_count=DEFAULT_BACKUP_COUNT, console=True):
+    """
+    Konfiguruje nieblokujące logowanie aplikacji.
+
+    Args:
+        level (str|int): Domyślny poziom logowania
+        module_levels (dict|str, optional): Poziomy dla poszczególnych modułów
+        log_file (str): Ścieżka do pliku logu
+        max_bytes (int): Maksymalny rozmiar pliku przed rotacją
+        backup_count (int): Liczba przechowywanych archiwów
+        console (bool): Czy wypisywać komunikaty INFO+ na konsolę
+
+    Returns:
+        Logger: Skonfigurowany logger aplikacji
+    """
+    global _listener
+
+    shutdown_logging()
+    os.makedirs(os.path.dirname(log_file), exist_ok=True)
+
+    file_handler = CompressingRotatingFileHandler(log_file, max_bytes, backup_count)
+    file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+    handlers = [file_handler]
+
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.INFO)
+        console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ModuleLevelFilter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    set_log_levels(level, module_levels)
+    return logger
+
+
+def set_log_levels(level="INFO", module_levels=None):
+    """
+    Zmienia poziomy logowania bez ponownej konfiguracji handlerów.
+
+    Args:
+        level (str|int): Domyślny poziom logowania
+        module_levels (dict|str, optional): Poziomy dla poszczególnych modułów
+    """
+    if isinstance(module_levels, str):
+        module_levels = parse_module_levels(module_levels)
+    levels = {module: parse_level(value) for module, value in DEFAULT_MODULE_LEVELS.items()}
+    levels.update({module: parse_level(value) for module, value in (module_levels or {}).items()})
+    default_level = parse_level(level)
+
+    logger = logging.getLogger(LOGGER_NAME)
+    # Logger przepuszcza najniższy potrzebny poziom, resztę rozstrzyga filtr modułów
+    logger.setLevel(min([default_level] + list(levels.values())))
+    for handler in logger.handlers:
+        for log_filter in handler.filters:
+            if isinstance(log_filter, ModuleLevelFilter):
+                log_filter.default_level = default_level
+                log_filter.module_levels = levels
+
+
+def shutdown_logging():
+    """Zatrzymuje wątek zapisu logów, opróżniając kolejkę."""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
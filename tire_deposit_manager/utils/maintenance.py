@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł konserwacji bazy danych w czasie bezczynności użytkownika.
+Zadania (PRAGMA optimize / ANALYZE, przyrostowe odzyskiwanie wolnych stron, quick_check,
+migawki stanów magazynowych, skracanie dziennika zmian)
+wykonywane są w wątku w tle na osobnym połączeniu i przerywane, gdy użytkownik wraca
+do pracy. Każde zadanie zapisywane jest w tabeli maintenance_log.
+"""
+
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from PySide6.QtCore import QObject, QEvent, QTimer
+
+from utils.paths import DATABASE_PATH
+from utils.stock_ledger import is_snapshot_due, create_stock_snapshot
+from utils.change_log import get_prune_limit, prune_change_log
+from utils.replication import capture_changes
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Czas bezczynności (s), po którym rozpoczyna się konserwacja
+DEFAULT_IDLE_SECONDS = 300
+
+# Co ile milisekund sprawdzać, czy należy rozpocząć konserwację
+CHECK_INTERVAL_MS = 60 * 1000
+
+# Odstępy między zadaniami
+OPTIMIZE_INTERVAL = timedelta(days=1)
+QUICK_CHECK_INTERVAL = timedelta(days=7)
+CHANGE_LOG_PRUNE_INTERVAL = timedelta(days=1)
+
+# Przyrostowe odzyskiwanie wolnych stron: liczba stron w jednym kroku i próg uruchomienia
+VACUUM_STEP_PAGES = 256
+VACUUM_MIN_FREE_PAGES = 64
+
+# Co ile instrukcji maszyny wirtualnej SQLite sprawdzać żądanie przerwania
+PROGRESS_HANDLER_STEPS = 10000
+
+# Tryb PRAGMA auto_vacuum = INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Zadania konserwacji
+TASK_AUTO_VACUUM = "auto_vacuum"
+TASK_OPTIMIZE = "optimize"
+TASK_VACUUM = "incremental_vacuum"
+TASK_QUICK_CHECK = "quick_check"
+TASK_STOCK_SNAPSHOT = "stock_snapshot"
+TASK_PRUNE_CHANGE_LOG = "prune_change_log"
+
+
+class MaintenanceInterrupted(Exception):
+    """Wyjątek zgłaszany, gdy konserwacja została przerwana (powrót użytkownika)."""
+
+
+def _file_stats(conn):
+    """Zwraca (liczba stron, liczba wolnych stron, rozmiar strony)."""
+    return (
+        conn.execute("PRAGMA page_count").fetchone()[0],
+        conn.execute("PRAGMA freelist_count").fetchone()[0],
+        conn.execute("PRAGMA page_size").fetchone()[0],
+    )
+
+
+def log_maintenance(conn, task, duration_ms, pages_before, pages_after, page_size, result):
+    """
+    Zapisuje wykonanie zadania konserwacji w dzienniku.
+
+    Args:
+        conn: Połączenie z bazą danych
+        task (str): Nazwa zadania
+        duration_ms (float): Czas wykonania w milisekundach
+        pages_before (int): Liczba stron pliku przed zadaniem
+        pages_after (int): Liczba stron pliku po zadaniu
+        page_size (int): Rozmiar strony w bajtach
+        result (str): Wynik zadania ('ok', 'interrupted' lub opis błędu)
+    """
+    conn.execute(
+        """
+        INSERT INTO maintenance_log (run_date, task, duration_ms, pages_before, pages_after, reclaimed_bytes, result)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S"), task, round(duration_ms, 1),
+            pages_before, pages_after, max(pages_before - pages_after, 0) * page_size, result
+        )
+    )
+    conn.commit()
+
+
+def get_last_runs(conn):
+    """
+    Zwraca datę ostatniego wykonania każdego zadania (z pominięciem przerwanych).
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        dict: Słownik {zadanie: datetime}
+    """
+    rows = conn.execute(
+        "SELECT task, MAX(run_date) FROM maintenance_log WHERE result != 'interrupted' GROUP BY task"
+    ).fetchall()
+    return {task: datetime.strptime(run_date, "%Y-%m-%d %H:%M:%S") for task, run_date in rows if run_date}
+
+
+def get_maintenance_log(conn, limit=50):
+    """
+    Zwraca ostatnie wpisy dziennika konserwacji.
+
+    Args:
+        conn: Połączenie z bazą danych
+        limit (int): Maksymalna liczba wpisów
+
+    Returns:
+        list: Lista krotek (run_date, task, duration_ms, reclaimed_bytes, result)
+    """
+    return conn.execute(
+        "SELECT run_date, task, duration_ms, reclaimed_bytes, result FROM maintenance_log "
+        "ORDER BY id DESC LIMIT ?",
+        (limit,)
+    ).fetchall()
+
+
+def get_due_tasks(conn, now=None):
+    """
+    Wyznacza zadania konserwacji, które należy wykonać.
+
+    Args:
+        conn: Połączenie z bazą danych
+        now (datetime, optional): Bieżący czas
+
+    Returns:
+        list: Lista nazw zadań w kolejności wykonania
+    """
+    now = now or datetime.now()
+    last_runs = get_last_runs(conn)
+    tasks = []
+
+    # Przed odzyskiwaniem stron - usunięte wpisy dziennika zwalniają strony
+    if now - last_runs.get(TASK_PRUNE_CHANGE_LOG, datetime.min) >= CHANGE_LOG_PRUNE_INTERVAL:
+        tasks.append(TASK_PRUNE_CHANGE_LOG)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+        tasks.append(TASK_AUTO_VACUUM)
+    elif conn.execute("PRAGMA freelist_count").fetchone()[0] >= VACUUM_MIN_FREE_PAGES:
+        tasks.append(TASK_VACUUM)
+
+    if now - last_runs.get(TASK_OPTIMIZE, datetime.min) >= OPTIMIZE_INTERVAL:
+        tasks.append(TASK_OPTIMIZE)
+    if now - last_runs.get(TASK_QUICK_CHECK, datetime.min) >= QUICK_CHECK_INTERVAL:
+        tasks.append(TASK_QUICK_CHECK)
+    if is_snapshot_due(conn, now):
+        tasks.append(TASK_STOCK_SNAPSHOT)
+    return tasks
+
+
+def _enable_incremental_auto_vacuum(conn, should_stop):
+    """Przełącza bazę w tryb auto_vacuum = INCREMENTAL (wymaga jednorazowego VACUUM)."""
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return "ok"
+
+
+def _incremental_vacuum(conn, should_stop):
+    """Zwalnia wolne strony pliku małymi krokami, sprawdzając między krokami żądanie przerwania."""
+    while conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+        if should_stop():
+            raise MaintenanceInterrupted()
+        conn.execute(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})").fetchall()
+    return "ok"
+
+
+def _optimize(conn, should_stop):
+    """Aktualizuje statystyki planera zapytań."""
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+    ).fetchone()
+    if has_stats:
+        conn.execute("PRAGMA optimize").fetchall()
+    else:
+        # Pierwsze statystyki - PRAGMA optimize analizuje tylko tabele, które tego wymagają
+        conn.execute("ANALYZE")
+    conn.commit()
+    return "ok"
+
+
+def _quick_check(conn, should_stop):
+    """Sprawdza spójność pliku bazy danych."""
+    rows = [row[0] for row in conn.execute("PRAGMA quick_check").fetchall()]
+    if rows == ["ok"]:
+        return "ok"
+    logger.error("PRAGMA quick_check zgłosiło problemy z bazą danych: " + "; ".join(rows[:10]))
+    return "; ".join(rows[:10])
+
+
+def _stock_snapshot(conn, should_stop):
+    """Zapisuje migawkę stanów magazynowych, skracając wyznaczanie stanów historycznych."""
+    create_stock_snapshot(conn, force=True)
+    return "ok"
+
+
+def _prune_change_log(conn, should_stop):
+    """Usuwa wpisy dziennika zmian przetworzone przez replikację i odbiorców kanału zmian."""
+    # Oznaczone zmiany trafiają do sync_rows - replikacja nie potrzebuje już ich wpisów
+    capture_changes(conn)
+    pruned = prune_change_log(conn, get_prune_limit(conn))
+    logger.info(f"Usunięto {pruned} wpisów dziennika zmian")
+    return "ok"
+
+
+TASK_FUNCTIONS = {
+    TASK_AUTO_VACUUM: _enable_incremental_auto_vacuum,
+    TASK_VACUUM: _incremental_vacuum,
+    TASK_OPTIMIZE: _optimize,
+    TASK_QUICK_CHECK: _quick_check,
+    TASK_STOCK_SNAPSHOT: _stock_snapshot,
+    TASK_PRUNE_CHANGE_LOG: _prune_change_log,
+}
+
+
+def run_maintenance(database_path=DATABASE_PATH, tasks=None, should_stop=lambda: False):
+    """
+    Wykonuje zadania konserwacji na osobnym połączeniu z bazą danych.
+
+    Args:
+        database_path (str): Ścieżka do bazy danych
+        tasks (list, optional): Zadania do wykonania; domyślnie zadania wymagające wykonania
+        should_stop (callable): Funkcja zwracająca True, gdy konserwację należy przerwać
+
+    Returns:
+        dict: Wyniki zadań {zadanie: wynik}
+    """
+    results = {}
+    conn = None
+    try:
+        conn = sqlite3.connect(database_path, timeout=5)
+        # Długie operacje (VACUUM, ANALYZE, quick_check) przerywane są przez SQLite
+        conn.set_progress_handler(lambda: 1 if should_stop() else 0, PROGRESS_HANDLER_STEPS)
+
+        for task in tasks if tasks is not None else get_due_tasks(conn):
+            if should_stop():
+                break
+
+            pages_before, _free, page_size = _file_stats(conn)
+            started = time.perf_counter()
+            try:
+                result = TASK_FUNCTIONS[task](conn, should_stop)
+            except (MaintenanceInterrupted, sqlite3.OperationalError) as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                result = "interrupted" if should_stop() else str(e)
+            duration_ms = (time.perf_counter() - started) * 1000
+            pages_after, _free, page_size = _file_stats(conn)
+
+            log_maintenance(conn, task, duration_ms, pages_before, pages_after, page_size, result)
+            results[task] = result
+            logger.info(
+                f"Konserwacja bazy danych: {task} - {result} ({duration_ms:.0f} ms, "
+                f"odzyskano {max(pages_before - pages_after, 0) * page_size} B)"
+            )
+    except Exception as e:
+        logger.error(f"Błąd podczas konserwacji bazy danych: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
+    return results
+
+
+class MaintenanceScheduler(QObject):
+    """
+    Planista konserwacji bazy danych w czasie bezczynności użytkownika.
+    Śledzi zdarzenia klawiatury i myszy aplikacji; po DEFAULT_IDLE_SECONDS bez aktywności
+    uruchamia run_maintenance w wątku w tle, a przy powrocie użytkownika ją przerywa.
+    """
+
+    # Zdarzenia oznaczające aktywność użytkownika
+    ACTIVITY_EVENTS = (
+        QEvent.KeyPress, QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.Wheel,
+    )
+
+    def __init__(self, app, database_path=DATABASE_PATH, idle_seconds=DEFAULT_IDLE_SECONDS):
+        """
+        Inicjalizuje planistę konserwacji.
+
+        Args:
+            app: Obiekt QApplication
+            database_path (str): Ścieżka do bazy danych
+            idle_seconds (int): Czas bezczynności przed rozpoczęciem konserwacji
+        """
+        super().__init__(app)
+        self.database_path = database_path
+        self.idle_seconds = idle_seconds
+        self.last_activity = time.monotonic()
+        self.stop_event = threading.Event()
+        self.worker = None
+
+        app.installEventFilter(self)
+        app.aboutToQuit.connect(self.stop)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(CHECK_INTERVAL_MS)
+        self.timer.timeout.connect(self.check_idle)
+
+    def start(self):
+        """Uruchamia okresowe sprawdzanie bezczynności."""
+        self.timer.start()
+
+    def stop(self):
+        """Zatrzymuje planistę i przerywa trwającą konserwację."""
+        self.timer.stop()
+        self.stop_event.set()
+
+    def eventFilter(self, obj, event):
+        """Rejestruje aktywność użytkownika i przerywa trwającą konserwację."""
+        if event.type() in self.ACTIVITY_EVENTS:
+            self.last_activity = time.monotonic()
+            if self.worker is not None and self.worker.is_alive():
+                self.stop_event.set()
+        return False
+
+    def check_idle(self):
+        """Rozpoczyna konserwację, jeśli użytkownik jest bezczynny wystarczająco długo."""
+        if self.worker is not None and self.worker.is_alive():
+            return
+        if time.monotonic() - self.last_activity < self.idle_seconds:
+            return
+
+        self.stop_event.clear()
+        self.worker = threading.Thread(
+            target=run_maintenance,
+            kwargs={"database_path": self.database_path, "should_stop": self.stop_event.is_set},
+            daemon=True
+        )
+        self.worker.start()
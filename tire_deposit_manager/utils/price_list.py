@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł cennika usług w postaci znormalizowanej.
+Każda pozycja cennika jest osobnym wierszem tabeli price_items (kategoria, rodzaj, usługa,
+typ felgi, zakres rozmiarów, cena za sztukę i komplet, VAT), więc edycja zmienia tylko
+zmienione wiersze zamiast zapisywać cały cennik jako JSON. PriceCatalog trzyma cennik
+w pamięci ze słownikami do wyszukiwania cen po kluczu w czasie O(1) (kalkulator, wyceny,
+zamówienia) i z gotową listą usług kalkulatora.
+"""
+
+import re
+import json
+import logging
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Rodzaje pozycji (klucze sekcji w strukturze cennika używanej przez interfejs)
+KIND_SIZES = "sizes"
+KIND_BALANCING = "balancing"
+KIND_REPAIRS = "repairs"
+KIND_ADDITIONAL = "additional_services"
+
+# Rodzaje z cenami za sztukę i komplet (pozostałe mają jedną cenę)
+SET_PRICED_KINDS = (KIND_SIZES, KIND_BALANCING)
+
+# Domyślna stawka VAT (%)
+DEFAULT_VAT_RATE = 23
+
+PRICE_LIST_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS price_categories (
+        name TEXT PRIMARY KEY,
+        position INTEGER NOT NULL DEFAULT 0,
+        additional_info TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS price_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        category TEXT NOT NULL REFERENCES price_categories(name) ON DELETE CASCADE ON UPDATE CASCADE,
+        kind TEXT NOT NULL,
+        service TEXT NOT NULL DEFAULT '',
+        rim_type TEXT NOT NULL DEFAULT '',
+        size_label TEXT NOT NULL DEFAULT '',
+        size_min INTEGER,
+        size_max INTEGER,
+        price_single REAL NOT NULL DEFAULT 0,
+        price_set REAL,
+        vat_rate REAL NOT NULL DEFAULT 23,
+        position INTEGER NOT NULL DEFAULT 0,
+        last_updated TEXT NOT NULL DEFAULT (datetime('now', 'localtime'))
+    )
+    """,
+]
+
+PRICE_LIST_INDEXES = [
+    """CREATE UNIQUE INDEX IF NOT EXISTS idx_price_items_key
+       ON price_items(category, kind, service, rim_type, size_label)""",
+    "CREATE INDEX IF NOT EXISTS idx_price_items_category ON price_items(category, position)",
+]
+
+_SIZE_NUMBERS = re.compile(r"\d+")
+
+
+def parse_size_range(size_label):
+    """
+    Wyznacza zakres średnic felg (cale) z opisu rozmiaru w cenniku.
+
+    Args:
+        size_label (str): Opis rozmiaru, np. 'do 14"', '15"', '14"-18"', 'dostawcze'
+
+    Returns:
+        tuple: (od, do) - None oznacza brak ograniczenia; (None, None) dla opisów bez liczb
+    """
+    numbers = [int(number) for number in _SIZE_NUMBERS.findall(size_label or "")]
+    if not numbers:
+        return None, None
+    if (size_label or "").strip().lower().startswith("do "):
+        return None, numbers[0]
+    return min(numbers), max(numbers)
+
+
+def _item_key(kind, item):
+    """Zwraca klucz pozycji w kategorii: (rodzaj, usługa, typ felgi, rozmiar)."""
+    if kind in SET_PRICED_KINDS:
+        return kind, "", item.get("rim_type", "") if kind == KIND_BALANCING else "", item.get("size", "")
+    return kind, item.get("name", ""), "", ""
+
+
+def _item_values(kind, item, vat_rate=DEFAULT_VAT_RATE):
+    """Zwraca wartości kolumn pozycji: (rozmiar od, rozmiar do, cena za sztukę, cena za komplet, VAT)."""
+    vat_rate = item.get("vat_rate", vat_rate)
+    if kind in SET_PRICED_KINDS:
+        size_min, size_max = parse_size_range(item.get("size", ""))
+        return size_min, size_max, float(item.get("price_single", 0)), float(item.get("price_set", 0)), vat_rate
+    return None, None, float(item.get("price", 0)), None, vat_rate
+
+
+def find_duplicate_items(category_data):
+    """
+    Wyszukuje powtórzone pozycje kategorii (ta sama usługa, typ felgi i rozmiar) -
+    w cenniku może zostać tylko jedna cena takiej pozycji.
+
+    Args:
+        category_data (dict): Dane kategorii w strukturze interfejsu
+
+    Returns:
+        list: Opisy powtórzonych pozycji (np. 'Łatka', 'Stalowe 15"') w kolejności wystąpienia
+    """
+    seen = set()
+    duplicates = []
+    for kind in (KIND_SIZES, KIND_BALANCING, KIND_REPAIRS, KIND_ADDITIONAL):
+        for item in category_data.get(kind, []):
+            key = _item_key(kind, item)
+            if key in seen:
+                label = " ".join(part for part in key[1:] if part)
+                if label not in duplicates:
+                    duplicates.append(label)
+            seen.add(key)
+    return duplicates
+
+
+def save_price_category(conn, category, category_data, position=None, commit=True):
+    """
+    Zapisuje jedną kategorię cennika, zmieniając tylko dodane, zmienione i usunięte pozycje.
+
+    Args:
+        conn: Połączenie z bazą danych
+        category (str): Nazwa kategorii
+        category_data (dict): Dane kategorii w strukturze interfejsu ({"sizes": [...], ...});
+            brak "additional_info" zachowuje dotychczasowe informacje dodatkowe
+        position (int, optional): Kolejność kategorii (dla nowej kategorii)
+        commit (bool): Zatwierdź transakcję
+
+    Returns:
+        int: Liczba zmienionych wierszy
+    """
+    cursor = conn.cursor()
+    if position is None:
+        position = cursor.execute(
+            "SELECT COALESCE((SELECT position FROM price_categories WHERE name = ?), "
+            "(SELECT COALESCE(MAX(position) + 1, 0) FROM price_categories))", (category,)
+        ).fetchone()[0]
+    cursor.execute("""
+        INSERT INTO price_categories (name, position, additional_info) VALUES (?, ?, ?)
+        ON CONFLICT (name) DO UPDATE SET
+            position = excluded.position, additional_info = COALESCE(excluded.additional_info, additional_info)
+    """, (category, position, category_data.get("additional_info")))
+
+    existing = {
+        (kind, service, rim_type, size_label): (item_id, (size_min, size_max, price_single, price_set, vat_rate), item_position)
+        for item_id, kind, service, rim_type, size_label, size_min, size_max, price_single, price_set, vat_rate, item_position
+        in cursor.execute("""
+            SELECT id, kind, service, rim_type, size_label, size_min, size_max, price_single, price_set, vat_rate, position
+            FROM price_items WHERE category = ?
+        """, (category,)).fetchall()
+    }
+
+    changed = 0
+    seen = set()
+    item_position = 0
+    for kind in (KIND_SIZES, KIND_BALANCING, KIND_REPAIRS, KIND_ADDITIONAL):
+        for item in category_data.get(kind, []):
+            key = _item_key(kind, item)
+            if key in seen:
+                # Edytor cennika odrzuca powtórzenia (find_duplicate_items), tu trafiają tylko
+                # z importowanych danych - zostaje pierwsza cena
+                logger.warning(f"Pominięto powtórzoną pozycję cennika {category}: {' '.join(key[1:]).strip()}")
+                continue
+            seen.add(key)
+            current = existing.get(key)
+            # Pozycje bez podanej stawki VAT zachowują dotychczasową
+            values = _item_values(kind, item, current[1][4] if current else DEFAULT_VAT_RATE)
+            if current is None:
+                cursor.execute("""
+                    INSERT INTO price_items (category, kind, service, rim_type, size_label,
+                                             size_min, size_max, price_single, price_set, vat_rate, position)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (category,) + key + values + (item_position,))
+                changed += 1
+            elif current[1] != values or current[2] != item_position:
+                cursor.execute("""
+                    UPDATE price_items SET size_min = ?, size_max = ?, price_single = ?, price_set = ?,
+                        vat_rate = ?, position = ?, last_updated = datetime('now', 'localtime')
+                    WHERE id = ?
+                """, values + (item_position, current[0]))
+                changed += 1
+            item_position += 1
+
+    removed = [current[0] for key, current in existing.items() if key not in seen]
+    if removed:
+        cursor.executemany("DELETE FROM price_items WHERE id = ?", [(item_id,) for item_id in removed])
+        changed += len(removed)
+
+    if commit:
+        conn.commit()
+    return changed
+
+
+def save_price_data(conn, price_data):
+    """
+    Zapisuje cały cennik (wszystkie kategorie) w jednej transakcji.
+
+    Args:
+        conn: Połączenie z bazą danych
+        price_data (dict): Cennik w strukturze interfejsu {kategoria: dane kategorii}
+
+    Returns:
+        int: Liczba zmienionych wierszy
+    """
+    try:
+        changed = 0
+        for position, (category, category_data) in enumerate(price_data.items()):
+            changed += save_price_category(conn, category, category_data, position, commit=False)
+        conn.commit()
+        return changed
+    except Exception:
+        conn.rollback()
+        raise
+
+
+class PriceCatalog:
+    """Cennik w pamięci ze słownikami do wyszukiwania cen po kluczu."""
+
+    def __init__(self, rows, categories, translate=None):
+        """
+        Args:
+            rows (list): Wiersze price_items (słowniki z kolumnami tabeli)
+            categories (list): Kategorie [(nazwa, informacje dodatkowe)] w kolejności wyświetlania
+            translate (callable, optional): Funkcja tłumacząca nazwy usług kalkulatora
+        """
+        translate = translate or (lambda text: text)
+        self.items = rows
+        self.categories = [name for name, _info in categories]
+        self._additional_info = dict(categories)
+        # (kategoria, rodzaj, usługa, typ felgi, rozmiar) -> pozycja
+        self.by_key = {
+            (row["category"], row["kind"], row["service"], row["rim_type"], row["size_label"]): row for row in rows
+        }
+        # (kategoria, typ felgi, średnica w calach) -> pozycja z zakresem obejmującym średnicę
+        self.by_rim = {}
+        # Nazwa usługi kalkulatora -> usługa; usługi kalkulatora według kategorii
+        self.services = []
+        self.by_service_name = {}
+        self._services_by_category = {}
+
+        for row in rows:
+            if row["kind"] in SET_PRICED_KINDS and (row["size_min"] is not None or row["size_max"] is not None):
+                low = row["size_min"] if row["size_min"] is not None else 10
+                high = row["size_max"] if row["size_max"] is not None else 24
+                for inches in range(low, high + 1):
+                    self.by_rim.setdefault((row["category"], row["rim_type"], inches), row)
+            for service in self._calculator_services(row, translate):
+                self.services.append(service)
+                self.by_service_name.setdefault(service["name"], service)
+                self._services_by_category.setdefault(row["category"], []).append(service)
+
+    @staticmethod
+    def _calculator_services(row, translate):
+        """Zwraca usługi kalkulatora odpowiadające pozycji cennika."""
+        category = row["category"]
+        entries = []
+        if row["kind"] == KIND_SIZES:
+            entries = [
+                (f"{translate('Wymiana opon')} {row['size_label']}", row["price_set"]),
+                (f"{translate('Wymiana opony')} {row['size_label']}", row["price_single"]),
+            ]
+        elif row["kind"] == KIND_BALANCING:
+            entries = [
+                (f"{translate('Wyważanie kół')} {row['rim_type']} {row['size_label']}", row["price_set"]),
+                (f"{translate('Wyważanie koła')} {row['rim_type']} {row['size_label']}", row["price_single"]),
+            ]
+        else:
+            entries = [(row["service"], row["price_single"])]
+        return [
+            {
+                "name": name,
+                "display_name": f"{name} - {price:.2f} zł",
+                "price": price,
+                "vat_rate": row["vat_rate"],
+                "category": category,
+            }
+            for name, price in entries
+        ]
+
+    def services_for(self, category):
+        """
+        Zwraca usługi kalkulatora z kategorii.
+
+        Args:
+            category (str): Nazwa kategorii
+
+        Returns:
+            list: Lista słowników usług (name, display_name, price, vat_rate, category)
+        """
+        return self._services_by_category.get(category, [])
+
+    def get(self, category, kind, service="", rim_type="", size_label=""):
+        """
+        Zwraca pozycję cennika o podanym kluczu.
+
+        Returns:
+            dict: Pozycja cennika lub None
+        """
+        return self.by_key.get((category, kind, service, rim_type, size_label))
+
+    def price_for_rim(self, category, rim_inches, rim_type="", per_set=True):
+        """
+        Zwraca cenę usługi dla średnicy felgi (np. wymiana opon na felgach 16").
+
+        Args:
+            category (str): Nazwa kategorii
+            rim_inches (int): Średnica felgi w calach
+            rim_type (str): Typ felgi (dla wyważania)
+            per_set (bool): Cena za komplet (True) lub za sztukę (False)
+
+        Returns:
+            float: Cena lub None, jeśli cennik nie obejmuje średnicy
+        """
+        row = self.by_rim.get((category, rim_type, int(rim_inches)))
+        if row is None:
+            return None
+        return row["price_set"] if per_set else row["price_single"]
+
+    def find_service(self, name):
+        """
+        Zwraca usługę kalkulatora o podanej nazwie.
+
+        Args:
+            name (str): Nazwa usługi (np. 'Wymiana opon 16"')
+
+        Returns:
+            dict: Usługa lub None
+        """
+        return self.by_service_name.get(name)
+
+    def to_price_data(self):
+        """
+        Zwraca cennik w strukturze używanej przez widoki i dialog edycji cennika.
+
+        Returns:
+            dict: {kategoria: {"sizes" | "balancing" | "repairs" | "additional_services": [...]}}
+        """
+        price_data = {category: {} for category in self.categories}
+        for row in self.items:
+            category_data = price_data.setdefault(row["category"], {})
+            if row["kind"] == KIND_SIZES:
+                item = {"size": row["size_label"], "price_single": row["price_single"], "price_set": row["price_set"]}
+            elif row["kind"] == KIND_BALANCING:
+                item = {
+                    "rim_type": row["rim_type"], "size": row["size_label"],
+                    "price_single": row["price_single"], "price_set": row["price_set"],
+                }
+            else:
+                item = {"name": row["service"], "price": row["price_single"]}
+            if row["vat_rate"] != DEFAULT_VAT_RATE:
+                item["vat_rate"] = row["vat_rate"]
+            category_data.setdefault(row["kind"], []).append(item)
+        for category, info in self._additional_info.items():
+            if info:
+                price_data[category]["additional_info"] = info
+        return price_data
+
+
+def load_price_catalog(conn, translate=None):
+    """
+    Wczytuje cennik z bazy danych.
+
+    Args:
+        conn: Połączenie z bazą danych
+        translate (callable, optional): Funkcja tłumacząca nazwy usług kalkulatora
+
+    Returns:
+        PriceCatalog: Cennik (pusty, jeśli brak pozycji)
+    """
+    columns = (
+        "id", "category", "kind", "service", "rim_type", "size_label",
+        "size_min", "size_max", "price_single", "price_set", "vat_rate", "position",
+    )
+    rows = [
+        dict(zip(columns, tuple(row))) for row in conn.execute(f"""
+            SELECT {', '.join('i.' + column for column in columns)}
+            FROM price_items i JOIN price_categories c ON c.name = i.category
+            ORDER BY c.position, i.position
+        """).fetchall()
+    ]
+    categories = [
+        (name, info) for name, info in conn.execute(
+            "SELECT name, additional_info FROM price_categories ORDER BY position"
+        ).fetchall()
+    ]
+    return PriceCatalog(rows, categories, translate)
+
+
+def install_price_items(conn):
+    """
+    Tworzy znormalizowane tabele cennika i przenosi do nich cennik zapisany jako JSON
+    w price_list (id = 1). Tabela price_list pozostaje bez zmian jako kopia.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for table_sql in PRICE_LIST_TABLES:
+        cursor.execute(table_sql)
+    for index_sql in PRICE_LIST_INDEXES:
+        cursor.execute(index_sql)
+
+    if cursor.execute("SELECT 1 FROM price_items LIMIT 1").fetchone():
+        return
+    if not cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'price_list'").fetchone():
+        return
+    row = cursor.execute("SELECT data FROM price_list WHERE id = 1").fetchone()
+    if not row or not row[0]:
+        return
+    try:
+        price_data = json.loads(row[0])
+    except ValueError:
+        logger.error("Nie można odczytać cennika zapisanego jako JSON - pominięto przeniesienie")
+        return
+    for position, (category, category_data) in enumerate(price_data.items()):
+        save_price_category(conn, category, category_data, position, commit=False)
+    logger.info(f"Przeniesiono cennik do tabeli price_items ({len(price_data)} kategorii)")
@@ -0,0 +1,591 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł automatycznych przypomnień dla klientów.
+Harmonogram wyznacza przypomnienia należne danego dnia (zbliżający się odbiór depozytu,
+zaległy depozyt, jutrzejsza wizyta) zapytaniami po indeksach na deposits.pickup_date
+i appointments.appointment_date, pomija klientów, którym niedawno wysłano wiadomość
+(sms_logs, email_logs), i zapisuje gotowe treści w kolejce notification_queue.
+Wysyłka kolejki odbywa się partiami, poza wątkiem interfejsu.
+"""
+
+import os
+import json
+import sqlite3
+import logging
+from datetime import date, datetime, timedelta
+
+from utils.paths import CONFIG_DIR, DATABASE_PATH
+from utils.sms_sender import SMSSender, format_phone_number
+from utils.status_lookup import format_deposit_code
+from utils.deposit_lifecycle import QUEUE_PENDING, QUEUE_SENT, QUEUE_FAILED, STATUS_ACTIVE, STATUS_PICKUP, STATUS_OVERDUE
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Rodzaje przypomnień
+REMINDER_PICKUP = "deposit_pickup"
+REMINDER_OVERDUE = "deposit_overdue"
+REMINDER_APPOINTMENT = "appointment"
+
+# Domyślne terminy: przypomnienie o odbiorze N dni przed terminem, o zaległym depozycie
+# N dni po terminie, o wizycie N dni wcześniej
+DEFAULT_PICKUP_REMINDER_DAYS = 3
+DEFAULT_OVERDUE_REMINDER_DAYS = 14
+DEFAULT_APPOINTMENT_REMINDER_DAYS = 1
+
+# Klient, któremu w tym okresie wysłano wiadomość o depozycie, nie dostaje przypomnienia
+DEDUPE_DAYS = 3
+
+# Maksymalna liczba zaległych dni nadrabianych po przerwie w pracy aplikacji
+MAX_CATCHUP_DAYS = 7
+
+# Kanały wysyłki
+CHANNEL_SMS = "sms"
+CHANNEL_EMAIL = "email"
+
+# Status udanej wysyłki w sms_logs i email_logs
+LOG_SENT = "Wysłany"
+
+# Domyślne szablony SMS (nadpisywane przez templates.json w katalogu konfiguracji)
+DEFAULT_SMS_TEMPLATES = {
+    "deposit": {
+        "Przyjęcie depozytu": "Dziekujemy za skorzystanie z naszych uslug. Przyjeto depozyt {deposit_id}. Ilosc opon: {quantity}. Odbior: {pickup_date}. {company_name}",
+        "Przypomnienie o odbiorze": "Przypominamy o odbiorze depozytu {deposit_id}. Opony czekaja na odbior. W razie pytan prosimy o kontakt: {company_phone}. {company_name}",
+        "Zaległy depozyt": "Depozyt {deposit_id} zalega w naszym magazynie. Prosimy o pilny kontakt: {company_phone}. {company_name}",
+        "Do odbioru": "Depozyt {deposit_id} mozna odebrac od {pickup_date}. W razie pytan prosimy o kontakt: {company_phone}. {company_name}",
+    },
+    "appointment": {
+        "Przypomnienie o wizycie": "Przypomnienie: {client_name}, masz wizyte {appointment_date} o {appointment_time} - {service_type}. Pozdrawiamy, {company_name}",
+    },
+}
+
+# Tematy wiadomości e-mail dla szablonów
+EMAIL_SUBJECTS = {
+    "Przypomnienie o odbiorze": "Przypomnienie o odbiorze depozytu {deposit_id}",
+    "Zaległy depozyt": "Zaległy depozyt {deposit_id}",
+    "Do odbioru": "Depozyt {deposit_id} do odbioru",
+    "Przypomnienie o wizycie": "Przypomnienie o wizycie w serwisie",
+}
+
+# Reguły przypomnień o depozytach: {rodzaj: (statusy depozytu, szablon, przesunięcie terminu w dniach)}
+DEPOSIT_REMINDER_RULES = {
+    REMINDER_PICKUP: ((STATUS_ACTIVE, STATUS_PICKUP), "Przypomnienie o odbiorze", 1),
+    REMINDER_OVERDUE: ((STATUS_OVERDUE,), "Zaległy depozyt", -1),
+}
+
+REMINDER_COLUMNS = {
+    "reminder_kind": "TEXT",
+    "appointment_id": "INTEGER",
+    "due_date": "TEXT",
+    "recipient": "TEXT",
+    "subject": "TEXT",
+    "content": "TEXT",
+}
+
+REMINDER_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS reminder_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_date TEXT NOT NULL,
+        run_day TEXT NOT NULL,
+        scheduled INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+REMINDER_INDEXES = [
+    # Jedno przypomnienie danego rodzaju na depozyt/wizytę, kanał i termin
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_notification_queue_reminder ON notification_queue("
+    "reminder_kind, channel, COALESCE(deposit_id, 0), COALESCE(appointment_id, 0), due_date) "
+    "WHERE reminder_kind IS NOT NULL",
+    "CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments(appointment_date)",
+    "CREATE INDEX IF NOT EXISTS idx_sms_logs_deposit_date ON sms_logs(deposit_id, sent_date)",
+    "CREATE INDEX IF NOT EXISTS idx_email_logs_deposit_date ON email_logs(deposit_id, sent_date)",
+]
+
+# Dziennik wiadomości używany do pomijania duplikatów: {kanał: tabela}
+MESSAGE_LOGS = {
+    CHANNEL_SMS: "sms_logs",
+    CHANNEL_EMAIL: "email_logs",
+}
+
+# Kolumna kontaktu klienta dla kanału
+CLIENT_CONTACT_COLUMNS = {
+    CHANNEL_SMS: "phone_number",
+    CHANNEL_EMAIL: "email",
+}
+
+
+def load_sms_templates(template_type):
+    """
+    Zwraca szablony SMS danego typu: domyślne uzupełnione szablonami z templates.json.
+
+    Args:
+        template_type (str): Typ szablonu ('deposit', 'appointment')
+
+    Returns:
+        dict: Słownik {nazwa szablonu: treść}
+    """
+    templates = dict(DEFAULT_SMS_TEMPLATES.get(template_type, {}))
+    templates_file = os.path.join(CONFIG_DIR, "templates.json")
+    if os.path.exists(templates_file):
+        try:
+            with open(templates_file, 'r', encoding='utf-8') as f:
+                templates.update(json.load(f).get(f"sms_{template_type}", {}))
+        except Exception as e:
+            logger.error(f"Błąd podczas wczytywania szablonów SMS: {e}")
+    return templates
+
+
+def fill_template(template, data):
+    """
+    Podstawia dane w miejsce znaczników {klucz} szablonu.
+
+    Args:
+        template (str): Treść szablonu
+        data (dict): Dane do podstawienia
+
+    Returns:
+        str: Wypełniony szablon
+    """
+    for key, value in data.items():
+        template = template.replace("{" + key + "}", "" if value is None else str(value))
+    return template
+
+
+def _display_date(value):
+    """Zwraca datę w formacie DD-MM-RRRR (tekst bez zmian, jeśli nie jest datą)."""
+    try:
+        return datetime.strptime(str(value)[:10], "%Y-%m-%d").strftime("%d-%m-%Y")
+    except ValueError:
+        return value or ""
+
+
+def _deposit_message_data(row):
+    """Zwraca dane szablonu dla wiersza depozytu z klientem."""
+    return {
+        "deposit_id": format_deposit_code(row["deposit_id"], row["deposit_code"]),
+        "client_name": row["client_name"],
+        "phone_number": row["phone_number"],
+        "tire_size": row["tire_size"],
+        "tire_type": row["tire_type"],
+        "quantity": row["quantity"],
+        "location": row["location"],
+        "deposit_date": _display_date(row["deposit_date"]),
+        "pickup_date": _display_date(row["pickup_date"]),
+        "status": row["status"],
+        "current_date": date.today().strftime("%d-%m-%Y"),
+    }
+
+
+def _appointment_message_data(row):
+    """Zwraca dane szablonu dla wiersza wizyty z klientem."""
+    return {
+        "client_name": row["client_name"],
+        "phone_number": row["phone_number"],
+        "appointment_date": _display_date(row["appointment_date"]),
+        "appointment_time": row["appointment_time"] or "",
+        "service_type": row["service_type"] or "",
+        "current_date": date.today().strftime("%d-%m-%Y"),
+    }
+
+
+def _recently_messaged(channel, dedupe_since):
+    """Zwraca warunek SQL: do klienta wysłano już wiadomość o depozycie d."""
+    return (
+        f"EXISTS (SELECT 1 FROM {MESSAGE_LOGS[channel]} l WHERE l.deposit_id = d.id "
+        f"AND l.sent_date >= '{dedupe_since}' AND l.status = '{LOG_SENT}')"
+    )
+
+
+def get_due_reminders(conn, day, channel=CHANNEL_SMS, pickup_days=DEFAULT_PICKUP_REMINDER_DAYS,
+                      overdue_days=DEFAULT_OVERDUE_REMINDER_DAYS,
+                      appointment_days=DEFAULT_APPOINTMENT_REMINDER_DAYS):
+    """
+    Wyznacza przypomnienia należne danego dnia dla jednego kanału.
+
+    Args:
+        conn: Połączenie z bazą danych
+        day (date): Dzień, dla którego wyznaczane są przypomnienia
+        channel (str): 'sms' lub 'email'
+        pickup_days (int): Ile dni przed terminem odbioru przypominać o odbiorze
+        overdue_days (int): Ile dni po terminie przypominać o zaległym depozycie
+        appointment_days (int): Ile dni przed wizytą przypominać o wizycie
+
+    Returns:
+        list: Lista słowników (reminder_kind, deposit_id, appointment_id, client_id, recipient,
+              template_key, data)
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    contact = CLIENT_CONTACT_COLUMNS[channel]
+    dedupe_since = (day - timedelta(days=DEDUPE_DAYS)).strftime("%Y-%m-%d")
+    reminders = []
+
+    offsets = {REMINDER_PICKUP: pickup_days, REMINDER_OVERDUE: overdue_days}
+    for kind, (statuses, template_key, direction) in DEPOSIT_REMINDER_RULES.items():
+        target = day + timedelta(days=direction * offsets[kind])
+        # pickup_date może zawierać godzinę - zakres obejmuje cały dzień
+        rows = cursor.execute(f"""
+            SELECT d.id AS deposit_id, d.code AS deposit_code, d.client_id, d.tire_size, d.tire_type, d.quantity, d.location,
+                   d.deposit_date, d.pickup_date, d.status,
+                   c.name AS client_name, c.phone_number, c.{contact} AS recipient
+            FROM deposits d
+            JOIN clients c ON c.id = d.client_id
+            WHERE d.status IN ({", ".join("?" * len(statuses))})
+              AND d.pickup_date >= ? AND d.pickup_date < ?
+              AND COALESCE(c.{contact}, '') != ''
+              AND NOT {_recently_messaged(channel, dedupe_since)}
+        """, statuses + (target.strftime("%Y-%m-%d"), (target + timedelta(days=1)).strftime("%Y-%m-%d"))).fetchall()
+        for row in rows:
+            reminders.append({
+                "reminder_kind": kind,
+                "deposit_id": row["deposit_id"],
+                "appointment_id": None,
+                "client_id": row["client_id"],
+                "recipient": row["recipient"],
+                "template_key": template_key,
+                "data": _deposit_message_data(row),
+            })
+
+    target = (day + timedelta(days=appointment_days)).strftime("%Y-%m-%d")
+    rows = cursor.execute(f"""
+        SELECT a.id AS appointment_id, a.client_id, a.appointment_date, a.appointment_time, a.service_type,
+               c.name AS client_name, c.phone_number, c.{contact} AS recipient
+        FROM appointments a
+        JOIN clients c ON c.id = a.client_id
+        WHERE a.appointment_date = ? AND a.status = 'Zaplanowana'
+          AND COALESCE(c.{contact}, '') != ''
+    """, (target,)).fetchall()
+    for row in rows:
+        reminders.append({
+            "reminder_kind": REMINDER_APPOINTMENT,
+            "deposit_id": None,
+            "appointment_id": row["appointment_id"],
+            "client_id": row["client_id"],
+            "recipient": row["recipient"],
+            "template_key": "Przypomnienie o wizycie",
+            "data": _appointment_message_data(row),
+        })
+    return reminders
+
+
+def render_queued_notifications(conn, company_data):
+    """
+    Uzupełnia treść oczekujących powiadomień dodanych bez treści (np. przez zmiany statusu
+    depozytów w utils.deposit_lifecycle).
+
+    Args:
+        conn: Połączenie z bazą danych
+        company_data (dict): Dane firmy do szablonów (company_name, company_phone, ...)
+
+    Returns:
+        int: Liczba uzupełnionych powiadomień
+    """
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    rows = cursor.execute("""
+        SELECT q.id, q.channel, q.template_key,
+               d.id AS deposit_id, d.code AS deposit_code, d.tire_size, d.tire_type, d.quantity, d.location,
+               d.deposit_date, d.pickup_date, d.status,
+               c.name AS client_name, c.phone_number, c.email
+        FROM notification_queue q
+        JOIN deposits d ON d.id = q.deposit_id
+        JOIN clients c ON c.id = d.client_id
+        WHERE q.status = ? AND q.content IS NULL
+    """, (QUEUE_PENDING,)).fetchall()
+    if not rows:
+        return 0
+
+    templates = load_sms_templates("deposit")
+    updates = []
+    for row in rows:
+        data = {**company_data, **_deposit_message_data(row)}
+        recipient = row["email"] if row["channel"] == CHANNEL_EMAIL else row["phone_number"]
+        updates.append((
+            recipient,
+            fill_template(EMAIL_SUBJECTS.get(row["template_key"], ""), data),
+            fill_template(templates.get(row["template_key"], ""), data),
+            row["id"],
+        ))
+    conn.executemany("UPDATE notification_queue SET recipient = ?, subject = ?, content = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+def schedule_reminders(conn, today=None, channels=(CHANNEL_SMS,), company_data=None,
+                       pickup_days=DEFAULT_PICKUP_REMINDER_DAYS, overdue_days=DEFAULT_OVERDUE_REMINDER_DAYS,
+                       appointment_days=DEFAULT_APPOINTMENT_REMINDER_DAYS):
+    """
+    Dodaje do kolejki przypomnienia należne od dnia po ostatnim przebiegu do dziś
+    (najwyżej MAX_CATCHUP_DAYS wstecz). Ponowne uruchomienie nie tworzy duplikatów.
+
+    Args:
+        conn: Połączenie z bazą danych
+        today (date, optional): Bieżąca data
+        channels (tuple): Kanały wysyłki ('sms', 'email')
+        company_data (dict, optional): Dane firmy do szablonów
+        pickup_days (int): Ile dni przed terminem odbioru przypominać o odbiorze
+        overdue_days (int): Ile dni po terminie przypominać o zaległym depozycie
+        appointment_days (int): Ile dni przed wizytą przypominać o wizycie
+
+    Returns:
+        int: Liczba nowych przypomnień w kolejce
+    """
+    today = today or date.today()
+    company_data = company_data or {}
+    templates = {
+        REMINDER_APPOINTMENT: load_sms_templates("appointment"),
+        None: load_sms_templates("deposit"),
+    }
+    try:
+        last_day = conn.execute("SELECT MAX(run_day) FROM reminder_runs").fetchone()[0]
+        first_day = today - timedelta(days=MAX_CATCHUP_DAYS)
+        if last_day:
+            first_day = max(first_day, datetime.strptime(last_day, "%Y-%m-%d").date() + timedelta(days=1))
+        first_day = min(first_day, today)
+
+        scheduled = 0
+        day = first_day
+        while day <= today:
+            for channel in channels:
+                for reminder in get_due_reminders(conn, day, channel, pickup_days, overdue_days, appointment_days):
+                    # Przypomnienia o terminach, które już minęły, nie są nadrabiane
+                    if day < today and reminder["reminder_kind"] != REMINDER_OVERDUE:
+                        continue
+                    data = {**company_data, **reminder["data"]}
+                    kind_templates = templates.get(reminder["reminder_kind"], templates[None])
+                    cursor = conn.execute("""
+                        INSERT OR IGNORE INTO notification_queue (
+                            channel, client_id, deposit_id, appointment_id, template_key,
+                            reminder_kind, due_date, recipient, subject, content
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, (
+                        channel, reminder["client_id"], reminder["deposit_id"], reminder["appointment_id"],
+                        reminder["template_key"], reminder["reminder_kind"], day.strftime("%Y-%m-%d"),
+                        reminder["recipient"],
+                        fill_template(EMAIL_SUBJECTS.get(reminder["template_key"], ""), data),
+                        fill_template(kind_templates.get(reminder["template_key"], ""), data),
+                    ))
+                    scheduled += cursor.rowcount
+            day += timedelta(days=1)
+
+        render_queued_notifications(conn, company_data)
+        conn.execute(
+            "INSERT INTO reminder_runs (run_date, run_day, scheduled) VALUES (?, ?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), today.strftime("%Y-%m-%d"), scheduled)
+        )
+        conn.commit()
+        if scheduled:
+            logger.info(f"Zaplanowano {scheduled} przypomnień dla klientów")
+        return scheduled
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Błąd podczas planowania przypomnień: {e}")
+        return 0
+
+
+def get_delivery_config(settings):
+    """
+    Zwraca ustawienia wysyłki potrzebne poza wątkiem interfejsu.
+
+    Args:
+        settings: Ustawienia aplikacji (obiekt z metodą value(klucz, domyślna, type=...))
+
+    Returns:
+        dict: Konfiguracja kanałów, danych firmy i serwerów SMS/SMTP
+    """
+    channels = settings.value("reminder_channels", CHANNEL_SMS)
+    return {
+        "channels": tuple(channel.strip() for channel in channels.split(",") if channel.strip() in MESSAGE_LOGS),
+        "pickup_days": settings.value("reminder_pickup_days", DEFAULT_PICKUP_REMINDER_DAYS, type=int),
+        "overdue_days": settings.value("reminder_overdue_days", DEFAULT_OVERDUE_REMINDER_DAYS, type=int),
+        "appointment_days": settings.value("reminder_appointment_days", DEFAULT_APPOINTMENT_REMINDER_DAYS, type=int),
+        "company_data": {
+            "company_name": settings.value("company_name", "Serwis Opon"),
+            "company_address": settings.value("company_address", ""),
+            "company_phone": settings.value("company_phone", ""),
+            "company_email": settings.value("company_email", ""),
+            "company_website": settings.value("company_website", ""),
+        },
+        "enable_sms": settings.value("enable_sms", False, type=bool),
+        "sms_api_key": settings.value("sms_api_key", ""),
+        "sms_sender": settings.value("sms_sender", ""),
+        "smtp_server": settings.value("smtp_server", ""),
+        "smtp_port": settings.value("smtp_port", 587, type=int),
+        "use_ssl": settings.value("use_ssl", True, type=bool),
+        "email_address": settings.value("email_address", ""),
+        "email_password": settings.value("email_password", ""),
+    }
+
+
+def schedule_reminders_if_due(conn, settings, today=None):
+    """
+    Planuje przypomnienia z parametrami z ustawień, jeśli nie były planowane danego dnia.
+
+    Args:
+        conn: Połączenie z bazą danych
+        settings: Ustawienia aplikacji (obiekt z metodą value(klucz, domyślna, type=...))
+        today (date, optional): Bieżąca data
+
+    Returns:
+        int: Liczba nowych przypomnień w kolejce
+    """
+    if not settings.value("reminders_enabled", False, type=bool):
+        return 0
+    today = today or date.today()
+    try:
+        last_day = conn.execute("SELECT MAX(run_day) FROM reminder_runs").fetchone()[0]
+    except Exception as e:
+        logger.error(f"Błąd podczas sprawdzania ostatniego planowania przypomnień: {e}")
+        return 0
+    if last_day and last_day >= today.strftime("%Y-%m-%d"):
+        return 0
+
+    config = get_delivery_config(settings)
+    return schedule_reminders(
+        conn, today, config["channels"], config["company_data"],
+        config["pickup_days"], config["overdue_days"], config["appointment_days"]
+    )
+
+
+def _open_smtp(config):
+    """Otwiera sesję SMTP według konfiguracji wysyłki."""
+    import smtplib
+
+    session = smtplib.SMTP(config["smtp_server"], config["smtp_port"])
+    if config["use_ssl"]:
+        session.starttls()
+    session.login(config["email_address"], config["email_password"])
+    return session
+
+
+def deliver_pending_notifications(conn, config, limit=500):
+    """
+    Wysyła partię oczekujących powiadomień z kolejki i zapisuje je w sms_logs / email_logs.
+    Kanały bez kompletnej konfiguracji są pomijane (powiadomienia czekają w kolejce).
+
+    Args:
+        conn: Połączenie z bazą danych
+        config (dict): Konfiguracja z get_delivery_config
+        limit (int): Maksymalna liczba powiadomień w partii
+
+    Returns:
+        tuple: (liczba wysłanych, liczba błędów)
+    """
+    channels = []
+    if config["enable_sms"] and config["sms_api_key"] and config["sms_sender"]:
+        channels.append(CHANNEL_SMS)
+    if config["smtp_server"] and config["email_address"] and config["email_password"]:
+        channels.append(CHANNEL_EMAIL)
+    if not channels:
+        return 0, 0
+
+    rows = conn.execute(f"""
+        SELECT id, channel, deposit_id, recipient, subject, content
+        FROM notification_queue
+        WHERE status = ? AND content IS NOT NULL AND channel IN ({", ".join("?" * len(channels))})
+        ORDER BY id
+        LIMIT ?
+    """, (QUEUE_PENDING, *channels, limit)).fetchall()
+    if not rows:
+        return 0, 0
+
+    sms_sender = SMSSender(config["sms_api_key"], config["sms_sender"]) if CHANNEL_SMS in channels else None
+    smtp_session = None
+    sent = failed = 0
+    try:
+        for queue_id, channel, deposit_id, recipient, subject, content in rows:
+            sent_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            try:
+                if channel == CHANNEL_SMS:
+                    recipient = format_phone_number(recipient or "")
+                    success, message = sms_sender.send_sms(recipient, content)
+                    if not success:
+                        raise Exception(message)
+                else:
+                    from email.mime.text import MIMEText
+
+                    if smtp_session is None:
+                        smtp_session = _open_smtp(config)
+                    msg = MIMEText(content, "plain", "utf-8")
+                    msg["From"] = config["email_address"]
+                    msg["To"] = recipient
+                    msg["Subject"] = subject or ""
+                    smtp_session.sendmail(config["email_address"], recipient, msg.as_string())
+                log_status, error = LOG_SENT, None
+                sent += 1
+            except Exception as e:
+                logger.error(f"Błąd podczas wysyłania powiadomienia {queue_id} ({channel}): {e}")
+                log_status, error = f"Błąd: {e}", str(e)
+                failed += 1
+
+            if channel == CHANNEL_SMS:
+                conn.execute(
+                    "INSERT INTO sms_logs (deposit_id, phone_number, content, sent_date, status) VALUES (?, ?, ?, ?, ?)",
+                    (deposit_id, recipient, content, sent_date, log_status)
+                )
+            else:
+                conn.execute(
+                    "INSERT INTO email_logs (deposit_id, email, subject, sent_date, status) VALUES (?, ?, ?, ?, ?)",
+                    (deposit_id, recipient, subject, sent_date, log_status)
+                )
+            conn.execute(
+                "UPDATE notification_queue SET status = ?, sent_at = ?, error = ? WHERE id = ?",
+                (QUEUE_FAILED if error else QUEUE_SENT, sent_date, error, queue_id)
+            )
+            conn.commit()
+    finally:
+        if smtp_session is not None:
+            try:
+                smtp_session.quit()
+            except Exception:
+                pass
+
+    logger.info(f"Wysłano {sent} powiadomień z kolejki (błędy: {failed})")
+    return sent, failed
+
+
+def run_reminder_delivery(config, database_path=DATABASE_PATH, limit=500):
+    """
+    Wysyła partię powiadomień z kolejki na osobnym połączeniu (do uruchamiania w wątku w tle).
+
+    Args:
+        config (dict): Konfiguracja z get_delivery_config
+        database_path (str): Ścieżka do bazy danych
+        limit (int): Maksymalna liczba powiadomień w partii
+
+    Returns:
+        tuple: (liczba wysłanych, liczba błędów)
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(database_path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        return deliver_pending_notifications(conn, config, limit)
+    except Exception as e:
+        logger.error(f"Błąd podczas wysyłki powiadomień z kolejki: {e}")
+        return 0, 0
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def install_reminders(conn):
+    """
+    Rozszerza kolejkę powiadomień o dane przypomnień i tworzy indeksy harmonogramu.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(notification_queue)").fetchall()}
+    for name, column_type in REMINDER_COLUMNS.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE notification_queue ADD COLUMN {name} {column_type}")
+
+    for table_sql in REMINDER_TABLES:
+        cursor.execute(table_sql)
+    for index_sql in REMINDER_INDEXES:
+        cursor.execute(index_sql)
@@ -0,0 +1,883 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł replikacji zmian między stanowiskami (bez serwera centralnego).
+Zmiany wierszy zapisane przez wyzwalacze w change_log są oznaczane znacznikami hybrydowego
+zegara logicznego (HLC) i identyfikatorami wierszy niezależnymi od lokalnych kluczy
+(tabela sync_rows). Stanowisko eksportuje tylko własne zmiany jako skompresowany zestaw
+zmian (changeset), a zestawy innych stanowisk stosuje z regułami konfliktów ustalonymi dla
+tabel: ostatni zapis wygrywa dla danych klientów, depozytów itp. i łączenie addytywne dla
+logów wiadomości. Ilości opon i części przenoszone są jako przyrosty względem ostatnio
+uzgodnionej ilości, więc jednoczesne sprzedaże na dwóch stanowiskach sumują się.
+Lokalne identyfikatory wierszy różnią się między stanowiskami - depozyty mają replikowany
+kod (np. D012), nadawany na stanowisku, które je przyjęło (z kodem stanowiska, jeśli
+ustawiono). Zestawy wymieniane są przez wspólny katalog (udział sieciowy, dysk
+w chmurze). Wszystkie stanowiska muszą zaczynać od kopii tej samej bazy danych; identyfikator
+stanowiska przechowywany jest poza bazą, więc skopiowana baza otrzymuje własny identyfikator.
+"""
+
+import os
+import gzip
+import json
+import time
+import uuid
+import sqlite3
+import logging
+from datetime import datetime
+
+from utils.paths import CONFIG_DIR, DATABASE_PATH
+from utils.change_log import OP_INSERT, OP_DELETE
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Reguły rozwiązywania konfliktów
+RULE_LAST_WRITER_WINS = "lww"
+RULE_APPEND_ONLY = "append"
+
+# Reguła dla każdej replikowanej tabeli
+CONFLICT_RULES = {
+    "clients": RULE_LAST_WRITER_WINS,
+    "vehicles": RULE_LAST_WRITER_WINS,
+    "deposits": RULE_LAST_WRITER_WINS,
+    "inventory": RULE_LAST_WRITER_WINS,
+    "parts": RULE_LAST_WRITER_WINS,
+    "orders": RULE_LAST_WRITER_WINS,
+    "order_items": RULE_LAST_WRITER_WINS,
+    "appointments": RULE_LAST_WRITER_WINS,
+    "locations": RULE_LAST_WRITER_WINS,
+    "sms_logs": RULE_APPEND_ONLY,
+    "email_logs": RULE_APPEND_ONLY,
+}
+
+# Kolumny ilości replikowane jako przyrosty: {tabela: kolumna}
+DELTA_COLUMNS = {
+    "inventory": "quantity",
+    "parts": "quantity",
+}
+
+# Wersja formatu zestawu zmian
+CHANGESET_FORMAT = 1
+
+# Rozszerzenie plików zestawów zmian we wspólnym katalogu
+CHANGESET_EXTENSION = ".changeset.json.gz"
+
+# Plik z identyfikatorem stanowiska
+NODE_ID_PATH = os.path.join(CONFIG_DIR, "replication_node_id")
+
+# Nazwa dołączonej bazy archiwum (utils.archive)
+ARCHIVE_SCHEMA = "archive"
+
+# Prefiks identyfikatorów wierszy istniejących przed włączeniem replikacji ("0-<id>") -
+# na kopiach tej samej bazy oznaczają te same wiersze
+BOOTSTRAP_UID_PREFIX = "0-"
+
+REPLICATION_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS sync_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        node_id TEXT NOT NULL,
+        hlc TEXT NOT NULL DEFAULT '',
+        last_change_id INTEGER NOT NULL DEFAULT 0,
+        last_exported_hlc TEXT NOT NULL DEFAULT ''
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sync_rows (
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        sync_uid TEXT NOT NULL,
+        hlc TEXT NOT NULL,
+        origin TEXT NOT NULL,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (table_name, row_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sync_imports (
+        file_name TEXT PRIMARY KEY,
+        node_id TEXT,
+        imported_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        applied INTEGER NOT NULL DEFAULT 0,
+        skipped INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+# Zmiany innych stanowisk, których nie udało się zastosować (do przejrzenia przez obsługę)
+SYNC_CONFLICT_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS sync_conflicts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recorded_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        table_name TEXT NOT NULL,
+        sync_uid TEXT NOT NULL,
+        hlc TEXT NOT NULL,
+        origin TEXT NOT NULL,
+        reason TEXT NOT NULL,
+        data TEXT
+    )
+    """,
+]
+
+# Ilość wiersza uzgodniona z innymi stanowiskami (po ostatnim eksporcie lub zastosowaniu
+# zmian) - różnica względem bieżącej ilości to lokalny przyrost do wyeksportowania
+SYNC_QUANTITY_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS sync_quantities (
+        table_name TEXT NOT NULL,
+        row_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        PRIMARY KEY (table_name, row_id)
+    ) WITHOUT ROWID
+    """,
+]
+
+# Kod depozytu nadawany przy dodaniu: "D" + kod stanowiska + numer (np. D012, DB012).
+# Depozyty z innych stanowisk przychodzą z gotowym kodem.
+DEPOSIT_CODE_TRIGGERS = {
+    "trg_deposits_code": """
+        AFTER INSERT ON deposits WHEN NEW.code IS NULL BEGIN
+            UPDATE deposits
+            SET code = 'D' || COALESCE((SELECT station_code FROM sync_state WHERE id = 1), '')
+                       || printf('%03d', NEW.id)
+            WHERE id = NEW.id;
+        END
+    """,
+}
+
+REPLICATION_INDEXES = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_sync_rows_uid ON sync_rows(table_name, sync_uid)",
+    "CREATE INDEX IF NOT EXISTS idx_sync_rows_origin_hlc ON sync_rows(origin, hlc)",
+]
+
+
+class HybridLogicalClock:
+    """
+    Hybrydowy zegar logiczny: czas fizyczny (ms) z licznikiem zdarzeń i identyfikatorem stanowiska.
+    Znaczniki w postaci tekstowej "czas-licznik-stanowisko" porównuje się leksykograficznie.
+    """
+
+    def __init__(self, node_id, last=""):
+        """
+        Args:
+            node_id (str): Identyfikator stanowiska
+            last (str): Ostatni wydany znacznik (pusty dla nowego zegara)
+        """
+        self.node_id = node_id
+        self.wall, self.counter = self.parse(last)[:2] if last else (0, 0)
+
+    @staticmethod
+    def parse(stamp):
+        """
+        Rozkłada znacznik na (czas ms, licznik, stanowisko).
+
+        Args:
+            stamp (str): Znacznik HLC
+
+        Returns:
+            tuple: (czas ms, licznik, stanowisko)
+        """
+        wall, counter, node = stamp.split("-", 2)
+        return int(wall), int(counter), node
+
+    def _format(self):
+        return f"{self.wall:015d}-{self.counter:05d}-{self.node_id}"
+
+    def tick(self, physical_ms=None):
+        """
+        Wydaje znacznik dla zdarzenia lokalnego.
+
+        Args:
+            physical_ms (int, optional): Czas fizyczny zdarzenia (ms); domyślnie bieżący
+
+        Returns:
+            str: Znacznik HLC
+        """
+        physical_ms = int(time.time() * 1000) if physical_ms is None else physical_ms
+        if physical_ms > self.wall:
+            self.wall, self.counter = physical_ms, 0
+        else:
+            self.counter += 1
+        return self._format()
+
+    def receive(self, stamp):
+        """
+        Uwzględnia znacznik otrzymany z innego stanowiska (kolejne znaczniki lokalne będą późniejsze).
+
+        Args:
+            stamp (str): Znacznik HLC innego stanowiska
+        """
+        wall, counter, _node = self.parse(stamp)
+        if wall > self.wall:
+            self.wall, self.counter = wall, counter
+        elif wall == self.wall:
+            self.counter = max(self.counter, counter)
+
+    @property
+    def current(self):
+        """Ostatni wydany znacznik."""
+        return self._format() if self.wall else ""
+
+
+def _load_state(conn):
+    """Zwraca stan replikacji: (node_id, hlc, last_change_id, last_exported_hlc)."""
+    return conn.execute(
+        "SELECT node_id, hlc, last_change_id, last_exported_hlc FROM sync_state WHERE id = 1"
+    ).fetchone()
+
+
+def get_station_node_id():
+    """
+    Zwraca identyfikator tego stanowiska (przy pierwszym użyciu tworzy go i zapisuje w NODE_ID_PATH).
+
+    Returns:
+        str: Identyfikator stanowiska
+    """
+    try:
+        with open(NODE_ID_PATH, "r", encoding="utf-8") as f:
+            node_id = f.read().strip()
+        if node_id:
+            return node_id
+    except FileNotFoundError:
+        pass
+    node_id = uuid.uuid4().hex[:12]
+    os.makedirs(os.path.dirname(NODE_ID_PATH), exist_ok=True)
+    with open(NODE_ID_PATH, "w", encoding="utf-8") as f:
+        f.write(node_id)
+    return node_id
+
+
+def _claim_node(conn):
+    """
+    Przypisuje bazę do tego stanowiska (np. po skopiowaniu bazy z innego stanowiska).
+    Zmiany nieoznaczone w chwili kopiowania oznaczane są jeszcze jako zmiany poprzedniego
+    stanowiska - wszystkie kopie nadają im te same znaczniki i identyfikatory.
+    """
+    node_id = get_station_node_id()
+    if _load_state(conn)[0] != node_id:
+        _capture(conn)
+        logger.info(f"Replikacja: baza danych przypisana do stanowiska {node_id}")
+        conn.execute("UPDATE sync_state SET node_id = ? WHERE id = 1", (node_id,))
+
+
+def get_node_id(conn):
+    """
+    Zwraca identyfikator stanowiska.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        str: Identyfikator stanowiska
+    """
+    return _load_state(conn)[0]
+
+
+def _to_ms(changed_at):
+    """Zamienia datę zmiany z change_log na czas w milisekundach."""
+    try:
+        return int(datetime.strptime(changed_at, "%Y-%m-%d %H:%M:%S").timestamp() * 1000)
+    except (TypeError, ValueError):
+        return int(time.time() * 1000)
+
+
+def _foreign_keys(conn, table):
+    """Zwraca klucze obce tabeli wskazujące tabele replikowane: {kolumna: tabela}."""
+    return {
+        row[3]: row[2] for row in conn.execute(f"PRAGMA foreign_key_list({table})").fetchall()
+        if row[2] in CONFLICT_RULES and row[4] == "id"
+    }
+
+
+def _columns(conn, table):
+    """Zwraca kolumny tabeli."""
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _capture(conn):
+    """Oznacza znacznikami HLC zmiany z change_log jako zmiany stanowiska zapisanego w sync_state."""
+    node_id, hlc, last_change_id, _last_exported = _load_state(conn)
+    clock = HybridLogicalClock(node_id, hlc)
+    tables = tuple(CONFLICT_RULES)
+    changes = conn.execute(f"""
+        SELECT id, changed_at, table_name, row_id, operation FROM change_log
+        WHERE id > ? AND table_name IN ({", ".join("?" * len(tables))})
+        ORDER BY id
+    """, (last_change_id,) + tables).fetchall()
+
+    for _change_id, changed_at, table, row_id, operation in changes:
+        stamp = clock.tick(_to_ms(changed_at))
+        # Nowe wiersze: "<stanowisko>-<id>"; wiersze sprzed replikacji: "0-<id>".
+        # Dodanie zawsze nadaje identyfikator nowego wiersza - wyzwalacze AFTER INSERT
+        # (np. kod depozytu) mogą zapisać w change_log zmianę U przed I.
+        uid = f"{node_id}-{row_id}" if operation == OP_INSERT else f"{BOOTSTRAP_UID_PREFIX}{row_id}"
+        conn.execute("""
+            INSERT INTO sync_rows (table_name, row_id, sync_uid, hlc, origin, deleted) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (table_name, row_id) DO UPDATE SET
+                sync_uid = CASE WHEN ? THEN excluded.sync_uid ELSE sync_uid END,
+                hlc = excluded.hlc, origin = excluded.origin, deleted = excluded.deleted
+        """, (table, row_id, uid, stamp, node_id, 1 if operation == OP_DELETE else 0, operation == OP_INSERT))
+
+    max_change_id = conn.execute("SELECT MAX(id) FROM change_log").fetchone()[0] or 0
+    conn.execute(
+        "UPDATE sync_state SET hlc = ?, last_change_id = ? WHERE id = 1",
+        (clock.current, max(max_change_id, last_change_id))
+    )
+    return len(changes)
+
+
+def capture_changes(conn, commit=True):
+    """
+    Oznacza znacznikami HLC lokalne zmiany zapisane w change_log od ostatniego przebiegu.
+
+    Args:
+        conn: Połączenie z bazą danych
+        commit (bool): Zatwierdź transakcję
+
+    Returns:
+        int: Liczba oznaczonych zmian
+    """
+    _claim_node(conn)
+    count = _capture(conn)
+    if commit:
+        conn.commit()
+    return count
+
+
+def skip_local_changes(conn):
+    """
+    Pomija wpisy change_log zapisane od ostatniego oznaczenia - nie trafią do eksportu.
+    Służy do zmian, których stanowiska nie wymieniają (np. przeniesienie do archiwum);
+    wcześniejsze zmiany należy najpierw oznaczyć (capture_changes) w tej samej transakcji.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    conn.execute("UPDATE sync_state SET last_change_id = (SELECT COALESCE(MAX(id), 0) FROM change_log) WHERE id = 1")
+
+
+def _uid_for(conn, table, row_id):
+    """Zwraca identyfikator replikacji wiersza (dla wierszy sprzed replikacji - "0-<id>")."""
+    row = conn.execute(
+        "SELECT sync_uid FROM sync_rows WHERE table_name = ? AND row_id = ?", (table, row_id)
+    ).fetchone()
+    return row[0] if row else f"{BOOTSTRAP_UID_PREFIX}{row_id}"
+
+
+def _local_row(conn, table, uid):
+    """Zwraca (row_id, hlc) lokalnego wiersza o identyfikatorze replikacji lub (None, None)."""
+    row = conn.execute(
+        "SELECT row_id, hlc FROM sync_rows WHERE table_name = ? AND sync_uid = ?", (table, uid)
+    ).fetchone()
+    if row:
+        return row[0], row[1]
+    if uid.startswith(BOOTSTRAP_UID_PREFIX):
+        row_id = int(uid[len(BOOTSTRAP_UID_PREFIX):])
+        if conn.execute(f"SELECT 1 FROM {table} WHERE id = ?", (row_id,)).fetchone():
+            return row_id, ""
+    return None, None
+
+
+def _synced_quantity(conn, table, row_id):
+    """Zwraca ilość wiersza uzgodnioną z innymi stanowiskami lub None."""
+    row = conn.execute(
+        "SELECT quantity FROM sync_quantities WHERE table_name = ? AND row_id = ?", (table, row_id)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _set_synced_quantity(conn, table, row_id, quantity):
+    """Zapisuje ilość wiersza uzgodnioną z innymi stanowiskami."""
+    conn.execute("""
+        INSERT INTO sync_quantities (table_name, row_id, quantity) VALUES (?, ?, ?)
+        ON CONFLICT (table_name, row_id) DO UPDATE SET quantity = excluded.quantity
+    """, (table, row_id, quantity))
+
+
+def _apply_quantity_delta(conn, table, row_id, column, delta):
+    """
+    Dodaje przyrost ilości innego stanowiska do wiersza i do ilości uzgodnionej
+    (lokalny, jeszcze niewyeksportowany przyrost pozostaje bez zmian).
+
+    Returns:
+        bool: True, jeśli wiersz istnieje
+    """
+    cursor = conn.execute(
+        f"UPDATE {table} SET {column} = COALESCE({column}, 0) + ? WHERE id = ?", (delta, row_id)
+    )
+    if cursor.rowcount == 0:
+        return False
+    synced = _synced_quantity(conn, table, row_id)
+    if synced is None:
+        synced = conn.execute(f"SELECT {column} FROM {table} WHERE id = ?", (row_id,)).fetchone()[0] - delta
+    _set_synced_quantity(conn, table, row_id, synced + delta)
+    return True
+
+
+def _has_local_delta(conn, table, row_id):
+    """Sprawdza, czy ilość wiersza ma lokalny przyrost, którego jeszcze nie wyeksportowano."""
+    column = DELTA_COLUMNS[table]
+    row = conn.execute(f"""
+        SELECT t.{column} - q.quantity FROM {table} t
+        JOIN sync_quantities q ON q.table_name = ? AND q.row_id = t.id
+        WHERE t.id = ?
+    """, (table, row_id)).fetchone()
+    return bool(row and row[0])
+
+
+def export_changeset(conn, since_hlc=""):
+    """
+    Tworzy zestaw własnych zmian stanowiska nowszych niż podany znacznik.
+    Klucze obce zapisywane są jako identyfikatory replikacji wierszy nadrzędnych, a ilości
+    z DELTA_COLUMNS także jako przyrost od ostatniego eksportu. Uzgodnione ilości są
+    zmieniane bez zatwierdzenia - zestaw należy zapisać przed commit (export_to_folder).
+
+    Args:
+        conn: Połączenie z bazą danych
+        since_hlc (str): Znacznik ostatniego eksportu
+
+    Returns:
+        dict: Zestaw zmian {"format", "node", "since", "until", "changes"}
+    """
+    capture_changes(conn)
+    node_id = get_node_id(conn)
+    rows = conn.execute("""
+        SELECT table_name, row_id, sync_uid, hlc, deleted FROM sync_rows
+        WHERE origin = ? AND hlc > ?
+        ORDER BY hlc
+    """, (node_id, since_hlc)).fetchall()
+
+    changes = []
+    foreign_keys = {}
+    columns = {}
+    for table, row_id, uid, stamp, deleted in rows:
+        change = {"table": table, "uid": uid, "hlc": stamp}
+        if deleted:
+            change["op"] = "delete"
+        else:
+            if table not in columns:
+                columns[table] = _columns(conn, table)
+                foreign_keys[table] = _foreign_keys(conn, table)
+            values = conn.execute(f"SELECT * FROM {table} WHERE id = ?", (row_id,)).fetchone()
+            if values is None:
+                continue
+            data = {name: value for name, value in zip(columns[table], tuple(values)) if name != "id"}
+            refs = {}
+            for column, parent in foreign_keys[table].items():
+                if data.get(column) is not None:
+                    refs[column] = [parent, _uid_for(conn, parent, data.pop(column))]
+            change.update({"op": "upsert", "data": data, "refs": refs})
+            delta_column = DELTA_COLUMNS.get(table)
+            if delta_column and data.get(delta_column) is not None:
+                synced = _synced_quantity(conn, table, row_id)
+                if synced is not None:
+                    change["deltas"] = {delta_column: data[delta_column] - synced}
+                _set_synced_quantity(conn, table, row_id, data[delta_column])
+        changes.append(change)
+
+    return {
+        "format": CHANGESET_FORMAT,
+        "node": node_id,
+        "since": since_hlc,
+        "until": changes[-1]["hlc"] if changes else since_hlc,
+        "changes": changes,
+    }
+
+
+def _is_archived(conn, table, row_id):
+    """Sprawdza, czy wiersz został przeniesiony do dołączonego archiwum (utils.archive)."""
+    if not any(row[1] == ARCHIVE_SCHEMA for row in conn.execute("PRAGMA database_list").fetchall()):
+        return False
+    try:
+        return conn.execute(f"SELECT 1 FROM {ARCHIVE_SCHEMA}.{table} WHERE id = ?", (row_id,)).fetchone() is not None
+    except sqlite3.OperationalError:
+        # Tabela nie jest archiwizowana
+        return False
+
+
+def _record_conflict(conn, change, node, reason):
+    """Zapisuje zmianę innego stanowiska, której nie zastosowano, w sync_conflicts."""
+    logger.warning(f"Replikacja: konflikt {change['table']} {change['uid']}: {reason}")
+    conn.execute(
+        "INSERT INTO sync_conflicts (table_name, sync_uid, hlc, origin, reason, data) VALUES (?, ?, ?, ?, ?, ?)",
+        (change["table"], change["uid"], change["hlc"], node, reason,
+         json.dumps(change.get("data"), ensure_ascii=False, default=str))
+    )
+
+
+def _apply_change(conn, change, columns, clock):
+    """
+    Stosuje jedną zmianę innego stanowiska.
+    Przyrost ilości (DELTA_COLUMNS) dodawany jest zawsze, a pozostałe kolumny według
+    reguły konfliktów tabeli. Wiersz z lokalnym, jeszcze niewyeksportowanym przyrostem
+    zostaje zmianą tego stanowiska (z nowym znacznikiem), aby przyrost trafił do eksportu.
+
+    Args:
+        conn: Połączenie z bazą danych
+        change (dict): Zmiana z zestawu zmian
+        columns (set): Kolumny tabeli (bez id)
+        clock (HybridLogicalClock): Zegar tego stanowiska
+
+    Returns:
+        str: 'applied', 'skipped' lub 'deferred' (brak wiersza nadrzędnego)
+    """
+    table = change["table"]
+    rule = CONFLICT_RULES.get(table)
+    if rule is None:
+        return "skipped"
+    node = HybridLogicalClock.parse(change["hlc"])[2]
+    row_id, local_hlc = _local_row(conn, table, change["uid"])
+
+    if change["op"] == "delete":
+        # Logi łączone są addytywnie - usunięcia (np. archiwizacja) nie są przenoszone
+        if rule == RULE_APPEND_ONLY or row_id is None or local_hlc >= change["hlc"]:
+            return "skipped"
+        try:
+            conn.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+        except sqlite3.IntegrityError as e:
+            logger.warning(f"Replikacja: nie można usunąć {table} {row_id}: {e}")
+            return "skipped"
+        conn.execute(
+            "UPDATE sync_rows SET hlc = ?, origin = ?, deleted = 1 WHERE table_name = ? AND row_id = ?",
+            (change["hlc"], node, table, row_id)
+        )
+        return "applied"
+
+    delta_column = DELTA_COLUMNS.get(table)
+    delta = change.get("deltas", {}).get(delta_column) if delta_column and row_id is not None else None
+
+    if row_id is not None and (rule == RULE_APPEND_ONLY or local_hlc >= change["hlc"]):
+        # Lokalne dane są nowsze - stosowany jest tylko przyrost ilości
+        if delta is not None and _apply_quantity_delta(conn, table, row_id, delta_column, delta):
+            return "applied"
+        return "skipped"
+    if row_id is None and change["uid"].startswith(BOOTSTRAP_UID_PREFIX) and rule != RULE_APPEND_ONLY:
+        if _is_archived(conn, table, int(change["uid"][len(BOOTSTRAP_UID_PREFIX):])):
+            _record_conflict(conn, change, node, "wiersz przeniesiony do archiwum")
+            return "skipped"
+
+    values = {name: value for name, value in change["data"].items() if name in columns}
+    for column, (parent, parent_uid) in change.get("refs", {}).items():
+        parent_id, _parent_hlc = _local_row(conn, parent, parent_uid)
+        if parent_id is None:
+            return "deferred"
+        if column in columns:
+            values[column] = parent_id
+
+    # Ilość zmieniona przyrostem nie jest nadpisywana wartością z innego stanowiska
+    if delta is not None and _apply_quantity_delta(conn, table, row_id, delta_column, delta):
+        values.pop(delta_column, None)
+
+    try:
+        if row_id is None:
+            cursor = conn.execute(
+                f"INSERT INTO {table} ({', '.join(values)}) VALUES ({', '.join('?' * len(values))})",
+                list(values.values())
+            )
+            row_id = cursor.lastrowid
+            if delta_column and values.get(delta_column) is not None:
+                _set_synced_quantity(conn, table, row_id, values[delta_column])
+        else:
+            cursor = conn.execute(
+                f"UPDATE {table} SET {', '.join(f'{name} = ?' for name in values)} WHERE id = ?",
+                list(values.values()) + [row_id]
+            )
+            if cursor.rowcount == 0:
+                deleted = conn.execute(
+                    "SELECT deleted FROM sync_rows WHERE table_name = ? AND row_id = ?", (table, row_id)
+                ).fetchone()
+                if not deleted or not deleted[0]:
+                    # Wiersza nie usunęła replikacja (np. przeniesiony do archiwum) - nie jest odtwarzany
+                    archived = _is_archived(conn, table, row_id)
+                    _record_conflict(
+                        conn, change, node, "wiersz przeniesiony do archiwum" if archived else "brak wiersza lokalnego"
+                    )
+                    return "skipped"
+                # Ostatni zapis wygrywa: zmiana nowsza niż lokalne usunięcie odtwarza wiersz
+                conn.execute(
+                    f"INSERT INTO {table} (id, {', '.join(values)}) VALUES (?, {', '.join('?' * len(values))})",
+                    [row_id] + list(values.values())
+                )
+    except sqlite3.IntegrityError as e:
+        # Np. ten sam numer rejestracyjny dodany na dwóch stanowiskach - zostaje wersja lokalna
+        _record_conflict(conn, change, node, f"konflikt danych: {e}")
+        return "skipped"
+    conn.execute("""
+        INSERT INTO sync_rows (table_name, row_id, sync_uid, hlc, origin, deleted) VALUES (?, ?, ?, ?, ?, 0)
+        ON CONFLICT (table_name, row_id) DO UPDATE SET
+            sync_uid = excluded.sync_uid, hlc = excluded.hlc, origin = excluded.origin, deleted = 0
+    """, (table, row_id, change["uid"], change["hlc"], node))
+    if delta_column and _has_local_delta(conn, table, row_id):
+        clock.receive(change["hlc"])
+        conn.execute(
+            "UPDATE sync_rows SET hlc = ?, origin = ? WHERE table_name = ? AND row_id = ?",
+            (clock.tick(), clock.node_id, table, row_id)
+        )
+    return "applied"
+
+
+def apply_changeset(conn, changeset):
+    """
+    Stosuje zestaw zmian innego stanowiska w jednej transakcji.
+    Zmiany lokalne są wcześniej oznaczane znacznikami, a zmiany wprowadzone przez
+    zestaw nie trafiają do eksportu tego stanowiska.
+
+    Args:
+        conn: Połączenie z bazą danych
+        changeset (dict): Zestaw zmian z export_changeset
+
+    Returns:
+        tuple: (liczba zastosowanych zmian, liczba pominiętych zmian)
+    """
+    if changeset.get("format") != CHANGESET_FORMAT:
+        raise ValueError(f"Nieobsługiwany format zestawu zmian: {changeset.get('format')}")
+
+    applied = skipped = 0
+    try:
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        capture_changes(conn, commit=False)
+        node_id, hlc, _last_change_id, _last_exported = _load_state(conn)
+        clock = HybridLogicalClock(node_id, hlc)
+        columns = {}
+
+        pending = changeset["changes"]
+        # Zmiany bez wiersza nadrzędnego ponawiane są po zastosowaniu pozostałych
+        for _attempt in range(2):
+            deferred = []
+            for change in pending:
+                table = change["table"]
+                if table not in columns:
+                    columns[table] = set(_columns(conn, table)) - {"id"}
+                result = _apply_change(conn, change, columns[table], clock)
+                if result == "deferred":
+                    deferred.append(change)
+                    continue
+                clock.receive(change["hlc"])
+                if result == "applied":
+                    applied += 1
+                else:
+                    skipped += 1
+            pending = deferred
+            if not pending:
+                break
+
+        for change in pending:
+            logger.warning(f"Replikacja: brak wiersza nadrzędnego dla {change['table']} {change['uid']}")
+        skipped += len(pending)
+
+        max_change_id = conn.execute("SELECT MAX(id) FROM change_log").fetchone()[0] or 0
+        conn.execute(
+            "UPDATE sync_state SET hlc = ?, last_change_id = ? WHERE id = 1", (clock.current, max_change_id)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return applied, skipped
+
+
+def export_to_folder(conn, folder):
+    """
+    Zapisuje nowe zmiany stanowiska jako plik zestawu zmian we wspólnym katalogu.
+
+    Args:
+        conn: Połączenie z bazą danych
+        folder (str): Wspólny katalog wymiany
+
+    Returns:
+        int: Liczba wyeksportowanych zmian
+    """
+    last_exported = _load_state(conn)[3]
+    changeset = export_changeset(conn, last_exported)
+    if not changeset["changes"]:
+        return 0
+
+    os.makedirs(folder, exist_ok=True)
+    file_name = f"{changeset['node']}_{changeset['until'].split('-')[0]}_{changeset['until'].split('-')[1]}"
+    path = os.path.join(folder, file_name + CHANGESET_EXTENSION)
+    temp_path = path + ".tmp"
+    with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+        json.dump(changeset, f, ensure_ascii=False, default=str)
+    os.replace(temp_path, path)
+
+    conn.execute("UPDATE sync_state SET last_exported_hlc = ? WHERE id = 1", (changeset["until"],))
+    conn.commit()
+    logger.info(f"Replikacja: wyeksportowano {len(changeset['changes'])} zmian do {path}")
+    return len(changeset["changes"])
+
+
+def import_from_folder(conn, folder):
+    """
+    Stosuje zestawy zmian innych stanowisk ze wspólnego katalogu, których jeszcze nie zastosowano.
+
+    Args:
+        conn: Połączenie z bazą danych
+        folder (str): Wspólny katalog wymiany
+
+    Returns:
+        tuple: (liczba zastosowanych zmian, liczba pominiętych zmian)
+    """
+    if not os.path.isdir(folder):
+        return 0, 0
+    capture_changes(conn)
+    node_id = get_node_id(conn)
+    imported = {row[0] for row in conn.execute("SELECT file_name FROM sync_imports").fetchall()}
+
+    total_applied = total_skipped = 0
+    for file_name in sorted(os.listdir(folder)):
+        if not file_name.endswith(CHANGESET_EXTENSION) or file_name.startswith(node_id) or file_name in imported:
+            continue
+        try:
+            with gzip.open(os.path.join(folder, file_name), "rt", encoding="utf-8") as f:
+                changeset = json.load(f)
+            applied, skipped = apply_changeset(conn, changeset)
+        except Exception as e:
+            logger.error(f"Replikacja: błąd podczas stosowania zestawu zmian {file_name}: {e}")
+            continue
+        conn.execute(
+            "INSERT INTO sync_imports (file_name, node_id, applied, skipped) VALUES (?, ?, ?, ?)",
+            (file_name, changeset.get("node"), applied, skipped)
+        )
+        conn.commit()
+        total_applied += applied
+        total_skipped += skipped
+    if total_applied or total_skipped:
+        logger.info(f"Replikacja: zastosowano {total_applied} zmian, pominięto {total_skipped}")
+    return total_applied, total_skipped
+
+
+def sync_folder(conn, folder):
+    """
+    Wymienia zmiany przez wspólny katalog: eksportuje własne i stosuje zmiany innych stanowisk.
+
+    Args:
+        conn: Połączenie z bazą danych
+        folder (str): Wspólny katalog wymiany
+
+    Returns:
+        tuple: (liczba wyeksportowanych zmian, liczba zastosowanych zmian)
+    """
+    exported = export_to_folder(conn, folder)
+    applied, _skipped = import_from_folder(conn, folder)
+    return exported, applied
+
+
+def run_folder_sync(folder, database_path=DATABASE_PATH):
+    """
+    Wymienia zmiany przez wspólny katalog na osobnym połączeniu (do uruchamiania w wątku w tle,
+    bo odczyt i zapis udziału sieciowego może trwać długo).
+
+    Args:
+        folder (str): Wspólny katalog wymiany
+        database_path (str): Ścieżka do bazy danych
+
+    Returns:
+        tuple: (liczba wyeksportowanych zmian, liczba zastosowanych zmian)
+    """
+    # Import lokalny - utils.archive korzysta z tego modułu
+    from utils.archive import attach_archive
+
+    conn = None
+    try:
+        conn = sqlite3.connect(database_path, timeout=30)
+        conn.execute("PRAGMA foreign_keys = ON")
+        # Archiwum jest potrzebne do rozpoznania zmian wierszy przeniesionych do archiwum
+        attach_archive(conn, create_views=False)
+        return sync_folder(conn, folder)
+    except Exception as e:
+        logger.error(f"Błąd podczas replikacji zmian: {e}")
+        return 0, 0
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def install_replication(conn):
+    """
+    Tworzy tabele stanu replikacji i przypisuje bazę do tego stanowiska.
+    Zmiany sprzed instalacji nie są eksportowane (stanowiska zaczynają od wspólnej kopii bazy).
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for table_sql in REPLICATION_TABLES:
+        cursor.execute(table_sql)
+    for index_sql in REPLICATION_INDEXES:
+        cursor.execute(index_sql)
+
+    last_change_id = cursor.execute("SELECT MAX(id) FROM change_log").fetchone()[0] or 0
+    cursor.execute(
+        "INSERT OR IGNORE INTO sync_state (id, node_id, last_change_id) VALUES (1, ?, ?)",
+        (get_station_node_id(), last_change_id)
+    )
+
+
+def install_sync_conflicts(conn):
+    """
+    Tworzy rejestr zmian innych stanowisk, których nie udało się zastosować.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    for table_sql in SYNC_CONFLICT_TABLES:
+        conn.execute(table_sql)
+
+
+def set_station_code(conn, station_code):
+    """
+    Ustawia kod stanowiska dodawany do kodów nowych depozytów (np. "B" - kody DB001, DB002...).
+    Przy pracy wielostanowiskowej każde stanowisko powinno mieć inny kod, aby depozyty
+    przyjęte jednocześnie na dwóch stanowiskach nie dostały tego samego kodu.
+
+    Args:
+        conn: Połączenie z bazą danych
+        station_code (str): Kod stanowiska (litery i cyfry, pusty - bez kodu)
+
+    Raises:
+        ValueError: Dla kodu z innymi znakami niż litery i cyfry
+    """
+    station_code = (station_code or "").strip().upper()
+    if station_code and not station_code.isalnum():
+        raise ValueError(f"Kod stanowiska może zawierać tylko litery i cyfry: {station_code}")
+    conn.execute("UPDATE sync_state SET station_code = ? WHERE id = 1", (station_code,))
+    conn.commit()
+
+
+def install_deposit_codes(conn):
+    """
+    Dodaje replikowany kod depozytu (deposits.code) i kod stanowiska (sync_state.station_code).
+    Istniejące depozyty otrzymują dotychczasowy kod wyliczany z identyfikatora.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    if "code" not in _columns(conn, "deposits"):
+        conn.execute("ALTER TABLE deposits ADD COLUMN code TEXT")
+    if "station_code" not in _columns(conn, "sync_state"):
+        conn.execute("ALTER TABLE sync_state ADD COLUMN station_code TEXT NOT NULL DEFAULT ''")
+    conn.execute("UPDATE deposits SET code = 'D' || printf('%03d', id) WHERE code IS NULL")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_deposits_code ON deposits(code)")
+    for name, body in DEPOSIT_CODE_TRIGGERS.items():
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+        conn.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def install_quantity_deltas(conn):
+    """
+    Tworzy tabelę ilości uzgodnionych z innymi stanowiskami. Bieżące ilości opon i części
+    przyjmowane są jako uzgodnione (stanowiska zaczynają od kopii tej samej bazy).
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    for table_sql in SYNC_QUANTITY_TABLES:
+        conn.execute(table_sql)
+    for table, column in DELTA_COLUMNS.items():
+        conn.execute(f"""
+            INSERT OR IGNORE INTO sync_quantities (table_name, row_id, quantity)
+            SELECT ?, id, COALESCE({column}, 0) FROM {table}
+        """, (table,))
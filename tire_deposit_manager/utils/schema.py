@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł wersjonowanych migracji schematu bazy danych i grafu kluczy obcych.
+Wersja schematu przechowywana jest w PRAGMA user_version. Graf zależności między
+tabelami wyznaczany jest raz i unieważniany po każdej migracji.
+"""
+
+import re
+import logging
+
+from utils.summaries import install_client_summary, install_order_summary
+from utils.stock_ledger import install_stock_ledger, install_stock_status_movements
+from utils.stock_alerts import install_stock_alerts
+from utils.tire_size import install_tire_size_columns, install_tire_size_triggers
+from utils.tire_matching import install_tire_matching
+from utils.deposit_lifecycle import install_deposit_lifecycle, drop_deposit_events
+from utils.reminders import install_reminders
+from utils.change_log import install_change_log, install_change_log_cursors
+from utils.replication import (
+    install_replication, install_sync_conflicts, install_deposit_codes, install_quantity_deltas
+)
+from utils.price_list import install_price_items
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Pamięć podręczna grafu kluczy obcych: {tabela_nadrzędna: [referencje]}
+_foreign_key_graph = None
+
+# Docelowe akcje ON DELETE: {tabela: {kolumna: (tabela_nadrzędna, akcja, dodaj_gdy_brak)}}
+# Logi i pozycje zamówień usuwane są razem z rekordem nadrzędnym, a odwołania do pojazdów
+# są zerowane. Depozyty i zamówienia klienta celowo nie są usuwane kaskadowo.
+FOREIGN_KEY_RULES = {
+    "sms_logs": {"deposit_id": ("deposits", "CASCADE", True)},
+    "email_logs": {"deposit_id": ("deposits", "CASCADE", True)},
+    "order_items": {"order_id": ("orders", "CASCADE", True)},
+    "order_sms_logs": {"order_id": ("orders", "CASCADE", True)},
+    "order_email_logs": {"order_id": ("orders", "CASCADE", True)},
+    "vehicles": {"client_id": ("clients", "CASCADE", True)},
+    "appointments": {
+        "client_id": ("clients", "CASCADE", False),
+        "vehicle_id": ("vehicles", "SET NULL", False),
+    },
+    "deposits": {"vehicle_id": ("vehicles", "SET NULL", False)},
+    "orders": {"vehicle_id": ("vehicles", "SET NULL", False)},
+}
+
+_ON_ACTION = r"(?:SET\s+NULL|SET\s+DEFAULT|CASCADE|RESTRICT|NO\s+ACTION)"
+_ON_DELETE = re.compile(r"\s+ON\s+DELETE\s+" + _ON_ACTION, re.IGNORECASE)
+
+
+def invalidate_foreign_key_graph():
+    """Unieważnia zapamiętany graf kluczy obcych (po migracji lub przywróceniu bazy)."""
+    global _foreign_key_graph
+    _foreign_key_graph = None
+
+
+def get_foreign_key_graph(conn):
+    """
+    Zwraca graf kluczy obcych bazy danych (wyznaczany raz i zapamiętywany).
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        dict: Słownik {tabela_nadrzędna: [{'table', 'from', 'to', 'on_delete'}, ...]}
+    """
+    global _foreign_key_graph
+    if _foreign_key_graph is None:
+        graph = {}
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        for (table,) in cursor.fetchall():
+            cursor.execute(f"PRAGMA foreign_key_list({table})")
+            for fk in cursor.fetchall():
+                graph.setdefault(fk[2], []).append({
+                    "table": table,
+                    "from": fk[3],
+                    "to": fk[4] or "id",
+                    "on_delete": fk[6],
+                })
+        _foreign_key_graph = graph
+    return _foreign_key_graph
+
+
+def get_referencing_tables(conn, table, manual_only=False):
+    """
+    Zwraca tabele z kluczem obcym wskazującym na podaną tabelę.
+
+    Args:
+        conn: Połączenie z bazą danych
+        table (str): Nazwa tabeli nadrzędnej
+        manual_only (bool): Zwróć tylko referencje, których SQLite nie obsłuży sam
+                            (bez ON DELETE CASCADE / SET NULL / SET DEFAULT)
+
+    Returns:
+        list: Lista słowników {'table', 'from', 'to', 'on_delete'}
+    """
+    references = get_foreign_key_graph(conn).get(table, [])
+    if manual_only:
+        references = [ref for ref in references
+                      if ref["on_delete"] not in ("CASCADE", "SET NULL", "SET DEFAULT")]
+    return list(references)
+
+
+def get_schema_version(conn):
+    """
+    Zwraca numer wersji schematu bazy danych.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        int: Wersja schematu (PRAGMA user_version)
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _rewrite_foreign_key(create_sql, column, parent, action):
+    """
+    Zmienia lub dodaje akcję ON DELETE klucza obcego w instrukcji CREATE TABLE.
+
+    Returns:
+        str: Zmieniona instrukcja CREATE TABLE
+    """
+    reference = (r"REFERENCES\s+[\"'`\[]?" + re.escape(parent) + r"[\"'`\]]?\s*(?:\(\s*[\"'`\[]?\w+[\"'`\]]?\s*\))?")
+    tail = r"((?:\s+ON\s+(?:DELETE|UPDATE)\s+" + _ON_ACTION + r")*)"
+    patterns = [
+        # FOREIGN KEY (kolumna) REFERENCES tabela(id)
+        re.compile(r"(FOREIGN\s+KEY\s*\(\s*[\"'`\[]?" + re.escape(column) + r"[\"'`\]]?\s*\)\s*" + reference + r")" + tail,
+                   re.IGNORECASE),
+        # kolumna INTEGER REFERENCES tabela(id)
+        re.compile(r"((?:^|[,(]\s*)[\"'`\[]?" + re.escape(column) + r"[\"'`\]]?\s+[^,()]*?" + reference + r")" + tail,
+                   re.IGNORECASE),
+    ]
+
+    def replace(match):
+        other_actions = _ON_DELETE.sub("", match.group(2))
+        return f"{match.group(1)}{other_actions} ON DELETE {action}"
+
+    for pattern in patterns:
+        new_sql, count = pattern.subn(replace, create_sql, count=1)
+        if count:
+            return new_sql
+
+    # Brak klucza obcego - dodaj ograniczenie na końcu definicji tabeli
+    closing = create_sql.rstrip().rfind(")")
+    return (create_sql[:closing].rstrip()
+            + f",\n    FOREIGN KEY ({column}) REFERENCES {parent}(id) ON DELETE {action}\n)")
+
+
+def rebuild_table_foreign_keys(conn, table, rules):
+    """
+    Przebudowuje tabelę z nowymi akcjami ON DELETE (procedura zalecana przez SQLite:
+    nowa tabela, kopia danych, usunięcie starej, zmiana nazwy, odtworzenie indeksów).
+    Wywołujący odpowiada za wyłączenie kluczy obcych i transakcję.
+
+    Args:
+        conn: Połączenie z bazą danych
+        table (str): Nazwa tabeli
+        rules (dict): {kolumna: (tabela_nadrzędna, akcja, dodaj_gdy_brak)}
+
+    Returns:
+        bool: True, jeśli tabela została przebudowana
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+    row = cursor.fetchone()
+    if not row:
+        return False
+    create_sql = row[0]
+
+    cursor.execute(f"PRAGMA table_info({table})")
+    columns = [column[1] for column in cursor.fetchall()]
+
+    cursor.execute(f"PRAGMA foreign_key_list({table})")
+    current = {(fk[3], fk[2]): fk[6] for fk in cursor.fetchall()}
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    existing_tables = {name for (name,) in cursor.fetchall()}
+
+    changes = {}
+    for column, (parent, action, add_missing) in rules.items():
+        if column not in columns or parent not in existing_tables:
+            continue
+        if (column, parent) in current:
+            if current[(column, parent)] != action:
+                changes[column] = (parent, action)
+        elif add_missing:
+            changes[column] = (parent, action)
+
+    if not changes:
+        return False
+
+    new_sql = create_sql
+    for column, (parent, action) in changes.items():
+        new_sql = _rewrite_foreign_key(new_sql, column, parent, action)
+    temp_name = f"{table}__migrated"
+    new_sql = re.sub(r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?[\"'`\[]?\w+[\"'`\]]?",
+                     f"CREATE TABLE {temp_name}", new_sql, count=1, flags=re.IGNORECASE)
+
+    # Indeksy i wyzwalacze do odtworzenia po zmianie nazwy
+    cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') AND sql IS NOT NULL",
+        (table,)
+    )
+    dependent_sql = [sql for (sql,) in cursor.fetchall()]
+
+    # Rekordy osierocone: usuwane (CASCADE) lub zerowane (SET NULL)
+    select_columns = []
+    conditions = []
+    for column in columns:
+        rule = rules.get(column)
+        if rule and rule[0] in existing_tables and rule[1] == "SET NULL":
+            select_columns.append(f"CASE WHEN {column} IN (SELECT id FROM {rule[0]}) THEN {column} END")
+        else:
+            select_columns.append(column)
+        if rule and rule[0] in existing_tables and rule[1] == "CASCADE":
+            conditions.append(f"({column} IS NULL OR {column} IN (SELECT id FROM {rule[0]}))")
+
+    cursor.execute(f"DROP TABLE IF EXISTS {temp_name}")
+    cursor.execute(new_sql)
+    cursor.execute(
+        f"INSERT INTO {temp_name} ({', '.join(columns)}) "
+        f"SELECT {', '.join(select_columns)} FROM {table}"
+        + (f" WHERE {' AND '.join(conditions)}" if conditions else "")
+    )
+    cursor.execute(f"DROP TABLE {table}")
+    cursor.execute(f"ALTER TABLE {temp_name} RENAME TO {table}")
+    for sql in dependent_sql:
+        cursor.execute(sql)
+
+    logger.info(f"Przebudowano klucze obce tabeli {table}: "
+                + ", ".join(f"{column} -> ON DELETE {action}" for column, (_parent, action) in changes.items()))
+    return True
+
+
+def migrate_cascade_foreign_keys(conn):
+    """
+    Migracja 1: akcje ON DELETE CASCADE / SET NULL dla tabel zależnych
+    oraz indeksy na kolumnach kluczy obcych.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for table, rules in FOREIGN_KEY_RULES.items():
+        rebuild_table_foreign_keys(conn, table, rules)
+
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = {column[1] for column in cursor.fetchall()}
+        for column in rules:
+            if column in columns:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})")
+
+
+# Lista migracji: (wersja, opis, funkcja)
+MIGRATIONS = [
+    (1, "Kaskadowe usuwanie rekordów zależnych", migrate_cascade_foreign_keys),
+    (2, "Podsumowania klientów utrzymywane przez wyzwalacze", install_client_summary),
+    (3, "Podsumowania zamówień i liczniki statusów", install_order_summary),
+    (4, "Rejestr ruchów magazynowych i migawki stanów", install_stock_ledger),
+    (5, "Kolejka alertów niskiego stanu magazynowego", install_stock_alerts),
+    (6, "Znormalizowane kolumny rozmiaru opon", install_tire_size_columns),
+    (7, "Dopasowanie opon z magazynu do pojazdów", install_tire_matching),
+    (8, "Automatyczne zmiany statusu depozytów", install_deposit_lifecycle),
+    (9, "Harmonogram przypomnień dla klientów", install_reminders),
+    (10, "Dziennik zmian wierszy dla serwera API", install_change_log),
+    (11, "Replikacja zmian między stanowiskami", install_replication),
+    (12, "Znormalizowany cennik usług", install_price_items),
+    (13, "Wyzwalacze rozmiaru opon bez funkcji SQL z Pythona", install_tire_size_triggers),
+    (14, "Pozycje odbiorców dziennika zmian", install_change_log_cursors),
+    (15, "Rejestr konfliktów replikacji", install_sync_conflicts),
+    (16, "Usunięcie nieużywanego dziennika zdarzeń depozytów", drop_deposit_events),
+    (17, "Sprzedaż i wycofanie opon w rejestrze ruchów magazynowych", install_stock_status_movements),
+    (18, "Znacznik skracania dziennika zmian", install_change_log_cursors),
+    (19, "Replikowane kody depozytów", install_deposit_codes),
+    (20, "Replikacja ilości opon i części jako przyrostów", install_quantity_deltas),
+]
+
+
+def apply_migrations(conn):
+    """
+    Wykonuje brakujące migracje schematu, każdą w osobnej transakcji.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        bool: True jeśli wszystkie migracje zakończyły się sukcesem, False w przeciwnym razie
+    """
+    version = get_schema_version(conn)
+    pending = [migration for migration in MIGRATIONS if migration[0] > version]
+    if not pending:
+        return True
+
+    # Przebudowa tabel wymaga wyłączenia kluczy obcych (poza transakcją)
+    conn.commit()
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for number, description, migration in pending:
+            try:
+                # Wcześniejsze naruszenia (np. osierocone rekordy) nie blokują migracji,
+                # ale migracja nie może dodać nowych
+                violations_before = len(conn.execute("PRAGMA foreign_key_check").fetchall())
+                conn.execute("BEGIN")
+                migration(conn)
+                violations = len(conn.execute("PRAGMA foreign_key_check").fetchall())
+                if violations > violations_before:
+                    raise RuntimeError(f"nowe naruszenia kluczy obcych po migracji: {violations - violations_before}")
+                conn.execute(f"PRAGMA user_version = {int(number)}")
+                conn.commit()
+                logger.info(f"Wykonano migrację schematu {number}: {description}")
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Błąd podczas migracji schematu {number} ({description}): {e}")
+                return False
+            finally:
+                invalidate_foreign_key_graph()
+        return True
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {'ON' if foreign_keys else 'OFF'}")
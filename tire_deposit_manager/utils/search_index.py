@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł wyszukiwania tekstowego w danych w pamięci.
+Teksty są sprowadzane do postaci porównywalnej (małe litery, bez polskich znaków
+diakrytycznych), więc "wywazenie" znajduje "Wyważenie". SearchIndex buduje raz indeks
+prefiksów słów i zwraca wyniki uszeregowane według trafności bez przeglądania
+wszystkich pozycji przy każdym naciśnięciu klawisza.
+"""
+
+import re
+import unicodedata
+
+# Znaki, których nie rozkłada normalizacja Unicode
+_FOLD_TABLE = str.maketrans({"ł": "l", "Ł": "l", "ø": "o", "đ": "d", "ß": "ss"})
+
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+
+
+def fold_text(text):
+    """
+    Sprowadza tekst do postaci wyszukiwania: małe litery, bez znaków diakrytycznych.
+
+    Args:
+        text (str): Tekst
+
+    Returns:
+        str: Tekst po normalizacji (np. "Wyważanie kół" -> "wywazanie kol")
+    """
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", str(text).translate(_FOLD_TABLE))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text):
+    """
+    Dzieli tekst na słowa po normalizacji (litery i cyfry).
+
+    Args:
+        text (str): Tekst
+
+    Returns:
+        list: Słowa w kolejności występowania
+    """
+    return _TOKEN_PATTERN.findall(fold_text(text))
+
+
+class SearchIndex:
+    """Indeks prefiksów słów dla listy pozycji z rankingiem wyników."""
+
+    def __init__(self, items, key=lambda item: item):
+        """
+        Args:
+            items (list): Pozycje do przeszukiwania
+            key (callable): Funkcja zwracająca tekst pozycji
+        """
+        self.items = list(items)
+        self._tokens = []
+        # prefiks słowa -> zbiór numerów pozycji
+        self._prefixes = {}
+        for position, item in enumerate(self.items):
+            tokens = tokenize(key(item))
+            self._tokens.append(tokens)
+            for token in tokens:
+                for length in range(1, len(token) + 1):
+                    self._prefixes.setdefault(token[:length], set()).add(position)
+
+    def search(self, query, limit=None):
+        """
+        Zwraca pozycje, w których każde słowo zapytania jest początkiem któregoś słowa pozycji.
+        Wyżej są pozycje ze słowami równymi słowom zapytania i zaczynające się od pierwszego
+        słowa zapytania; przy równej trafności zachowana jest kolejność pozycji.
+
+        Args:
+            query (str): Zapytanie
+            limit (int, optional): Maksymalna liczba wyników
+
+        Returns:
+            list: Pasujące pozycje
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return list(self.items[:limit] if limit else self.items)
+
+        candidates = None
+        for token in sorted(set(query_tokens), key=len, reverse=True):
+            matches = self._prefixes.get(token)
+            if not matches:
+                return []
+            candidates = set(matches) if candidates is None else candidates & matches
+            if not candidates:
+                return []
+
+        def rank(position):
+            tokens = self._tokens[position]
+            exact = sum(1 for token in query_tokens if token in tokens)
+            leading = 1 if tokens and tokens[0].startswith(query_tokens[0]) else 0
+            return -exact, -leading, position
+
+        positions = sorted(candidates, key=rank)
+        if limit:
+            positions = positions[:limit]
+        return [self.items[position] for position in positions]
@@ -0,0 +1,351 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł serwera API dla pracy wielostanowiskowej i zewnętrznych integracji.
+Serwer udostępnia dane z pliku bazy przez API HTTP/JSON (odczyty, zapisy, kanał zmian).
+Stanowiska z ustawieniem server_url korzystają z niego przez RemoteDataSource
+(utils.data_access.create_data_source) - obecnie lista pojazdów klienta; pozostałe
+zakładki pracują na lokalnym połączeniu, a stanowiska wymieniają ich zmiany przez
+replikację (utils.replication). Z API mogą korzystać także inne programy, np. strona www.
+Zapytania obsługiwane są wielowątkowo z puli połączeń SQLite, a odpowiedzi na odczyty
+trafiają do pamięci podręcznej unieważnianej wersją danych z dziennika zmian
+(utils.change_log), więc powtarzane listy nie odpytują bazy.
+
+Endpointy:
+    GET    /api/health                     stan serwera
+    GET    /api/version[?resource=...]     wersja danych (identyfikator ostatniej zmiany)
+    GET    /api/changes?after=N&limit=M    kanał zmian
+    GET    /api/<zasób>?kolumna=wartość&_order=-id&_limit=100&_offset=0
+    GET    /api/<zasób>/<id>
+    POST   /api/<zasób>                    {"kolumna": wartość, ...}
+    PATCH  /api/<zasób>/<id>               {"kolumna": wartość, ...}
+    DELETE /api/<zasób>/<id>
+"""
+
+import hmac
+import json
+import queue
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+from utils.paths import DATABASE_PATH
+from utils.data_access import LocalDataSource, DataAccessError, TOKEN_HEADER, DEFAULT_LIMIT
+from utils.change_log import record_consumer_cursor, get_prune_watermark
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Domyślny adres i port serwera (tylko ten komputer; dostęp z sieci wymaga --host z adresem
+# interfejsu sieciowego lub 0.0.0.0 oraz tokenu)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Liczba połączeń w puli i maksymalna liczba odpowiedzi w pamięci podręcznej
+DEFAULT_POOL_SIZE = 4
+DEFAULT_CACHE_SIZE = 256
+
+# Maksymalny rozmiar treści żądania (bajty)
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class ConnectionPool:
+    """Pula połączeń SQLite współdzielona przez wątki serwera."""
+
+    def __init__(self, database_path=DATABASE_PATH, size=DEFAULT_POOL_SIZE):
+        """
+        Args:
+            database_path (str): Ścieżka do bazy danych
+            size (int): Liczba połączeń
+        """
+        self._connections = queue.Queue()
+        self._all = []
+        for _i in range(size):
+            conn = sqlite3.connect(database_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._connections.put(conn)
+            self._all.append(conn)
+
+    @contextmanager
+    def connection(self):
+        """Wypożycza połączenie z puli na czas bloku with."""
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._connections.put(conn)
+
+    def close(self):
+        """Zamyka wszystkie połączenia puli."""
+        for conn in self._all:
+            conn.close()
+
+
+class ResponseCache:
+    """Pamięć podręczna odpowiedzi (LRU) unieważniana wersją danych zasobu."""
+
+    def __init__(self, size=DEFAULT_CACHE_SIZE):
+        """
+        Args:
+            size (int): Maksymalna liczba przechowywanych odpowiedzi
+        """
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """
+        Zwraca odpowiedź zapisaną dla bieżącej wersji danych lub None.
+
+        Args:
+            key (tuple): Klucz odpowiedzi (ścieżka i parametry)
+            version (int): Bieżąca wersja danych zasobu
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, payload):
+        """
+        Zapisuje odpowiedź dla wersji danych.
+
+        Args:
+            key (tuple): Klucz odpowiedzi
+            version (int): Wersja danych, dla której wyznaczono odpowiedź
+            payload (bytes): Treść odpowiedzi
+        """
+        with self._lock:
+            self._entries[key] = (version, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+class ApiRequestHandler(BaseHTTPRequestHandler):
+    """Obsługa żądań API; pula, pamięć podręczna i token pochodzą z obiektu serwera."""
+
+    server_version = "TireDepositManager/1.0"
+
+    def log_message(self, format, *args):
+        """Kieruje dziennik żądań do loggera aplikacji."""
+        logger.debug("API %s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status, data=None, payload=None):
+        """Wysyła odpowiedź JSON."""
+        if payload is None:
+            payload = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self):
+        """Zwraca zdekodowaną treść żądania JSON (słownik)."""
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise DataAccessError("Zbyt duża treść żądania", 413)
+        try:
+            body = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+        except ValueError:
+            raise DataAccessError("Niepoprawny format JSON")
+        if not isinstance(body, dict):
+            raise DataAccessError("Treść żądania musi być obiektem JSON")
+        return body
+
+    def _route(self):
+        """Zwraca (zasób, identyfikator lub None, parametry) dla ścieżki /api/..."""
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+        if not parts or parts[0] != "api" or len(parts) not in (2, 3):
+            raise DataAccessError("Nieznany adres", 404)
+        row_id = None
+        if len(parts) == 3:
+            try:
+                row_id = int(parts[2])
+            except ValueError:
+                raise DataAccessError("Niepoprawny identyfikator", 404)
+        return parts[1], row_id, dict(parse_qsl(url.query))
+
+    @staticmethod
+    def _int_param(params, name, default, minimum=0):
+        """
+        Zwraca parametr liczbowy zapytania.
+
+        Args:
+            params (dict): Parametry zapytania
+            name (str): Nazwa parametru
+            default (int): Wartość, gdy parametru nie podano
+            minimum (int): Najmniejsza dopuszczalna wartość
+
+        Returns:
+            int: Wartość parametru
+        """
+        value = params.get(name)
+        if value is None:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise DataAccessError(f"Parametr {name} musi być liczbą całkowitą")
+        if number < minimum:
+            raise DataAccessError(f"Parametr {name} nie może być mniejszy niż {minimum}")
+        return number
+
+    def _handle(self, method):
+        """Wspólna obsługa żądania: autoryzacja, routing, błędy."""
+        try:
+            token = self.server.token
+            # Porównanie w stałym czasie - czas odpowiedzi nie zdradza poprawnych znaków tokenu
+            if token and not hmac.compare_digest(
+                (self.headers.get(TOKEN_HEADER) or "").encode("utf-8"), token.encode("utf-8")
+            ):
+                raise DataAccessError("Brak uprawnień", 401)
+
+            resource, row_id, params = self._route()
+            with self.server.pool.connection() as conn:
+                source = LocalDataSource(conn)
+                if method == "GET":
+                    self._handle_read(source, resource, row_id, params)
+                else:
+                    self._handle_write(source, method, resource, row_id)
+        except DataAccessError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            logger.error(f"Błąd podczas obsługi żądania API {method} {self.path}: {e}")
+            self._send_json(500, {"error": str(e)})
+
+    def _handle_read(self, source, resource, row_id, params):
+        """Obsługuje odczyty z pamięcią podręczną."""
+        if resource == "health":
+            cache = self.server.cache
+            self._send_json(200, {"status": "ok", "cache_hits": cache.hits, "cache_misses": cache.misses})
+            return
+        if resource == "version":
+            self._send_json(200, {"version": source.version(params.get("resource"))})
+            return
+        if resource == "changes":
+            after = self._int_param(params, "after", 0)
+            changes = source.changes(after, self._int_param(params, "limit", 500, minimum=1))
+            # Odbiorca potwierdza przetworzenie zmian do "after" - starsze wpisy można usunąć
+            record_consumer_cursor(source.conn, f"api:{self.client_address[0]}", after)
+            # pruned_through > after: część zmian usunięto z dziennika - odbiorca musi wczytać dane od nowa
+            self._send_json(200, {
+                "changes": changes,
+                "last_id": changes[-1]["id"] if changes else None,
+                "pruned_through": get_prune_watermark(source.conn),
+            })
+            return
+
+        source.columns(resource)
+        version = source.version(resource)
+        key = (resource, row_id, tuple(sorted(params.items())))
+        payload = self.server.cache.get(key, version)
+        if payload is not None:
+            self._send_json(200, payload=payload)
+            return
+
+        if row_id is not None:
+            row = source.get(resource, row_id)
+            if row is None:
+                raise DataAccessError(f"Nie znaleziono: {resource} {row_id}", 404)
+            data = row
+        else:
+            order = params.pop("_order", None)
+            limit = self._int_param(params, "_limit", DEFAULT_LIMIT, minimum=1)
+            offset = self._int_param(params, "_offset", 0)
+            params.pop("_limit", None)
+            params.pop("_offset", None)
+            data = {"rows": source.list(resource, params, order, limit, offset)}
+
+        payload = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+        self.server.cache.put(key, version, payload)
+        self._send_json(200, payload=payload)
+
+    def _handle_write(self, source, method, resource, row_id):
+        """Obsługuje zapisy (pamięć podręczną unieważnia nowa wersja danych)."""
+        if method == "POST" and row_id is None:
+            self._send_json(201, {"id": source.insert(resource, self._read_body())})
+        elif method == "PATCH" and row_id is not None:
+            updated = source.update(resource, row_id, self._read_body())
+            self._send_json(200 if updated else 404, {"updated": updated})
+        elif method == "DELETE" and row_id is not None:
+            deleted = source.delete(resource, row_id)
+            self._send_json(200 if deleted else 404, {"deleted": deleted})
+        else:
+            raise DataAccessError("Niedozwolona operacja", 405)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def create_server(database_path=DATABASE_PATH, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                  pool_size=DEFAULT_POOL_SIZE, cache_size=DEFAULT_CACHE_SIZE, token=None):
+    """
+    Tworzy serwer API (bez uruchamiania pętli obsługi żądań).
+
+    Args:
+        database_path (str): Ścieżka do bazy danych
+        host (str): Adres nasłuchiwania
+        port (int): Port (0 - wybierz wolny port)
+        pool_size (int): Liczba połączeń w puli
+        cache_size (int): Maksymalna liczba odpowiedzi w pamięci podręcznej
+        token (str, optional): Token wymagany w nagłówku X-Api-Token
+
+    Returns:
+        ThreadingHTTPServer: Serwer; adres w server.server_address
+    """
+    server = ThreadingHTTPServer((host, port), ApiRequestHandler)
+    server.daemon_threads = True
+    server.pool = ConnectionPool(database_path, pool_size)
+    server.cache = ResponseCache(cache_size)
+    server.token = token
+    return server
+
+
+def serve(database_path=DATABASE_PATH, host=DEFAULT_HOST, port=DEFAULT_PORT,
+          pool_size=DEFAULT_POOL_SIZE, token=None):
+    """
+    Uruchamia serwer API i obsługuje żądania do przerwania (Ctrl+C).
+
+    Args:
+        database_path (str): Ścieżka do bazy danych
+        host (str): Adres nasłuchiwania
+        port (int): Port
+        pool_size (int): Liczba połączeń w puli
+        token (str, optional): Token wymagany w nagłówku X-Api-Token
+    """
+    server = create_server(database_path, host, port, pool_size, token=token)
+    logger.info(f"Serwer API nasłuchuje na {host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.close()
+        logger.info("Serwer API zatrzymany")
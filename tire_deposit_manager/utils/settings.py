@@ -1,50 +1,278 @@
-from PySide6.QtCore import QSettings
+"""
+Moduł ustawień aplikacji.
+Ustawienia z QSettings i z tabeli `settings` w bazie SQLite są wczytywane jednorazowo
+do pamięci, odczyty są wyszukiwaniem w słowniku, a zmiany zapisywane w tle partiami.
+"""
 
-class Settings:
+import sqlite3
+import logging
+import threading
+
+from PySide6.QtCore import QObject, QSettings, QTimer, Signal
+
+from utils.database import DEFAULT_SETTINGS
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Opóźnienie zapisu zmian (ms) - zmiany w tym oknie są łączone w jeden zapis
+FLUSH_DELAY_MS = 500
+
+_TRUE_VALUES = ("true", "1", "yes", "tak", "on")
+
+# Dane firmy pochodzą wyłącznie z QSettings - tabela settings zawiera dla nich
+# wartości przykładowe wstawiane przy tworzeniu bazy
+COMPANY_KEY_PREFIX = "company_"
+COMPANY_PLACEHOLDERS = {
+    key: value for key, value, _description in DEFAULT_SETTINGS if key.startswith(COMPANY_KEY_PREFIX)
+}
+
+
+class Settings(QObject):
     """
     Klasa do zarządzania ustawieniami aplikacji.
     Implementuje wzorzec Singleton.
     """
     _instance = None
-    
+
+    # Sygnał emitowany po zmianie ustawienia (klucz, nowa wartość)
+    settingChanged = Signal(str, object)
+
     @classmethod
     def get_instance(cls):
         """
         Zwraca instancję klasy Settings (wzorzec Singleton).
-        
+
         Returns:
             Settings: Instancja ustawień
         """
         if cls._instance is None:
             cls._instance = Settings()
         return cls._instance
-    
+
     def __init__(self):
         """
-        Inicjalizuje obiekt ustawień.
+        Inicjalizuje obiekt ustawień i wczytuje wartości z QSettings.
         """
+        super().__init__()
         self.settings = QSettings("TireDepositManager", "Settings")
-    
+        self._values = {key: self.settings.value(key) for key in self.settings.allKeys()}
+        self._qsettings_keys = set(self._values)
+        self._db_values = {}
+        self._db_path = None
+        self._typed = {}
+        self._pending = {}
+        self._write_lock = threading.Lock()
+        self._flush_timer = None
+
+    def load_database(self, conn):
+        """
+        Wczytuje ustawienia z tabeli `settings` w bazie danych.
+        Wartości z QSettings mają pierwszeństwo przed wartościami z bazy.
+        Dane firmy (klucze company_*) nie są odczytywane z bazy - wartości różne
+        od przykładowych są jednorazowo przenoszone do QSettings.
+
+        Args:
+            conn: Połączenie z bazą danych
+        """
+        try:
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA database_list")
+            self._db_path = next((row[2] for row in cursor.fetchall() if row[1] == "main"), None)
+            cursor.execute("SELECT key, value FROM settings")
+            db_values = {row[0]: row[1] for row in cursor.fetchall()}
+            self._db_values = {
+                key: value for key, value in db_values.items() if not key.startswith(COMPANY_KEY_PREFIX)
+            }
+            self._typed.clear()
+            self._migrate_company_settings(db_values)
+        except Exception as e:
+            logger.error(f"Błąd podczas wczytywania ustawień z bazy danych: {e}")
+
+    def _migrate_company_settings(self, db_values):
+        """
+        Przenosi do QSettings dane firmy wpisane w tabeli `settings`, jeśli nie są
+        wartościami przykładowymi i nie zostały jeszcze ustawione w QSettings.
+
+        Args:
+            db_values (dict): Wszystkie wartości z tabeli `settings`
+        """
+        batch = {
+            key: value for key, value in db_values.items()
+            if key.startswith(COMPANY_KEY_PREFIX) and value
+            and value != COMPANY_PLACEHOLDERS.get(key) and key not in self._values
+        }
+        if not batch:
+            return
+
+        self._values.update(batch)
+        self._write_batch(batch)
+        logger.info(f"Przeniesiono dane firmy z bazy danych do ustawień: {', '.join(sorted(batch))}")
+
+    def contains(self, key):
+        """
+        Sprawdza, czy ustawienie istnieje.
+
+        Args:
+            key (str): Klucz ustawienia
+
+        Returns:
+            bool: True, jeśli ustawienie istnieje
+        """
+        return key in self._values or key in self._db_values
+
+    def value(self, key, default=None, type=None):
+        """
+        Pobiera wartość ustawienia (zgodnie z interfejsem QSettings.value).
+
+        Args:
+            key (str): Klucz ustawienia
+            default: Domyślna wartość, jeśli ustawienie nie istnieje
+            type (type, optional): Typ wyniku (bool, int, float, str)
+
+        Returns:
+            Wartość ustawienia lub wartość domyślna
+        """
+        if key in self._values:
+            raw = self._values[key]
+        elif key in self._db_values:
+            raw = self._db_values[key]
+        else:
+            return default if type is None else self._convert(default, type, default)
+
+        if type is None:
+            return raw
+
+        cache_key = (key, type)
+        if cache_key not in self._typed:
+            self._typed[cache_key] = self._convert(raw, type, default)
+        return self._typed[cache_key]
+
+    def setValue(self, key, value):
+        """
+        Ustawia wartość ustawienia. Zapis do magazynu następuje w tle.
+
+        Args:
+            key (str): Klucz ustawienia
+            value: Wartość ustawienia
+        """
+        if key in self._values and self._values[key] == value:
+            return
+
+        self._values[key] = value
+        self._typed = {k: v for k, v in self._typed.items() if k[0] != key}
+        self._pending[key] = value
+        self.settingChanged.emit(key, value)
+        self._schedule_flush()
+
     def get_setting(self, key, default=None):
         """
         Pobiera wartość ustawienia.
-        
+
         Args:
             key (str): Klucz ustawienia
             default: Domyślna wartość, jeśli ustawienie nie istnieje
-            
+
         Returns:
             Wartość ustawienia lub wartość domyślna
         """
-        return self.settings.value(key, default)
-    
+        return self.value(key, default)
+
     def set_setting(self, key, value):
         """
         Ustawia wartość ustawienia.
-        
+
         Args:
             key (str): Klucz ustawienia
             value: Wartość ustawienia
         """
-        self.settings.setValue(key, value)
-        self.settings.sync()
\ No newline at end of file
+        self.setValue(key, value)
+
+    def flush(self):
+        """Zapisuje oczekujące zmiany natychmiast (np. przy zamykaniu aplikacji)."""
+        if self._flush_timer is not None:
+            self._flush_timer.stop()
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._write_batch(batch)
+
+    def _schedule_flush(self):
+        """Planuje zapis zmian - kolejne zmiany przed upływem opóźnienia trafią do tej samej partii."""
+        if self._flush_timer is None:
+            self._flush_timer = QTimer(self)
+            self._flush_timer.setSingleShot(True)
+            self._flush_timer.setInterval(FLUSH_DELAY_MS)
+            self._flush_timer.timeout.connect(self._flush_in_background)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush_in_background(self):
+        """Przekazuje oczekujące zmiany do zapisu w wątku w tle."""
+        batch, self._pending = self._pending, {}
+        if batch:
+            threading.Thread(target=self._write_batch, args=(batch,), daemon=True).start()
+
+    def _write_batch(self, batch):
+        """
+        Zapisuje partię zmian - klucze pochodzące z bazy danych do tabeli `settings`,
+        pozostałe do QSettings.
+
+        Args:
+            batch (dict): Słownik {klucz: wartość}
+        """
+        db_items = [(key, str(value)) for key, value in batch.items()
+                    if key in self._db_values and key not in self._qsettings_keys]
+        qsettings_items = [(key, value) for key, value in batch.items()
+                           if key not in self._db_values or key in self._qsettings_keys]
+
+        with self._write_lock:
+            try:
+                if qsettings_items:
+                    # Osobny obiekt QSettings - instancje nie mogą być współdzielone między wątkami
+                    settings = QSettings("TireDepositManager", "Settings")
+                    for key, value in qsettings_items:
+                        settings.setValue(key, value)
+                    settings.sync()
+                    self._qsettings_keys.update(key for key, _value in qsettings_items)
+
+                if db_items and self._db_path:
+                    conn = sqlite3.connect(self._db_path, timeout=10)
+                    try:
+                        with conn:
+                            conn.executemany(
+                                "INSERT INTO settings (key, value) VALUES (?, ?) "
+                                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                                db_items
+                            )
+                    finally:
+                        conn.close()
+                    for key, value in db_items:
+                        self._db_values[key] = value
+            except Exception as e:
+                logger.error(f"Błąd podczas zapisywania ustawień: {e}")
+
+    @staticmethod
+    def _convert(value, type, default=None):
+        """
+        Konwertuje wartość ustawienia na wskazany typ.
+
+        Args:
+            value: Wartość do konwersji
+            type (type): Typ docelowy
+            default: Wartość zwracana, gdy konwersja się nie powiedzie
+
+        Returns:
+            Skonwertowana wartość
+        """
+        if value is None:
+            return default
+        try:
+            if type is bool:
+                if isinstance(value, str):
+                    return value.strip().lower() in _TRUE_VALUES
+                return bool(value)
+            if type is int:
+                return int(float(value)) if isinstance(value, str) else int(value)
+            return type(value)
+        except (TypeError, ValueError):
+            return default
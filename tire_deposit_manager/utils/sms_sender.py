@@ -1,5 +1,4 @@
 import logging
-import requests
 import json
 from typing import Dict, Any, Optional, Tuple, Union
 
@@ -56,6 +55,9 @@ class SMSSender:
         Returns:
             Tuple[bool, str]: (sukces, komunikat)
         """
+        # Biblioteka requests ładowana dopiero przy wysyłce (nie spowalnia startu aplikacji)
+        import requests
+
         try:
             # Formatuj numer telefonu
             formatted_phone = format_phone_number(phone_number)
@@ -81,16 +83,17 @@ class SMSSender:
                 'Authorization': f'Bearer {self.token}'
             }
             
-            # Dodaj debugowanie
-            logger.debug(f"Wysyłanie żądania do API SMS Planet: {self.base_url}")
-            logger.debug(f"Payload: {payload}")
-            logger.debug(f"Nagłówki: {headers}")
+            # Szczegóły żądania tylko przy włączonym DEBUG (bez tokenu autoryzacji)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Wysyłanie żądania do API SMS Planet: {self.base_url}, "
+                             f"odbiorca: {formatted_phone}, długość wiadomości: {len(message)}")
             
             # Wyślij żądanie do API
             response = requests.post(self.base_url, data=payload, headers=headers)
             
             # Logowanie odpowiedzi
-            logger.debug(f"Odpowiedź z API SMS Planet (kod: {response.status_code}): {response.text}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Odpowiedź z API SMS Planet (kod: {response.status_code}): {response.text}")
             
             # Sprawdzenie odpowiedzi zgodnie z dokumentacją
             if response.status_code == 200:
@@ -0,0 +1,437 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł do śledzenia zapytań SQL.
+Zawiera instrumentowane klasy połączenia i kursora SQLite, które mierzą czas zapytań,
+liczbę zwróconych wierszy i miejsce wywołania, prowadzą kroczące histogramy
+dla znormalizowanych zapytań oraz zapisują log wolnych zapytań z planem EXPLAIN QUERY PLAN.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+
+from utils.paths import LOGS_DIR
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Plik logu wolnych zapytań (format JSON Lines)
+SLOW_QUERY_LOG = os.path.join(LOGS_DIR, "slow_queries.log")
+
+# Domyślny próg wolnego zapytania (ms)
+DEFAULT_SLOW_THRESHOLD_MS = 100.0
+
+# Liczba ostatnich pomiarów przechowywanych dla każdego zapytania (okno kroczące)
+ROLLING_WINDOW = 500
+
+# Granice przedziałów histogramu (ms)
+HISTOGRAM_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Moduły pomijane przy ustalaniu miejsca wywołania
+_THIS_FILE = os.path.normcase(os.path.abspath(__file__))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(sql):
+    """
+    Normalizuje zapytanie SQL, aby zapytania różniące się tylko wartościami były grupowane razem.
+
+    Args:
+        sql (str): Treść zapytania
+
+    Returns:
+        str: Znormalizowane zapytanie
+    """
+    normalized = _STRING_LITERAL.sub("?", sql)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    normalized = _PLACEHOLDER_LIST.sub("(?, ...)", normalized)
+    return normalized
+
+
+class QueryStats:
+    """Statystyki jednego znormalizowanego zapytania."""
+
+    def __init__(self, query):
+        """
+        Inicjalizacja statystyk.
+
+        Args:
+            query (str): Znormalizowane zapytanie
+        """
+        self.query = query
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.last_call_site = ""
+        self.samples = deque(maxlen=ROLLING_WINDOW)
+
+    def add(self, elapsed_ms, rows, call_site):
+        """
+        Dodaje pomiar wykonania zapytania.
+
+        Args:
+            elapsed_ms (float): Czas wykonania w ms
+            rows (int): Liczba zwróconych wierszy
+            call_site (str): Miejsce wywołania (plik:linia funkcja)
+        """
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.last_call_site = call_site
+        self.samples.append(elapsed_ms)
+
+    def percentile(self, percent):
+        """
+        Zwraca percentyl czasu wykonania z okna kroczącego.
+
+        Args:
+            percent (float): Percentyl (0-100)
+
+        Returns:
+            float: Czas w ms
+        """
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def histogram(self):
+        """
+        Zwraca histogram czasów wykonania z okna kroczącego.
+
+        Returns:
+            list: Lista krotek (etykieta_przedziału, liczba_pomiarów)
+        """
+        counts = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+        for sample in self.samples:
+            for index, bound in enumerate(HISTOGRAM_BUCKETS_MS):
+                if sample < bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+        labels = [f"<{bound} ms" for bound in HISTOGRAM_BUCKETS_MS] + [f">={HISTOGRAM_BUCKETS_MS[-1]} ms"]
+        return list(zip(labels, counts))
+
+    def to_dict(self):
+        """
+        Zwraca statystyki w postaci słownika.
+
+        Returns:
+            dict: Statystyki zapytania
+        """
+        return {
+            "query": self.query,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows,
+            "call_site": self.last_call_site,
+        }
+
+
+class SQLTracer:
+    """
+    Rejestr statystyk zapytań SQL.
+    Implementuje wzorzec Singleton.
+    """
+    _instance = None
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Zwraca instancję rejestru (wzorzec Singleton).
+
+        Returns:
+            SQLTracer: Instancja rejestru
+        """
+        if cls._instance is None:
+            cls._instance = SQLTracer()
+        return cls._instance
+
+    def __init__(self):
+        """Inicjalizacja rejestru."""
+        self.enabled = False
+        self.slow_threshold_ms = DEFAULT_SLOW_THRESHOLD_MS
+        self.slow_log_path = SLOW_QUERY_LOG
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def configure(self, enabled=None, slow_threshold_ms=None):
+        """
+        Zmienia konfigurację śledzenia.
+
+        Args:
+            enabled (bool, optional): Czy śledzenie jest włączone
+            slow_threshold_ms (float, optional): Próg wolnego zapytania w ms
+        """
+        if enabled is not None:
+            self.enabled = bool(enabled)
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = float(slow_threshold_ms)
+
+    def record(self, conn, sql, params, elapsed_ms, rows, call_site):
+        """
+        Zapisuje pomiar zapytania i w razie potrzeby wpis w logu wolnych zapytań.
+
+        Args:
+            conn (TracedConnection): Połączenie, na którym wykonano zapytanie
+            sql (str): Treść zapytania
+            params: Parametry zapytania
+            elapsed_ms (float): Czas wykonania w ms
+            rows (int): Liczba zwróconych wierszy
+            call_site (str): Miejsce wywołania
+        """
+        query = normalize_query(sql)
+        with self._lock:
+            stats = self._stats.get(query)
+            if stats is None:
+                stats = self._stats[query] = QueryStats(query)
+            stats.add(elapsed_ms, rows, call_site)
+
+        if elapsed_ms >= self.slow_threshold_ms:
+            self._log_slow_query(conn, sql, params, elapsed_ms, rows, call_site)
+
+    def _log_slow_query(self, conn, sql, params, elapsed_ms, rows, call_site):
+        """Zapisuje wolne zapytanie wraz z planem wykonania."""
+        plan = []
+        if sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            try:
+                # Wywołanie metody klasy bazowej - plan nie jest ponownie śledzony
+                plan_cursor = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params or ())
+                plan = [str(row[-1]) for row in plan_cursor.fetchall()]
+            except Exception as e:
+                plan = [f"Nie udało się pobrać planu: {e}"]
+
+        entry = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "elapsed_ms": round(elapsed_ms, 3),
+            "rows": rows,
+            "call_site": call_site,
+            "query": normalize_query(sql),
+            "plan": plan,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.slow_log_path), exist_ok=True)
+            with open(self.slow_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e:
+            logger.error(f"Błąd podczas zapisu logu wolnych zapytań: {e}")
+
+    def get_stats(self, order_by="total_ms"):
+        """
+        Zwraca statystyki wszystkich zapytań.
+
+        Args:
+            order_by (str): Klucz sortowania (malejąco), np. 'total_ms', 'p95_ms', 'calls'
+
+        Returns:
+            list: Lista słowników ze statystykami
+        """
+        with self._lock:
+            stats = [item.to_dict() for item in self._stats.values()]
+        return sorted(stats, key=lambda item: item.get(order_by, 0), reverse=True)
+
+    def get_histogram(self, query):
+        """
+        Zwraca histogram dla znormalizowanego zapytania.
+
+        Args:
+            query (str): Znormalizowane zapytanie
+
+        Returns:
+            list: Lista krotek (etykieta_przedziału, liczba_pomiarów)
+        """
+        with self._lock:
+            stats = self._stats.get(query)
+            return stats.histogram() if stats else []
+
+    def read_slow_log(self, limit=200):
+        """
+        Odczytuje ostatnie wpisy logu wolnych zapytań.
+
+        Args:
+            limit (int): Maksymalna liczba wpisów
+
+        Returns:
+            list: Lista słowników (najnowsze na początku)
+        """
+        if not os.path.exists(self.slow_log_path):
+            return []
+        entries = deque(maxlen=limit)
+        with open(self.slow_log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+        return list(reversed(entries))
+
+    def reset(self):
+        """Czyści zebrane statystyki."""
+        with self._lock:
+            self._stats.clear()
+
+
+def _find_call_site():
+    """
+    Ustala miejsce wywołania zapytania w kodzie aplikacji.
+
+    Returns:
+        str: Opis miejsca wywołania w formacie 'plik:linia funkcja'
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.normcase(os.path.abspath(frame.f_code.co_filename))
+        if filename != _THIS_FILE:
+            return f"{os.path.basename(filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return ""
+
+
+class TracedCursor(sqlite3.Cursor):
+    """Kursor SQLite mierzący czas wykonania i pobierania wyników zapytań."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = None
+
+    def _begin(self, sql, params):
+        self._finish()
+        tracer = SQLTracer.get_instance()
+        if tracer.enabled:
+            # [sql, parametry, czas_ms, wiersze, miejsce_wywołania]
+            self._pending = [sql, params, 0.0, 0, _find_call_site()]
+
+    def _add(self, elapsed, rows=0):
+        if self._pending is not None:
+            self._pending[2] += elapsed * 1000
+            self._pending[3] += rows
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            sql, params, elapsed_ms, rows, call_site = pending
+            SQLTracer.get_instance().record(self.connection, sql, params, elapsed_ms, rows, call_site)
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._add(time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql, None)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._add(time.perf_counter() - start, max(self.rowcount, 0))
+            self._finish()
+
+    def executescript(self, sql_script):
+        self._begin(sql_script, None)
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._add(time.perf_counter() - start)
+            self._finish()
+
+    def fetchone(self):
+        if self._pending is None:
+            return super().fetchone()
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._add(time.perf_counter() - start, 0 if row is None else 1)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+        if self._pending is None:
+            return super().fetchmany(size)
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._add(time.perf_counter() - start, len(rows))
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        if self._pending is None:
+            return super().fetchall()
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._add(time.perf_counter() - start, len(rows))
+        self._finish()
+        return rows
+
+    def __next__(self):
+        if self._pending is None:
+            return super().__next__()
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add(time.perf_counter() - start)
+            self._finish()
+            raise
+        self._add(time.perf_counter() - start, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """
+    Połączenie SQLite zwracające kursory TracedCursor.
+    Gdy śledzenie jest wyłączone, zwracane są zwykłe kursory sqlite3.Cursor,
+    więc narzut ogranicza się do jednego sprawdzenia flagi na kursor.
+    """
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = TracedCursor if SQLTracer.get_instance().enabled else sqlite3.Cursor
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
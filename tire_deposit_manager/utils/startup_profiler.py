@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł do pomiaru czasu uruchamiania aplikacji.
+Używany w trybie --profile-startup do wykrywania regresji zimnego startu.
+"""
+
+import sys
+import time
+import logging
+from contextlib import contextmanager
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Flaga wiersza poleceń włączająca profilowanie startu
+PROFILE_STARTUP_FLAG = "--profile-startup"
+
+
+class StartupProfiler:
+    """
+    Klasa do mierzenia czasu poszczególnych faz uruchamiania aplikacji.
+    Gdy profilowanie jest wyłączone, wszystkie operacje są pomijane.
+    """
+
+    def __init__(self, enabled=False, start_time=None):
+        """
+        Inicjalizacja profilera.
+
+        Args:
+            enabled (bool): Czy profilowanie jest włączone
+            start_time (float, optional): Czas startu procesu (time.perf_counter).
+                                          Domyślnie moment utworzenia profilera.
+        """
+        self.enabled = enabled
+        self.start_time = start_time if start_time is not None else time.perf_counter()
+        self.phases = []
+        self._open_phases = {}
+
+    @classmethod
+    def from_argv(cls, argv, start_time=None):
+        """
+        Tworzy profiler na podstawie argumentów wiersza poleceń.
+
+        Args:
+            argv (list): Lista argumentów (np. sys.argv)
+            start_time (float, optional): Czas startu procesu
+
+        Returns:
+            StartupProfiler: Obiekt profilera (włączony, jeśli podano flagę)
+        """
+        return cls(PROFILE_STARTUP_FLAG in argv, start_time)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Mierzy czas wykonania bloku kodu jako fazę startu.
+
+        Args:
+            name (str): Nazwa fazy
+        """
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def begin(self, name):
+        """
+        Rozpoczyna pomiar fazy (dla faz kończonych asynchronicznie, np. pierwszego odmalowania).
+
+        Args:
+            name (str): Nazwa fazy
+        """
+        if self.enabled:
+            self._open_phases[name] = time.perf_counter()
+
+    def end(self, name):
+        """
+        Kończy pomiar fazy rozpoczętej metodą begin().
+
+        Args:
+            name (str): Nazwa fazy
+        """
+        if not self.enabled or name not in self._open_phases:
+            return
+        started = self._open_phases.pop(name)
+        self.phases.append((name, time.perf_counter() - started))
+
+    def record(self, name, duration):
+        """
+        Dodaje fazę o znanym czasie trwania.
+
+        Args:
+            name (str): Nazwa fazy
+            duration (float): Czas trwania w sekundach
+        """
+        if self.enabled:
+            self.phases.append((name, duration))
+
+    def report(self):
+        """
+        Tworzy raport z czasami faz.
+
+        Returns:
+            str: Sformatowany raport tekstowy
+        """
+        total = time.perf_counter() - self.start_time
+        lines = ["Profil uruchamiania aplikacji:"]
+        for name, duration in self.phases:
+            lines.append(f"  {name:<20} {duration * 1000:9.1f} ms")
+        lines.append(f"  {'razem':<20} {total * 1000:9.1f} ms")
+        return "\n".join(lines)
+
+    def print_report(self):
+        """Wypisuje raport na standardowe wyjście błędów i do logu."""
+        if not self.enabled:
+            return
+        report = self.report()
+        logger.info(report)
+        print(report, file=sys.stderr)
+
+
+def install_first_paint_probe(widget, profiler, callback=None):
+    """
+    Mierzy czas do pierwszego odmalowania okna.
+
+    Args:
+        widget (QWidget): Okno, którego pierwsze odmalowanie jest mierzone
+        profiler (StartupProfiler): Profiler, do którego trafi pomiar
+        callback (callable, optional): Funkcja wywoływana po pierwszym odmalowaniu
+
+    Returns:
+        QObject: Filtr zdarzeń (należy zachować referencję) lub None, gdy profilowanie wyłączone
+    """
+    if not profiler.enabled:
+        return None
+
+    from PySide6.QtCore import QObject, QEvent, QTimer
+
+    class _FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                obj.removeEventFilter(self)
+                profiler.end("first_paint")
+                if callback:
+                    # Raport po zakończeniu bieżącego cyklu odmalowania
+                    QTimer.singleShot(0, callback)
+            return False
+
+    probe = _FirstPaintFilter(widget)
+    profiler.begin("first_paint")
+    widget.installEventFilter(probe)
+    return probe
@@ -0,0 +1,541 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł wyszukiwarki statusu depozytów dla klientów (tylko do odczytu).
+Odpowiada na pytanie "czy moje opony są gotowe?" po kodzie depozytu (D001), numerze
+rejestracyjnym lub telefonie. Odpowiedzi pochodzą z migawki w pamięci z indeksami
+słownikowymi, odświeżanej przyrostowo zmianami z dziennika zmian (utils.change_log)
+przez osobne połączenie tylko do odczytu - główne połączenie aplikacji nie jest używane.
+Pozycja migawki zapisywana jest w change_log_cursors, aby konserwacja nie usuwała
+nieprzetworzonych zmian; po skróceniu dziennika poniżej tej pozycji migawka jest budowana od nowa.
+Serwer HTTP udostępnia API JSON i prostą stronę kiosku (tablet, monitor przy ladzie).
+
+Endpointy:
+    GET /                   strona kiosku
+    GET /status?q=D012      statusy depozytów (kod, numer rejestracyjny lub telefon)
+    GET /health             stan usługi
+"""
+
+import re
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+from utils.paths import DATABASE_PATH
+from utils.change_log import get_changes, get_change_version, get_prune_watermark, record_consumer_cursor
+from utils.deposit_lifecycle import STATUS_ACTIVE, STATUS_PICKUP, STATUS_OVERDUE
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Domyślny adres i port usługi
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766
+
+# Minimalny odstęp między sprawdzeniami dziennika zmian (sekundy)
+DEFAULT_REFRESH_INTERVAL = 2.0
+
+# Powyżej tej liczby zmian migawka budowana jest od nowa zamiast przyrostowo
+MAX_INCREMENTAL_CHANGES = 5000
+
+# Maksymalna liczba depozytów w odpowiedzi
+MAX_RESULTS = 10
+
+# Minimalny odstęp między zapisami pozycji migawki w change_log_cursors (sekundy)
+CURSOR_RECORD_INTERVAL = 60.0
+
+# Tabele, od których zależy migawka
+SNAPSHOT_TABLES = ("clients", "vehicles", "deposits")
+
+# Komunikaty dla klientów według statusu depozytu
+STATUS_MESSAGES = {
+    STATUS_ACTIVE: "Opony są przechowywane w naszym magazynie",
+    STATUS_PICKUP: "Opony są gotowe do odbioru",
+    STATUS_OVERDUE: "Termin odbioru minął - prosimy o kontakt z serwisem",
+    "Rezerwacja": "Rezerwacja - opony oczekują na przyjęcie do magazynu",
+    "Wydany": "Opony zostały wydane",
+}
+
+# Rodzaje zapytań
+QUERY_CODE = "code"
+QUERY_PHONE = "phone"
+QUERY_REGISTRATION = "registration"
+
+# Limit parametrów w jednym zapytaniu IN (...)
+_CHUNK_SIZE = 500
+
+_CODE_PATTERN = re.compile(r"^D?0*(\d{1,5})$")
+
+
+def format_deposit_code(deposit_id, code=None):
+    """
+    Zwraca kod depozytu w postaci wyświetlanej w aplikacji (np. D001).
+
+    Args:
+        deposit_id (int): ID depozytu
+        code (str, optional): Replikowany kod depozytu (deposits.code); depozyty bez kodu
+                              (np. w archiwum sprzed replikacji) - kod z identyfikatora
+
+    Returns:
+        str: Kod depozytu
+    """
+    return code or f"D{str(deposit_id).zfill(3)}"
+
+
+def phone_key(phone):
+    """Zwraca klucz wyszukiwania telefonu (ostatnie 9 cyfr) lub None."""
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-9:] if len(digits) >= 6 else None
+
+
+def registration_key(registration):
+    """Zwraca klucz wyszukiwania numeru rejestracyjnego (wielkie litery i cyfry) lub None."""
+    key = re.sub(r"[^0-9A-Z]", "", (registration or "").upper())
+    return key or None
+
+
+def parse_query(query):
+    """
+    Rozpoznaje rodzaj zapytania: kod depozytu, telefon lub numer rejestracyjny.
+
+    Args:
+        query (str): Tekst wpisany przez klienta
+
+    Returns:
+        tuple: (rodzaj, klucz) lub (None, None) dla pustego zapytania
+    """
+    text = re.sub(r"\s", "", (query or "").upper())
+    if not text:
+        return None, None
+    match = _CODE_PATTERN.match(text)
+    if match and (text.startswith("D") or len(text) < 6):
+        return QUERY_CODE, int(match.group(1))
+    if re.fullmatch(r"\+?[\d\-()]+", text):
+        key = phone_key(text)
+        if key:
+            return QUERY_PHONE, key
+    return QUERY_REGISTRATION, registration_key(text)
+
+
+def _mask_name(name):
+    """Skraca nazwę klienta do imienia i inicjału ("Jan K.") - kiosk nie pokazuje pełnych danych."""
+    parts = (name or "").split()
+    if not parts:
+        return ""
+    return parts[0] if len(parts) == 1 else f"{parts[0]} {parts[-1][0]}."
+
+
+def _chunks(ids):
+    """Dzieli identyfikatory na porcje dla zapytań IN (...)."""
+    ids = list(ids)
+    for start in range(0, len(ids), _CHUNK_SIZE):
+        yield ids[start:start + _CHUNK_SIZE]
+
+
+class DepositStatusIndex:
+    """
+    Migawka statusów depozytów z indeksami: kod, telefon i numer rejestracyjny klienta.
+    Bezpieczna wątkowo; odświeżana przy wyszukiwaniu najwyżej co refresh_interval sekund.
+    """
+
+    def __init__(self, database_path=DATABASE_PATH, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        """
+        Args:
+            database_path (str): Ścieżka do bazy danych
+            refresh_interval (float): Minimalny odstęp między sprawdzeniami zmian (sekundy)
+        """
+        self.database_path = database_path
+        self.conn = sqlite3.connect(
+            f"file:{database_path}?mode=ro", uri=True, timeout=30, check_same_thread=False
+        )
+        self.refresh_interval = refresh_interval
+        self.consumer = f"status_lookup:{socket.gethostname()}"
+        self.last_change_id = 0
+        self._recorded_at = 0.0
+        self.rebuilds = 0
+        self._indexes = self._empty_indexes()
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._checked_at = 0.0
+        self.rebuild()
+
+    def close(self):
+        """Zamyka połączenie migawki."""
+        self.conn.close()
+
+    def _empty_indexes(self):
+        """Zwraca puste struktury migawki."""
+        return {
+            "deposits": {},               # id depozytu -> dane depozytu
+            "codes": {},                  # kod depozytu -> zbiór id depozytów
+            "client_deposits": {},        # id klienta -> zbiór id depozytów
+            "client_names": {},           # id klienta -> skrócona nazwa
+            "client_phones": {},          # id klienta -> klucz telefonu
+            "phone_clients": {},          # klucz telefonu -> zbiór id klientów
+            "vehicle_registrations": {},  # id pojazdu -> (klucz rejestracji, id klienta)
+            "registration_clients": {},   # klucz rejestracji -> zbiór id klientów
+        }
+
+    def rebuild(self):
+        """Buduje migawkę od nowa i podmienia ją w całości."""
+        with self._refresh_lock:
+            self._rebuild()
+
+    def _rebuild(self):
+        version = get_change_version(self.conn)
+        indexes = self._empty_indexes()
+        self._load_clients(indexes, None)
+        self._load_vehicles(indexes, None)
+        self._load_deposits(indexes, None)
+        with self._lock:
+            self._indexes = indexes
+            self.last_change_id = version
+            self._checked_at = time.monotonic()
+        self.rebuilds += 1
+        logger.debug(f"Migawka statusów depozytów: {len(indexes['deposits'])} depozytów")
+        self._record_cursor(force=True)
+
+    def _rows(self, query, ids):
+        """Wykonuje zapytanie dla wszystkich wierszy (ids=None) lub porcjami dla podanych id."""
+        if ids is None:
+            return self.conn.execute(query.format(where="1 = 1")).fetchall()
+        rows = []
+        for chunk in _chunks(ids):
+            where = f"id IN ({', '.join('?' * len(chunk))})"
+            rows.extend(self.conn.execute(query.format(where=where), chunk).fetchall())
+        return rows
+
+    @staticmethod
+    def _discard(index, key, value):
+        """Usuwa wartość ze zbioru w indeksie (i pusty zbiór)."""
+        values = index.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del index[key]
+
+    def _load_clients(self, indexes, ids):
+        """Wczytuje (lub odświeża) klientów o podanych id; ids=None - wszystkich."""
+        if ids is not None:
+            for client_id in ids:
+                indexes["client_names"].pop(client_id, None)
+                self._discard(indexes["phone_clients"], indexes["client_phones"].pop(client_id, None), client_id)
+        for client_id, name, phone in self._rows("SELECT id, name, phone_number FROM clients WHERE {where}", ids):
+            indexes["client_names"][client_id] = _mask_name(name)
+            key = phone_key(phone)
+            if key:
+                indexes["client_phones"][client_id] = key
+                indexes["phone_clients"].setdefault(key, set()).add(client_id)
+
+    def _load_vehicles(self, indexes, ids):
+        """Wczytuje (lub odświeża) pojazdy o podanych id; ids=None - wszystkie."""
+        if ids is not None:
+            for vehicle_id in ids:
+                key, client_id = indexes["vehicle_registrations"].pop(vehicle_id, (None, None))
+                self._discard(indexes["registration_clients"], key, client_id)
+        query = "SELECT id, client_id, registration_number FROM vehicles WHERE {where}"
+        for vehicle_id, client_id, registration in self._rows(query, ids):
+            key = registration_key(registration)
+            if key and client_id is not None:
+                indexes["vehicle_registrations"][vehicle_id] = (key, client_id)
+                indexes["registration_clients"].setdefault(key, set()).add(client_id)
+
+    def _load_deposits(self, indexes, ids):
+        """Wczytuje (lub odświeża) depozyty o podanych id; ids=None - wszystkie."""
+        if ids is not None:
+            for deposit_id in ids:
+                entry = indexes["deposits"].pop(deposit_id, None)
+                if entry is not None:
+                    self._discard(indexes["client_deposits"], entry["client_id"], deposit_id)
+                    self._discard(indexes["codes"], entry["code"], deposit_id)
+        query = """
+            SELECT id, code, client_id, deposit_date, pickup_date, tire_size, tire_type, quantity, status
+            FROM deposits WHERE {where}
+        """
+        for deposit_id, code, client_id, deposit_date, pickup_date, tire_size, tire_type, quantity, status \
+                in self._rows(query, ids):
+            code = format_deposit_code(deposit_id, code)
+            indexes["codes"].setdefault(code, set()).add(deposit_id)
+            indexes["deposits"][deposit_id] = {
+                "code": code,
+                "client_id": client_id,
+                "status": status,
+                "message": STATUS_MESSAGES.get(status, status),
+                "deposit_date": deposit_date,
+                "pickup_date": pickup_date,
+                "tires": f"{tire_size or ''} {tire_type or ''}".strip(),
+                "quantity": quantity,
+            }
+            indexes["client_deposits"].setdefault(client_id, set()).add(deposit_id)
+
+    def refresh(self):
+        """
+        Uwzględnia zmiany z dziennika zmian od ostatniego odświeżenia.
+
+        Returns:
+            bool: True, jeśli migawka została zmieniona
+        """
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        # Dziennik skrócony powyżej pozycji migawki - część zmian mogła zostać usunięta
+        if get_prune_watermark(self.conn) > self.last_change_id:
+            self._rebuild()
+            return True
+
+        version = get_change_version(self.conn)
+        if version == self.last_change_id:
+            self._record_cursor()
+            return False
+
+        changes = get_changes(self.conn, self.last_change_id, MAX_INCREMENTAL_CHANGES + 1, SNAPSHOT_TABLES)
+        # Zbyt wiele zmian - szybciej zbudować migawkę od nowa
+        if len(changes) > MAX_INCREMENTAL_CHANGES:
+            self._rebuild()
+            return True
+
+        changed = {table: set() for table in SNAPSHOT_TABLES}
+        for _change_id, _changed_at, table, row_id, _operation in changes:
+            changed[table].add(row_id)
+        with self._lock:
+            indexes = self._indexes
+            self._load_clients(indexes, changed["clients"])
+            self._load_vehicles(indexes, changed["vehicles"])
+            self._load_deposits(indexes, changed["deposits"])
+            self.last_change_id = max(version, changes[-1][0] if changes else 0)
+        self._record_cursor()
+        return True
+
+    def _record_cursor(self, force=False):
+        """
+        Zapisuje pozycję migawki w change_log_cursors (najwyżej co CURSOR_RECORD_INTERVAL sekund),
+        aby konserwacja nie usuwała zmian, których migawka jeszcze nie uwzględniła.
+        Połączenie migawki jest tylko do odczytu - zapis idzie osobnym, krótkim połączeniem.
+
+        Args:
+            force (bool): Zapisz niezależnie od odstępu
+        """
+        now = time.monotonic()
+        if not force and now - self._recorded_at < CURSOR_RECORD_INTERVAL:
+            return
+        self._recorded_at = now
+        try:
+            conn = sqlite3.connect(self.database_path, timeout=5)
+            try:
+                if conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log_cursors'"
+                ).fetchone():
+                    record_consumer_cursor(conn, self.consumer, self.last_change_id)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Nie udało się zapisać pozycji wyszukiwarki statusu w dzienniku zmian: {e}")
+
+    def refresh_if_due(self):
+        """Odświeża migawkę, jeśli minął odstęp odświeżania (inne wątki nie czekają na odświeżenie)."""
+        if time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = time.monotonic()
+            self._refresh()
+        except Exception as e:
+            logger.error(f"Błąd podczas odświeżania migawki statusów depozytów: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def lookup(self, query):
+        """
+        Wyszukuje depozyty po kodzie, telefonie lub numerze rejestracyjnym.
+
+        Args:
+            query (str): Tekst wpisany przez klienta
+
+        Returns:
+            dict: {"query", "kind", "results": [dane depozytów]}; najpierw depozyty niewydane,
+                  od najnowszych
+        """
+        self.refresh_if_due()
+        kind, key = parse_query(query)
+        with self._lock:
+            indexes = self._indexes
+            # Kody z kodem stanowiska (np. DB012) rozpoznawane są po pełnym brzmieniu
+            text = re.sub(r"\s", "", (query or "").upper())
+            if text in indexes["codes"] or ("D" + text) in indexes["codes"]:
+                kind = QUERY_CODE
+                deposit_ids = set(indexes["codes"].get(text) or indexes["codes"]["D" + text])
+            elif kind == QUERY_CODE:
+                deposit_ids = set(indexes["codes"].get(format_deposit_code(key), ()))
+            else:
+                index = indexes["phone_clients" if kind == QUERY_PHONE else "registration_clients"]
+                deposit_ids = set()
+                for client_id in index.get(key, ()):
+                    deposit_ids.update(indexes["client_deposits"].get(client_id, ()))
+            entries = [indexes["deposits"][deposit_id] for deposit_id in deposit_ids]
+            entries.sort(key=lambda entry: entry["deposit_date"] or "", reverse=True)
+            entries.sort(key=lambda entry: entry["status"] == "Wydany")
+            results = []
+            for entry in entries[:MAX_RESULTS]:
+                result = {name: value for name, value in entry.items() if name != "client_id"}
+                result["client"] = indexes["client_names"].get(entry["client_id"], "")
+                results.append(result)
+        return {"query": query, "kind": kind, "results": results}
+
+
+KIOSK_PAGE = """<!DOCTYPE html>
+<html lang="pl">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>Status depozytu opon</title>
+<style>
+body { font-family: sans-serif; background: #1e1e1e; color: #fff; margin: 0; padding: 40px; text-align: center; }
+h1 { font-weight: normal; }
+input { font-size: 28px; padding: 12px; width: 60%; max-width: 520px; border-radius: 8px; border: none; }
+button { font-size: 28px; padding: 12px 28px; border-radius: 8px; border: none; background: #4dabf7; color: #fff; }
+.card { background: #2d2d2d; border-radius: 12px; margin: 16px auto; padding: 16px; max-width: 640px; text-align: left; }
+.status { font-size: 26px; font-weight: bold; }
+.hint { color: #aaa; }
+</style>
+</head>
+<body>
+<h1>Sprawdź status swoich opon</h1>
+<p class="hint">Wpisz kod depozytu (np. D012), numer rejestracyjny lub numer telefonu</p>
+<form id="form"><input id="q" autocomplete="off" autofocus> <button>Sprawdź</button></form>
+<div id="results"></div>
+<script>
+const form = document.getElementById("form"), input = document.getElementById("q"),
+      results = document.getElementById("results");
+let resetTimer = null;
+function card(r) {
+  const div = document.createElement("div");
+  div.className = "card";
+  const lines = [[r.code + " - " + r.client, ""], [r.message, "status"], ["Opony: " + r.tires + " (" + r.quantity + " szt.)", ""],
+                 ["Termin odbioru: " + (r.pickup_date || "-"), "hint"]];
+  for (const [text, cls] of lines) { const p = document.createElement("div"); p.textContent = text; p.className = cls; div.appendChild(p); }
+  return div;
+}
+form.addEventListener("submit", async (event) => {
+  event.preventDefault();
+  results.textContent = "";
+  const response = await fetch("status?q=" + encodeURIComponent(input.value));
+  const data = await response.json();
+  if (!data.results || !data.results.length) { results.textContent = "Nie znaleziono depozytu. Prosimy o kontakt z obsługą."; }
+  else { data.results.forEach(r => results.appendChild(card(r))); }
+  clearTimeout(resetTimer);
+  resetTimer = setTimeout(() => { input.value = ""; results.textContent = ""; input.focus(); }, 30000);
+});
+</script>
+</body>
+</html>
+"""
+
+
+class StatusLookupHandler(BaseHTTPRequestHandler):
+    """Obsługa żądań wyszukiwarki statusu; migawka pochodzi z obiektu serwera."""
+
+    server_version = "TireDepositManager-Status/1.0"
+
+    def log_message(self, format, *args):
+        """Kieruje dziennik żądań do loggera aplikacji."""
+        logger.debug("Status %s - %s", self.address_string(), format % args)
+
+    def _send(self, status, payload, content_type="application/json; charset=utf-8"):
+        """Wysyła odpowiedź."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_json(self, status, data):
+        """Wysyła odpowiedź JSON."""
+        self._send(status, json.dumps(data, ensure_ascii=False, default=str).encode("utf-8"))
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            if url.path in ("/", "/kiosk"):
+                self._send(200, KIOSK_PAGE.encode("utf-8"), "text/html; charset=utf-8")
+            elif url.path == "/status":
+                query = dict(parse_qsl(url.query)).get("q", "")
+                if not query.strip():
+                    self._send_json(400, {"error": "Podaj kod depozytu, numer rejestracyjny lub telefon"})
+                    return
+                self._send_json(200, self.server.index.lookup(query[:64]))
+            elif url.path == "/health":
+                index = self.server.index
+                self._send_json(200, {"status": "ok", "version": index.last_change_id, "rebuilds": index.rebuilds})
+            else:
+                self._send_json(404, {"error": "Nieznany adres"})
+        except Exception as e:
+            logger.error(f"Błąd podczas wyszukiwania statusu depozytu: {e}")
+            self._send_json(500, {"error": "Błąd usługi"})
+
+
+def create_status_server(database_path=DATABASE_PATH, host=DEFAULT_HOST, port=DEFAULT_PORT,
+                         refresh_interval=DEFAULT_REFRESH_INTERVAL):
+    """
+    Tworzy serwer wyszukiwarki statusu (bez uruchamiania pętli obsługi żądań).
+
+    Args:
+        database_path (str): Ścieżka do bazy danych
+        host (str): Adres nasłuchiwania
+        port (int): Port (0 - wybierz wolny port)
+        refresh_interval (float): Minimalny odstęp między sprawdzeniami zmian (sekundy)
+
+    Returns:
+        ThreadingHTTPServer: Serwer; migawka w server.index
+    """
+    server = ThreadingHTTPServer((host, port), StatusLookupHandler)
+    server.daemon_threads = True
+    server.index = DepositStatusIndex(database_path, refresh_interval)
+    return server
+
+
+def start_status_server(database_path=DATABASE_PATH, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Uruchamia serwer wyszukiwarki statusu w wątku w tle (np. obok aplikacji).
+
+    Args:
+        database_path (str): Ścieżka do bazy danych
+        host (str): Adres nasłuchiwania
+        port (int): Port
+
+    Returns:
+        ThreadingHTTPServer: Uruchomiony serwer (zatrzymanie: shutdown())
+    """
+    server = create_status_server(database_path, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Wyszukiwarka statusu depozytów nasłuchuje na {host}:{server.server_address[1]}")
+    return server
+
+
+def serve_status(database_path=DATABASE_PATH, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Uruchamia serwer wyszukiwarki statusu i obsługuje żądania do przerwania (Ctrl+C).
+
+    Args:
+        database_path (str): Ścieżka do bazy danych
+        host (str): Adres nasłuchiwania
+        port (int): Port
+    """
+    server = create_status_server(database_path, host, port)
+    logger.info(f"Wyszukiwarka statusu depozytów nasłuchuje na {host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.index.close()
+        logger.info("Wyszukiwarka statusu depozytów zatrzymana")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł kolejki alertów niskiego stanu magazynowego.
+Wyzwalacze na tabelach parts i inventory zapisują w stock_alerts przekroczenie progu
+(ilość <= minimum_quantity dla części, 1-2 sztuki dostępnej opony), a powrót powyżej
+progu lub usunięcie pozycji zamyka alert. Powiadomienia i pulpit czytają tylko kolejkę,
+więc koszt sprawdzenia zależy od liczby zmian, a nie od wielkości magazynu.
+"""
+
+import logging
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Próg niskiego stanu opon (zgodny z kartą "Niski stan" i raportem niskiego stanu)
+TIRE_LOW_STOCK_THRESHOLD = 2
+
+# Warunki niskiego stanu dla wiersza tabeli: {rodzaj: (tabela, warunek, próg, kolumny wyzwalacza)}
+LOW_STOCK_RULES = {
+    "part": (
+        "parts",
+        "{row}.quantity <= {row}.minimum_quantity",
+        "{row}.minimum_quantity",
+        "quantity, minimum_quantity",
+    ),
+    "tire": (
+        "inventory",
+        "{row}.status = 'Dostępna' AND {row}.quantity > 0 AND {row}.quantity <= " + str(TIRE_LOW_STOCK_THRESHOLD),
+        str(TIRE_LOW_STOCK_THRESHOLD),
+        "quantity, status",
+    ),
+}
+
+# Szkice zamówień uzupełniają stan do wielokrotności progu
+DRAFT_ORDER_TARGET_FACTOR = 2
+
+# Statusy szkiców zamówień
+DRAFT_STATUS = "Szkic"
+DRAFT_ORDERED = "Zamówione"
+
+
+def low_stock_condition(item_kind):
+    """
+    Zwraca warunek niskiego stanu bez kwalifikatora tabeli - zapytania z tym warunkiem
+    korzystają z indeksu częściowego idx_<tabela>_low_stock.
+
+    Args:
+        item_kind (str): 'part' lub 'tire'
+
+    Returns:
+        str: Warunek SQL
+    """
+    return LOW_STOCK_RULES[item_kind][1].replace("{row}.", "")
+
+
+STOCK_ALERT_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS stock_alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        item_kind TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        quantity INTEGER,
+        threshold INTEGER,
+        notified_at TEXT,
+        resolved_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS purchase_order_drafts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        alert_id INTEGER,
+        item_kind TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        supplier TEXT,
+        quantity INTEGER NOT NULL,
+        status TEXT DEFAULT 'Szkic',
+        FOREIGN KEY (alert_id) REFERENCES stock_alerts(id) ON DELETE SET NULL
+    )
+    """,
+]
+
+STOCK_ALERT_INDEXES = [
+    # Jeden otwarty alert na pozycję
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_stock_alerts_open ON stock_alerts(item_kind, item_id) "
+    "WHERE resolved_at IS NULL",
+    "CREATE INDEX IF NOT EXISTS idx_stock_alerts_pending ON stock_alerts(id) "
+    "WHERE notified_at IS NULL AND resolved_at IS NULL",
+    "CREATE INDEX IF NOT EXISTS idx_purchase_order_drafts_item ON purchase_order_drafts(item_kind, item_id, status)",
+] + [
+    f"CREATE INDEX IF NOT EXISTS idx_{table}_low_stock ON {table}(id) WHERE {low_stock_condition(kind)}"
+    for kind, (table, _condition, _threshold, _columns) in LOW_STOCK_RULES.items()
+]
+
+
+def _alert_triggers():
+    """Zwraca wyzwalacze kolejki alertów dla części i opon: {nazwa: definicja}."""
+    triggers = {}
+    for kind, (table, condition, threshold, columns) in LOW_STOCK_RULES.items():
+        is_low_new = condition.format(row="NEW")
+        is_low_old = f"COALESCE({condition.format(row='OLD')}, 0)"
+        open_alert = f"""
+            INSERT OR IGNORE INTO stock_alerts (item_kind, item_id, quantity, threshold)
+            VALUES ('{kind}', NEW.id, NEW.quantity, {threshold.format(row="NEW")});
+        """
+        close_alert = f"""
+            UPDATE stock_alerts SET resolved_at = datetime('now', 'localtime')
+            WHERE item_kind = '{kind}' AND item_id = {{row}}.id AND resolved_at IS NULL;
+        """
+        triggers[f"trg_stock_alert_{table}_insert"] = f"""
+            AFTER INSERT ON {table} WHEN {is_low_new} BEGIN
+                {open_alert}
+            END
+        """
+        triggers[f"trg_stock_alert_{table}_low"] = f"""
+            AFTER UPDATE OF {columns} ON {table} WHEN {is_low_new} AND NOT {is_low_old} BEGIN
+                {open_alert}
+            END
+        """
+        triggers[f"trg_stock_alert_{table}_restocked"] = f"""
+            AFTER UPDATE OF {columns} ON {table} WHEN NOT COALESCE({is_low_new}, 0) AND {is_low_old} BEGIN
+                {close_alert.format(row="NEW")}
+            END
+        """
+        triggers[f"trg_stock_alert_{table}_delete"] = f"""
+            AFTER DELETE ON {table} BEGIN
+                {close_alert.format(row="OLD")}
+            END
+        """
+    return triggers
+
+
+def _alert_query(where):
+    """Zwraca zapytanie o alerty z nazwą pozycji, bieżącą ilością i dostawcą."""
+    return f"""
+        SELECT a.id, a.created_at, a.item_kind, a.item_id, a.threshold,
+               COALESCE(p.name, i.brand_model || ' ' || i.size) AS name,
+               COALESCE(p.quantity, i.quantity, a.quantity) AS quantity,
+               p.supplier
+        FROM stock_alerts a
+        LEFT JOIN parts p ON a.item_kind = 'part' AND p.id = a.item_id
+        LEFT JOIN inventory i ON a.item_kind = 'tire' AND i.id = a.item_id
+        WHERE {where}
+        ORDER BY a.id
+    """
+
+
+def get_open_alerts(conn, item_kind=None):
+    """
+    Zwraca otwarte alerty niskiego stanu.
+
+    Args:
+        conn: Połączenie z bazą danych
+        item_kind (str, optional): 'part' lub 'tire'; domyślnie wszystkie
+
+    Returns:
+        list: Lista wierszy (id, created_at, item_kind, item_id, threshold, name, quantity, supplier)
+    """
+    if item_kind:
+        return conn.execute(_alert_query("a.resolved_at IS NULL AND a.item_kind = ?"), (item_kind,)).fetchall()
+    return conn.execute(_alert_query("a.resolved_at IS NULL")).fetchall()
+
+
+def count_open_alerts(conn, item_kind=None):
+    """
+    Zwraca liczbę pozycji o niskim stanie.
+
+    Args:
+        conn: Połączenie z bazą danych
+        item_kind (str, optional): 'part' lub 'tire'; domyślnie wszystkie
+
+    Returns:
+        int: Liczba otwartych alertów
+    """
+    if item_kind:
+        return conn.execute(
+            "SELECT COUNT(*) FROM stock_alerts WHERE resolved_at IS NULL AND item_kind = ?", (item_kind,)
+        ).fetchone()[0]
+    return conn.execute("SELECT COUNT(*) FROM stock_alerts WHERE resolved_at IS NULL").fetchone()[0]
+
+
+def take_pending_alerts(conn):
+    """
+    Pobiera z kolejki alerty, o których jeszcze nie powiadomiono, i oznacza je jako zgłoszone.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        list: Lista wierszy jak w get_open_alerts
+    """
+    alerts = conn.execute(_alert_query("a.notified_at IS NULL AND a.resolved_at IS NULL")).fetchall()
+    if alerts:
+        conn.executemany(
+            "UPDATE stock_alerts SET notified_at = datetime('now', 'localtime') WHERE id = ?",
+            ((alert[0],) for alert in alerts)
+        )
+        conn.commit()
+    return alerts
+
+
+def create_draft_purchase_orders(conn, alerts):
+    """
+    Tworzy szkice zamówień u dostawców dla pozycji z alertów, uzupełniające stan
+    do DRAFT_ORDER_TARGET_FACTOR x próg. Pozycje z otwartym szkicem są pomijane.
+
+    Args:
+        conn: Połączenie z bazą danych
+        alerts (list): Alerty zwrócone przez take_pending_alerts lub get_open_alerts
+
+    Returns:
+        int: Liczba utworzonych szkiców
+    """
+    created = 0
+    for alert_id, _created_at, item_kind, item_id, threshold, _name, quantity, supplier in alerts:
+        quantity = max((threshold or 1) * DRAFT_ORDER_TARGET_FACTOR - (quantity or 0), 1)
+        cursor = conn.execute(
+            """
+            INSERT INTO purchase_order_drafts (alert_id, item_kind, item_id, supplier, quantity)
+            SELECT ?, ?, ?, ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM purchase_order_drafts WHERE item_kind = ? AND item_id = ? AND status = ?
+            )
+            """,
+            (alert_id, item_kind, item_id, supplier, quantity, item_kind, item_id, DRAFT_STATUS)
+        )
+        created += cursor.rowcount
+    conn.commit()
+    if created:
+        logger.info(f"Utworzono {created} szkiców zamówień dla pozycji o niskim stanie")
+    return created
+
+
+def get_draft_purchase_orders(conn, status=DRAFT_STATUS):
+    """
+    Zwraca szkice zamówień z nazwą pozycji i bieżącą ilością.
+
+    Args:
+        conn: Połączenie z bazą danych
+        status (str, optional): Status szkiców; None zwraca wszystkie
+
+    Returns:
+        list: Lista wierszy (id, created_at, item_kind, item_id, name, stock_quantity,
+              supplier, quantity, status)
+    """
+    query = """
+        SELECT d.id, d.created_at, d.item_kind, d.item_id,
+               COALESCE(p.name, i.brand_model || ' ' || i.size) AS name,
+               COALESCE(p.quantity, i.quantity) AS stock_quantity,
+               d.supplier, d.quantity, d.status
+        FROM purchase_order_drafts d
+        LEFT JOIN parts p ON d.item_kind = 'part' AND p.id = d.item_id
+        LEFT JOIN inventory i ON d.item_kind = 'tire' AND i.id = d.item_id
+    """
+    if status is None:
+        return conn.execute(query + " ORDER BY d.id DESC").fetchall()
+    return conn.execute(query + " WHERE d.status = ? ORDER BY d.id DESC", (status,)).fetchall()
+
+
+def set_draft_status(conn, draft_ids, status):
+    """
+    Zmienia status szkiców zamówień (np. po złożeniu zamówienia u dostawcy).
+
+    Args:
+        conn: Połączenie z bazą danych
+        draft_ids (list): Identyfikatory szkiców
+        status (str): Nowy status
+
+    Returns:
+        int: Liczba zmienionych szkiców
+    """
+    cursor = conn.executemany(
+        "UPDATE purchase_order_drafts SET status = ? WHERE id = ?",
+        ((status, draft_id) for draft_id in draft_ids)
+    )
+    conn.commit()
+    return cursor.rowcount
+
+
+def delete_draft_purchase_orders(conn, draft_ids):
+    """
+    Usuwa szkice zamówień.
+
+    Args:
+        conn: Połączenie z bazą danych
+        draft_ids (list): Identyfikatory szkiców
+
+    Returns:
+        int: Liczba usuniętych szkiców
+    """
+    cursor = conn.executemany(
+        "DELETE FROM purchase_order_drafts WHERE id = ?", ((draft_id,) for draft_id in draft_ids)
+    )
+    conn.commit()
+    return cursor.rowcount
+
+
+def install_stock_alerts(conn):
+    """
+    Tworzy kolejkę alertów niskiego stanu, indeksy częściowe i wyzwalacze.
+    Pozycje, które już mają niski stan, otrzymują otwarte alerty.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for table_sql in STOCK_ALERT_TABLES:
+        cursor.execute(table_sql)
+    for index_sql in STOCK_ALERT_INDEXES:
+        cursor.execute(index_sql)
+
+    for name, body in _alert_triggers().items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+
+    for kind, (table, _condition, threshold, _columns) in LOW_STOCK_RULES.items():
+        cursor.execute(f"""
+            INSERT OR IGNORE INTO stock_alerts (item_kind, item_id, quantity, threshold)
+            SELECT '{kind}', id, quantity, {threshold.replace("{row}.", "")}
+            FROM {table} WHERE {low_stock_condition(kind)}
+        """)
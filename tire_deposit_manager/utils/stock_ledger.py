@@ -0,0 +1,465 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł rejestru ruchów magazynowych opon (inventory) i części (parts).
+Każda zmiana stanu lub ceny zapisywana jest przez wyzwalacze w tabeli stock_movements,
+do której można tylko dopisywać. Okresowe migawki (stock_snapshots) pozwalają wyznaczyć
+stan i wartość magazynu na dowolny dzień jako migawkę plus krótki ciąg ruchów.
+Opona jest na stanie tylko w statusach z TIRE_STOCK_STATUSES - sprzedaż lub wycofanie
+(zmiana statusu bez zmiany ilości) zapisywane są jako rozchód, powrót statusu jako zwrot.
+"""
+
+import logging
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Rodzaje pozycji magazynowych: {rodzaj: tabela}
+ITEM_TABLES = {"tire": "inventory", "part": "parts"}
+
+# Typy ruchów magazynowych
+MOVEMENT_OPENING = "opening_balance"
+MOVEMENT_RECEIPT = "receipt"
+MOVEMENT_SALE = "sale"
+MOVEMENT_ADJUSTMENT = "adjustment"
+MOVEMENT_DEPOSIT_CONVERSION = "deposit_conversion"
+MOVEMENT_REMOVAL = "removal"
+MOVEMENT_REVALUATION = "revaluation"
+MOVEMENT_RETURN = "return"
+
+# Statusy opon wliczane do stanu magazynowego (jak w statystykach zakładki Magazyn)
+TIRE_STOCK_STATUSES = ("Dostępna", "Rezerwacja", "Zamówiona")
+TIRE_STATUS_SOLD = "Sprzedana"
+
+# Migawka tworzona, gdy od poprzedniej przybyło co najmniej tyle ruchów
+# lub minął SNAPSHOT_INTERVAL i zarejestrowano jakikolwiek ruch
+SNAPSHOT_MIN_MOVEMENTS = 500
+SNAPSHOT_INTERVAL = timedelta(days=7)
+
+STOCK_LEDGER_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS stock_movements (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        movement_date TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+        item_kind TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        movement_type TEXT NOT NULL,
+        quantity_change INTEGER NOT NULL DEFAULT 0,
+        quantity_after INTEGER NOT NULL DEFAULT 0,
+        unit_value REAL,
+        reference TEXT,
+        notes TEXT
+    )
+    """,
+    # Kontekst bieżącej operacji (typ ruchu, dokument) odczytywany przez wyzwalacze
+    """
+    CREATE TABLE IF NOT EXISTS stock_movement_context (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        movement_type TEXT,
+        reference TEXT,
+        notes TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stock_snapshots (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        snapshot_date TEXT NOT NULL,
+        last_movement_id INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS stock_snapshot_items (
+        snapshot_id INTEGER NOT NULL,
+        item_kind TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        quantity INTEGER NOT NULL,
+        unit_value REAL,
+        PRIMARY KEY (snapshot_id, item_kind, item_id),
+        FOREIGN KEY (snapshot_id) REFERENCES stock_snapshots(id) ON DELETE CASCADE
+    )
+    """,
+]
+
+STOCK_LEDGER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_stock_movements_item ON stock_movements(item_kind, item_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_stock_movements_date ON stock_movements(movement_date)",
+    "CREATE INDEX IF NOT EXISTS idx_stock_snapshots_date ON stock_snapshots(snapshot_date)",
+]
+
+
+def _context_sql(column, default_sql):
+    if default_sql is None:
+        return f"(SELECT {column} FROM stock_movement_context WHERE id = 1)"
+    return f"COALESCE((SELECT {column} FROM stock_movement_context WHERE id = 1), {default_sql})"
+
+
+def _movement_insert_sql(kind, row, movement_type_sql, change, after):
+    return f"""
+        INSERT INTO stock_movements (
+            item_kind, item_id, movement_type, quantity_change, quantity_after, unit_value, reference, notes
+        ) VALUES (
+            '{kind}', {row}.id, {_context_sql("movement_type", movement_type_sql)}, {change}, {after}, {row}.price,
+            {_context_sql("reference", None)}, {_context_sql("notes", None)}
+        );
+    """
+
+
+def _in_stock_sql(row):
+    """Warunek SQL: opona w statusie wliczanym do stanu magazynowego."""
+    statuses = ", ".join(f"'{status}'" for status in TIRE_STOCK_STATUSES)
+    return f"COALESCE({row}.status IN ({statuses}), 0)"
+
+
+def _stocked_sql(kind, row):
+    """
+    Zwraca wyrażenie SQL z ilością pozycji wliczaną do stanu magazynowego.
+
+    Args:
+        kind (str): 'tire' lub 'part'
+        row (str): Kwalifikator wiersza (NEW, OLD lub nazwa tabeli)
+
+    Returns:
+        str: Wyrażenie SQL
+    """
+    if kind == "tire":
+        return f"(CASE WHEN {_in_stock_sql(row)} THEN COALESCE({row}.quantity, 0) ELSE 0 END)"
+    return f"COALESCE({row}.quantity, 0)"
+
+
+def _change_type_sql(kind):
+    """Zwraca wyrażenie SQL z typem ruchu dla zmiany stanu pozycji (wyzwalacz UPDATE)."""
+    if kind != "tire":
+        return f"'{MOVEMENT_ADJUSTMENT}'"
+    return f"""(CASE
+        WHEN {_in_stock_sql("OLD")} AND NOT {_in_stock_sql("NEW")} THEN
+            CASE WHEN NEW.status = '{TIRE_STATUS_SOLD}' THEN '{MOVEMENT_SALE}' ELSE '{MOVEMENT_REMOVAL}' END
+        WHEN NOT {_in_stock_sql("OLD")} AND {_in_stock_sql("NEW")} THEN '{MOVEMENT_RETURN}'
+        ELSE '{MOVEMENT_ADJUSTMENT}'
+    END)"""
+
+
+def _ledger_triggers():
+    """Zwraca wyzwalacze rejestrujące ruchy dla opon i części: {nazwa: definicja}."""
+    triggers = {
+        "trg_stock_movements_no_update": """
+            BEFORE UPDATE ON stock_movements BEGIN
+                SELECT RAISE(ABORT, 'stock_movements is append-only');
+            END
+        """,
+        "trg_stock_movements_no_delete": """
+            BEFORE DELETE ON stock_movements BEGIN
+                SELECT RAISE(ABORT, 'stock_movements is append-only');
+            END
+        """,
+    }
+    for kind, table in ITEM_TABLES.items():
+        old_stock, new_stock = _stocked_sql(kind, "OLD"), _stocked_sql(kind, "NEW")
+        # Stan opony zależy także od statusu (sprzedaż to zmiana statusu na 'Sprzedana')
+        stock_columns = "quantity, status" if kind == "tire" else "quantity"
+        triggers[f"trg_stock_{table}_insert"] = f"""
+            AFTER INSERT ON {table} WHEN {new_stock} != 0 BEGIN
+                {_movement_insert_sql(kind, "NEW", f"'{MOVEMENT_RECEIPT}'", new_stock, new_stock)}
+            END
+        """
+        triggers[f"trg_stock_{table}_quantity"] = f"""
+            AFTER UPDATE OF {stock_columns} ON {table}
+            WHEN {old_stock} != {new_stock} BEGIN
+                {_movement_insert_sql(kind, "NEW", _change_type_sql(kind),
+                                      f"{new_stock} - {old_stock}", new_stock)}
+            END
+        """
+        triggers[f"trg_stock_{table}_price"] = f"""
+            AFTER UPDATE OF price ON {table}
+            WHEN OLD.price IS NOT NEW.price AND {old_stock} = {new_stock} BEGIN
+                {_movement_insert_sql(kind, "NEW", f"'{MOVEMENT_REVALUATION}'", "0", new_stock)}
+            END
+        """
+        triggers[f"trg_stock_{table}_delete"] = f"""
+            AFTER DELETE ON {table} WHEN {old_stock} != 0 BEGIN
+                {_movement_insert_sql(kind, "OLD", f"'{MOVEMENT_REMOVAL}'", f"-{old_stock}", "0")}
+            END
+        """
+    return triggers
+
+
+@contextmanager
+def stock_movement(conn, movement_type, reference=None, notes=None):
+    """
+    Kontekst operacji magazynowej - zmiany stanów wykonane wewnątrz bloku są zapisywane
+    w rejestrze z podanym typem ruchu i dokumentem. Bez kontekstu wyzwalacze zapisują
+    przyjęcie (nowa pozycja), korektę (zmiana stanu), sprzedaż, wycofanie lub zwrot
+    (zmiana statusu opony) albo usunięcie.
+
+    Args:
+        conn: Połączenie z bazą danych
+        movement_type (str): Typ ruchu (np. MOVEMENT_SALE)
+        reference (str, optional): Dokument źródłowy (np. 'order:12', numer faktury)
+        notes (str, optional): Uwagi
+    """
+    conn.execute(
+        "INSERT OR REPLACE INTO stock_movement_context (id, movement_type, reference, notes) VALUES (1, ?, ?, ?)",
+        (movement_type, reference, notes)
+    )
+    try:
+        yield
+    finally:
+        conn.execute("DELETE FROM stock_movement_context WHERE id = 1")
+
+
+def _to_timestamp(at):
+    """Zamienia datę (koniec dnia) lub datę z czasem na znacznik czasu porównywalny z movement_date."""
+    if at is None:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(at, datetime):
+        return at.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(at, date):
+        return at.strftime("%Y-%m-%d") + " 23:59:59"
+    return at if len(at) > 10 else at + " 23:59:59"
+
+
+def get_stock_levels(conn, at=None, item_kind=None):
+    """
+    Wyznacza stany magazynowe na wskazany moment: najbliższa wcześniejsza migawka
+    plus ruchy zarejestrowane po niej.
+
+    Args:
+        conn: Połączenie z bazą danych
+        at (date|datetime|str, optional): Moment (data oznacza koniec dnia); domyślnie teraz
+        item_kind (str, optional): 'tire' lub 'part'; domyślnie wszystkie pozycje
+
+    Returns:
+        dict: Słownik {(rodzaj, id): (ilość, wartość jednostkowa)} dla pozycji o niezerowym stanie
+    """
+    timestamp = _to_timestamp(at)
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT id, last_movement_id FROM stock_snapshots WHERE snapshot_date <= ? "
+        "ORDER BY snapshot_date DESC, id DESC LIMIT 1",
+        (timestamp,)
+    )
+    snapshot = cursor.fetchone()
+
+    levels = {}
+    last_movement_id = 0
+    if snapshot:
+        snapshot_id, last_movement_id = snapshot[0], snapshot[1]
+        cursor.execute(
+            "SELECT item_kind, item_id, quantity, unit_value FROM stock_snapshot_items WHERE snapshot_id = ?"
+            + (" AND item_kind = ?" if item_kind else ""),
+            (snapshot_id, item_kind) if item_kind else (snapshot_id,)
+        )
+        levels = {(kind, item_id): (quantity, value) for kind, item_id, quantity, value in cursor.fetchall()}
+
+    cursor.execute(
+        "SELECT item_kind, item_id, quantity_change, unit_value FROM stock_movements "
+        "WHERE id > ? AND movement_date <= ?" + (" AND item_kind = ?" if item_kind else "") + " ORDER BY id",
+        (last_movement_id, timestamp, item_kind) if item_kind else (last_movement_id, timestamp)
+    )
+    for kind, item_id, change, value in cursor.fetchall():
+        quantity, _previous_value = levels.get((kind, item_id), (0, None))
+        levels[(kind, item_id)] = (quantity + change, value)
+
+    return {key: level for key, level in levels.items() if level[0] != 0}
+
+
+def get_inventory_valuation(conn, at=None):
+    """
+    Wyznacza wartość magazynu na wskazany moment (ilość x cena jednostkowa).
+
+    Args:
+        conn: Połączenie z bazą danych
+        at (date|datetime|str, optional): Moment; domyślnie teraz
+
+    Returns:
+        dict: Wartość magazynu {'tire': ..., 'part': ..., 'total': ...}
+    """
+    valuation = {kind: 0.0 for kind in ITEM_TABLES}
+    for (kind, _item_id), (quantity, value) in get_stock_levels(conn, at).items():
+        valuation[kind] += quantity * (value or 0)
+    valuation["total"] = sum(valuation[kind] for kind in ITEM_TABLES)
+    return valuation
+
+
+def get_item_movements(conn, item_kind, item_id, limit=100):
+    """
+    Zwraca ostatnie ruchy magazynowe pozycji.
+
+    Args:
+        conn: Połączenie z bazą danych
+        item_kind (str): 'tire' lub 'part'
+        item_id (int): Identyfikator pozycji
+        limit (int): Maksymalna liczba ruchów
+
+    Returns:
+        list: Lista krotek (movement_date, movement_type, quantity_change, quantity_after, reference, notes)
+    """
+    return conn.execute(
+        "SELECT movement_date, movement_type, quantity_change, quantity_after, reference, notes "
+        "FROM stock_movements WHERE item_kind = ? AND item_id = ? ORDER BY id DESC LIMIT ?",
+        (item_kind, item_id, limit)
+    ).fetchall()
+
+
+def is_snapshot_due(conn, now=None):
+    """
+    Sprawdza, czy należy utworzyć nową migawkę stanów magazynowych.
+
+    Args:
+        conn: Połączenie z bazą danych
+        now (datetime, optional): Bieżący czas
+
+    Returns:
+        bool: True, jeśli migawka jest potrzebna
+    """
+    cursor = conn.cursor()
+    if not cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stock_movements'"
+    ).fetchone():
+        return False
+
+    last_snapshot = cursor.execute(
+        "SELECT MAX(snapshot_date), COALESCE(MAX(last_movement_id), 0) FROM stock_snapshots"
+    ).fetchone()
+    new_movements = cursor.execute(
+        "SELECT COUNT(*) FROM stock_movements WHERE id > ?", (last_snapshot[1],)
+    ).fetchone()[0]
+    if new_movements >= SNAPSHOT_MIN_MOVEMENTS:
+        return True
+    if new_movements == 0 or last_snapshot[0] is None:
+        return new_movements > 0
+    age = (now or datetime.now()) - datetime.strptime(last_snapshot[0], "%Y-%m-%d %H:%M:%S")
+    return age >= SNAPSHOT_INTERVAL
+
+
+def create_stock_snapshot(conn, force=False):
+    """
+    Zapisuje migawkę stanów magazynowych wyliczoną z poprzedniej migawki i rejestru ruchów.
+
+    Args:
+        conn: Połączenie z bazą danych
+        force (bool): Utwórz migawkę nawet wtedy, gdy is_snapshot_due zwraca False
+
+    Returns:
+        int: Identyfikator migawki lub None, jeśli nie była potrzebna
+    """
+    if not force and not is_snapshot_due(conn):
+        return None
+
+    cursor = conn.cursor()
+    last_movement_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM stock_movements").fetchone()[0]
+
+    snapshot_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    levels = get_stock_levels(conn, snapshot_date)
+    cursor.execute(
+        "INSERT INTO stock_snapshots (snapshot_date, last_movement_id) VALUES (?, ?)",
+        (snapshot_date, last_movement_id)
+    )
+    snapshot_id = cursor.lastrowid
+    cursor.executemany(
+        "INSERT INTO stock_snapshot_items (snapshot_id, item_kind, item_id, quantity, unit_value) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ((snapshot_id, kind, item_id, quantity, value) for (kind, item_id), (quantity, value) in levels.items())
+    )
+    conn.commit()
+    logger.info(f"Utworzono migawkę stanów magazynowych {snapshot_id} ({len(levels)} pozycji)")
+    return snapshot_id
+
+
+def reconcile_stock_ledger(conn):
+    """
+    Dopisuje ruchy wyrównujące stany z rejestru do bieżących stanów w tabelach
+    (np. opon sprzedanych przed rejestrowaniem zmian statusu).
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        int: Liczba dopisanych ruchów
+    """
+    levels = get_stock_levels(conn)
+    corrections = []
+    for kind, table in ITEM_TABLES.items():
+        status_column = "status" if kind == "tire" else "NULL"
+        rows = conn.execute(
+            f"SELECT id, {_stocked_sql(kind, table)}, price, {status_column} FROM {table}"
+        ).fetchall()
+        for item_id, stocked, price, status in rows:
+            quantity = levels.pop((kind, item_id), (0, None))[0]
+            if stocked == quantity:
+                continue
+            if kind == "tire" and status not in TIRE_STOCK_STATUSES:
+                movement_type = MOVEMENT_SALE if status == TIRE_STATUS_SOLD else MOVEMENT_REMOVAL
+            else:
+                movement_type = MOVEMENT_ADJUSTMENT
+            corrections.append((kind, item_id, movement_type, stocked - quantity, stocked, price))
+
+    # Pozycje usunięte z tabel, które nadal mają stan w rejestrze
+    for (kind, item_id), (quantity, value) in levels.items():
+        corrections.append((kind, item_id, MOVEMENT_REMOVAL, -quantity, 0, value))
+
+    conn.executemany(
+        "INSERT INTO stock_movements (item_kind, item_id, movement_type, quantity_change, quantity_after, "
+        "unit_value, notes) VALUES (?, ?, ?, ?, ?, ?, 'Wyrównanie stanu rejestru')",
+        corrections
+    )
+    if corrections:
+        logger.info(f"Wyrównano stany rejestru ruchów magazynowych: {len(corrections)} pozycji")
+    return len(corrections)
+
+
+def install_stock_status_movements(conn):
+    """
+    Odtwarza wyzwalacze rejestru ruchów (zmiany statusu opon jako sprzedaż, wycofanie
+    lub zwrot) i wyrównuje stany rejestru do bieżących stanów magazynu.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    _install_ledger_triggers(conn)
+    reconcile_stock_ledger(conn)
+
+
+def _install_ledger_triggers(conn):
+    """Tworzy (lub odtwarza) wyzwalacze rejestru ruchów magazynowych."""
+    cursor = conn.cursor()
+    for name, body in _ledger_triggers().items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def install_stock_ledger(conn):
+    """
+    Tworzy rejestr ruchów magazynowych i jego wyzwalacze. Bieżące stany zapisywane są
+    jako bilans otwarcia i pierwsza migawka.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for table_sql in STOCK_LEDGER_TABLES:
+        cursor.execute(table_sql)
+    for index_sql in STOCK_LEDGER_INDEXES:
+        cursor.execute(index_sql)
+
+    _install_ledger_triggers(conn)
+
+    if cursor.execute("SELECT COUNT(*) FROM stock_movements").fetchone()[0] == 0:
+        for kind, table in ITEM_TABLES.items():
+            stocked = _stocked_sql(kind, table)
+            cursor.execute(f"""
+                INSERT INTO stock_movements (item_kind, item_id, movement_type, quantity_change, quantity_after, unit_value)
+                SELECT '{kind}', id, '{MOVEMENT_OPENING}', {stocked}, {stocked}, price
+                FROM {table} WHERE {stocked} != 0
+            """)
+        cursor.execute(
+            "INSERT INTO stock_snapshots (snapshot_date, last_movement_id) "
+            "SELECT datetime('now', 'localtime'), COALESCE(MAX(id), 0) FROM stock_movements"
+        )
+        snapshot_id = cursor.lastrowid
+        cursor.execute(f"""
+            INSERT INTO stock_snapshot_items (snapshot_id, item_kind, item_id, quantity, unit_value)
+            SELECT {snapshot_id}, item_kind, item_id, quantity_after, unit_value FROM stock_movements
+        """)
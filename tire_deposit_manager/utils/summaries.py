@@ -0,0 +1,435 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł zdenormalizowanych podsumowań utrzymywanych przez wyzwalacze SQLite.
+Tabela client_summary przechowuje dane wyświetlane na liście klientów (liczba pojazdów,
+pierwszy pojazd, aktywne depozyty, ostatnia wizyta, łączna wartość zamówień), a tabele
+order_summary i order_status_counts - pozycje zamówień w postaci tekstu i liczniki
+zamówień według statusu. Listy nie muszą dzięki temu wyliczać agregatów dla każdego wiersza.
+"""
+
+import logging
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Statusy depozytów liczone jako aktywne
+ACTIVE_DEPOSIT_STATUSES = ("Aktywny", "Do odbioru", "Zaległy", "Rezerwacja")
+
+# Zamówienia o tym statusie nie wliczają się do wartości zamówień klienta
+CANCELLED_ORDER_STATUS = "Anulowane"
+
+# Status wizyty, która się odbyła
+COMPLETED_APPOINTMENT_STATUS = "Zakończona"
+
+_ACTIVE_STATUSES_SQL = ", ".join(f"'{status}'" for status in ACTIVE_DEPOSIT_STATUSES)
+
+# Wartość zamówienia wliczana do łącznej wartości zamówień klienta
+_ORDER_VALUE_SQL = "(CASE WHEN {row}.status = '" + CANCELLED_ORDER_STATUS + "' THEN 0 ELSE COALESCE({row}.total_amount, 0) END)"
+
+
+def _recompute_vehicles_sql(client):
+    # Kolumny pojedyncze obok MIN(id) pochodzą z wiersza o najmniejszym id (pierwszy pojazd klienta)
+    return f"""
+        UPDATE client_summary SET
+            (vehicle_count, primary_vehicle_id, primary_registration, primary_make, primary_model) = (
+                SELECT COUNT(*), MIN(id), registration_number, make, model
+                FROM vehicles WHERE client_id = {client}
+            )
+        WHERE client_id = {client};
+    """
+
+
+def _recompute_deposits_sql(client):
+    return f"""
+        UPDATE client_summary SET active_deposit_count = (
+            SELECT COUNT(*) FROM deposits
+            WHERE client_id = {client} AND status IN ({_ACTIVE_STATUSES_SQL})
+        )
+        WHERE client_id = {client};
+    """
+
+
+def _touch_last_visit_sql(client, date):
+    # Ostatnia wizyta tylko rośnie - usunięcie lub archiwizacja rekordu jej nie cofa
+    return f"""
+        UPDATE client_summary
+        SET last_visit = NULLIF(MAX(COALESCE(last_visit, ''), COALESCE(substr({date}, 1, 10), '')), '')
+        WHERE client_id = {client};
+    """
+
+
+def _add_order_value_sql(client, row, sign):
+    return f"""
+        UPDATE client_summary
+        SET lifetime_order_value = lifetime_order_value {sign} {_ORDER_VALUE_SQL.format(row=row)}
+        WHERE client_id = {client};
+    """
+
+
+CLIENT_SUMMARY_TABLE = """
+    CREATE TABLE IF NOT EXISTS client_summary (
+        client_id INTEGER PRIMARY KEY,
+        vehicle_count INTEGER NOT NULL DEFAULT 0,
+        primary_vehicle_id INTEGER,
+        primary_registration TEXT,
+        primary_make TEXT,
+        primary_model TEXT,
+        active_deposit_count INTEGER NOT NULL DEFAULT 0,
+        last_visit TEXT,
+        lifetime_order_value REAL NOT NULL DEFAULT 0
+    )
+"""
+
+# Gdy tabela zawiera wiersz, usuwanie zamówień nie zmniejsza wartości zamówień klienta
+# (archiwizacja przenosi zamówienia do archiwum, ale nadal są one historią klienta)
+SUMMARY_FREEZE_TABLE = """
+    CREATE TABLE IF NOT EXISTS summary_freeze (
+        reason TEXT PRIMARY KEY
+    )
+"""
+
+CLIENT_SUMMARY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_client_summary_vehicle_count ON client_summary(vehicle_count)",
+    "CREATE INDEX IF NOT EXISTS idx_client_summary_registration ON client_summary(primary_registration)",
+]
+
+CLIENT_SUMMARY_TRIGGERS = {
+    "trg_client_summary_client_insert": """
+        AFTER INSERT ON clients BEGIN
+            INSERT OR IGNORE INTO client_summary (client_id) VALUES (NEW.id);
+        END
+    """,
+    "trg_client_summary_client_delete": """
+        AFTER DELETE ON clients BEGIN
+            DELETE FROM client_summary WHERE client_id = OLD.id;
+        END
+    """,
+    "trg_client_summary_vehicle_insert": f"""
+        AFTER INSERT ON vehicles BEGIN
+            {_recompute_vehicles_sql("NEW.client_id")}
+        END
+    """,
+    "trg_client_summary_vehicle_delete": f"""
+        AFTER DELETE ON vehicles BEGIN
+            {_recompute_vehicles_sql("OLD.client_id")}
+        END
+    """,
+    "trg_client_summary_vehicle_update": f"""
+        AFTER UPDATE OF client_id, registration_number, make, model ON vehicles BEGIN
+            {_recompute_vehicles_sql("OLD.client_id")}
+            {_recompute_vehicles_sql("NEW.client_id")}
+        END
+    """,
+    "trg_client_summary_deposit_insert": f"""
+        AFTER INSERT ON deposits BEGIN
+            {_recompute_deposits_sql("NEW.client_id")}
+            {_touch_last_visit_sql("NEW.client_id", "NEW.deposit_date")}
+        END
+    """,
+    "trg_client_summary_deposit_delete": f"""
+        AFTER DELETE ON deposits BEGIN
+            {_recompute_deposits_sql("OLD.client_id")}
+        END
+    """,
+    "trg_client_summary_deposit_update": f"""
+        AFTER UPDATE OF client_id, status ON deposits BEGIN
+            {_recompute_deposits_sql("OLD.client_id")}
+            {_recompute_deposits_sql("NEW.client_id")}
+        END
+    """,
+    "trg_client_summary_appointment_insert": f"""
+        AFTER INSERT ON appointments WHEN NEW.status = '{COMPLETED_APPOINTMENT_STATUS}' BEGIN
+            {_touch_last_visit_sql("NEW.client_id", "NEW.appointment_date")}
+        END
+    """,
+    "trg_client_summary_appointment_update": f"""
+        AFTER UPDATE OF client_id, status, appointment_date ON appointments
+        WHEN NEW.status = '{COMPLETED_APPOINTMENT_STATUS}' BEGIN
+            {_touch_last_visit_sql("NEW.client_id", "NEW.appointment_date")}
+        END
+    """,
+    "trg_client_summary_order_insert": f"""
+        AFTER INSERT ON orders BEGIN
+            {_add_order_value_sql("NEW.client_id", "NEW", "+")}
+            {_touch_last_visit_sql("NEW.client_id", "NEW.order_date")}
+        END
+    """,
+    "trg_client_summary_order_delete": f"""
+        AFTER DELETE ON orders WHEN NOT EXISTS (SELECT 1 FROM summary_freeze) BEGIN
+            {_add_order_value_sql("OLD.client_id", "OLD", "-")}
+        END
+    """,
+    "trg_client_summary_order_update": f"""
+        AFTER UPDATE OF client_id, status, total_amount ON orders BEGIN
+            {_add_order_value_sql("OLD.client_id", "OLD", "-")}
+            {_add_order_value_sql("NEW.client_id", "NEW", "+")}
+        END
+    """,
+}
+
+
+def _has_table(conn, table, schema="main"):
+    return conn.execute(
+        f"SELECT 1 FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def _sources(conn, table):
+    """Zwraca źródła danych tabeli: główna baza i (jeśli dołączone) archiwum."""
+    sources = [f"main.{table}"]
+    attached = {row[1] for row in conn.execute("PRAGMA database_list").fetchall()}
+    if "archive" in attached and _has_table(conn, table, "archive"):
+        sources.append(f"archive.{table}")
+    return sources
+
+
+def rebuild_client_summary(conn, client_ids=None):
+    """
+    Wylicza od nowa podsumowania klientów (wszystkich lub wskazanych).
+    Ostatnia wizyta i wartość zamówień uwzględniają archiwum, jeśli jest dołączone.
+
+    Args:
+        conn: Połączenie z bazą danych
+        client_ids (iterable, optional): Identyfikatory klientów; domyślnie wszyscy klienci
+    """
+    cursor = conn.cursor()
+    if client_ids is None:
+        cursor.execute("DELETE FROM client_summary")
+        cursor.execute("INSERT INTO client_summary (client_id) SELECT id FROM clients")
+        condition = ""
+    else:
+        ids = [int(client_id) for client_id in client_ids]
+        if not ids:
+            return
+        cursor.executemany("INSERT OR IGNORE INTO client_summary (client_id) VALUES (?)", ((i,) for i in ids))
+        condition = f" WHERE client_id IN ({', '.join(str(i) for i in ids)})"
+
+    cursor.execute(f"""
+        UPDATE client_summary SET
+            (vehicle_count, primary_vehicle_id, primary_registration, primary_make, primary_model) = (
+                SELECT COUNT(*), MIN(id), registration_number, make, model
+                FROM vehicles WHERE vehicles.client_id = client_summary.client_id
+            ),
+            active_deposit_count = (
+                SELECT COUNT(*) FROM deposits
+                WHERE deposits.client_id = client_summary.client_id AND status IN ({_ACTIVE_STATUSES_SQL})
+            )
+        {condition}
+    """)
+
+    orders = " UNION ALL ".join(f"SELECT client_id, status, total_amount, order_date FROM {source}"
+                                for source in _sources(conn, "orders"))
+    deposits = " UNION ALL ".join(f"SELECT client_id, deposit_date FROM {source}"
+                                  for source in _sources(conn, "deposits"))
+    cursor.execute(f"""
+        UPDATE client_summary SET
+            lifetime_order_value = COALESCE((
+                SELECT SUM({_ORDER_VALUE_SQL.format(row="o")})
+                FROM ({orders}) o WHERE o.client_id = client_summary.client_id
+            ), 0),
+            last_visit = (
+                SELECT NULLIF(MAX(visit), '') FROM (
+                    SELECT substr(o.order_date, 1, 10) AS visit FROM ({orders}) o
+                    WHERE o.client_id = client_summary.client_id
+                    UNION ALL
+                    SELECT substr(d.deposit_date, 1, 10) FROM ({deposits}) d
+                    WHERE d.client_id = client_summary.client_id
+                    UNION ALL
+                    SELECT substr(a.appointment_date, 1, 10) FROM appointments a
+                    WHERE a.client_id = client_summary.client_id AND a.status = '{COMPLETED_APPOINTMENT_STATUS}'
+                )
+            )
+        {condition}
+    """)
+
+
+def repair_client_summary(conn):
+    """
+    Uzupełnia podsumowania klientów, którzy ich nie mają (np. dodanych przez starszą
+    wersję aplikacji), i usuwa podsumowania nieistniejących klientów.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        int: Liczba uzupełnionych podsumowań
+    """
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM clients WHERE id NOT IN (SELECT client_id FROM client_summary)")
+        missing = [row[0] for row in cursor.fetchall()]
+        cursor.execute("DELETE FROM client_summary WHERE client_id NOT IN (SELECT id FROM clients)")
+        if missing:
+            rebuild_client_summary(conn, missing)
+            logger.info(f"Uzupełniono podsumowania {len(missing)} klientów")
+        conn.commit()
+        return len(missing)
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Błąd podczas uzupełniania podsumowań klientów: {e}")
+        return 0
+
+
+def install_client_summary(conn):
+    """
+    Tworzy tabelę client_summary, jej indeksy i wyzwalacze oraz wypełnia ją danymi.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    cursor.execute(CLIENT_SUMMARY_TABLE)
+    cursor.execute(SUMMARY_FREEZE_TABLE)
+    for index_sql in CLIENT_SUMMARY_INDEXES:
+        cursor.execute(index_sql)
+
+    for name, body in CLIENT_SUMMARY_TRIGGERS.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+
+    rebuild_client_summary(conn)
+
+
+# --- Podsumowania zamówień ---
+
+def _recompute_order_items_sql(order):
+    return f"""
+        UPDATE order_summary SET (items_text, item_count, items_total) = (
+            SELECT GROUP_CONCAT(name, ', '), COUNT(*), COALESCE(SUM(COALESCE(quantity, 0) * COALESCE(price, 0)), 0)
+            FROM (SELECT name, quantity, price FROM order_items WHERE order_id = {order} ORDER BY id)
+        )
+        WHERE order_id = {order};
+    """
+
+
+def _add_status_count_sql(status, delta):
+    return f"""
+        INSERT INTO order_status_counts (status, count) VALUES (COALESCE({status}, ''), {delta})
+        ON CONFLICT(status) DO UPDATE SET count = count + ({delta});
+    """
+
+
+ORDER_SUMMARY_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS order_summary (
+        order_id INTEGER PRIMARY KEY,
+        items_text TEXT,
+        item_count INTEGER NOT NULL DEFAULT 0,
+        items_total REAL NOT NULL DEFAULT 0
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS order_status_counts (
+        status TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+]
+
+ORDER_SUMMARY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)",
+    "CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders(order_date)",
+]
+
+ORDER_SUMMARY_TRIGGERS = {
+    "trg_order_summary_order_insert": f"""
+        AFTER INSERT ON orders BEGIN
+            INSERT OR IGNORE INTO order_summary (order_id) VALUES (NEW.id);
+            {_recompute_order_items_sql("NEW.id")}
+            {_add_status_count_sql("NEW.status", 1)}
+        END
+    """,
+    "trg_order_summary_order_delete": f"""
+        AFTER DELETE ON orders BEGIN
+            DELETE FROM order_summary WHERE order_id = OLD.id;
+            {_add_status_count_sql("OLD.status", -1)}
+        END
+    """,
+    "trg_order_summary_order_status": f"""
+        AFTER UPDATE OF status ON orders WHEN OLD.status IS NOT NEW.status BEGIN
+            {_add_status_count_sql("OLD.status", -1)}
+            {_add_status_count_sql("NEW.status", 1)}
+        END
+    """,
+    "trg_order_summary_item_insert": f"""
+        AFTER INSERT ON order_items BEGIN
+            {_recompute_order_items_sql("NEW.order_id")}
+        END
+    """,
+    "trg_order_summary_item_delete": f"""
+        AFTER DELETE ON order_items BEGIN
+            {_recompute_order_items_sql("OLD.order_id")}
+        END
+    """,
+    "trg_order_summary_item_update": f"""
+        AFTER UPDATE OF order_id, name, quantity, price ON order_items BEGIN
+            {_recompute_order_items_sql("OLD.order_id")}
+            {_recompute_order_items_sql("NEW.order_id")}
+        END
+    """,
+}
+
+
+def rebuild_order_summary(conn):
+    """
+    Wylicza od nowa podsumowania zamówień i liczniki statusów.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM order_summary")
+    cursor.execute("""
+        INSERT INTO order_summary (order_id, items_text, item_count, items_total)
+        SELECT o.id, i.items_text, COALESCE(i.item_count, 0), COALESCE(i.items_total, 0)
+        FROM orders o
+        LEFT JOIN (
+            SELECT order_id,
+                   GROUP_CONCAT(name, ', ') AS items_text,
+                   COUNT(*) AS item_count,
+                   SUM(COALESCE(quantity, 0) * COALESCE(price, 0)) AS items_total
+            FROM (SELECT order_id, name, quantity, price FROM order_items ORDER BY order_id, id)
+            GROUP BY order_id
+        ) i ON i.order_id = o.id
+    """)
+    cursor.execute("DELETE FROM order_status_counts")
+    cursor.execute("""
+        INSERT INTO order_status_counts (status, count)
+        SELECT COALESCE(status, ''), COUNT(*) FROM orders GROUP BY COALESCE(status, '')
+    """)
+
+
+def get_order_status_counts(conn):
+    """
+    Zwraca liczbę zamówień według statusu.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        dict: Słownik {status: liczba}
+    """
+    return {row[0]: row[1] for row in conn.execute("SELECT status, count FROM order_status_counts").fetchall()}
+
+
+def install_order_summary(conn):
+    """
+    Tworzy tabele order_summary i order_status_counts, indeksy i wyzwalacze
+    oraz wypełnia je danymi.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for table_sql in ORDER_SUMMARY_TABLES:
+        cursor.execute(table_sql)
+    for index_sql in ORDER_SUMMARY_INDEXES:
+        cursor.execute(index_sql)
+
+    for name, body in ORDER_SUMMARY_TRIGGERS.items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+
+    rebuild_order_summary(conn)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł dopasowania opon z magazynu do pojazdów klientów.
+Tabela vehicle_tire_matches przechowuje dla każdego pojazdu dostępne opony o tym samym
+rozmiarze (szerokość, profil, średnica - kolumny size_*). Wyzwalacze aktualizują ją
+przyrostowo przy zmianie rozmiaru pojazdu lub rozmiaru, sezonu i dostępności opony,
+dzięki czemu panel podpowiedzi wymaga jednego zapytania po indeksie.
+"""
+
+import re
+import logging
+from datetime import date
+
+from utils.tire_size import refresh_tire_sizes
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Opona jest dostępna do sprzedaży
+IN_STOCK_CONDITION = "{row}.quantity > 0 AND {row}.status IN ('Dostępna', 'Dostępny')"
+
+# Ten sam rozmiar opony i pojazdu
+SAME_SIZE_CONDITION = (
+    "{vehicle}.size_width = {tire}.size_width AND {vehicle}.size_profile IS {tire}.size_profile "
+    "AND {vehicle}.size_rim = {tire}.size_rim"
+)
+
+# Kolumny opony wpływające na dopasowanie
+MATCH_INVENTORY_COLUMNS = ("size_width", "size_profile", "size_rim", "season_type", "quantity", "status")
+MATCH_VEHICLE_COLUMNS = ("size_width", "size_profile", "size_rim")
+
+MATCH_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS vehicle_tire_matches (
+        vehicle_id INTEGER NOT NULL,
+        inventory_id INTEGER NOT NULL,
+        season_type TEXT,
+        PRIMARY KEY (vehicle_id, inventory_id)
+    ) WITHOUT ROWID
+    """,
+]
+
+MATCH_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_vehicle_tire_matches_inventory ON vehicle_tire_matches(inventory_id)",
+]
+
+# Format numeru DOT: tydzień i rok produkcji, np. "2321" lub "DOT XXXX 2321"
+_DOT_PATTERN = re.compile(r"(\d{2})(\d{2})\s*$")
+
+
+def _match_triggers():
+    """Zwraca wyzwalacze utrzymujące tabelę dopasowań: {nazwa: definicja}."""
+    insert_for_tire = f"""
+        INSERT OR IGNORE INTO vehicle_tire_matches (vehicle_id, inventory_id, season_type)
+        SELECT v.id, NEW.id, NEW.season_type FROM vehicles v
+        WHERE {IN_STOCK_CONDITION.format(row="NEW")} AND {SAME_SIZE_CONDITION.format(vehicle="v", tire="NEW")};
+    """
+    insert_for_vehicle = f"""
+        INSERT OR IGNORE INTO vehicle_tire_matches (vehicle_id, inventory_id, season_type)
+        SELECT NEW.id, i.id, i.season_type FROM inventory i
+        WHERE {SAME_SIZE_CONDITION.format(vehicle="NEW", tire="i")} AND {IN_STOCK_CONDITION.format(row="i")};
+    """
+    # Zmiana ilości bez zmiany dostępności nie przebudowuje dopasowań popularnego rozmiaru
+    tire_changed = " OR ".join(
+        [f"({IN_STOCK_CONDITION.format(row='OLD')}) IS NOT ({IN_STOCK_CONDITION.format(row='NEW')})"]
+        + [f"OLD.{column} IS NOT NEW.{column}" for column in MATCH_INVENTORY_COLUMNS[:4]]
+    )
+    vehicle_changed = " OR ".join(f"OLD.{column} IS NOT NEW.{column}" for column in MATCH_VEHICLE_COLUMNS)
+
+    return {
+        "trg_matches_inventory_insert": f"""
+            AFTER INSERT ON inventory BEGIN
+                {insert_for_tire}
+            END
+        """,
+        "trg_matches_inventory_update": f"""
+            AFTER UPDATE OF {", ".join(MATCH_INVENTORY_COLUMNS)} ON inventory WHEN {tire_changed} BEGIN
+                DELETE FROM vehicle_tire_matches WHERE inventory_id = NEW.id;
+                {insert_for_tire}
+            END
+        """,
+        "trg_matches_inventory_delete": """
+            AFTER DELETE ON inventory BEGIN
+                DELETE FROM vehicle_tire_matches WHERE inventory_id = OLD.id;
+            END
+        """,
+        "trg_matches_vehicles_insert": f"""
+            AFTER INSERT ON vehicles BEGIN
+                {insert_for_vehicle}
+            END
+        """,
+        "trg_matches_vehicles_update": f"""
+            AFTER UPDATE OF {", ".join(MATCH_VEHICLE_COLUMNS)} ON vehicles WHEN {vehicle_changed} BEGIN
+                DELETE FROM vehicle_tire_matches WHERE vehicle_id = NEW.id;
+                {insert_for_vehicle}
+            END
+        """,
+        "trg_matches_vehicles_delete": """
+            AFTER DELETE ON vehicles BEGIN
+                DELETE FROM vehicle_tire_matches WHERE vehicle_id = OLD.id;
+            END
+        """,
+    }
+
+
+def dot_age_years(dot, today=None):
+    """
+    Wyznacza wiek opony na podstawie numeru DOT (tydzień i rok produkcji).
+
+    Args:
+        dot (str): Numer DOT, np. "2321" lub "DOT EX2K 2321"
+        today (date, optional): Data odniesienia
+
+    Returns:
+        float: Wiek w latach lub None, jeśli numeru nie udało się rozpoznać
+    """
+    match = _DOT_PATTERN.search(str(dot or "").strip())
+    if not match:
+        return None
+    week, year = int(match.group(1)), 2000 + int(match.group(2))
+    try:
+        produced = date.fromisocalendar(year, week, 1)
+    except ValueError:
+        return None
+    return max(((today or date.today()) - produced).days, 0) / 365.25
+
+
+def _suggestions_query(where):
+    """Zwraca zapytanie o podpowiedzi z danymi pojazdu i opony."""
+    return f"""
+        SELECT m.vehicle_id, v.make, v.model, v.registration_number,
+               i.id AS inventory_id, i.brand_model, i.size, i.season_type, i.condition,
+               i.quantity, i.price, i.dot
+        FROM vehicle_tire_matches m
+        JOIN vehicles v ON v.id = m.vehicle_id
+        JOIN inventory i ON i.id = m.inventory_id
+        WHERE {where}
+        ORDER BY i.price, i.brand_model
+        LIMIT ?
+    """
+
+
+def get_tire_suggestions(conn, vehicle_id=None, client_id=None, season_type=None, limit=50):
+    """
+    Zwraca dostępne opony pasujące do pojazdu lub do wszystkich pojazdów klienta.
+
+    Args:
+        conn: Połączenie z bazą danych
+        vehicle_id (int, optional): Identyfikator pojazdu
+        client_id (int, optional): Identyfikator klienta (gdy nie podano pojazdu)
+        season_type (str, optional): Sezon opon ('Zimowe', 'Letnie', 'Całoroczne')
+        limit (int): Maksymalna liczba podpowiedzi
+
+    Returns:
+        list: Lista słowników z danymi pojazdu i opony (w tym dot_age - wiek w latach)
+    """
+    if vehicle_id is not None:
+        where, params = "m.vehicle_id = ?", [vehicle_id]
+    elif client_id is not None:
+        where, params = "v.client_id = ?", [client_id]
+    else:
+        return []
+    if season_type:
+        where += " AND m.season_type = ?"
+        params.append(season_type)
+
+    # Dopasowania nowych opon i pojazdów powstają po wyliczeniu kolumn rozmiaru
+    refresh_tire_sizes(conn)
+    suggestions = []
+    for row in conn.execute(_suggestions_query(where), params + [limit]).fetchall():
+        suggestion = dict(zip(
+            ("vehicle_id", "make", "model", "registration_number", "inventory_id", "brand_model", "size",
+             "season_type", "condition", "quantity", "price", "dot"),
+            tuple(row)
+        ))
+        suggestion["dot_age"] = dot_age_years(suggestion["dot"])
+        suggestions.append(suggestion)
+    return suggestions
+
+
+def format_suggestion(suggestion):
+    """
+    Zwraca opis podpowiedzi do wyświetlenia w panelu.
+
+    Args:
+        suggestion (dict): Podpowiedź z get_tire_suggestions
+
+    Returns:
+        str: Opis opony z ceną i wiekiem
+    """
+    text = (
+        f"{suggestion['brand_model']} {suggestion['size']} ({suggestion['season_type'] or '-'}) - "
+        f"{suggestion['quantity']} szt. - {suggestion['price'] or 0:.2f} zł"
+    )
+    if suggestion["dot"]:
+        text += f" - DOT {suggestion['dot']}"
+        if suggestion["dot_age"] is not None:
+            text += f" ({suggestion['dot_age']:.1f} lat)"
+    return text
+
+
+def install_tire_matching(conn):
+    """
+    Tworzy tabelę dopasowań opon do pojazdów z wyzwalaczami i wypełnia ją bieżącymi danymi.
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    cursor = conn.cursor()
+    for table_sql in MATCH_TABLES:
+        cursor.execute(table_sql)
+    for index_sql in MATCH_INDEXES:
+        cursor.execute(index_sql)
+
+    for name, body in _match_triggers().items():
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"CREATE TRIGGER {name} {body}")
+
+    cursor.execute("DELETE FROM vehicle_tire_matches")
+    cursor.execute(f"""
+        INSERT INTO vehicle_tire_matches (vehicle_id, inventory_id, season_type)
+        SELECT v.id, i.id, i.season_type
+        FROM inventory i
+        JOIN vehicles v ON {SAME_SIZE_CONDITION.format(vehicle="v", tire="i")}
+        WHERE {IN_STOCK_CONDITION.format(row="i")}
+    """)
+    logger.info(f"Dopasowano {cursor.rowcount} opon z magazynu do pojazdów")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Moduł rozpoznawania rozmiarów opon i znormalizowanych kolumn rozmiaru.
+Rozmiar zapisany tekstem (np. "205/55R16 91V", "235/65 R16C 115/113R") rozkładany jest
+na szerokość, profil, konstrukcję, średnicę felgi, indeks nośności i prędkości. Kolumny
+size_* w tabelach deposits, inventory i vehicles są indeksowane, dzięki czemu wyszukiwanie
+po rozmiarze korzysta z indeksu zamiast LIKE.
+
+Wyzwalacze są zwykłym SQL (działają także w sqlite3, DB Browser i połączeniach bez
+zarejestrowanych funkcji): zapisują zmieniony wiersz w kolejce tire_size_pending,
+a kolumny rozmiaru wylicza refresh_tire_sizes przed odczytem po rozmiarze.
+"""
+
+import re
+import logging
+from collections import namedtuple
+from functools import lru_cache
+
+# Logger
+logger = logging.getLogger("TireDepositManager")
+
+# Tabele z rozmiarem opon: {tabela: kolumna z rozmiarem}
+TIRE_SIZE_TABLES = {
+    "deposits": "tire_size",
+    "inventory": "size",
+    "vehicles": "tire_size",
+}
+
+# Znormalizowane kolumny: {kolumna: (pole TireSize, typ SQL)}
+SIZE_COLUMNS = {
+    "size_width": ("width", "INTEGER"),
+    "size_profile": ("profile", "INTEGER"),
+    "size_construction": ("construction", "TEXT"),
+    "size_rim": ("rim", "REAL"),
+    "size_load_index": ("load_index", "INTEGER"),
+    "size_speed_index": ("speed_index", "TEXT"),
+}
+
+# Kolejka wierszy, których kolumny rozmiaru trzeba wyliczyć ponownie
+PENDING_TABLE = "tire_size_pending"
+
+# Liczba wierszy odczytywanych jednym zapytaniem podczas wyliczania rozmiarów
+REFRESH_BATCH_SIZE = 500
+
+TireSize = namedtuple("TireSize", ["width", "profile", "construction", "rim", "load_index", "speed_index"])
+
+# 205/55 R16 91V, 205/55R16, 205 55 16, 225/45 ZR17 94W, 235/65 R16C 115/113R, 195 R14C
+_SIZE_PATTERN = re.compile(
+    r"(?P<width>\d{3})(?:\s*[/\s-]\s*(?P<profile>\d{2}))?\s*[/\s-]?\s*"
+    r"(?P<construction>ZR|RF|R|D|B)?\s*(?P<rim>\d{2}(?:[.,]5)?)C?"
+    r"(?:\s*(?P<load>\d{2,3})(?:/\d{2,3})?\s*(?P<speed>[A-HJ-NP-Z])\b)?"
+)
+
+
+@lru_cache(maxsize=4096)
+def parse_tire_size(text):
+    """
+    Rozpoznaje rozmiar opony zapisany tekstem.
+
+    Args:
+        text (str): Rozmiar opony, np. "205/55 R16 91V"
+
+    Returns:
+        TireSize: Rozłożony rozmiar lub None, jeśli tekstu nie udało się rozpoznać
+    """
+    if not text:
+        return None
+
+    match = _SIZE_PATTERN.search(str(text).upper())
+    if not match or (match.group("profile") is None and match.group("construction") is None):
+        return None
+
+    width = int(match.group("width"))
+    rim = float(match.group("rim").replace(",", "."))
+    if not 100 <= width <= 400 or not 10 <= rim <= 24:
+        return None
+
+    return TireSize(
+        width=width,
+        profile=int(match.group("profile")) if match.group("profile") else None,
+        construction=match.group("construction") or "R",
+        rim=rim,
+        load_index=int(match.group("load")) if match.group("load") else None,
+        speed_index=match.group("speed"),
+    )
+
+
+def format_tire_size(size):
+    """
+    Zwraca rozmiar w postaci kanonicznej, np. "205/55 R16" (bez indeksów).
+
+    Args:
+        size (TireSize): Rozmiar opony
+
+    Returns:
+        str: Rozmiar opony
+    """
+    rim = f"{size.rim:g}"
+    if size.profile is None:
+        return f"{size.width} {size.construction}{rim}"
+    return f"{size.width}/{size.profile} {size.construction}{rim}"
+
+
+def _size_values(text):
+    """Zwraca wartości kolumn SIZE_COLUMNS dla rozmiaru (same None, gdy nie rozpoznano)."""
+    size = parse_tire_size(text)
+    return tuple(getattr(size, field) if size is not None else None for field, _type in SIZE_COLUMNS.values())
+
+
+def refresh_tire_sizes(conn):
+    """
+    Wylicza kolumny rozmiaru wierszy z kolejki tire_size_pending (dodanych lub ze zmienionym
+    rozmiarem od ostatniego wywołania). Jeśli połączenie nie miało otwartej transakcji,
+    zmiany są zatwierdzane.
+
+    Args:
+        conn: Połączenie z bazą danych
+
+    Returns:
+        int: Liczba przetworzonych wierszy z kolejki
+    """
+    pending_query = f"SELECT table_name, row_id FROM {PENDING_TABLE}"
+    if conn.execute(pending_query + " LIMIT 1").fetchone() is None:
+        return 0
+
+    # Kolejka jest czytana i czyszczona w jednej transakcji zapisu (inne połączenia
+    # nie dopiszą w tym czasie wiersza, który zostałby usunięty bez wyliczenia)
+    in_transaction = conn.in_transaction
+    if not in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        pending = conn.execute(pending_query).fetchall()
+        _apply_pending_sizes(conn, pending)
+    except Exception:
+        if not in_transaction:
+            conn.rollback()
+        raise
+    if not in_transaction:
+        conn.commit()
+    logger.debug(f"Wyliczono kolumny rozmiaru opon dla {len(pending)} wierszy")
+    return len(pending)
+
+
+def _apply_pending_sizes(conn, pending):
+    """Zapisuje kolumny rozmiaru wierszy z kolejki i usuwa je z kolejki."""
+    assignments = ", ".join(f"{name} = ?" for name in SIZE_COLUMNS)
+    # Wiersze z aktualnymi wartościami nie są zapisywane (dziennik zmian, dopasowania opon)
+    changed = " OR ".join(f"{name} IS NOT ?" for name in SIZE_COLUMNS)
+
+    row_ids = {}
+    for table, row_id in pending:
+        if table in TIRE_SIZE_TABLES:
+            row_ids.setdefault(table, []).append(row_id)
+
+    for table, ids in row_ids.items():
+        column = TIRE_SIZE_TABLES[table]
+        updates = []
+        for start in range(0, len(ids), REFRESH_BATCH_SIZE):
+            batch = ids[start:start + REFRESH_BATCH_SIZE]
+            rows = conn.execute(
+                f"SELECT id, {column} FROM {table} WHERE id IN ({', '.join('?' * len(batch))})", batch
+            ).fetchall()
+            for row_id, text in rows:
+                values = _size_values(text)
+                updates.append(values + (row_id,) + values)
+        conn.executemany(f"UPDATE {table} SET {assignments} WHERE id = ? AND ({changed})", updates)
+
+    conn.executemany(
+        f"DELETE FROM {PENDING_TABLE} WHERE table_name = ? AND row_id = ?",
+        [tuple(row) for row in pending]
+    )
+
+
+def size_equals_clause(size_text, table, alias=None):
+    """
+    Buduje warunek SQL "ten sam rozmiar" (szerokość, profil, średnica) korzystający z indeksu.
+    Rozmiar, którego nie udało się rozpoznać, porównywany jest dosłownie.
+
+    Args:
+        size_text (str): Szukany rozmiar
+        table (str): Tabela z TIRE_SIZE_TABLES
+        alias (str, optional): Alias tabeli w zapytaniu
+
+    Returns:
+        tuple: (warunek SQL, lista parametrów)
+    """
+    prefix = f"{alias}." if alias else ""
+    size = parse_tire_size(size_text)
+    if size is None:
+        return f"{prefix}{TIRE_SIZE_TABLES[table]} = ?", [size_text]
+    return (
+        f"{prefix}size_width = ? AND {prefix}size_profile IS ? AND {prefix}size_rim = ?",
+        [size.width, size.profile, size.rim]
+    )
+
+
+def get_size_options(conn, table, where="1", params=()):
+    """
+    Zwraca listę różnych rozmiarów (postać kanoniczna) do filtrów, grupując zapisy
+    tego samego rozmiaru ("205/55R16", "205/55 R16 91V").
+
+    Args:
+        conn: Połączenie z bazą danych
+        table (str): Tabela z TIRE_SIZE_TABLES
+        where (str): Dodatkowy warunek SQL
+        params (tuple): Parametry warunku
+
+    Returns:
+        list: Posortowana lista rozmiarów
+    """
+    refresh_tire_sizes(conn)
+    column = TIRE_SIZE_TABLES[table]
+    rows = conn.execute(f"""
+        SELECT size_width, size_profile, size_construction, size_rim, MIN({column})
+        FROM {table}
+        WHERE {where}
+        GROUP BY size_width, size_profile, size_rim, CASE WHEN size_width IS NULL THEN {column} END
+        ORDER BY size_width IS NULL, size_width, size_profile, size_rim, MIN({column})
+    """, params).fetchall()
+
+    options = []
+    for width, profile, construction, rim, text in rows:
+        if width is None:
+            options.append(text)
+        else:
+            options.append(format_tire_size(TireSize(width, profile, construction or "R", rim, None, None)))
+    return options
+
+
+def find_inventory_by_size(conn, size=None, rim_from=None, rim_to=None, season_type=None, in_stock=True):
+    """
+    Wyszukuje opony w magazynie po rozmiarze (dokładnym lub zakresie średnic) i sezonie.
+
+    Args:
+        conn: Połączenie z bazą danych
+        size (str, optional): Rozmiar opony (porównanie szerokości, profilu i średnicy)
+        rim_from (float, optional): Minimalna średnica felgi
+        rim_to (float, optional): Maksymalna średnica felgi
+        season_type (str, optional): Sezon ('Zimowe', 'Letnie', 'Całoroczne')
+        in_stock (bool): Tylko dostępne opony z niezerową ilością
+
+    Returns:
+        list: Lista wierszy inventory
+    """
+    refresh_tire_sizes(conn)
+    conditions, params = [], []
+    if size:
+        clause, clause_params = size_equals_clause(size, "inventory")
+        conditions.append(clause)
+        params.extend(clause_params)
+    if rim_from is not None:
+        conditions.append("size_rim >= ?")
+        params.append(rim_from)
+    if rim_to is not None:
+        conditions.append("size_rim <= ?")
+        params.append(rim_to)
+    if season_type:
+        conditions.append("season_type = ?")
+        params.append(season_type)
+    if in_stock:
+        conditions.append("quantity > 0 AND status IN ('Dostępna', 'Dostępny')")
+
+    return conn.execute(
+        "SELECT * FROM inventory WHERE " + (" AND ".join(conditions) or "1") + " ORDER BY price",
+        params
+    ).fetchall()
+
+
+def _size_triggers(table, column):
+    """Zwraca wyzwalacze kolejkujące wiersze do wyliczenia kolumn rozmiaru: {nazwa: definicja}."""
+    enqueue = f"INSERT OR IGNORE INTO {PENDING_TABLE} (table_name, row_id) VALUES ('{table}', NEW.id);"
+    # Nieaktualny rozmiar nie może pasować do wyszukiwania do czasu ponownego wyliczenia
+    clear = f"UPDATE {table} SET {', '.join(f'{name} = NULL' for name in SIZE_COLUMNS)} WHERE id = NEW.id;"
+    return {
+        f"trg_{table}_size_insert": f"""
+            AFTER INSERT ON {table} BEGIN
+                {enqueue}
+            END
+        """,
+        f"trg_{table}_size_update": f"""
+            AFTER UPDATE OF {column} ON {table} WHEN NEW.{column} IS NOT OLD.{column} BEGIN
+                {clear}
+                {enqueue}
+            END
+        """,
+    }
+
+
+def _add_size_columns(conn, table, schema="main"):
+    """Dodaje brakujące kolumny rozmiaru i uzupełnia je dla istniejących wierszy."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info({table})").fetchall()}
+    if not existing:
+        return
+    for name, (_field, column_type) in SIZE_COLUMNS.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {schema}.{table} ADD COLUMN {name} {column_type}")
+
+    column = TIRE_SIZE_TABLES[table]
+    updates = []
+    for row_id, text in conn.execute(f"SELECT id, {column} FROM {schema}.{table}").fetchall():
+        if parse_tire_size(text) is not None:
+            updates.append(_size_values(text) + (row_id,))
+    assignments = ", ".join(f"{name} = ?" for name in SIZE_COLUMNS)
+    conn.executemany(f"UPDATE {schema}.{table} SET {assignments} WHERE id = ?", updates)
+    logger.info(f"Rozpoznano rozmiar opon w {len(updates)} wierszach tabeli {schema}.{table}")
+
+
+def install_tire_size_triggers(conn):
+    """
+    Tworzy kolejkę tire_size_pending i wyzwalacze kolumn rozmiaru w zwykłym SQL
+    (zastępują wcześniejsze wyzwalacze wymagające funkcji tire_size_part).
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {PENDING_TABLE} (
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            PRIMARY KEY (table_name, row_id)
+        ) WITHOUT ROWID
+    """)
+    for table, column in TIRE_SIZE_TABLES.items():
+        for name, body in _size_triggers(table, column).items():
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            conn.execute(f"CREATE TRIGGER {name} {body}")
+
+
+def install_tire_size_columns(conn):
+    """
+    Dodaje znormalizowane kolumny rozmiaru opon z indeksami i wyzwalaczami
+    oraz uzupełnia je dla istniejących danych (również w dołączonym archiwum).
+
+    Args:
+        conn: Połączenie z bazą danych
+    """
+    attached = {row[1] for row in conn.execute("PRAGMA database_list").fetchall()}
+
+    for table in TIRE_SIZE_TABLES:
+        _add_size_columns(conn, table)
+        # Archiwum musi mieć te same kolumny co tabela główna (widoki <tabela>_all)
+        if "archive" in attached:
+            _add_size_columns(conn, table, "archive")
+
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_size ON {table}(size_width, size_profile, size_rim)"
+        )
+    install_tire_size_triggers(conn)
+
+    # Zakres średnic z sezonem ("wszystkie 16-calowe opony zimowe")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_inventory_rim_season ON inventory(size_rim, season_type)")